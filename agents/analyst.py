@@ -11,9 +11,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from typing import Dict
 import xml.etree.ElementTree as ET
 import pandas as pd
-from langchain_ollama import ChatOllama
 
-from config.settings import OLLAMA_BASE_URL, MODEL_REASONING, SIMULATIONS_DIR
+from config.settings import MODEL_REASONING, SIMULATIONS_DIR
+from utils.artifact_store import open_artifact, compress_run_artifacts
 from utils.state import AgentState, add_audit_entry, increment_iteration
 from utils.statistical_tests import (
     t_test_two_samples,
@@ -23,38 +23,18 @@ from utils.statistical_tests import (
     generate_statistical_report
 )
 from utils.prompts import get_prompt
+from utils.dependency_injection import get_llm
 
 
 def parse_flowmonitor_xml(xml_path: str) -> pd.DataFrame:
-    """Parsea XML de FlowMonitor de NS-3"""
+    """Parsea XML de FlowMonitor de NS-3 (acepta XML comprimido)"""
     try:
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-        
         flows = []
-        for flow in root.findall('.//Flow'):
-            tx_packets = int(flow.get('txPackets', 0))
-            rx_packets = int(flow.get('rxPackets', 0))
-            tx_bytes = int(flow.get('txBytes', 0))
-            rx_bytes = int(flow.get('rxBytes', 0))
-            
-            # Calcular métricas
-            pdr = (rx_packets / tx_packets * 100) if tx_packets > 0 else 0
-            throughput = (rx_bytes * 8 / 1000000)  # Mbps
-            
-            # Delay (convertir de nanosegundos a milisegundos)
-            delay_str = flow.get('delaySum', '0ns').replace('ns', '')
-            delay_ns = float(delay_str) if delay_str else 0
-            avg_delay = (delay_ns / rx_packets / 1e6) if rx_packets > 0 else 0
-            
-            flows.append({
-                'flow_id': flow.get('flowId'),
-                'tx_packets': tx_packets,
-                'rx_packets': rx_packets,
-                'pdr': pdr,
-                'throughput_mbps': throughput,
-                'avg_delay_ms': avg_delay
-            })
+        with open_artifact(xml_path) as stream:
+            for _, elem in ET.iterparse(stream, events=('end',)):
+                if elem.tag == 'Flow':
+                    flows.append(_parse_flow_element(elem))
+                    elem.clear()
         
         return pd.DataFrame(flows)
     except Exception as e:
@@ -62,6 +42,32 @@ def parse_flowmonitor_xml(xml_path: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+def _parse_flow_element(flow: ET.Element) -> Dict:
+    """Extrae las métricas de un elemento <Flow> de FlowMonitor"""
+    tx_packets = int(flow.get('txPackets', 0))
+    rx_packets = int(flow.get('rxPackets', 0))
+    tx_bytes = int(flow.get('txBytes', 0))
+    rx_bytes = int(flow.get('rxBytes', 0))
+    
+    # Calcular métricas
+    pdr = (rx_packets / tx_packets * 100) if tx_packets > 0 else 0
+    throughput = (rx_bytes * 8 / 1000000)  # Mbps
+    
+    # Delay (convertir de nanosegundos a milisegundos)
+    delay_str = flow.get('delaySum', '0ns').replace('ns', '')
+    delay_ns = float(delay_str) if delay_str else 0
+    avg_delay = (delay_ns / rx_packets / 1e6) if rx_packets > 0 else 0
+    
+    return {
+        'flow_id': flow.get('flowId'),
+        'tx_packets': tx_packets,
+        'rx_packets': rx_packets,
+        'pdr': pdr,
+        'throughput_mbps': throughput,
+        'avg_delay_ms': avg_delay
+    }
+
+
 def calculate_kpis(df: pd.DataFrame) -> Dict:
     """Calcula KPIs agregados con estadísticas avanzadas"""
     if df.empty:
@@ -211,11 +217,7 @@ def classify_performance(kpis: Dict) -> str:
 def propose_optimization(kpis: Dict, task: str) -> str:
     """Propone optimizaciones usando LLM con análisis profundo"""
     try:
-        llm = ChatOllama(
-            model=MODEL_REASONING,
-            temperature=0.3,
-            base_url=OLLAMA_BASE_URL
-        )
+        llm = get_llm(MODEL_REASONING, 0.3, agent="analyst")
         
         # Preparar estadísticas detalladas
         stats_summary = f"""
@@ -278,6 +280,35 @@ Recomendación Principal: {"Optimización con Deep Learning necesaria" if kpis.g
         return f"Error en propuesta: {str(e)}"
 
 
+def archive_simulation_artifacts(results_path: str, df: pd.DataFrame) -> Dict:
+    """
+    Guarda la tabla de flujos y comprime los artefactos crudos de la ejecución
+    
+    Solo actúa sobre directorios de ejecución bajo simulations/results; la
+    tabla derivada (flows.csv) se conserva aunque la retención elimine
+    posteriormente los PCAPs y el XML.
+    
+    Args:
+        results_path: Ruta del XML de FlowMonitor analizado
+        df: DataFrame de flujos ya parseado
+        
+    Returns:
+        Estadísticas de compresión (vacío si no aplica)
+    """
+    run_dir = Path(results_path).parent
+    results_root = (SIMULATIONS_DIR / "results").resolve()
+    
+    if results_root not in run_dir.resolve().parents:
+        return {}
+    
+    try:
+        df.to_csv(run_dir / "flows.csv", index=False)
+        return compress_run_artifacts(run_dir)
+    except Exception as e:
+        print(f"⚠️  No se pudieron archivar los artefactos: {e}")
+        return {}
+
+
 def analyst_node(state: AgentState) -> Dict:
     """Nodo del agente analista para LangGraph"""
     print("\n" + "="*80)
@@ -380,6 +411,12 @@ def analyst_node(state: AgentState) -> Dict:
         
         print("✅ Análisis completado")
         
+        # Comprimir PCAPs y XML ya analizados
+        archive_stats = archive_simulation_artifacts(results_path, df)
+        if archive_stats.get('compressed_files'):
+            print(f"🗜️  Artefactos comprimidos: {len(archive_stats['compressed_files'])} "
+                  f"({archive_stats['bytes_before'] / 1e6:.1f} MB → {archive_stats['bytes_after'] / 1e6:.1f} MB)")
+        
         return {
             'analysis_results': {
                 'dataframe': df.to_dict(),
@@ -408,7 +445,8 @@ def analyst_node(state: AgentState) -> Dict:
                 'avg_delay': kpis.get('avg_delay', 0),
                 'routing_overhead': routing_overhead,
                 'confidence_intervals_count': len(confidence_intervals) if confidence_intervals else 0,
-                'statistical_tests_count': len(statistical_results) if statistical_results else 0
+                'statistical_tests_count': len(statistical_results) if statistical_results else 0,
+                'compressed_artifacts': len(archive_stats.get('compressed_files', []))
             })
         }
         
@@ -9,25 +9,35 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from typing import Dict
+from typing import Dict, Optional
 import re
-from langchain_ollama import ChatOllama
 
 from config.settings import (
-    OLLAMA_BASE_URL,
     MODEL_CODING,
     MODEL_TEMPERATURE_CODING,
-    SIMULATIONS_DIR
+    SIMULATIONS_DIR,
+    PCAP_CAPTURE_PROFILE,
+    CODER_STREAMING,
+    MODEL_ESCALATION_FAILURES,
+    CODER_TEMPLATES_ENABLED
 )
 from utils.state import AgentState, add_audit_entry, increment_iteration
 from utils.logging_utils import update_agent_status, log_message
 from utils.validation import validate_code
 from utils.errors import CodeGenerationError
 from utils.prompts import get_prompt
+from utils.prompt_budget import PromptSection, compress_traceback, get_budgeted_prompt
+from utils.capture_profiles import apply_capture_profile
+from utils.model_router import get_routed_llm
+from utils.llm_streaming import stream_code_block
 
 
 # Template movido a config/prompts.yaml
 
+# Límites de tokens por sección (el prompt completo se ajusta a PROMPT_TOKEN_BUDGET)
+RESEARCH_NOTES_TOKENS = 600
+ERROR_DETAIL_TOKENS = 250
+
 
 def extract_code_from_response(response: str) -> str:
     """
@@ -60,7 +70,7 @@ def extract_code_from_response(response: str) -> str:
 
 
 
-from utils.memory import memory
+from utils.memory import get_memory
 
 def generate_code(task: str, research_notes: str, previous_error: str = None, error_type: str = None, iteration: int = 0) -> str:
     """
@@ -77,20 +87,28 @@ def generate_code(task: str, research_notes: str, previous_error: str = None, er
         Código Python generado
     """
     try:
-        llm = ChatOllama(
-            model=MODEL_CODING,
-            temperature=MODEL_TEMPERATURE_CODING,
-            base_url=OLLAMA_BASE_URL
-        )
+        # Plan con el modelo rápido; pasa al grande si el código ya falló varias veces
+        escalate = bool(previous_error) and iteration >= MODEL_ESCALATION_FAILURES
+        planner = get_routed_llm('coder.plan', MODEL_CODING, MODEL_TEMPERATURE_CODING,
+                                 agent="coder", escalate=escalate)
+        llm = get_routed_llm('coder.code', MODEL_CODING, MODEL_TEMPERATURE_CODING, agent="coder")
         
         # Recuperar experiencia de memoria si hay error previo
         memory_context = ""
+        known_fix = False
         if previous_error:
-            experiences = memory.retrieve_experience(task, previous_error)
+            experiences = get_memory().retrieve_experience(task, previous_error)
             if experiences:
                 exp = experiences[0]
-                print(f"🧠 Memoria activada: Solución similar encontrada ({exp['relevance']:.2f})")
-                log_message("Coder", f"Memoria activada: Solución similar encontrada ({exp['relevance']:.2f})")
+                # La memoria solo resuelve por firma si esta nombra el símbolo que
+                # falla o la tarea sigue la misma plantilla; el resto pasa por CoT
+                known_fix = 'signature' in exp
+                if known_fix:
+                    print(f"🧠 Memoria activada: Fallo conocido ({exp['signature']})")
+                    log_message("Coder", f"Memoria activada: Fallo conocido ({exp['signature']})")
+                else:
+                    print(f"🧠 Memoria activada: Solución similar encontrada ({exp['relevance']:.2f})")
+                    log_message("Coder", f"Memoria activada: Solución similar encontrada ({exp['relevance']:.2f})")
                 memory_context = f"""
 **💡 SOLUCIÓN PASADA RECUPERADA:**
 En una tarea similar ("{exp['task']}") con un error similar ("{exp['error']}"), 
@@ -99,20 +117,33 @@ esta solución funcionó:
 """
 
         # Paso 1: Chain of Thought - Planificación detallada
-        print("  🧠 Generando plan de simulación...")
-        log_message("Coder", "Planificando simulación con Chain-of-Thought...")
-        
-        cot_prompt = get_prompt(
-            'coder', 
-            'chain_of_thought',
-            task=task,
-            research_notes=research_notes[:2000] if research_notes else "Sin contexto específico",
-            memory_context=memory_context
-        )
-        print(f"  DEBUG: Invoking LLM for CoT with model {MODEL_CODING}...")
-        reasoning = llm.invoke(cot_prompt)
-        print(f"  DEBUG: LLM CoT response received. Length: {len(reasoning.content)}")
-        print(f"  ✓ Planificación completada")
+        if known_fix:
+            # La solución validada de un fallo conocido hace de plan: sin ronda de planificación
+            plan = memory_context
+            print("  ✓ Fallo conocido: se omite la planificación")
+            log_message("Coder", "Fallo conocido: se omite la planificación Chain-of-Thought")
+        else:
+            print("  🧠 Generando plan de simulación...")
+            log_message("Coder", "Planificando simulación con Chain-of-Thought...")
+            
+            cot_prompt = get_budgeted_prompt(
+                'coder', 
+                'chain_of_thought',
+                sections={
+                    # Las notas se resumen una vez y el resumen se reutiliza entre iteraciones
+                    'research_notes': PromptSection(
+                        research_notes or "Sin contexto específico",
+                        priority=2, max_tokens=RESEARCH_NOTES_TOKENS, compressor='notes'
+                    ),
+                    'memory_context': PromptSection(memory_context, priority=3)
+                },
+                task=task
+            )
+            print(f"  DEBUG: Invoking LLM for CoT with model {planner.model_name}...")
+            reasoning = planner.invoke(cot_prompt)
+            plan = reasoning.content
+            print(f"  DEBUG: LLM CoT response received. Length: {len(plan)}")
+            print(f"  ✓ Planificación completada")
         
         # Paso 2: Generación de código
         error_context = ""
@@ -129,7 +160,7 @@ esta solución funcionó:
             error_context = f"""
 **⚠️ ERROR ANTERIOR (Iteración {iteration}):**
 Tipo: {error_type or 'Desconocido'}
-Detalle: {previous_error[:500]}
+Detalle: {compress_traceback(previous_error, ERROR_DETAIL_TOKENS)}
 
 ESTRATEGIA DE CORRECCIÓN:
 {strategy}
@@ -137,21 +168,32 @@ ESTRATEGIA DE CORRECCIÓN:
 IMPORTANTE: Este es el intento #{iteration+1}. Sé más cuidadoso.
 """
 
-        code_prompt = get_prompt(
+        code_prompt = get_budgeted_prompt(
             'coder',
             'generation',
-            task=task,
-            plan=reasoning.content,
-            error_context=error_context
+            sections={
+                'plan': PromptSection(plan, priority=1),
+                'error_context': PromptSection(error_context, priority=2)
+            },
+            task=task
         )
         
         print(f"  💻 Generando código (intento #{iteration+1})...")
         log_message("Coder", f"Generando código (Iteración {iteration+1})...")
         print(f"  DEBUG: Invoking LLM for Code Generation with model {MODEL_CODING}...")
-        response = llm.invoke(code_prompt)
+        if CODER_STREAMING:
+            # Cortar la generación en cuanto llega un bloque Python válido
+            content, code, stream_stats = stream_code_block(llm, code_prompt)
+            if stream_stats['stopped_early']:
+                print(f"  ✓ Bloque de código completo recibido; generación detenida "
+                      f"({stream_stats['chars_received']} caracteres, {stream_stats['elapsed']:.1f}s)")
+                log_message("Coder", f"Streaming detenido tras bloque válido ({stream_stats['chars_received']} caracteres)")
+        else:
+            content, code = llm.invoke(code_prompt).content, None
         print(f"  DEBUG: LLM Code Generation response received.")
-        print(f"  ✓ Respuesta LLM recibida. Longitud: {len(response.content)}")
-        code = extract_code_from_response(response.content)
+        print(f"  ✓ Respuesta LLM recibida. Longitud: {len(content)}")
+        if code is None:
+            code = extract_code_from_response(content)
         print(f"  ✓ Código extraído. Longitud: {len(code)}")
         
         # Post-procesamiento: asegurar imports básicos
@@ -303,6 +345,293 @@ if __name__ == "__main__":
 '''
 
 
+# ==================== PLANTILLAS DE ESCENARIOS ESTÁNDAR ====================
+
+# Protocolo -> (módulo NS-3, helper de enrutamiento); HWMP enruta en capa 2 (802.11s)
+TEMPLATE_PROTOCOLS = {
+    'AODV': ('aodv', 'AodvHelper'),
+    'OLSR': ('olsr', 'OlsrHelper'),
+    'DSDV': ('dsdv', 'DsdvHelper'),
+    'HWMP': ('mesh', None),
+}
+
+TEMPLATE_MOBILITY = ('RandomWaypoint', 'ConstantPosition')
+
+# Tarea generada por ExperimentRunner._generate_task
+STANDARD_TASK_PATTERN = re.compile(
+    r'protocolo\s+(?P<protocol>\w+),\s*(?P<nodes>\d+)\s+nodos\s+m[oó]viles\s+con\s+modelo\s+'
+    r'(?P<mobility>\w+)\s*\(velocidad\s+(?P<speed>[\d.]+\s*-\s*[\d.]+)\s*m/s\),\s*'
+    r'[aá]rea\s+de\s+(?P<area>[\d.]+)x[\d.]+\s+metros,\s*durante\s+(?P<duration>[\d.]+)\s+segundos',
+    re.IGNORECASE
+)
+
+SCENARIO_SCRIPT_TEMPLATE = '''#!/usr/bin/env python3
+"""
+Script de simulación NS-3 - Plantilla de escenario estándar
+Protocolo: {protocol} | Nodos: {nodes} | Área: {area:g}x{area:g} m
+Movilidad: {mobility} ({speed_min:g}-{speed_max:g} m/s) | Duración: {duration:g} s
+"""
+
+import sys
+import time
+import json
+import datetime
+sys.path.insert(0, 'build/lib/python3')
+
+import ns.core
+import ns.network
+import ns.internet
+import ns.wifi
+import ns.mobility
+import ns.applications
+import ns.flow_monitor
+import ns.{protocol_module}
+
+NUM_NODES = {nodes}
+AREA = {area}
+SIMULATION_TIME = {duration}
+SPEED_MIN = {speed_min}
+SPEED_MAX = {speed_max}
+SIMULATION_SEED = {seed}
+NUM_FLOWS = {flows}
+PORT = 9
+PACKET_SIZE = 512
+PACKET_INTERVAL = 0.25
+
+
+def main():
+    start_time = time.time()
+    print("Iniciando simulación ({protocol}, {{}} nodos)...".format(NUM_NODES))
+
+    ns.core.RngSeedManager.SetSeed(SIMULATION_SEED)
+
+    # Nodos
+    nodes = ns.network.NodeContainer()
+    nodes.Create({nodes})
+
+    # Capa física
+    phy = ns.wifi.YansWifiPhyHelper()
+    channel = ns.wifi.YansWifiChannelHelper.Default()
+    phy.SetChannel(channel.Create())
+{device_block}
+    # Movilidad
+    position_alloc = ns.mobility.RandomRectanglePositionAllocator()
+    position_alloc.SetAttribute("X", ns.core.StringValue(
+        "ns3::UniformRandomVariable[Min=0.0|Max={{}}]".format(AREA)))
+    position_alloc.SetAttribute("Y", ns.core.StringValue(
+        "ns3::UniformRandomVariable[Min=0.0|Max={{}}]".format(AREA)))
+    mobility = ns.mobility.MobilityHelper()
+    mobility.SetPositionAllocator(position_alloc)
+{mobility_block}
+    mobility.Install(nodes)
+
+    # Stack de Internet y enrutamiento
+    internet = ns.internet.InternetStackHelper()
+{routing_block}
+    internet.Install(nodes)
+
+    ipv4 = ns.internet.Ipv4AddressHelper()
+    ipv4.SetBase(ns.network.Ipv4Address("10.1.0.0"), ns.network.Ipv4Mask("255.255.0.0"))
+    interfaces = ipv4.Assign(devices)
+
+    # Tráfico UDP entre pares de nodos opuestos
+    for flow in range(NUM_FLOWS):
+        sink = NUM_NODES - 1 - flow
+        server = ns.applications.UdpEchoServerHelper(PORT + flow)
+        server_apps = server.Install(nodes.Get(sink))
+        server_apps.Start(ns.core.Seconds(1.0))
+        server_apps.Stop(ns.core.Seconds(SIMULATION_TIME))
+
+        client = ns.applications.UdpEchoClientHelper(interfaces.GetAddress(sink), PORT + flow)
+        client.SetAttribute("MaxPackets", ns.core.UintegerValue(int(SIMULATION_TIME / PACKET_INTERVAL)))
+        client.SetAttribute("Interval", ns.core.TimeValue(ns.core.Seconds(PACKET_INTERVAL)))
+        client.SetAttribute("PacketSize", ns.core.UintegerValue(PACKET_SIZE))
+        client_apps = client.Install(nodes.Get(flow))
+        client_apps.Start(ns.core.Seconds(2.0 + 0.1 * flow))
+        client_apps.Stop(ns.core.Seconds(SIMULATION_TIME - 1.0))
+
+    # Captura PCAP
+    phy.EnablePcapAll("simulacion", True)
+
+    # FlowMonitor
+    flowmon_helper = ns.flow_monitor.FlowMonitorHelper()
+    monitor = flowmon_helper.InstallAll()
+
+    ns.core.Simulator.Stop(ns.core.Seconds(SIMULATION_TIME))
+    ns.core.Simulator.Run()
+
+    monitor.SerializeToXmlFile("resultados.xml", True, True)
+
+    metadata = {{
+        "status": "completed",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "execution_time": time.time() - start_time,
+        "simulation_time": SIMULATION_TIME,
+        "files_generated": ["resultados.xml"],
+        "nodes_count": ns.network.NodeList.GetNNodes(),
+        "protocol": "{protocol}",
+        "source": "template"
+    }}
+    with open("simulation_metadata.json", "w") as f:
+        json.dump(metadata, f, indent=4)
+
+    print("✅ Simulación completada. Resultados en resultados.xml")
+    ns.core.Simulator.Destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        with open("simulation_metadata.json", "w") as f:
+            json.dump({{
+                "status": "failed",
+                "timestamp": datetime.datetime.now().isoformat(),
+                "error": str(e)
+            }}, f, indent=4)
+        sys.exit(1)
+'''
+
+ADHOC_DEVICE_BLOCK = '''
+    # WiFi ad hoc
+    wifi = ns.wifi.WifiHelper()
+    wifi.SetStandard(ns.wifi.WIFI_STANDARD_80211a)
+    wifi.SetRemoteStationManager("ns3::ConstantRateWifiManager",
+                                 "DataMode", ns.core.StringValue("OfdmRate6Mbps"),
+                                 "ControlMode", ns.core.StringValue("OfdmRate6Mbps"))
+    mac = ns.wifi.WifiMacHelper()
+    mac.SetType("ns3::AdhocWifiMac")
+    devices = wifi.Install(phy, mac, nodes)
+'''
+
+MESH_DEVICE_BLOCK = '''
+    # Red mesh IEEE 802.11s (HWMP)
+    mesh = ns.mesh.MeshHelper.Default()
+    mesh.SetStackInstaller("ns3::Dot11sStack")
+    mesh.SetSpreadInterfaceChannels(ns.mesh.MeshHelper.SPREAD_CHANNELS)
+    mesh.SetMacType("RandomStart", ns.core.TimeValue(ns.core.Seconds(0.1)))
+    mesh.SetNumberOfInterfaces(1)
+    devices = mesh.Install(phy, nodes)
+'''
+
+RANDOM_WAYPOINT_BLOCK = '''    mobility.SetMobilityModel(
+        "ns3::RandomWaypointMobilityModel",
+        "Speed", ns.core.StringValue(
+            "ns3::UniformRandomVariable[Min={}|Max={}]".format(SPEED_MIN, SPEED_MAX)),
+        "Pause", ns.core.StringValue("ns3::ConstantRandomVariable[Constant=0.0]"),
+        "PositionAllocator", ns.core.PointerValue(position_alloc)
+    )'''
+
+CONSTANT_POSITION_BLOCK = '''    mobility.SetMobilityModel("ns3::ConstantPositionMobilityModel")'''
+
+
+def parse_scenario_from_task(task: str) -> Optional[Dict]:
+    """
+    Extrae los parámetros de una tarea con el formato de los experimentos
+
+    Args:
+        task: Descripción de la tarea
+
+    Returns:
+        Parámetros del escenario o None si la tarea no sigue el formato estándar
+    """
+    match = STANDARD_TASK_PATTERN.search(task)
+    if not match:
+        return None
+    return {
+        'protocol': match.group('protocol'),
+        'nodes': match.group('nodes'),
+        'mobility': match.group('mobility'),
+        'speed': match.group('speed'),
+        'area': match.group('area'),
+        'duration': match.group('duration'),
+    }
+
+
+def normalize_scenario(scenario: Optional[Dict]) -> Optional[Dict]:
+    """
+    Valida los parámetros de un escenario para la plantilla
+
+    Args:
+        scenario: Parámetros (protocol, nodes, area, duration, mobility, speed)
+
+    Returns:
+        Parámetros normalizados o None si el escenario no es estándar
+    """
+    if not scenario:
+        return None
+    try:
+        protocol = str(scenario.get('protocol', '')).upper()
+        mobility = str(scenario.get('mobility', 'RandomWaypoint'))
+        nodes = int(scenario.get('nodes', 20))
+        area = float(scenario.get('area', 1000))
+        duration = float(scenario.get('duration', 200))
+        speed_min, speed_max = (float(v) for v in str(scenario.get('speed', '5-15')).split('-'))
+    except (TypeError, ValueError):
+        return None
+
+    if protocol not in TEMPLATE_PROTOCOLS or mobility not in TEMPLATE_MOBILITY:
+        return None
+    if nodes < 2 or area <= 0 or duration <= 5 or not 0 <= speed_min <= speed_max:
+        return None
+    if mobility == 'RandomWaypoint' and speed_max <= 0:
+        return None
+
+    return {
+        'protocol': protocol,
+        'nodes': nodes,
+        'area': area,
+        'duration': duration,
+        'mobility': mobility,
+        'speed_min': speed_min,
+        'speed_max': speed_max,
+    }
+
+
+def render_scenario_script(scenario: Dict, seed: Optional[int] = None) -> str:
+    """
+    Genera el script NS-3 de un escenario estándar sin pasar por el LLM
+
+    Args:
+        scenario: Parámetros normalizados (ver normalize_scenario)
+        seed: Semilla del generador aleatorio (None = 1)
+
+    Returns:
+        Código Python del script
+    """
+    module, helper = TEMPLATE_PROTOCOLS[scenario['protocol']]
+
+    if helper:
+        routing_block = (f"    routing = ns.{module}.{helper}()\n"
+                         f"    internet.SetRoutingHelper(routing)")
+        device_block = ADHOC_DEVICE_BLOCK
+    else:
+        routing_block = "    # Enrutamiento HWMP en capa 2: sin helper IP"
+        device_block = MESH_DEVICE_BLOCK
+
+    mobility_block = (RANDOM_WAYPOINT_BLOCK if scenario['mobility'] == 'RandomWaypoint'
+                      else CONSTANT_POSITION_BLOCK)
+
+    return SCENARIO_SCRIPT_TEMPLATE.format(
+        protocol=scenario['protocol'],
+        protocol_module=module,
+        nodes=scenario['nodes'],
+        area=scenario['area'],
+        duration=scenario['duration'],
+        mobility=scenario['mobility'],
+        speed_min=scenario['speed_min'],
+        speed_max=scenario['speed_max'],
+        seed=int(seed) if seed else 1,
+        flows=max(1, min(10, scenario['nodes'] // 2)),
+        device_block=device_block,
+        mobility_block=mobility_block,
+        routing_block=routing_block
+    )
+
+
 def save_code(code: str, filename: str = "tesis_sim.py") -> str:
     """
     Guarda el código en el directorio de simulaciones
@@ -347,7 +676,8 @@ def coder_node(state: AgentState) -> Dict:
     research_notes = "\n".join(state.get('research_notes', []))
     previous_error = state['errors'][-1] if state.get('errors') else None
     error_type = state.get('error_type')
-    iteration = state.get('iteration', 0)
+    iteration = state.get('iteration_count', 0)
+    capture_profile = state.get('capture_profile') or PCAP_CAPTURE_PROFILE
     
     # Actualizar estado en Dashboard
     update_agent_status("Coder", "running", f"Generando código (Iteración {iteration+1})")
@@ -360,14 +690,30 @@ def coder_node(state: AgentState) -> Dict:
         log_message("Coder", f"Corrigiendo error previo ({error_type}): {previous_error[:100]}...", level="WARNING")
     print()
     
-    # Generar código con contexto de iteración
-    try:
-        code = generate_code(task, research_notes, previous_error, error_type, iteration)
-    except CodeGenerationError as e:
-        print(f"⚠️  Fallo en generación: {e}")
-        print("⚠️  Usando código de respaldo (fallback)...")
-        log_message("Coder", f"Fallo generación: {e}. Usando fallback.", level="WARNING")
-        code = generate_fallback_code(task)
+    # Escenarios estándar: plantilla directa (sin CoT, generación ni crítico).
+    # Tras un error o una propuesta de optimización se usa el LLM.
+    scenario = None
+    if CODER_TEMPLATES_ENABLED is True and not previous_error and not state.get('optimization_count'):
+        scenario = normalize_scenario(state.get('scenario') or parse_scenario_from_task(task))
+    
+    if scenario:
+        print(f"⚡ Escenario estándar ({scenario['protocol']}, {scenario['nodes']} nodos): usando plantilla")
+        log_message("Coder", f"Escenario estándar {scenario['protocol']}: código generado desde plantilla")
+        code = render_scenario_script(scenario, state.get('simulation_seed'))
+        code_source = 'template'
+    else:
+        code_source = 'llm'
+        # Generar código con contexto de iteración
+        try:
+            code = generate_code(task, research_notes, previous_error, error_type, iteration)
+        except CodeGenerationError as e:
+            print(f"⚠️  Fallo en generación: {e}")
+            print("⚠️  Usando código de respaldo (fallback)...")
+            log_message("Coder", f"Fallo generación: {e}. Usando fallback.", level="WARNING")
+            code = generate_fallback_code(task)
+    
+    # Inyectar perfil de captura PCAP
+    code = apply_capture_profile(code, capture_profile)
     
     # Validar código
     is_valid, validation_msg = validate_code(code)
@@ -381,6 +727,8 @@ def coder_node(state: AgentState) -> Dict:
             print("🔧 Intentando auto-corrección...")
             log_message("Coder", "Intentando auto-corrección inmediata...")
             code = generate_code(task, research_notes, validation_msg, "CompilationError", 1)
+            code = apply_capture_profile(code, capture_profile)
+            code_source = 'llm'
             is_valid, validation_msg = validate_code(code)
             
             if is_valid:
@@ -425,7 +773,7 @@ def coder_node(state: AgentState) -> Dict:
     if previous_error:
         try:
             print("🧠 Guardando experiencia en memoria episódica...")
-            memory.add_experience(
+            get_memory().add_experience(
                 task=task,
                 code=code, # El código exitoso es la solución
                 error=previous_error,
@@ -443,12 +791,15 @@ def coder_node(state: AgentState) -> Dict:
         'code_snippet': code,
         'code_validated': True,
         'code_filepath': filepath,
+        'code_source': code_source,
         **increment_iteration(state),
         **add_audit_entry(state, "coder", "code_generated", {
             'filepath': filepath,
+            'code_source': code_source,
             'code_length': len(code),
             'iteration': iteration,
-            'functions_count': code.count('def ')
+            'functions_count': code.count('def '),
+            'capture_profile': capture_profile
         })
     }
 
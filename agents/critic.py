@@ -9,16 +9,107 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from typing import Dict, Any
-from langchain_ollama import ChatOllama
+from typing import Dict, Any, Optional, Tuple
+import json
+import re
 
 from config.settings import (
-    OLLAMA_BASE_URL,
     MODEL_REASONING,
-    MODEL_TEMPERATURE_REASONING
+    MODEL_TEMPERATURE_REASONING,
+    PCAP_CAPTURE_PROFILE,
+    CRITIC_RULES_ENABLED
 )
 from utils.state import AgentState, add_audit_entry
 from utils.logging_utils import update_agent_status, log_message
+from utils.model_router import TIER_FAST, get_routed_llm
+from utils.code_rules import check_code_rules, VERDICT_APPROVED, VERDICT_REJECTED
+from utils.capture_profiles import get_capture_profile
+from utils.prompt_budget import PromptSection, get_budgeted_prompt
+
+def parse_critic_response(content: str) -> Tuple[bool, str, bool]:
+    """
+    Interpreta la respuesta del crítico
+    
+    Args:
+        content: Respuesta del LLM
+        
+    Returns:
+        Tupla (aprobado, crítica, confiable); la respuesta es confiable solo si
+        contiene un JSON válido con el campo 'approved'
+    """
+    content = content.strip()
+    
+    # Buscar bloque JSON
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if json_match:
+        try:
+            data = json.loads(json_match.group(0))
+            if isinstance(data, dict) and isinstance(data.get('approved'), bool):
+                return data['approved'], data.get('critique', "Sin comentarios"), True
+        except ValueError:
+            pass
+        # Fallback si el JSON está mal formado
+        if "true" in content.lower() and "approved" in content.lower():
+            return True, "Aprobado (Fallback parse)", False
+        return False, content[:200], False
+    
+    # Fallback si no hay JSON
+    content_lower = content.lower()
+    if "approved" in content_lower and "rejected" not in content_lower:
+        return True, "Aprobado (No JSON)", False
+    if "true" in content_lower and "false" not in content_lower:
+        return True, "Aprobado (No JSON)", False
+    return False, content[:200], False
+
+
+def run_rule_checks(state: AgentState, task: str, code: str) -> Optional[Dict[str, Any]]:
+    """
+    Pre-crítico determinista: decide sin LLM cuando las reglas bastan
+    
+    Args:
+        state: Estado actual del sistema
+        task: Descripción de la tarea
+        code: Código generado
+        
+    Returns:
+        Actualización del estado si las reglas deciden, None si la revisión
+        debe pasar al crítico LLM
+    """
+    try:
+        capture_enabled = get_capture_profile(
+            state.get('capture_profile') or PCAP_CAPTURE_PROFILE
+        )['enabled']
+    except ValueError:
+        capture_enabled = True
+    
+    report = check_code_rules(task, code, capture_enabled)
+    details = {
+        'critique': report.critique,
+        'source': 'rules',
+        'checks': {check.name: check.passed for check in report.checks}
+    }
+    
+    if report.verdict == VERDICT_REJECTED:
+        print(f"  ❌ Código RECHAZADO por reglas: {report.critique}")
+        log_message("Critic", f"Código rechazado por reglas: {report.critique}", level="WARNING")
+        return {
+            'critic_approved': False,
+            'critique': report.critique,
+            **add_audit_entry(state, "critic", "rejected", details)
+        }
+    
+    if report.verdict == VERDICT_APPROVED:
+        print("  ✅ Código APROBADO por reglas deterministas")
+        log_message("Critic", "Código aprobado por reglas deterministas")
+        return {
+            'critic_approved': True,
+            'critique': report.critique,
+            **add_audit_entry(state, "critic", "approved", details)
+        }
+    
+    print("  🔎 Reglas superadas sin veredicto concluyente; consultando al LLM...")
+    return None
+
 
 def critic_node(state: AgentState) -> Dict[str, Any]:
     """
@@ -49,77 +140,37 @@ def critic_node(state: AgentState) -> Dict[str, Any]:
             **add_audit_entry(state, "critic", "evaluation_failed", {'reason': "no_code"})
         }
 
+    if CRITIC_RULES_ENABLED is True:
+        rules_result = run_rule_checks(state, task, code)
+        if rules_result is not None:
+            return rules_result
+
     try:
-        llm = ChatOllama(
-            model=MODEL_REASONING,
-            temperature=MODEL_TEMPERATURE_REASONING,
-            base_url=OLLAMA_BASE_URL
-        )
+        llm = get_routed_llm('critic.review', MODEL_REASONING, MODEL_TEMPERATURE_REASONING, agent="critic")
         
-        prompt = f"""
-Actúa como un Revisor de Código Experto en NS-3 y Redes.
-Tu objetivo es encontrar ERRORES LÓGICOS o DE ALINEACIÓN con la tarea. NO te preocupes por errores de sintaxis (eso lo hace el compilador).
-
-**TAREA ORIGINAL:**
-{task}
-
-**CÓDIGO GENERADO:**
-```python
-{code[:4000]}  # Truncado para evitar contexto excesivo si es muy largo
-```
-
-**CRITERIOS DE EVALUACIÓN:**
-1. ¿El código implementa el protocolo solicitado? (Ej: Si pide AODV, ¿usa AODV?)
-2. ¿La topología y movilidad coinciden con lo pedido?
-3. ¿Se están recolectando las métricas necesarias?
-4. ¿Hay lógica "tonta" o placeholders obvios?
-
-**FORMATO DE RESPUESTA:**
-Responde EXACTAMENTE con este formato JSON:
-{{
-    "approved": true/false,
-    "critique": "Explicación breve del problema (si approved=false) o 'Aprobado' (si approved=true)"
-}}
-"""
+        # El código es lo más importante: solo se recorta si no cabe en el presupuesto
+        prompt = get_budgeted_prompt(
+            'critic',
+            'review',
+            sections={'code': PromptSection(code, priority=1)},
+            task=task
+        )
         
         print("  🤔 Analizando lógica y alineación...")
         response = llm.invoke(prompt)
-        content = response.content.strip()
-        
-        # Intentar parsear JSON (o buscarlo en el texto)
-        import json
-        import re
-        
-        approved = False
-        critique = "Error parseando respuesta del crítico"
+        approved, critique, confident = parse_critic_response(response.content)
         
-        # Buscar bloque JSON
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            try:
-                data = json.loads(json_match.group(0))
-                approved = data.get('approved', False)
-                critique = data.get('critique', "Sin comentarios")
-            except:
-                # Fallback si el JSON está mal formado
-                if "true" in content.lower() and "approved" in content.lower():
-                    approved = True
-                    critique = "Aprobado (Fallback parse)"
-                else:
-                    critique = content[:200]
-        else:
-             # Fallback si no hay JSON
-            # Fallback si no hay JSON
-            content_lower = content.lower()
-            if "approved" in content_lower and "rejected" not in content_lower:
-                approved = True
-                critique = "Aprobado (No JSON)"
-            elif "true" in content_lower and "false" not in content_lower:
-                approved = True
-                critique = "Aprobado (No JSON)"
-            else:
-                critique = content[:200]
-
+        escalated = False
+        if not confident and getattr(llm, 'tier', None) == TIER_FAST:
+            # Respuesta ambigua del modelo rápido: repetir con el modelo grande
+            # (si ya respondió el grande, repetir no aportaría nada)
+            print("  ↗️  Respuesta ambigua; escalando al modelo grande...")
+            log_message("Critic", "Respuesta sin JSON válido, escalando al modelo grande")
+            llm = get_routed_llm('critic.review', MODEL_REASONING, MODEL_TEMPERATURE_REASONING,
+                                 agent="critic", escalate=True)
+            response = llm.invoke(prompt)
+            approved, critique, _ = parse_critic_response(response.content)
+            escalated = True
         
         if approved:
             print("  ✅ Código APROBADO por el Crítico")
@@ -127,7 +178,11 @@ Responde EXACTAMENTE con este formato JSON:
             return {
                 'critic_approved': True,
                 'critique': critique,
-                **add_audit_entry(state, "critic", "approved", {'critique': critique})
+                **add_audit_entry(state, "critic", "approved", {
+                    'critique': critique,
+                    'model': llm.model_name,
+                    'escalated': escalated
+                })
             }
         else:
             print(f"  ❌ Código RECHAZADO: {critique}")
@@ -138,7 +193,11 @@ Responde EXACTAMENTE con este formato JSON:
                 # Incrementar iteración aquí podría ser opcional, pero mejor dejar que el supervisor decida
                 # o que el coder incremente al reintentar.
                 # Por ahora, pasamos el feedback.
-                **add_audit_entry(state, "critic", "rejected", {'critique': critique})
+                **add_audit_entry(state, "critic", "rejected", {
+                    'critique': critique,
+                    'model': llm.model_name,
+                    'escalated': escalated
+                })
             }
 
     except Exception as e:
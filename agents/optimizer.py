@@ -10,11 +10,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from typing import Dict, List
-from langchain_ollama import ChatOllama
 
-from config.settings import OLLAMA_BASE_URL, MODEL_REASONING, MODEL_CODING
+from config.settings import MODEL_REASONING, MODEL_CODING
 from utils.state import AgentState, add_audit_entry
 from utils.logging_utils import update_agent_status, log_message
+from utils.dependency_injection import get_llm
 from agents.ns3_ai_integration import (
     generate_ns3_ai_code,
     generate_drl_training_code,
@@ -146,11 +146,7 @@ def propose_dl_architecture(bottlenecks: Dict, task: str) -> str:
         Propuesta de arquitectura
     """
     try:
-        llm = ChatOllama(
-            model=MODEL_REASONING,
-            temperature=0.2,
-            base_url=OLLAMA_BASE_URL
-        )
+        llm = get_llm(MODEL_REASONING, 0.2, agent="optimizer")
         
         # Preparar resumen de problemas
         problems_summary = []
@@ -294,11 +290,7 @@ def generate_optimization_code(architecture_proposal: str, baseline_code: str, t
         Código optimizado
     """
     try:
-        llm = ChatOllama(
-            model=MODEL_CODING,
-            temperature=0.1,
-            base_url=OLLAMA_BASE_URL
-        )
+        llm = get_llm(MODEL_CODING, 0.1, agent="optimizer")
         
         prompt = f"""
 Eres un experto en NS-3 y Deep Learning. Genera código OPTIMIZADO basado en la propuesta.
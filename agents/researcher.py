@@ -9,23 +9,45 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from typing import Dict
+from typing import Dict, List, Tuple
+import asyncio
 import time
 from functools import wraps
-from langchain_ollama import ChatOllama
 from chromadb import Client
 import requests
 
 from config.settings import (
-    OLLAMA_BASE_URL,
     MODEL_REASONING,
     MODEL_EMBEDDING,
-    CHROMA_PATH,
     SEMANTIC_SCHOLAR_MAX_RESULTS
 )
 from utils.state import AgentState, add_audit_entry
 from utils.logging_utils import update_agent_status, log_message
 from utils.prompts import get_prompt
+from utils.prompt_budget import PromptSection, get_budgeted_prompt
+from utils.dependency_injection import get_llm
+from utils.model_router import get_routed_llm
+from utils.llm_concurrency import run_coroutine
+from utils.vector_store import get_vector_store
+from utils.literature_cache import get_literature_cache, literature_offline
+from utils.research_cache import get_research_cache, research_reuse_enabled, task_template
+from utils.literature_sources import (
+    SourceResult, STATUS_OK, fan_out, fetch_source, merge_papers, source_timeouts, source_url
+)
+from utils.hybrid_retrieval import RetrievedChunk, assemble_context, chunks_from_documents
+
+
+# Límite de tokens para los resúmenes de papers en la síntesis
+PAPERS_SUMMARY_TOKENS = 1200
+
+# Límite de tokens del contexto recuperado de la base local
+LOCAL_CONTEXT_TOKENS = 500
+
+# Fragmentos candidatos de la base local (el presupuesto decide cuántos entran)
+LOCAL_CONTEXT_CANDIDATES = 5
+
+# Texto de la sección de contexto local cuando no hay fragmentos
+NO_LOCAL_CONTEXT = "Sin documentos relevantes en la base local."
 
 
 def rate_limit(calls_per_minute: int = 10):
@@ -52,8 +74,25 @@ def rate_limit(calls_per_minute: int = 10):
     return decorator
 
 
-@rate_limit(calls_per_minute=10)
 def search_semantic_scholar(query: str, max_results: int = 10) -> list:
+    """
+    Busca papers en Semantic Scholar (desde el caché bibliográfico si la consulta es reciente)
+    
+    Args:
+        query: Consulta de búsqueda
+        max_results: Número máximo de resultados
+        
+    Returns:
+        Lista de papers encontrados
+    """
+    return get_literature_cache().search(
+        'semantic_scholar', query, {'max_results': max_results},
+        lambda: _fetch_semantic_scholar(query, max_results)
+    )
+
+
+@rate_limit(calls_per_minute=10)
+def _fetch_semantic_scholar(query: str, max_results: int = 10) -> list:
     """
     Busca papers en Semantic Scholar con filtros avanzados
     
@@ -66,7 +105,7 @@ def search_semantic_scholar(query: str, max_results: int = 10) -> list:
     """
     try:
         # API de Semantic Scholar con campos extendidos
-        url = "https://api.semanticscholar.org/graph/v1/paper/search"
+        url = source_url('semantic_scholar')
         params = {
             'query': query,
             'limit': max_results,
@@ -75,7 +114,7 @@ def search_semantic_scholar(query: str, max_results: int = 10) -> list:
             'minCitationCount': 5  # Filtrar papers con al menos 5 citas
         }
         
-        response = requests.get(url, params=params, timeout=30)
+        response = requests.get(url, params=params, timeout=source_timeouts()['semantic_scholar'])
         
         if response.status_code == 200:
             data = response.json()
@@ -149,78 +188,91 @@ def calculate_relevance_score(paper: dict) -> float:
     return score
 
 
-def store_in_chromadb(papers: list, collection_name: str = "thesis_papers"):
+def paper_relevance(paper: dict) -> float:
+    """
+    Score de relevancia de un paper ya normalizado (de cualquier fuente)
+    
+    Traduce los campos normalizados a los de Semantic Scholar que espera
+    calculate_relevance_score.
+    
+    Args:
+        paper: Paper con 'citations', 'influential_citations', 'year' y 'venue'
+        
+    Returns:
+        Score de relevancia (0-100)
+    """
+    try:
+        year = int(paper.get('year') or 0)
+    except (TypeError, ValueError):
+        year = 0
+    
+    return calculate_relevance_score({
+        'citationCount': paper.get('citations') or 0,
+        'influentialCitationCount': paper.get('influential_citations') or 0,
+        'year': year,
+        'venue': paper.get('venue') or ''
+    })
+
+
+def store_in_chromadb(papers: list, collection_name: str = "thesis_papers") -> int:
     """
     Almacena papers en ChromaDB para RAG
     
+    Solo se insertan (y embeben) los papers que la colección aún no tiene.
+    
     Args:
         papers: Lista de papers
         collection_name: Nombre de la colección
+        
+    Returns:
+        Número de papers nuevos almacenados
     """
     try:
-        from chromadb import PersistentClient
-        from chromadb.config import Settings
-        
-        client = PersistentClient(
-            path=str(CHROMA_PATH),
-            settings=Settings(anonymized_telemetry=False)
-        )
-        collection = client.get_or_create_collection(collection_name)
-        
-        for i, paper in enumerate(papers):
-            # Combinar título y abstract
-            content = f"Title: {paper['title']}\n\nAbstract: {paper['abstract']}"
-            
-            # Almacenar
-            collection.add(
-                documents=[content],
-                metadatas=[{
-                    'title': paper['title'],
-                    'year': str(paper['year']),
-                    'citations': paper['citations'],
-                    'url': paper['url']
-                }],
-                ids=[f"paper_{i}_{hash(paper['title'])}"]
-            )
-        
-        print(f"✅ {len(papers)} papers almacenados en ChromaDB")
+        stored = get_vector_store().add_papers(papers, collection_name)
+        print(f"✅ {stored} papers nuevos almacenados en ChromaDB "
+              f"({len(papers) - stored} ya presentes o duplicados)")
+        return stored
         
     except Exception as e:
         print(f"⚠️  Error almacenando en ChromaDB: {e}")
+        return 0
 
 
-def synthesize_research(task: str, papers: list) -> str:
+def synthesize_research(task: str, papers: list, local_context: List[str] = None) -> str:
     """
     Sintetiza hallazgos de investigación usando LLM con análisis profundo
     
     Args:
         task: Tarea de investigación
         papers: Lista de papers encontrados
+        local_context: Fragmentos de la base local ya ensamblados (ver assemble_context)
         
     Returns:
         Síntesis de hallazgos
     """
     try:
-        llm = ChatOllama(
-            model=MODEL_REASONING,
-            temperature=0.1,
-            base_url=OLLAMA_BASE_URL
-        )
+        llm = get_llm(MODEL_REASONING, 0.1, agent="researcher")
         
         # Preparar contexto con top 7 papers ordenados por relevancia
-        papers_summary = "\n\n".join([
+        papers_summary = [
             f"**Paper {i+1}** (Relevancia: {p.get('relevance_score', 0):.1f}/100):\n"
             f"Título: {p['title']}\n"
             f"Año: {p['year']} | Citas: {p['citations']} | Venue: {p.get('venue', 'N/A')}\n"
-            f"Abstract: {p['abstract'][:400]}..."
+            f"Abstract: {p['abstract']}"
             for i, p in enumerate(papers[:7])
-        ])
+        ]
         
-        prompt = get_prompt(
+        # Los abstracts más largos se recortan primero para caber en el presupuesto;
+        # el contexto local cede espacio antes que los papers
+        prompt = get_budgeted_prompt(
             'researcher',
             'synthesis',
-            task=task,
-            papers_summary=papers_summary
+            sections={
+                'papers_summary': PromptSection(papers_summary, max_tokens=PAPERS_SUMMARY_TOKENS),
+                'local_context': PromptSection(local_context or [NO_LOCAL_CONTEXT], priority=2,
+                                               max_tokens=LOCAL_CONTEXT_TOKENS)
+            },
+            task=task
         )
         
         response = llm.invoke(prompt)
@@ -251,27 +303,51 @@ def query_vectordb(query: str, collection_name: str = "thesis_papers", n_results
         Lista de documentos relevantes
     """
     try:
-        from chromadb import PersistentClient
-        from chromadb.config import Settings
-        
-        client = PersistentClient(
-            path=str(CHROMA_PATH),
-            settings=Settings(anonymized_telemetry=False)
-        )
-        collection = client.get_or_create_collection(collection_name)
-        
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
-        
-        return results.get('documents', [[]])[0]
+        # Cliente y colección compartidos por el proceso; consultas recientes desde memoria
+        return get_vector_store().query(query, collection_name, n_results)
     except Exception as e:
         print(f"⚠️  Error consultando ChromaDB: {e}")
         return []
 
 
+def retrieve_local_context(query: str, collection_name: str = "thesis_papers",
+                           n_results: int = LOCAL_CONTEXT_CANDIDATES) -> List[RetrievedChunk]:
+    """
+    Recupera fragmentos de la base local con búsqueda híbrida (BM25 + vectorial)
+    
+    Args:
+        query: Consulta de búsqueda
+        collection_name: Nombre de la colección
+        n_results: Número de fragmentos tras reordenar
+        
+    Returns:
+        Fragmentos ordenados por relevancia
+    """
+    try:
+        return get_vector_store().hybrid_query(query, collection_name, n_results)
+    except Exception as e:
+        print(f"⚠️  Recuperación híbrida no disponible, usando solo búsqueda vectorial: {e}")
+        return chunks_from_documents(query_vectordb(query, collection_name, n_results))
+
+
 def search_arxiv(query: str, max_results: int = 5) -> list:
+    """
+    Busca papers en arXiv (desde el caché bibliográfico si la consulta es reciente)
+    
+    Args:
+        query: Consulta de búsqueda
+        max_results: Número máximo de resultados
+        
+    Returns:
+        Lista de papers encontrados
+    """
+    return get_literature_cache().search(
+        'arxiv', query, {'max_results': max_results},
+        lambda: _fetch_arxiv(query, max_results)
+    )
+
+
+def _fetch_arxiv(query: str, max_results: int = 5) -> list:
     """
     Busca papers en arXiv
     
@@ -293,6 +369,7 @@ def search_arxiv(query: str, max_results: int = 5) -> list:
         
         papers = []
         client = arxiv.Client()
+        client.query_url_format = f"{source_url('arxiv')}?{{}}"
         
         for result in client.results(search):
             papers.append({
@@ -310,21 +387,70 @@ def search_arxiv(query: str, max_results: int = 5) -> list:
         return []
 
 
+DEFAULT_SEARCH_QUERY = "routing protocols optimization ns-3"
+
+
+def _parse_search_query(content: str) -> str:
+    """Limpia la consulta generada por el LLM"""
+    query = content.strip().replace('"', '')
+    if "Query:" in query:
+        query = query.split("Query:")[1].strip()
+    return query
+
+
 def generate_search_query(task: str) -> str:
     """Genera una consulta de búsqueda concisa basada en la tarea"""
     try:
-        llm = ChatOllama(model=MODEL_REASONING, base_url=OLLAMA_BASE_URL)
+        llm = get_routed_llm('researcher.query', MODEL_REASONING, agent="researcher")
         
         prompt = get_prompt('researcher', 'generate_query', task=task)
         
         response = llm.invoke(prompt)
-        query = response.content.strip().replace('"', '')
-        if "Query:" in query:
-            query = query.split("Query:")[1].strip()
-        return query
+        return _parse_search_query(response.content)
+    except Exception as e:
+        print(f"⚠️ Error generando consulta: {e}")
+        return DEFAULT_SEARCH_QUERY
+
+
+async def agenerate_search_query(task: str) -> str:
+    """Versión asíncrona de generate_search_query()"""
+    try:
+        llm = get_routed_llm('researcher.query', MODEL_REASONING, agent="researcher")
+        
+        prompt = get_prompt('researcher', 'generate_query', task=task)
+        
+        response = await llm.ainvoke(prompt)
+        return _parse_search_query(response.content)
     except Exception as e:
         print(f"⚠️ Error generando consulta: {e}")
-        return "routing protocols optimization ns-3"
+        return DEFAULT_SEARCH_QUERY
+
+
+async def _gather_literature(task: str) -> Tuple[str, List[RetrievedChunk], Dict[str, SourceResult]]:
+    """
+    Genera la consulta de búsqueda y consulta todas las fuentes en paralelo
+    
+    La consulta RAG local solo depende de la tarea, así que se lanza antes de
+    generar la consulta; Semantic Scholar y arXiv se consultan a la vez en
+    cuanto la consulta está lista. Cada fuente tiene su propio timeout.
+    
+    Returns:
+        Tupla (consulta de búsqueda, fragmentos locales, resultados por fuente)
+    """
+    timeouts = source_timeouts()
+    local = asyncio.ensure_future(fetch_source(
+        'local_db', lambda: retrieve_local_context(task), timeouts['local_db']
+    ))
+    
+    search_query = await agenerate_search_query(task)
+    sources = await fan_out({
+        'semantic_scholar': lambda: search_semantic_scholar(search_query, SEMANTIC_SCHOLAR_MAX_RESULTS),
+        'arxiv': lambda: search_arxiv(search_query, max_results=5)
+    }, timeouts)
+    
+    local_result = await local
+    sources['local_db'] = local_result
+    return search_query, local_result.items, sources
 
 
 def research_node(state: AgentState) -> Dict:
@@ -348,39 +474,58 @@ def research_node(state: AgentState) -> Dict:
     update_agent_status("Researcher", "running", f"Investigando: {task}")
     log_message("Researcher", f"Iniciando investigación para: {task}")
     
-    all_papers = []
+    # Tarea de una familia ya investigada: reutilizar notas y papers
+    if research_reuse_enabled():
+        previous = get_research_cache().lookup(task)
+        if previous is not None:
+            age_hours = (time.time() - previous['created_at']) / 3600
+            print(f"♻️  Reutilizando investigación de: {previous['task']} ({age_hours:.1f} h)")
+            log_message("Researcher", f"Investigación reutilizada de una tarea de la misma familia: {previous['task']}")
+            update_agent_status("Researcher", "completed", "Investigación reutilizada")
+            return {
+                "research_notes": previous['research_notes'],
+                "papers_found": previous['papers_found'],
+                **add_audit_entry(state, "researcher", "research_reused", {
+                    'papers_count': len(previous['papers_found']),
+                    'source_task': previous['task'],
+                    'template': task_template(task),
+                    'age_hours': round(age_hours, 2)
+                })
+            }
     
-    # 1. Buscar en Semantic Scholar
-    print("🔎 Buscando en Semantic Scholar...")
-    log_message("Researcher", "Consultando Semantic Scholar...")
-    search_query = generate_search_query(task)
+    # Consultar Semantic Scholar, arXiv y la base de datos local (RAG) en paralelo
+    print("🔎 Consultando Semantic Scholar, arXiv y base de datos local...")
+    log_message("Researcher", "Consultando fuentes bibliográficas en paralelo...")
+    search_query, local_chunks, sources = run_coroutine(_gather_literature(task))
     print(f"🔑 Keywords de búsqueda: {search_query}")
-    query_ss = search_query
-    papers_ss = search_semantic_scholar(query_ss, SEMANTIC_SCHOLAR_MAX_RESULTS)
-    
-    if papers_ss:
-        print(f"✅ Semantic Scholar: {len(papers_ss)} papers")
-        log_message("Researcher", f"Encontrados {len(papers_ss)} papers en Semantic Scholar")
-        all_papers.extend(papers_ss)
     
-    # 2. Buscar en arXiv
-    print("🔎 Buscando en arXiv...")
-    log_message("Researcher", "Consultando arXiv...")
-    query_arxiv = search_query
-    papers_arxiv = search_arxiv(query_arxiv, max_results=5)
+    labels = {'semantic_scholar': "Semantic Scholar", 'arxiv': "arXiv"}
+    for name, label in labels.items():
+        result = sources[name]
+        if result.status != STATUS_OK:
+            print(f"⚠️  {label}: {result.status} ({result.error})")
+            log_message("Researcher", f"{label} sin resultados: {result.error}", level="WARNING")
+        elif result.items:
+            print(f"✅ {label}: {len(result.items)} papers ({result.elapsed:.1f}s)")
+            log_message("Researcher", f"Encontrados {len(result.items)} papers en {label}")
     
-    if papers_arxiv:
-        print(f"✅ arXiv: {len(papers_arxiv)} papers")
-        log_message("Researcher", f"Encontrados {len(papers_arxiv)} papers en arXiv")
-        all_papers.extend(papers_arxiv)
+    # Fusionar: duplicados entre fuentes combinados y orden por relevancia
+    all_papers = merge_papers({name: sources[name].items for name in labels}, paper_relevance)
     
-    # 3. Consultar base de datos local (RAG)
-    print("🔎 Consultando base de datos local...")
-    local_docs = query_vectordb(task, n_results=3)
+    # Sin conexión y sin búsquedas cacheadas: corpus local de papers
+    if not all_papers and literature_offline():
+        papers_local = get_literature_cache().search_corpus(search_query, SEMANTIC_SCHOLAR_MAX_RESULTS)
+        if papers_local:
+            print(f"✅ Corpus local: {len(papers_local)} papers")
+            log_message("Researcher", f"Modo sin conexión: {len(papers_local)} papers del corpus local")
+            all_papers = merge_papers({'local_corpus': papers_local}, paper_relevance)
     
-    if local_docs:
-        print(f"✅ Base local: {len(local_docs)} documentos relevantes")
-        log_message("Researcher", f"Recuperados {len(local_docs)} documentos de base local")
+    # Contexto de la base de datos local (RAG): los mejores fragmentos que caben en el presupuesto
+    local_context = assemble_context(local_chunks, LOCAL_CONTEXT_TOKENS)
+    if local_context:
+        print(f"✅ Base local: {len(local_context)} de {len(local_chunks)} fragmentos en el contexto")
+        log_message("Researcher", f"Recuperados {len(local_chunks)} fragmentos de base local "
+                                  f"({len(local_context)} en el contexto)")
     
     if all_papers:
         print(f"\n📚 Total: {len(all_papers)} papers encontrados")
@@ -392,12 +537,7 @@ def research_node(state: AgentState) -> Dict:
         # Sintetizar hallazgos
         print("📝 Sintetizando hallazgos...")
         log_message("Researcher", "Sintetizando hallazgos con LLM...")
-        synthesis = synthesize_research(task, all_papers)
-        
-        # Añadir contexto de documentos locales si existen
-        if local_docs:
-            synthesis += "\n\n**Contexto de investigaciones previas:**\n"
-            synthesis += "\n".join([f"- {doc[:200]}..." for doc in local_docs[:2]])
+        synthesis = synthesize_research(task, all_papers, local_context)
         
         print("\n📚 Síntesis completada")
         print(f"   Longitud: {len(synthesis)} caracteres")
@@ -406,6 +546,9 @@ def research_node(state: AgentState) -> Dict:
         log_message("Researcher", "Investigación completada exitosamente")
         update_agent_status("Researcher", "completed", "Investigación finalizada")
         
+        if research_reuse_enabled():
+            get_research_cache().store(task, [synthesis], all_papers)
+        
         # Actualizar estado
         return {
             "research_notes": [synthesis],
@@ -413,7 +556,10 @@ def research_node(state: AgentState) -> Dict:
             **add_audit_entry(state, "researcher", "literature_review", {
                 'papers_count': len(all_papers),
                 'sources': ['semantic_scholar', 'arxiv', 'local_db'],
-                'query': query_ss
+                'source_status': {name: result.status for name, result in sources.items()},
+                'source_seconds': {name: round(result.elapsed, 2) for name, result in sources.items()},
+                'local_context_chunks': len(local_context),
+                'query': search_query
             })
         }
     else:
@@ -439,9 +585,9 @@ obtener resultados empíricos.
 """
         
         # Añadir context local si existe
-        if local_docs:
+        if local_context:
             synthesis += "\n\n**Contexto de investigaciones previas:**\n"
-            synthesis += "\n".join([f"- {doc[:200]}..." for doc in local_docs[:2]])
+            synthesis += "\n".join([f"- {text}" for text in local_context])
         
         update_agent_status("Researcher", "completed", "Investigación finalizada (sin papers)")
         
@@ -449,7 +595,8 @@ obtener resultados empíricos.
             "research_notes": [synthesis],
             "papers_found": [],
             **add_audit_entry(state, "researcher", "no_papers_found", {
-                'query': query_ss
+                'source_status': {name: result.status for name, result in sources.items()},
+                'query': search_query
             })
         }
 
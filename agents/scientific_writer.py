@@ -9,22 +9,21 @@ from pathlib import Path
 import json
 import yaml
 
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
-from config.settings import MODEL_REASONING, OLLAMA_BASE_URL
+from config.settings import MODEL_REASONING
 from utils.logging_utils import log_info, log_error, log_warning
 from utils.errors import DocumentGenerationError
 from utils.state import AgentState
 from utils.prompts import get_prompt
+from utils.dependency_injection import get_llm
+from utils.llm_concurrency import invoke_concurrently
 
 
 # Inicializar modelo
-llm = ChatOllama(
-    model=MODEL_REASONING,
-    base_url=OLLAMA_BASE_URL,
-    temperature=0.3  # Más bajo para escritura técnica precisa
-)
+def get_writer_llm():
+    """Cliente LLM compartido del escritor (se construye en el primer uso)"""
+    return get_llm(MODEL_REASONING, 0.3, agent="scientific_writer")  # Más bajo para escritura técnica precisa
 
 
 def scientific_writer_node(state: AgentState) -> AgentState:
@@ -35,29 +34,28 @@ def scientific_writer_node(state: AgentState) -> AgentState:
     log_info("ScientificWriter", "🖊️ Agente de Escritura Científica iniciado")
     
     try:
-        # Obtener tipo de documento solicitado
+        # Obtener tipo(s) de documento solicitado(s)
         doc_type = state.get("document_type", "briefing")
+        doc_types = [doc_type] if isinstance(doc_type, str) else list(doc_type)
         experiment_results = state.get("experiment_results", {})
         
-        if doc_type == "briefing":
-            document = generate_experiment_briefing(experiment_results, state)
-        elif doc_type == "detailed_report":
-            document = generate_detailed_report(experiment_results, state)
-        elif doc_type == "thesis_section":
-            document = generate_thesis_section(experiment_results, state)
-        elif doc_type == "paper_draft":
-            document = generate_paper_draft(experiment_results, state)
-        else:
-            raise DocumentGenerationError(f"Tipo de documento no soportado: {doc_type}")
+        for requested in doc_types:
+            if requested not in DOCUMENT_BUILDERS:
+                raise DocumentGenerationError(f"Tipo de documento no soportado: {requested}")
         
-        # Guardar documento
-        output_path = save_document(document, doc_type, state)
+        # Los documentos son independientes: se generan en paralelo
+        documents = generate_documents(doc_types, experiment_results, state)
         
-        state["generated_document"] = document
-        state["document_path"] = str(output_path)
-        state["messages"].append(f"✅ Documento generado: {output_path}")
-        
-        log_info("ScientificWriter", f"✅ Documento generado exitosamente: {output_path}")
+        for requested, document in documents.items():
+            # Guardar documento
+            output_path = save_document(document, requested, state)
+            
+            state["generated_document"] = document
+            state["document_path"] = str(output_path)
+            state.setdefault("generated_documents", {})[requested] = str(output_path)
+            state["messages"].append(f"✅ Documento generado: {output_path}")
+            
+            log_info("ScientificWriter", f"✅ Documento generado exitosamente: {output_path}")
         return state
         
     except Exception as e:
@@ -67,11 +65,8 @@ def scientific_writer_node(state: AgentState) -> AgentState:
         return state
 
 
-def generate_experiment_briefing(results: Dict[str, Any], state: AgentState) -> str:
-    """
-    Genera un briefing conciso del experimento
-    Ideal para reportes rápidos y actualizaciones
-    """
+def _briefing_messages(results: Dict[str, Any], state: AgentState) -> List[BaseMessage]:
+    """Mensajes para el briefing del experimento"""
     log_info("ScientificWriter", "📝 Generando briefing de experimento...")
     
     # Extraer información clave
@@ -95,15 +90,20 @@ def generate_experiment_briefing(results: Dict[str, Any], state: AgentState) ->
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
-    return response.content
+    return messages
 
 
-def generate_detailed_report(results: Dict[str, Any], state: AgentState) -> str:
+def generate_experiment_briefing(results: Dict[str, Any], state: AgentState) -> str:
     """
-    Genera un informe detallado del experimento
-    Incluye análisis estadístico completo y gráficos
+    Genera un briefing conciso del experimento
+    Ideal para reportes rápidos y actualizaciones
     """
+    response = get_writer_llm().invoke(_briefing_messages(results, state))
+    return response.content
+
+
+def _detailed_report_messages(results: Dict[str, Any], state: AgentState) -> List[BaseMessage]:
+    """Mensajes para el informe detallado del experimento"""
     log_info("ScientificWriter", "📊 Generando informe detallado...")
     
     experiment_name = results.get("experiment_name", "Experimento")
@@ -127,15 +127,20 @@ def generate_detailed_report(results: Dict[str, Any], state: AgentState) -> str:
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
-    return response.content
+    return messages
 
 
-def generate_thesis_section(results: Dict[str, Any], state: AgentState) -> str:
+def generate_detailed_report(results: Dict[str, Any], state: AgentState) -> str:
     """
-    Genera una sección de tesis doctoral
-    Formato académico completo con referencias
+    Genera un informe detallado del experimento
+    Incluye análisis estadístico completo y gráficos
     """
+    response = get_writer_llm().invoke(_detailed_report_messages(results, state))
+    return response.content
+
+
+def _thesis_section_messages(results: Dict[str, Any], state: AgentState) -> List[BaseMessage]:
+    """Mensajes para la sección de tesis doctoral"""
     log_info("ScientificWriter", "🎓 Generando sección de tesis...")
     
     section_type = state.get("thesis_section_type", "results")  # results, methodology, discussion
@@ -172,15 +177,20 @@ def generate_thesis_section(results: Dict[str, Any], state: AgentState) -> str:
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
-    return response.content
+    return messages
 
 
-def generate_paper_draft(results: Dict[str, Any], state: AgentState) -> str:
+def generate_thesis_section(results: Dict[str, Any], state: AgentState) -> str:
     """
-    Genera un borrador de paper científico
-    Formato IEEE o ACM
+    Genera una sección de tesis doctoral
+    Formato académico completo con referencias
     """
+    response = get_writer_llm().invoke(_thesis_section_messages(results, state))
+    return response.content
+
+
+def _paper_draft_messages(results: Dict[str, Any], state: AgentState) -> List[BaseMessage]:
+    """Mensajes para el borrador de paper científico"""
     log_info("ScientificWriter", "📄 Generando borrador de paper...")
     
     experiment_name = results.get("experiment_name", "Experimento")
@@ -200,10 +210,55 @@ def generate_paper_draft(results: Dict[str, Any], state: AgentState) -> str:
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
+    return messages
+
+
+def generate_paper_draft(results: Dict[str, Any], state: AgentState) -> str:
+    """
+    Genera un borrador de paper científico
+    Formato IEEE o ACM
+    """
+    response = get_writer_llm().invoke(_paper_draft_messages(results, state))
     return response.content
 
 
+# Constructores de mensajes por tipo de documento
+DOCUMENT_BUILDERS = {
+    "briefing": _briefing_messages,
+    "detailed_report": _detailed_report_messages,
+    "thesis_section": _thesis_section_messages,
+    "paper_draft": _paper_draft_messages,
+}
+
+
+def generate_documents(doc_types: List[str], results: Dict[str, Any],
+                       state: AgentState) -> Dict[str, str]:
+    """
+    Genera varios documentos independientes en paralelo
+    
+    Las generaciones se lanzan de forma concurrente contra el servidor de
+    modelos (limitadas por LLM_MAX_CONCURRENCY), por lo que el tiempo total
+    se aproxima al del documento más largo en lugar de a la suma.
+    
+    Args:
+        doc_types: Tipos de documento (claves de DOCUMENT_BUILDERS)
+        results: Resultados experimentales
+        state: Estado actual
+        
+    Returns:
+        Diccionario tipo de documento -> contenido generado
+    """
+    doc_types = list(dict.fromkeys(doc_types))
+    prompts = [DOCUMENT_BUILDERS[doc_type](results, state) for doc_type in doc_types]
+    
+    if len(prompts) == 1:
+        responses = [get_writer_llm().invoke(prompts[0])]
+    else:
+        responses = invoke_concurrently(get_writer_llm(), prompts)
+    
+    return {doc_type: response.content for doc_type, response in zip(doc_types, responses)}
+
+
 def save_document(content: str, doc_type: str, state: AgentState) -> Path:
     """
     Guarda el documento generado en el directorio apropiado
@@ -250,7 +305,7 @@ def generate_comparative_analysis(results_list: List[Dict[str, Any]], state: Age
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
+    response = get_writer_llm().invoke(messages)
     return response.content
 
 
@@ -276,7 +331,7 @@ def generate_presentation_slides(results: Dict[str, Any], state: AgentState) ->
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
+    response = get_writer_llm().invoke(messages)
     return response.content
 
 
@@ -10,13 +10,13 @@ import json
 import yaml
 import re
 
-from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from config.settings import MODEL_REASONING, OLLAMA_BASE_URL
+from config.settings import MODEL_REASONING
 from utils.logging_utils import log_info, log_error, log_warning
 from utils.errors import DocumentGenerationError
 from utils.state import AgentState
+from utils.dependency_injection import get_llm
 
 
 # Base de datos de referencias IEEE estándar para redes
@@ -38,11 +38,9 @@ IEEE_REFERENCES = {
 }
 
 # Inicializar modelo con temperatura más baja para mayor precisión
-llm = ChatOllama(
-    model=MODEL_REASONING,
-    base_url=OLLAMA_BASE_URL,
-    temperature=0.2  # Más bajo para escritura académica precisa
-)
+def get_writer_llm():
+    """Cliente LLM compartido del escritor (se construye en el primer uso)"""
+    return get_llm(MODEL_REASONING, 0.2, agent="scientific_writer")  # Más bajo para escritura académica precisa
 
 
 
@@ -258,7 +256,7 @@ TONO: Académico formal, nivel de publicación IEEE Transactions."""
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
+    response = get_writer_llm().invoke(messages)
     content = response.content
     
     # Añadir referencias IEEE al final
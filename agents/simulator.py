@@ -8,7 +8,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from typing import Dict
+from typing import Dict, List
 import subprocess
 import tempfile
 import shutil
@@ -17,10 +17,20 @@ import re
 import time
 import json
 
-from config.settings import NS3_ROOT, SIMULATION_TIMEOUT, SIMULATIONS_DIR
+from config.settings import (
+    NS3_ROOT,
+    NS3_VERSION,
+    SIMULATION_TIMEOUT,
+    SIMULATIONS_DIR,
+    SIMULATION_CACHE_ENABLED,
+    PCAP_CAPTURE_PROFILE
+)
 from utils.state import AgentState, add_audit_entry
 from utils.logging_utils import update_agent_status, log_message, log_metric
 from utils.validation import validate_code
+from utils.simulation_cache import simulation_cache, simulation_fingerprint
+from utils.capture_profiles import apply_capture_profile
+from utils.batch_simulation import build_batch_runner, load_batch_manifest
 
 
 
@@ -131,6 +141,94 @@ def run_ns3_simulation(scratch_file: Path, timeout: int) -> Dict:
         raise SimulationError(f"Error inesperado al ejecutar simulación: {e}")
 
 
+def run_simulation_batch(code: str, seeds: List[int], timeout: int = SIMULATION_TIMEOUT) -> List[Dict]:
+    """
+    Ejecuta un mismo script para varias semillas en un único proceso NS-3
+    
+    El script se importa una vez y su main() se invoca por semilla (RngSeedManager.SetSeed),
+    con Simulator.Destroy() entre ejecuciones. Cada semilla obtiene su propio
+    directorio de resultados y se registra en el caché de simulaciones.
+    
+    Args:
+        code: Código del script de simulación (debe definir main())
+        seeds: Semillas a ejecutar
+        timeout: Tiempo máximo por semilla (en segundos)
+        
+    Returns:
+        Lista de resultados por semilla con 'seed', 'status', 'simulation_logs',
+        'pcap_files', 'results_dir' y 'execution_time'
+        
+    Raises:
+        TimeoutError, CompilationError, SimulationError: Si falla el lanzador
+    """
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    scratch_file = NS3_ROOT / "scratch" / f"tesis_sim_{timestamp}.py"
+    runner_file = NS3_ROOT / "scratch" / f"tesis_batch_{timestamp}.py"
+    batch_dir = NS3_ROOT / f"batch_{timestamp}"
+    
+    with open(scratch_file, 'w', encoding='utf-8') as f:
+        f.write(code)
+    with open(runner_file, 'w', encoding='utf-8') as f:
+        f.write(build_batch_runner(scratch_file, seeds, batch_dir))
+    
+    log_message("Simulator", f"Ejecutando lote de {len(seeds)} semillas: {runner_file.name}")
+    result_data = run_ns3_simulation(runner_file, timeout * len(seeds))
+    
+    results = []
+    for entry in load_batch_manifest(batch_dir):
+        seed = entry['seed']
+        seed_dir = Path(entry['output_dir'])
+        results_dir = SIMULATIONS_DIR / "results" / f"{timestamp}_seed{seed}"
+        results_dir.mkdir(parents=True, exist_ok=True)
+        
+        xml_file = seed_dir / "resultados.xml"
+        simulation_logs = None
+        if xml_file.exists():
+            simulation_logs = results_dir / f"sim_{timestamp}_seed{seed}.xml"
+            shutil.move(str(xml_file), str(simulation_logs))
+        
+        pcap_files = []
+        for pcap_file in sorted(seed_dir.glob("simulacion-*.pcap")):
+            dest = results_dir / pcap_file.name
+            shutil.move(str(pcap_file), str(dest))
+            pcap_files.append(str(dest))
+        
+        metadata_file = seed_dir / "simulation_metadata.json"
+        if metadata_file.exists():
+            shutil.move(str(metadata_file), str(results_dir / metadata_file.name))
+        
+        status = entry['status'] if simulation_logs else 'failed'
+        seed_result = {
+            'seed': seed,
+            'status': status,
+            'error': entry.get('error'),
+            'simulation_logs': str(simulation_logs) if simulation_logs else None,
+            'pcap_files': pcap_files,
+            'results_dir': str(results_dir),
+            'execution_time': entry.get('execution_time', 0)
+        }
+        results.append(seed_result)
+        
+        if status == 'completed' and SIMULATION_CACHE_ENABLED:
+            fingerprint = simulation_fingerprint(code, seed, NS3_VERSION, {
+                'ns3_root': str(NS3_ROOT)
+            })
+            simulation_cache.store(fingerprint, {
+                'timestamp': f"{timestamp}_seed{seed}",
+                'results_dir': str(results_dir),
+                'simulation_logs': seed_result['simulation_logs'],
+                'pcap_files': pcap_files,
+                'execution_time': seed_result['execution_time']
+            })
+    
+    shutil.rmtree(batch_dir, ignore_errors=True)
+    
+    completed = len([r for r in results if r['status'] == 'completed'])
+    log_message("Simulator", f"Lote completado: {completed}/{len(seeds)} semillas en {result_data['execution_time']:.1f}s")
+    
+    return results
+
+
 def simulator_node(state: AgentState) -> Dict:
     """
     Nodo del agente simulador para LangGraph con validación y retry mejorados
@@ -161,6 +259,10 @@ def simulator_node(state: AgentState) -> Dict:
             **add_audit_entry(state, "simulator", "no_code", {})
         }
     
+    # Aplicar perfil de captura (sin efecto si el coder ya lo inyectó)
+    capture_profile = state.get('capture_profile') or PCAP_CAPTURE_PROFILE
+    code = apply_capture_profile(code, capture_profile)
+    
     print(f"📄 Código recibido: {len(code)} caracteres")
     print(f"🔄 Iteración: {iteration + 1}")
     print(f"🎯 Ejecutando en NS-3: {NS3_ROOT}")
@@ -184,6 +286,35 @@ def simulator_node(state: AgentState) -> Dict:
     
     print("  ✓ Validación pre-ejecución exitosa")
     
+    # Deduplicación: reutilizar resultados de una simulación idéntica
+    seed = state.get('simulation_seed')
+    fingerprint = simulation_fingerprint(code, seed, NS3_VERSION, {
+        'ns3_root': str(NS3_ROOT)
+    })
+    
+    if SIMULATION_CACHE_ENABLED:
+        cached = simulation_cache.lookup(fingerprint)
+        if cached:
+            print(f"  ♻️  Simulación idéntica encontrada en caché ({cached['timestamp']})")
+            print(f"  📁 Reutilizando resultados de: {cached['results_dir']}")
+            log_message("Simulator", f"Cache hit: reutilizando resultados de {cached['timestamp']}")
+            update_agent_status("Simulator", "completed", "Resultados reutilizados desde caché")
+            
+            return {
+                'simulation_status': 'completed',
+                'simulation_logs': cached['simulation_logs'],
+                'pcap_files': cached.get('pcap_files', []),
+                'simulation_info': cached.get('simulation_info', {}),
+                'execution_time': cached.get('execution_time', 0),
+                **add_audit_entry(state, "simulator", "simulation_cache_hit", {
+                    'fingerprint': fingerprint,
+                    'seed': seed,
+                    'original_timestamp': cached['timestamp'],
+                    'saved_execution_time': cached.get('execution_time', 0),
+                    'results_dir': cached['results_dir']
+                })
+            }
+    
     # Guardar código en scratch de NS-3
     import datetime
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -290,6 +421,17 @@ def simulator_node(state: AgentState) -> Dict:
         print(f"  ✅ Simulación completada exitosamente")
         print(f"  📁 Resultados en: {results_dir}")
         
+        if SIMULATION_CACHE_ENABLED:
+            simulation_cache.store(fingerprint, {
+                'timestamp': timestamp,
+                'results_dir': str(results_dir),
+                'simulation_logs': str(moved_results_file) if moved_results_file else str(stdout_file),
+                'pcap_files': moved_pcaps,
+                'stdout_file': str(stdout_file),
+                'simulation_info': sim_info,
+                'execution_time': execution_time
+            })
+        
         log_message("Simulator", f"Simulación completada. Archivos: XML={moved_results_file is not None}, PCAP={len(moved_pcaps)}")
         update_agent_status("Simulator", "completed", "Simulación finalizada")
         
@@ -303,7 +445,9 @@ def simulator_node(state: AgentState) -> Dict:
                 'execution_time': execution_time,
                 'nodes': sim_info['nodes_created'],
                 'pcap_files_count': len(moved_pcaps),
-                'results_dir': str(results_dir)
+                'capture_profile': capture_profile,
+                'results_dir': str(results_dir),
+                'fingerprint': fingerprint
             })
         }
         
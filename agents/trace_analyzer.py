@@ -11,13 +11,18 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from typing import Dict, List, Optional
+import os
 import subprocess
+import threading
+import shutil
 import json
 import pandas as pd
-from langchain_ollama import ChatOllama
 
-from config.settings import OLLAMA_BASE_URL, MODEL_REASONING, SIMULATIONS_DIR
+from config.settings import MODEL_REASONING, SIMULATIONS_DIR, PCAP_CAPTURE_PROFILE
 from utils.state import AgentState, add_audit_entry
+from utils.artifact_store import open_artifact, resolve_artifact, is_compressed, CHUNK_SIZE
+from utils.capture_profiles import get_capture_profile
+from utils.dependency_injection import get_llm
 
 
 def check_tshark_available() -> bool:
@@ -39,6 +44,74 @@ def check_tshark_available() -> bool:
         return False
 
 
+def run_tshark(pcap_file: str, args: List[str], timeout: int = 60) -> subprocess.CompletedProcess:
+    """
+    Ejecuta tshark sobre un PCAP, comprimido o no
+    
+    Los PCAPs comprimidos se descomprimen en streaming hacia la entrada
+    estándar de tshark, sin materializar el archivo en disco.
+    
+    Args:
+        pcap_file: Ruta al archivo PCAP (original o comprimida)
+        args: Argumentos de tshark posteriores a la lectura
+        timeout: Timeout en segundos
+        
+    Returns:
+        Resultado del proceso (stdout/stderr como texto)
+    """
+    resolved = resolve_artifact(pcap_file) or Path(pcap_file)
+    
+    if not is_compressed(resolved):
+        return subprocess.run(
+            ['tshark', '-r', str(resolved)] + args,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    
+    cmd = ['tshark', '-r', '-'] + args
+    read_fd, write_fd = os.pipe()
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdin=read_fd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    except OSError:
+        os.close(write_fd)
+        raise
+    finally:
+        os.close(read_fd)
+    
+    def feed():
+        try:
+            with open(write_fd, 'wb') as sink, open_artifact(resolved) as src:
+                shutil.copyfileobj(src, sink, CHUNK_SIZE)
+        except BrokenPipeError:
+            # tshark terminó antes de consumir toda la traza
+            pass
+    
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise
+    finally:
+        feeder.join(timeout=5)
+    
+    return subprocess.CompletedProcess(
+        cmd,
+        process.returncode,
+        stdout.decode('utf-8', errors='replace'),
+        stderr.decode('utf-8', errors='replace')
+    )
+
+
 def analyze_pcap_basic_stats(pcap_file: str) -> Dict:
     """
     Extrae estadísticas básicas del archivo PCAP usando tshark
@@ -51,19 +124,10 @@ def analyze_pcap_basic_stats(pcap_file: str) -> Dict:
     """
     try:
         # Comando tshark para estadísticas básicas
-        cmd = [
-            'tshark',
-            '-r', pcap_file,
+        result = run_tshark(pcap_file, [
             '-q',  # Modo silencioso
             '-z', 'io,stat,0'  # Estadísticas de I/O
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        ])
         
         if result.returncode != 0:
             return {'error': result.stderr}
@@ -111,19 +175,10 @@ def analyze_pcap_protocols(pcap_file: str) -> Dict:
     """
     try:
         # Comando para jerarquía de protocolos
-        cmd = [
-            'tshark',
-            '-r', pcap_file,
+        result = run_tshark(pcap_file, [
             '-q',
             '-z', 'io,phs'  # Protocol Hierarchy Statistics
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        ])
         
         if result.returncode != 0:
             return {'error': result.stderr}
@@ -163,19 +218,10 @@ def analyze_pcap_conversations(pcap_file: str) -> List[Dict]:
     """
     try:
         # Comando para conversaciones IP
-        cmd = [
-            'tshark',
-            '-r', pcap_file,
+        result = run_tshark(pcap_file, [
             '-q',
             '-z', 'conv,ip'  # IP conversations
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        ])
         
         if result.returncode != 0:
             return []
@@ -231,22 +277,13 @@ def analyze_pcap_routing_packets(pcap_file: str, protocol: str = 'aodv') -> Dict
         filter_str = filters.get(protocol.lower(), 'aodv')
         
         # Contar paquetes de enrutamiento
-        cmd = [
-            'tshark',
-            '-r', pcap_file,
+        result = run_tshark(pcap_file, [
             '-Y', filter_str,  # Display filter
             '-T', 'fields',
             '-e', 'frame.number',
             '-e', 'frame.len',
             '-e', f'{filter_str}.type'
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        ])
         
         if result.returncode != 0:
             return {'error': result.stderr}
@@ -309,20 +346,11 @@ def analyze_pcap_retransmissions(pcap_file: str) -> Dict:
     """
     try:
         # Buscar retransmisiones TCP
-        cmd = [
-            'tshark',
-            '-r', pcap_file,
+        result = run_tshark(pcap_file, [
             '-Y', 'tcp.analysis.retransmission',
             '-T', 'fields',
             '-e', 'frame.number'
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        ])
         
         retransmissions = len([l for l in result.stdout.split('\n') if l.strip()])
         
@@ -334,30 +362,33 @@ def analyze_pcap_retransmissions(pcap_file: str) -> Dict:
         return {'error': str(e)}
 
 
-def generate_trace_analysis_report(pcap_file: str, protocol: str = 'aodv') -> str:
+def generate_trace_analysis_report(pcap_file: str, protocol: str = 'aodv',
+                                   capture_profile: str = 'full') -> str:
     """
     Genera un reporte completo del análisis de trazas usando LLM
     
     Args:
         pcap_file: Ruta al archivo PCAP
         protocol: Protocolo de enrutamiento usado
+        capture_profile: Perfil de captura con el que se generó el PCAP
         
     Returns:
         Reporte en texto
     """
     try:
-        llm = ChatOllama(
-            model=MODEL_REASONING,
-            temperature=0.2,
-            base_url=OLLAMA_BASE_URL
-        )
+        llm = get_llm(MODEL_REASONING, 0.2, agent="trace_analyzer")
         
-        # Recopilar todos los análisis
+        # Recopilar los análisis válidos para el perfil de captura
+        profile = get_capture_profile(capture_profile)
+        analyses = profile['analyses']
         basic_stats = analyze_pcap_basic_stats(pcap_file)
         protocols_dist = analyze_pcap_protocols(pcap_file)
-        conversations = analyze_pcap_conversations(pcap_file)
         routing_analysis = analyze_pcap_routing_packets(pcap_file, protocol)
-        retrans_analysis = analyze_pcap_retransmissions(pcap_file)
+        conversations = analyze_pcap_conversations(pcap_file) if 'conversations' in analyses else []
+        retrans_analysis = (
+            analyze_pcap_retransmissions(pcap_file) if 'retransmissions' in analyses
+            else {'skipped': f"No disponible con el perfil '{profile['name']}'"}
+        )
         
         # Preparar contexto para LLM
         context = f"""
@@ -365,6 +396,7 @@ def generate_trace_analysis_report(pcap_file: str, protocol: str = 'aodv') -> st
 
 Archivo: {Path(pcap_file).name}
 Protocolo de Enrutamiento: {protocol.upper()}
+Perfil de captura: {profile['name']} ({profile['description']})
 
 **ESTADÍSTICAS BÁSICAS:**
 - Total de paquetes: {basic_stats.get('total_packets', 0):,}
@@ -476,12 +508,18 @@ def trace_analyzer_node(state: AgentState) -> Dict:
         protocol = 'dsr'
     
     print(f"🔍 Protocolo detectado: {protocol.upper()}")
+    
+    # Perfil de captura: determina qué análisis son válidos
+    profile = get_capture_profile(state.get('capture_profile') or PCAP_CAPTURE_PROFILE)
+    analyses = profile['analyses']
+    partial_capture = profile['max_nodes'] is not None
+    print(f"📼 Perfil de captura: {profile['name']} ({profile['description']})")
     print()
     
     all_analyses = []
     
     for pcap_file in pcap_files:
-        if not Path(pcap_file).exists():
+        if resolve_artifact(pcap_file) is None:
             print(f"⚠️  Archivo no encontrado: {pcap_file}")
             continue
         
@@ -510,19 +548,26 @@ def trace_analyzer_node(state: AgentState) -> Dict:
             print(f"     Paquetes de enrutamiento: {routing.get('total_routing_packets', 0):,}")
             print(f"     Bytes de enrutamiento: {routing.get('total_routing_bytes', 0):,}")
         
-        # Análisis de conversaciones
-        print("  🔍 Conversaciones...")
-        conversations = analyze_pcap_conversations(pcap_file)
-        print(f"     Conversaciones detectadas: {len(conversations)}")
+        # Análisis de conversaciones (requiere captura de todos los nodos)
+        conversations = []
+        if 'conversations' in analyses:
+            print("  🔍 Conversaciones...")
+            conversations = analyze_pcap_conversations(pcap_file)
+            print(f"     Conversaciones detectadas: {len(conversations)}")
         
         # Análisis de retransmisiones
-        print("  🔍 Retransmisiones...")
-        retrans = analyze_pcap_retransmissions(pcap_file)
-        print(f"     Retransmisiones TCP: {retrans.get('tcp_retransmissions', 0)}")
+        retrans = {}
+        if 'retransmissions' in analyses:
+            print("  🔍 Retransmisiones...")
+            retrans = analyze_pcap_retransmissions(pcap_file)
+            print(f"     Retransmisiones TCP: {retrans.get('tcp_retransmissions', 0)}")
         
         # Compilar análisis
         analysis = {
             'pcap_file': pcap_file,
+            'capture_profile': profile['name'],
+            'snaplen': profile['snaplen'],
+            'partial_capture': partial_capture,
             'basic_stats': basic_stats,
             'protocols': protocols,
             'routing_analysis': routing,
@@ -540,7 +585,7 @@ def trace_analyzer_node(state: AgentState) -> Dict:
         
         # Usar el primer archivo PCAP para el reporte principal
         main_pcap = pcap_files[0]
-        report = generate_trace_analysis_report(main_pcap, protocol)
+        report = generate_trace_analysis_report(main_pcap, protocol, profile['name'])
         
         # Guardar reporte
         import datetime
@@ -552,6 +597,7 @@ def trace_analyzer_node(state: AgentState) -> Dict:
             f.write(f"# Análisis de Trazas PCAP\n\n")
             f.write(f"**Fecha:** {timestamp}\n")
             f.write(f"**Protocolo:** {protocol.upper()}\n")
+            f.write(f"**Perfil de captura:** {profile['name']}\n")
             f.write(f"**Archivos analizados:** {len(pcap_files)}\n\n")
             f.write(report)
         
@@ -572,6 +618,7 @@ def trace_analyzer_node(state: AgentState) -> Dict:
         **add_audit_entry(state, "trace_analyzer", "analysis_completed", {
             'files_analyzed': len(all_analyses),
             'protocol': protocol,
+            'capture_profile': profile['name'],
             'report_file': str(report_file) if all_analyses else None
         })
     }
@@ -7,6 +7,7 @@ from .settings import *
 __all__ = [
     'PROJECT_ROOT',
     'NS3_ROOT',
+    'NS3_VERSION',
     'OLLAMA_BASE_URL',
     'MODEL_REASONING',
     'MODEL_CODING',
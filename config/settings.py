@@ -19,6 +19,25 @@ SIMULATIONS_DIR = PROJECT_ROOT / "simulations"
 DATA_DIR = PROJECT_ROOT / "data"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
+# ============================================================================
+# CONFIGURACIÓN DE NS-3
+# ============================================================================
+
+# Directorio raíz de NS-3 (donde se ejecutan los scripts generados)
+NS3_ROOT = Path(os.getenv("NS3_ROOT", str(Path.home() / "ns-3.45")))
+
+# Versión de NS-3 (clave del índice cacheado de bindings Python)
+NS3_VERSION = os.getenv("NS3_VERSION", "3.45")
+
+# Verificación estática de referencias ns.* contra el índice de bindings
+NS3_BINDINGS_CHECK = os.getenv("NS3_BINDINGS_CHECK", "true").lower() == "true"
+
+# Directorio del índice cacheado de bindings
+NS3_BINDINGS_CACHE_DIR = DATA_DIR / "ns3_bindings"
+
+# Perfil de captura PCAP inyectado en los scripts ("full", "headers", "routing", "none")
+PCAP_CAPTURE_PROFILE = os.getenv("PCAP_CAPTURE_PROFILE", "full").lower()
+
 # ============================================================================
 # CONFIGURACIÓN DE OLLAMA (BACKUP para compatibilidad)
 # ============================================================================
@@ -26,16 +45,44 @@ LOGS_DIR = PROJECT_ROOT / "logs"
 # URL base de Ollama
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+# Tiempo que Ollama mantiene el modelo cargado entre llamadas ("30m", "-1" = siempre)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
 # Modelos a utilizar
 MODEL_REASONING = os.getenv("MODEL_REASONING", "llama3.1:8b")
 MODEL_CODING = os.getenv("MODEL_CODING", "llama3.1:8b")
 MODEL_EMBEDDING = os.getenv("MODEL_EMBEDDING", "nomic-embed-text")
 
+# Modelo pequeño y rápido para llamadas de bajo riesgo (consultas, aprobación del crítico)
+MODEL_FAST = os.getenv("MODEL_FAST", "llama3.2:3b")
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+
+# Iteraciones fallidas tras las que el plan del coder pasa al modelo grande
+MODEL_ESCALATION_FAILURES = int(os.getenv("MODEL_ESCALATION_FAILURES", "2"))
+
 # Parámetros de los modelos
 MODEL_TEMPERATURE_REASONING = float(os.getenv("MODEL_TEMPERATURE_REASONING", "0.1"))
 MODEL_TEMPERATURE_CODING = float(os.getenv("MODEL_TEMPERATURE_CODING", "0.05"))
 MODEL_TEMPERATURE_CREATIVE = float(os.getenv("MODEL_TEMPERATURE_CREATIVE", "0.3"))
 
+# Generar código en streaming y cortar al recibir un bloque Python válido
+CODER_STREAMING = os.getenv("CODER_STREAMING", "true").lower() == "true"
+
+# Generar los escenarios estándar (protocolo, nodos, área, movilidad) desde plantilla, sin LLM
+CODER_TEMPLATES_ENABLED = os.getenv("CODER_TEMPLATES_ENABLED", "true").lower() == "true"
+
+# Revisar el código con reglas deterministas antes de consultar al crítico LLM
+CRITIC_RULES_ENABLED = os.getenv("CRITIC_RULES_ENABLED", "true").lower() == "true"
+
+# Registrar tokens, latencia y aciertos de caché de cada llamada LLM (logs/llm_calls.csv)
+LLM_METRICS_ENABLED = os.getenv("LLM_METRICS_ENABLED", "true").lower() == "true"
+
+# Presupuesto de tokens por prompt (dejar margen en num_ctx para la respuesta)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+
+# Caracteres por token para estimar el tamaño de los prompts
+PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "3.5"))
+
 # ============================================================================
 # LÍMITES Y TIMEOUTS
 # ============================================================================
@@ -46,13 +93,100 @@ MAX_ITERATIONS = int(os.getenv("MAX_ITERATIONS", "5"))
 # Timeout para simulaciones NS-3 (en segundos)
 SIMULATION_TIMEOUT = int(os.getenv("SIMULATION_TIMEOUT", "900"))
 
+# Escenarios con hasta este número de nodos ejecutan todas sus repeticiones
+# en un único proceso NS-3 (0 = desactivado)
+SIMULATION_BATCH_MAX_NODES = int(os.getenv("SIMULATION_BATCH_MAX_NODES", "50"))
+
 # Timeout para llamadas a LLM (en segundos)
 LLM_TIMEOUT = int(os.getenv("LLM_TIMEOUT", "120"))
 
+# ============================================================================
+# CACHÉS PERSISTENTES
+# ============================================================================
+
+# Base de datos SQLite compartida por los cachés del sistema
+CACHE_DB_PATH = DATA_DIR / "cache.db"
+
+# Reutilizar resultados de simulaciones idénticas (script + semilla + NS-3)
+SIMULATION_CACHE_ENABLED = os.getenv("SIMULATION_CACHE_ENABLED", "true").lower() == "true"
+
+# Caché de respuestas LLM (modelo + temperatura + prompt normalizado)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# Agentes que no usan el caché LLM (separados por comas, p.ej. "critic,researcher")
+LLM_CACHE_BYPASS_AGENTS = [
+    agent.strip().lower()
+    for agent in os.getenv("LLM_CACHE_BYPASS_AGENTS", "").split(",")
+    if agent.strip()
+]
+
+# Caché de búsquedas en Semantic Scholar y arXiv
+LITERATURE_CACHE_ENABLED = os.getenv("LITERATURE_CACHE_ENABLED", "true").lower() == "true"
+LITERATURE_CACHE_TTL_HOURS = float(os.getenv("LITERATURE_CACHE_TTL_HOURS", "720"))
+
+# Investigar sin red: solo caché bibliográfico y corpus local (JSON/JSONL de papers)
+LITERATURE_OFFLINE = os.getenv("LITERATURE_OFFLINE", "false").lower() == "true"
+LITERATURE_CORPUS_DIR = DATA_DIR / "papers"
+
+# Reutilizar la investigación de tareas de la misma familia (misma tarea salvo valores numéricos)
+RESEARCH_REUSE_ENABLED = os.getenv("RESEARCH_REUSE_ENABLED", "false").lower() == "true"
+# Antigüedad a partir de la cual se repite la investigación (0 = sin límite)
+RESEARCH_REUSE_MAX_AGE_HOURS = float(os.getenv("RESEARCH_REUSE_MAX_AGE_HOURS", "168"))
+
+# Máximo de generaciones LLM simultáneas por nodo (alinear con OLLAMA_NUM_PARALLEL)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# ============================================================================
+# EMBEDDINGS
+# ============================================================================
+
+# Backend de embedding de RAG y memoria ("chroma", "sentence_transformers", "hashing", "ollama")
+# Cambiar de modelo crea colecciones nuevas en ChromaDB (los vectores no son compatibles)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "chroma").lower()
+
+# Modelo del backend sentence_transformers (se ejecuta en CPU dentro del proceso)
+EMBEDDING_LOCAL_MODEL = os.getenv("EMBEDDING_LOCAL_MODEL", "all-MiniLM-L6-v2")
+
+# Textos por llamada al modelo
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# Caché en disco de vectores (clave: modelo + hash del texto)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+# ============================================================================
+# MEMORIA EPISÓDICA
+# ============================================================================
+
+# Máximo de experiencias antes de desalojar las menos usadas
+MEMORY_MAX_EXPERIENCES = int(os.getenv("MEMORY_MAX_EXPERIENCES", "5000"))
+
+# Recuperar experiencias por similitud de embeddings (backend EMBEDDING_BACKEND) en lugar de TF-IDF
+MEMORY_SEMANTIC_SEARCH = os.getenv("MEMORY_SEMANTIC_SEARCH", "false").lower() == "true"
+
+# ============================================================================
+# ALMACENAMIENTO DE ARTEFACTOS
+# ============================================================================
+
+# Compresión de PCAPs y XML de FlowMonitor tras el análisis ("zstd", "gzip" o "none")
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "zstd").lower()
+
+# Nivel de compresión (zstd: 1-22, gzip: 1-9)
+ARTIFACT_COMPRESSION_LEVEL = int(os.getenv("ARTIFACT_COMPRESSION_LEVEL", "3"))
+
+# Días tras los cuales se eliminan los artefactos crudos conservando las
+# tablas derivadas (0 = conservar siempre)
+ARTIFACT_RETENTION_DAYS = int(os.getenv("ARTIFACT_RETENTION_DAYS", "0"))
+
 # ============================================================================
 # CONFIGURACIÓN DE CHROMADB
 # ============================================================================
 
+# Directorio de la base de datos vectorial persistente
+CHROMA_PATH = DATA_DIR / "vector_db"
+
 # Nombre de la colección para papers
 CHROMA_COLLECTION_PAPERS = os.getenv("CHROMA_COLLECTION", "thesis_papers")
 
@@ -70,6 +204,18 @@ SEMANTIC_SCHOLAR_MAX_RESULTS = int(os.getenv("SEMANTIC_SCHOLAR_MAX_RESULTS", "10
 SEMANTIC_SCHOLAR_YEAR_FROM = int(os.getenv("SEMANTIC_SCHOLAR_YEAR_FROM", "2020"))
 SEMANTIC_SCHOLAR_YEAR_TO = int(os.getenv("SEMANTIC_SCHOLAR_YEAR_TO", "2025"))
 
+# Endpoints de las fuentes bibliográficas (permiten apuntar a servidores locales de prueba)
+SEMANTIC_SCHOLAR_API_URL = os.getenv(
+    "SEMANTIC_SCHOLAR_API_URL", "https://api.semanticscholar.org/graph/v1/paper/search"
+)
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", "https://export.arxiv.org/api/query")
+
+# Timeouts por fuente (segundos): las fuentes se consultan en paralelo y
+# una fuente lenta solo pierde sus propios resultados
+SEMANTIC_SCHOLAR_TIMEOUT = float(os.getenv("SEMANTIC_SCHOLAR_TIMEOUT", "30"))
+ARXIV_TIMEOUT = float(os.getenv("ARXIV_TIMEOUT", "30"))
+VECTORDB_TIMEOUT = float(os.getenv("VECTORDB_TIMEOUT", "10"))
+
 # ============================================================================
 # CONFIGURACIÓN DE VISUALIZACIÓN
 # ============================================================================
@@ -106,7 +252,7 @@ def ensure_directories():
         SIMULATIONS_DIR,
         DATA_DIR,
         LOGS_DIR,
-        DATA_DIR / "vector_db",
+        CHROMA_PATH,
         SIMULATIONS_DIR / "scripts",
         SIMULATIONS_DIR / "results",
         SIMULATIONS_DIR / "plots",
@@ -28,6 +28,7 @@ LOGS_DIR = Path("logs")
 STATE_FILE = LOGS_DIR / "system_state.json"
 METRICS_FILE = LOGS_DIR / "metrics_history.csv"
 AGENT_LOGS_FILE = LOGS_DIR / "agent_logs.json"
+LLM_CALLS_FILE = LOGS_DIR / "llm_calls.csv"
 
 # Crear directorios si no existen
 LOGS_DIR.mkdir(exist_ok=True)
@@ -103,6 +104,16 @@ def load_metrics_history():
     return pd.DataFrame()
 
 
+def load_llm_calls():
+    """Carga el historial de llamadas LLM"""
+    if LLM_CALLS_FILE.exists():
+        try:
+            return pd.read_csv(LLM_CALLS_FILE)
+        except Exception:
+            return pd.DataFrame()
+    return pd.DataFrame()
+
+
 def load_agent_logs():
     """Carga los logs de agentes"""
     if AGENT_LOGS_FILE.exists():
@@ -179,6 +190,49 @@ def create_metrics_chart(df):
     return fig
 
 
+def create_llm_usage_chart(df):
+    """Crea gráfico de latencia y tokens LLM por agente"""
+    if df.empty:
+        return None
+    
+    by_agent = df.groupby('agent').agg(
+        latency=('latency', 'sum'),
+        prompt_tokens=('prompt_tokens', 'sum'),
+        completion_tokens=('completion_tokens', 'sum')
+    ).reset_index()
+    
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Latencia total (s)', 'Tokens'),
+        horizontal_spacing=0.1
+    )
+    
+    fig.add_trace(
+        go.Bar(x=by_agent['agent'], y=by_agent['latency'], name='Latencia',
+               marker_color='#9467bd'),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Bar(x=by_agent['agent'], y=by_agent['prompt_tokens'], name='Entrada',
+               marker_color='#1f77b4'),
+        row=1, col=2
+    )
+    fig.add_trace(
+        go.Bar(x=by_agent['agent'], y=by_agent['completion_tokens'], name='Salida',
+               marker_color='#ff7f0e'),
+        row=1, col=2
+    )
+    
+    fig.update_layout(
+        height=400,
+        barmode='stack',
+        title_text="Uso de LLM por Agente",
+        title_x=0.5
+    )
+    
+    return fig
+
+
 def main():
     """Función principal del dashboard"""
     
@@ -223,6 +277,8 @@ def main():
                 METRICS_FILE.unlink()
             if AGENT_LOGS_FILE.exists():
                 AGENT_LOGS_FILE.unlink()
+            if LLM_CALLS_FILE.exists():
+                LLM_CALLS_FILE.unlink()
             st.success("Logs limpiados")
             time.sleep(1)
             st.rerun()
@@ -295,6 +351,33 @@ def main():
             st.plotly_chart(fig, use_container_width=True)
         st.markdown("---")
     
+    # Fila 3b: Uso de LLM (tokens, latencia, caché)
+    llm_df = load_llm_calls()
+    if not llm_df.empty:
+        st.subheader("🧠 Uso de LLM")
+        
+        generated = llm_df[~llm_df['cached'].astype(str).str.lower().eq('true')]
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Llamadas", len(llm_df))
+        with col2:
+            total_tokens = int(llm_df['prompt_tokens'].sum() + llm_df['completion_tokens'].sum())
+            st.metric("Tokens", f"{total_tokens:,}")
+        with col3:
+            avg_latency = generated['latency'].mean() if not generated.empty else 0
+            avg_ttft = generated['ttft'].mean() if not generated.empty else float('nan')
+            st.metric("Latencia media", f"{avg_latency:.1f} s",
+                      f"TTFT {avg_ttft:.2f} s" if pd.notna(avg_ttft) else None,
+                      delta_color="off")
+        with col4:
+            st.metric("Aciertos de caché", f"{1 - len(generated) / len(llm_df):.0%}")
+        
+        fig = create_llm_usage_chart(llm_df)
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        st.markdown("---")
+    
     # Fila 4: Estado de agentes
     st.subheader("🤖 Estado de Agentes")
     
@@ -21,7 +21,12 @@ import pandas as pd
 from tqdm import tqdm
 
 from supervisor import SupervisorOrchestrator
+from agents.simulator import run_simulation_batch
+from agents.analyst import parse_flowmonitor_xml, calculate_kpis
 from utils.logging_utils import set_system_status, log_message
+from utils.artifact_store import apply_retention_policy
+from utils.llm_metrics import get_llm_calls, set_llm_context, summarize_llm_calls
+from config.settings import ARTIFACT_RETENTION_DAYS, SIMULATION_BATCH_MAX_NODES
 
 
 class ExperimentRunner:
@@ -39,6 +44,7 @@ class ExperimentRunner:
         self.config_file = Path(config_file)
         self.config = self._load_config()
         self.results = []
+        self.llm_usage = None
         self.supervisor = SupervisorOrchestrator()
         
         # Crear directorio de resultados
@@ -100,6 +106,9 @@ class ExperimentRunner:
         # Calcular total de simulaciones
         total_sims = len(scenarios) * repetitions
         
+        # Atribuir las llamadas LLM a la campaña
+        set_llm_context(campaign=experiment_name)
+        
         # Barra de progreso global
         with tqdm(total=total_sims, desc="Progreso total") as pbar:
             for scenario_idx, scenario in enumerate(scenarios, 1):
@@ -108,6 +117,15 @@ class ExperimentRunner:
                 print(f"\n{'='*60}")
                 print(f"📌 Escenario {scenario_idx}/{len(scenarios)}: {scenario_name}")
                 print(f"{'='*60}")
+                set_llm_context(scenario=scenario_name)
+                
+                # Escenarios pequeños: todas las repeticiones en un único proceso
+                if self._should_batch(scenario, repetitions):
+                    if self._run_batched_scenario(experiment_name, scenario, scenario_name, repetitions):
+                        pbar.update(repetitions)
+                        self._save_results()
+                        continue
+                    print("⚠️  Lote no disponible, ejecutando repeticiones individualmente")
                 
                 # Ejecutar repeticiones
                 for rep in range(1, repetitions + 1):
@@ -125,28 +143,20 @@ class ExperimentRunner:
                     try:
                         result = self.supervisor.run_experiment(
                             task=task,
-                            max_iterations=self.config['experiment'].get('max_iterations', 5)
+                            max_iterations=self.config['experiment'].get('max_iterations', 5),
+                            capture_profile=self._capture_profile(scenario),
+                            seed=seed,
+                            scenario=scenario
                         )
                         
                         execution_time = time.time() - start_time
                         
                         if result and 'metrics' in result:
                             # Guardar resultado
-                            result_entry = {
-                                'experiment': experiment_name,
-                                'scenario': scenario_name,
-                                'repetition': rep,
-                                'seed': seed,
-                                'protocol': scenario.get('protocol'),
-                                'nodes': scenario.get('nodes'),
-                                'area': scenario.get('area'),
-                                'duration': scenario.get('duration'),
-                                'mobility': scenario.get('mobility'),
-                                'speed': scenario.get('speed'),
-                                'execution_time': execution_time,
-                                'timestamp': datetime.now().isoformat(),
-                                **result['metrics']
-                            }
+                            result_entry = self._build_result_entry(
+                                experiment_name, scenario, scenario_name, rep, seed,
+                                execution_time, result['metrics']
+                            )
                             
                             self.results.append(result_entry)
                             
@@ -197,8 +207,131 @@ class ExperimentRunner:
         print(f"📁 Resultados guardados en: {self.results_dir}")
         print(f"{'='*80}\n")
         
+        set_llm_context(campaign=None, scenario=None)
+        
+        # Coste y latencia LLM de la campaña
+        self.llm_usage = self._save_llm_usage(experiment_name)
+        
         # Generar análisis
         self._generate_analysis()
+        
+        # Aplicar política de retención de artefactos crudos
+        self._apply_artifact_retention()
+    
+    def _capture_profile(self, scenario: Dict) -> str:
+        """Perfil de captura PCAP del escenario (o del experimento)"""
+        return scenario.get('capture_profile', self.config['experiment'].get('capture_profile'))
+    
+    def _build_result_entry(self, experiment_name: str, scenario: Dict, scenario_name: str,
+                            rep: int, seed: int, execution_time: float, metrics: Dict) -> Dict:
+        """Construye la fila de resultados de una repetición exitosa"""
+        return {
+            'experiment': experiment_name,
+            'scenario': scenario_name,
+            'repetition': rep,
+            'seed': seed,
+            'protocol': scenario.get('protocol'),
+            'nodes': scenario.get('nodes'),
+            'area': scenario.get('area'),
+            'duration': scenario.get('duration'),
+            'mobility': scenario.get('mobility'),
+            'speed': scenario.get('speed'),
+            'execution_time': execution_time,
+            'timestamp': datetime.now().isoformat(),
+            **metrics
+        }
+    
+    def _should_batch(self, scenario: Dict, repetitions: int) -> bool:
+        """Indica si las repeticiones del escenario se ejecutan en un único proceso"""
+        max_nodes = self.config['experiment'].get('batch_max_nodes', SIMULATION_BATCH_MAX_NODES)
+        nodes = scenario.get('nodes')
+        return repetitions > 1 and max_nodes > 0 and nodes is not None and nodes <= max_nodes
+    
+    def _run_batched_scenario(self, experiment_name: str, scenario: Dict,
+                              scenario_name: str, repetitions: int) -> bool:
+        """
+        Ejecuta todas las repeticiones de un escenario en un único proceso NS-3
+        
+        El pipeline de agentes se ejecuta una vez y se detiene antes del
+        simulador, de modo que el script validado (antes de cualquier
+        reescritura del optimizador) se lanza una sola vez por semilla.
+        
+        Returns:
+            True si el lote se ejecutó (aunque fallen semillas individuales)
+        """
+        task = self._generate_task(scenario)
+        base_seed = scenario.get('base_seed', 12345)
+        seeds = [base_seed + rep for rep in range(1, repetitions + 1)]
+        
+        print(f"\n📦 Ejecución por lotes: {repetitions} semillas en un único proceso")
+        
+        try:
+            result = self.supervisor.run_experiment(
+                task=task,
+                max_iterations=self.config['experiment'].get('max_iterations', 5),
+                capture_profile=self._capture_profile(scenario),
+                seed=seeds[0],
+                scenario=scenario,
+                stop_before=["simulator"]
+            )
+            code = result.get('code_snippet') if result else None
+            if not code or not result.get('code_validated'):
+                return False
+            if result.get('code_source') != 'template' and not result.get('critic_approved'):
+                return False
+            
+            batch_results = run_simulation_batch(code, seeds)
+        except Exception as e:
+            print(f"❌ Error en lote: {e}")
+            log_message("ExperimentRunner", f"Error en lote de {scenario_name}: {e}", level="WARNING")
+            return False
+        
+        if not batch_results:
+            return False
+        
+        for seed_result in batch_results:
+            seed = seed_result['seed']
+            rep = seeds.index(seed) + 1
+            metrics = {}
+            if seed_result['status'] == 'completed':
+                metrics = calculate_kpis(parse_flowmonitor_xml(seed_result['simulation_logs']))
+            
+            if metrics:
+                result_entry = self._build_result_entry(
+                    experiment_name, scenario, scenario_name, rep, seed,
+                    seed_result['execution_time'], metrics
+                )
+                result_entry['batched'] = True
+                print(f"✅ Semilla {seed} - PDR: {metrics.get('avg_pdr', 0):.2f}%")
+            else:
+                result_entry = {
+                    'experiment': experiment_name,
+                    'scenario': scenario_name,
+                    'repetition': rep,
+                    'seed': seed,
+                    'status': 'failed',
+                    'error': seed_result.get('error'),
+                    'execution_time': seed_result['execution_time'],
+                    'timestamp': datetime.now().isoformat(),
+                    'batched': True
+                }
+                print(f"⚠️  Semilla {seed} falló o sin métricas")
+            
+            self.results.append(result_entry)
+        
+        return True
+    
+    def _apply_artifact_retention(self):
+        """Elimina PCAPs/XML antiguos conservando las tablas derivadas"""
+        retention_days = self.config['experiment'].get('artifact_retention_days', ARTIFACT_RETENTION_DAYS)
+        if not retention_days or retention_days <= 0:
+            return
+        
+        stats = apply_retention_policy(retention_days)
+        if stats['removed_files']:
+            print(f"🧹 Retención ({retention_days} días): {stats['removed_files']} artefactos eliminados, "
+                  f"{stats['bytes_freed'] / 1e6:.1f} MB liberados")
+            log_message("ExperimentRunner", f"Retención de artefactos: {stats['removed_files']} archivos eliminados")
     
     def _save_results(self):
         """Guarda los resultados en CSV y JSON"""
@@ -212,6 +345,30 @@ class ExperimentRunner:
         with open(json_file, 'w', encoding='utf-8') as f:
             json.dump(self.results, f, indent=2, ensure_ascii=False)
     
+    def _save_llm_usage(self, experiment_name: str) -> Dict:
+        """
+        Agrega las llamadas LLM de la campaña (total y por escenario) en llm_usage.json
+        
+        Returns:
+            Resumen de la campaña con el desglose 'by_scenario'
+        """
+        calls = get_llm_calls(campaign=experiment_name)
+        usage = summarize_llm_calls(calls)
+        usage['by_scenario'] = {}
+        for scenario_name in dict.fromkeys(call['scenario'] for call in calls):
+            scenario_calls = [call for call in calls if call['scenario'] == scenario_name]
+            usage['by_scenario'][scenario_name or 'sin escenario'] = summarize_llm_calls(scenario_calls)['total']
+        
+        usage_file = self.results_dir / "llm_usage.json"
+        with open(usage_file, 'w', encoding='utf-8') as f:
+            json.dump(usage, f, indent=2, ensure_ascii=False)
+        
+        total = usage['total']
+        print(f"🧠 LLM: {total['calls']} llamadas ({total['hit_rate']:.0%} desde caché), "
+              f"{total['prompt_tokens'] + total['completion_tokens']} tokens, "
+              f"{total['latency_seconds']:.0f}s de inferencia")
+        return usage
+    
     def _generate_analysis(self):
         """Genera análisis estadístico de los resultados"""
         print("\n📊 Generando análisis estadístico...")
@@ -303,8 +460,35 @@ class ExperimentRunner:
             f.write(f"- **Mayor throughput:** {best_throughput['scenario']} ")
             f.write(f"({best_throughput['protocol']}) con {best_throughput['throughput_mean']:.2f} Mbps ")
             f.write(f"± {best_throughput['throughput_std']:.2f} Mbps\n")
+            
+            if self.llm_usage and self.llm_usage['total']['calls'] > 0:
+                self._write_llm_usage_section(f, self.llm_usage)
         
         print(f"✅ Reporte Markdown generado: {report_file}")
+    
+    def _write_llm_usage_section(self, f, usage: Dict):
+        """Escribe la sección de coste y latencia LLM del reporte"""
+        total = usage['total']
+        f.write("\n## Coste y Latencia LLM\n\n")
+        f.write(f"- **Llamadas:** {total['calls']} ({total['hit_rate']:.0%} servidas desde caché)\n")
+        f.write(f"- **Tokens:** {total['prompt_tokens']} entrada / {total['completion_tokens']} salida\n")
+        f.write(f"- **Inferencia:** {total['latency_seconds']:.0f} s "
+                f"(media {total['avg_latency']:.1f} s, p95 {total['p95_latency']:.1f} s)\n")
+        if total['avg_ttft'] is not None:
+            f.write(f"- **Tiempo hasta el primer token:** {total['avg_ttft']:.2f} s de media\n")
+        
+        f.write("\n### Por Agente\n\n")
+        f.write(pd.DataFrame([
+            {'agente': name, 'llamadas': stats['calls'], 'tokens_entrada': stats['prompt_tokens'],
+             'tokens_salida': stats['completion_tokens'], 'latencia_s': round(stats['latency_seconds'], 1),
+             'aciertos_cache': stats['cache_hits']}
+            for name, stats in usage['by_agent'].items()
+        ]).to_markdown(index=False))
+        
+        f.write("\n\n### Coste Proyectado con APIs Comerciales\n\n")
+        f.write("Tokens reales de la campaña con las tarifas de COST_ESTIMATION.md:\n\n")
+        for provider, cost in usage['projected_cost'].items():
+            f.write(f"- **{provider}:** ${cost:.4f}\n")
 
 
 def main():
@@ -148,6 +148,8 @@ fi
 
 log "Descargando modelo Llama 3.1 (8B)..."
 ollama pull llama3.1:8b || error "Fallo descargando modelo"
+log "Descargando modelo rápido Llama 3.2 (3B)..."
+ollama pull llama3.2:3b || error "Fallo descargando modelo"
 success "IA configurada"
 
 # 6. Configuración Final
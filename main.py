@@ -69,6 +69,14 @@ Para más información, consulta: docs/03-USO-BASICO.md
         help='ID de thread para continuar experimento previo'
     )
     
+    parser.add_argument(
+        '--capture-profile',
+        type=str,
+        choices=['full', 'headers', 'routing', 'none'],
+        default=None,
+        help='Perfil de captura PCAP (default: PCAP_CAPTURE_PROFILE o full)'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -114,7 +122,8 @@ Para más información, consulta: docs/03-USO-BASICO.md
         result = supervisor.run_experiment(
             task=args.task,
             thread_id=args.thread_id,
-            max_iterations=args.max_iterations
+            max_iterations=args.max_iterations,
+            capture_profile=args.capture_profile
         )
         
         if result:
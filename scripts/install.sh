@@ -167,6 +167,10 @@ print_info "  Descargando deepseek-coder-v2:16b..."
 ollama pull deepseek-coder-v2:16b
 print_success "  deepseek-coder-v2:16b descargado"
 
+print_info "  Descargando llama3.2:3b (modelo rápido para llamadas simples)..."
+ollama pull llama3.2:3b
+print_success "  llama3.2:3b descargado"
+
 print_info "  Descargando nomic-embed-text..."
 ollama pull nomic-embed-text
 print_success "  nomic-embed-text descargado"
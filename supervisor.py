@@ -8,7 +8,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from typing import Literal
+from typing import Dict, List, Literal
 import sqlite3
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.sqlite import SqliteSaver
@@ -16,6 +16,9 @@ from langgraph.checkpoint.sqlite import SqliteSaver
 from utils.state import AgentState
 from utils.logging_utils import update_agent_status, log_message
 from utils.errors import A2AError
+from utils.llm_cache import get_llm_cache_stats
+from utils.model_router import get_tier_stats
+from utils.llm_metrics import get_llm_calls, set_llm_context, summarize_llm_calls
 from agents import (
     research_node,
     coder_node,
@@ -83,6 +86,7 @@ class SupervisorOrchestrator:
             self._should_retry_code,
             {
                 "critic": "critic",
+                "simulator": "simulator",
                 "retry": "coder",
                 "end": END
             }
@@ -134,7 +138,7 @@ class SupervisorOrchestrator:
         # GitHub Manager → Fin
         self.workflow.add_edge("github_manager", END)
     
-    def _should_retry_code(self, state: AgentState) -> Literal["critic", "retry", "end"]:
+    def _should_retry_code(self, state: AgentState) -> Literal["critic", "simulator", "retry", "end"]:
         """
         Decide si reintentar generación de código (validación sintáctica)
         
@@ -152,6 +156,9 @@ class SupervisorOrchestrator:
         
         # Si código validado (sintácticamente)
         if state.get('code_validated', False):
+            # Las plantillas de escenarios estándar ya están verificadas: sin crítico
+            if state.get('code_source') == 'template':
+                return "simulator"
             return "critic"
         
         # Si se excedió límite
@@ -241,7 +248,9 @@ class SupervisorOrchestrator:
             log_message("Supervisor", "Rendimiento aceptable o límite alcanzado. Pasando a visualización.")
             return "visualizer"
     
-    def run_experiment(self, task: str, thread_id: str = None, max_iterations: int = 5):
+    def run_experiment(self, task: str, thread_id: str = None, max_iterations: int = 5,
+                       capture_profile: str = None, seed: int = None, scenario: Dict = None,
+                       stop_before: List[str] = None):
         """
         Ejecuta un experimento completo
         
@@ -249,6 +258,11 @@ class SupervisorOrchestrator:
             task: Descripción de la tarea de investigación
             thread_id: ID del thread (para continuar experimentos)
             max_iterations: Número máximo de iteraciones
+            capture_profile: Perfil de captura PCAP (None = configuración global)
+            seed: Semilla de la simulación (None = aleatoria)
+            scenario: Parámetros del escenario; los estándar se generan desde plantilla
+            stop_before: Nodos ante los que se detiene el flujo (p. ej. ["simulator"]
+                para obtener solo el código validado)
             
         Returns:
             Estado final del experimento
@@ -267,7 +281,9 @@ class SupervisorOrchestrator:
         }
         
         # Estado inicial
-        initial_state = create_initial_state(task, max_iterations)
+        initial_state = create_initial_state(task, max_iterations, seed=seed,
+                                             capture_profile=capture_profile,
+                                             scenario=scenario)
         
         print("\n" + "="*80)
         print("🚀 INICIANDO EXPERIMENTO A2A")
@@ -279,17 +295,23 @@ class SupervisorOrchestrator:
         
         # Actualizar estado del sistema para dashboard
         set_system_status("running", task=task, iteration=0, max_iterations=max_iterations)
+        set_llm_context(run_id=thread_id, iteration=0)
         
         update_agent_status("Supervisor", "running", f"Iniciando experimento: {task}")
         log_message("Supervisor", f"Iniciando experimento. Thread ID: {thread_id}")
         
         # Ejecutar workflow
         try:
-            for event in self.app.stream(initial_state, config=config):
+            for event in self.app.stream(initial_state, config=config, interrupt_before=stop_before):
                 for node_name, node_output in event.items():
                     print(f"\n✓ Nodo completado: {node_name}")
                     log_message("Supervisor", f"Nodo completado: {node_name}")
                     
+                    # Iteración a la que se atribuyen las siguientes llamadas LLM
+                    if isinstance(node_output, dict) and 'iteration_count' in node_output:
+                        set_system_status("running", iteration=node_output['iteration_count'])
+                        set_llm_context(iteration=node_output['iteration_count'])
+                    
                     # Mostrar errores si existen
                     if 'errors' in node_output and node_output['errors']:
                         print(f"  ⚠️  Errores: {node_output['errors'][-1][:100]}...")
@@ -297,6 +319,9 @@ class SupervisorOrchestrator:
             
             # Obtener estado final
             final_state = self.app.get_state(config)
+            if final_state.next:
+                print(f"\n⏸️  Flujo detenido antes de: {', '.join(final_state.next)}")
+                log_message("Supervisor", f"Flujo detenido antes de: {', '.join(final_state.next)}")
             
             print("\n" + "="*80)
             print("🎉 EXPERIMENTO COMPLETADO")
@@ -322,6 +347,29 @@ class SupervisorOrchestrator:
             if final_state.values.get('errors'):
                 print(f"\n⚠️  Errores encontrados: {len(final_state.values['errors'])}")
             
+            llm_cache_stats = get_llm_cache_stats()
+            llm_queries = llm_cache_stats['hits'] + llm_cache_stats['misses']
+            if llm_queries > 0:
+                print(f"\n♻️  Caché LLM: {llm_cache_stats['hits']}/{llm_queries} aciertos "
+                      f"({llm_cache_stats['hit_rate']:.0%}), ~{llm_cache_stats['saved_seconds']:.0f}s de inferencia evitados")
+            
+            llm_usage = summarize_llm_calls(get_llm_calls(run_id=thread_id))
+            if llm_usage['total']['calls'] > 0:
+                print(f"\n🧠 Uso de LLM: {llm_usage['total']['calls']} llamadas, "
+                      f"{llm_usage['total']['prompt_tokens']} tokens entrada / "
+                      f"{llm_usage['total']['completion_tokens']} salida, "
+                      f"{llm_usage['total']['latency_seconds']:.0f}s de inferencia")
+                for agent_name, agent_usage in llm_usage['by_agent'].items():
+                    print(f"   {agent_name}: {agent_usage['calls']} llamadas, "
+                          f"{agent_usage['latency_seconds']:.1f}s, "
+                          f"{agent_usage['prompt_tokens'] + agent_usage['completion_tokens']} tokens")
+            
+            for tier, tier_stats in get_tier_stats().items():
+                print(f"🧭 Modelo {tier}: {tier_stats['calls']} llamadas, "
+                      f"{tier_stats['avg_latency']:.1f}s de media, "
+                      f"{tier_stats['tokens_per_second']:.1f} tokens/s, "
+                      f"{tier_stats['escalations']} escaladas")
+            
             print("\n" + "="*80)
             
             return final_state.values
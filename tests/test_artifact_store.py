@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.artifact_store import (
+    ZSTD_AVAILABLE,
+    apply_retention_policy,
+    compress_artifact,
+    compress_run_artifacts,
+    open_artifact,
+    resolve_artifact
+)
+
+
+FLOWMON_XML = b"""<?xml version="1.0" ?>
+<FlowMonitor>
+  <FlowStats>
+    <Flow flowId="1" txPackets="100" rxPackets="90" txBytes="51200" rxBytes="46080" delaySum="+900000000.0ns"/>
+  </FlowStats>
+</FlowMonitor>
+"""
+
+
+class TestArtifactStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.run_dir = Path(self.tmp.name) / "results" / "20260101_000000"
+        self.run_dir.mkdir(parents=True)
+        self.xml_file = self.run_dir / "resultados.xml"
+        self.xml_file.write_bytes(FLOWMON_XML)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_gzip_roundtrip(self):
+        """Test that a gzip-compressed artifact is read back transparently"""
+        target = compress_artifact(self.xml_file, method="gzip", level=6)
+
+        self.assertEqual(target.name, "resultados.xml.gz")
+        self.assertFalse(self.xml_file.exists())
+        self.assertEqual(resolve_artifact(self.xml_file), target)
+        with open_artifact(self.xml_file) as stream:
+            self.assertEqual(stream.read(), FLOWMON_XML)
+
+    @unittest.skipUnless(ZSTD_AVAILABLE, "zstandard no instalado")
+    def test_zstd_roundtrip(self):
+        """Test that a zstd-compressed artifact is read back transparently"""
+        target = compress_artifact(self.xml_file, method="zstd", level=3)
+
+        self.assertEqual(target.suffix, ".zst")
+        with open_artifact(self.xml_file, text=True) as stream:
+            self.assertIn('flowId="1"', stream.read())
+
+    def test_compress_run_artifacts_skips_derived_tables(self):
+        """Test that only raw artifacts are compressed"""
+        pcap_file = self.run_dir / "simulacion-0-0.pcap"
+        pcap_file.write_bytes(b"\x00" * 4096)
+        csv_file = self.run_dir / "flows.csv"
+        csv_file.write_text("flow_id,pdr\n1,90.0\n")
+
+        stats = compress_run_artifacts(self.run_dir, method="gzip")
+
+        self.assertEqual(len(stats['compressed_files']), 2)
+        self.assertLess(stats['bytes_after'], stats['bytes_before'])
+        self.assertTrue(csv_file.exists())
+        self.assertIsNotNone(resolve_artifact(pcap_file))
+
+    def test_compression_disabled(self):
+        """Test that method 'none' leaves artifacts untouched"""
+        self.assertEqual(compress_artifact(self.xml_file, method="none"), self.xml_file)
+        self.assertTrue(self.xml_file.exists())
+
+    def test_retention_keeps_derived_tables(self):
+        """Test that retention removes old raw artifacts only"""
+        compressed = compress_artifact(self.xml_file, method="gzip")
+        csv_file = self.run_dir / "flows.csv"
+        csv_file.write_text("flow_id,pdr\n1,90.0\n")
+
+        old = time.time() - 10 * 86400
+        os.utime(compressed, (old, old))
+        os.utime(csv_file, (old, old))
+
+        stats = apply_retention_policy(7, results_root=self.run_dir.parent)
+
+        self.assertEqual(stats['removed_files'], 1)
+        self.assertFalse(compressed.exists())
+        self.assertTrue(csv_file.exists())
+
+    def test_retention_disabled(self):
+        """Test that a zero retention period removes nothing"""
+        old = time.time() - 365 * 86400
+        os.utime(self.xml_file, (old, old))
+
+        stats = apply_retention_policy(0, results_root=self.run_dir.parent)
+
+        self.assertEqual(stats['removed_files'], 0)
+        self.assertTrue(self.xml_file.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.batch_simulation import build_batch_runner, load_batch_manifest
+
+
+# Sustituto mínimo de los bindings: registra la semilla y Destroy
+FAKE_NS_CORE = """
+class RngSeedManager:
+    seed = None
+
+    @staticmethod
+    def SetSeed(seed):
+        RngSeedManager.seed = seed
+
+
+class Simulator:
+    destroyed = 0
+
+    @staticmethod
+    def Destroy():
+        Simulator.destroyed += 1
+"""
+
+# Igual que las plantillas del Coder: la semilla llega en SIMULATION_SEED
+SCRIPT = """
+import sys
+import ns.core
+
+SIMULATION_SEED = 1
+
+def main():
+    ns.core.RngSeedManager.SetSeed(SIMULATION_SEED)
+    seed = ns.core.RngSeedManager.seed
+    if seed == 3:
+        raise RuntimeError("fallo simulado")
+    with open("resultados.xml", "w") as f:
+        f.write(f"<FlowMonitor seed='{seed}'/>")
+    with open("simulacion-0-0.pcap", "w") as f:
+        f.write(str(seed))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+"""
+
+
+class TestBatchSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "ns").mkdir()
+        (self.root / "ns" / "__init__.py").write_text("")
+        (self.root / "ns" / "core.py").write_text(FAKE_NS_CORE)
+        self.script = self.root / "sim.py"
+        self.script.write_text(SCRIPT)
+        self.output_dir = self.root / "batch"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, seeds):
+        runner = self.root / "runner.py"
+        runner.write_text(build_batch_runner(self.script, seeds, self.output_dir))
+        env = dict(os.environ, PYTHONPATH=str(self.root))
+        return subprocess.run(
+            [sys.executable, str(runner)],
+            cwd=str(self.root), env=env, capture_output=True, text=True, timeout=60
+        )
+
+    def test_outputs_separated_per_seed(self):
+        """Test that each seed gets its own FlowMonitor and PCAP output"""
+        result = self._run([1, 2])
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        manifest = load_batch_manifest(self.output_dir)
+        self.assertEqual([e['seed'] for e in manifest], [1, 2])
+        self.assertTrue(all(e['status'] == 'completed' for e in manifest))
+
+        for seed in (1, 2):
+            seed_dir = self.output_dir / f"seed_{seed}"
+            self.assertIn(f"seed='{seed}'", (seed_dir / "resultados.xml").read_text())
+            self.assertTrue((seed_dir / "simulacion-0-0.pcap").exists())
+        self.assertFalse((self.root / "resultados.xml").exists())
+
+    def test_same_seeding_as_single_run(self):
+        """Test that a batched seed sees the same RNG seed as a standalone run of the script"""
+        env = dict(os.environ, PYTHONPATH=str(self.root))
+        standalone = self.root / "standalone.py"
+        standalone.write_text(SCRIPT.replace("SIMULATION_SEED = 1", "SIMULATION_SEED = 7"))
+        subprocess.run([sys.executable, str(standalone)], cwd=str(self.root), env=env,
+                       check=True, timeout=60)
+        expected = (self.root / "resultados.xml").read_text()
+        (self.root / "resultados.xml").unlink()
+
+        result = self._run([7])
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual((self.output_dir / "seed_7" / "resultados.xml").read_text(), expected)
+
+    def test_failed_seed_does_not_stop_batch(self):
+        """Test that a failing seed is recorded and later seeds still run"""
+        result = self._run([3, 4])
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        manifest = load_batch_manifest(self.output_dir)
+        self.assertEqual(manifest[0]['status'], 'failed')
+        self.assertIn('fallo simulado', manifest[0]['error'])
+        self.assertEqual(manifest[1]['status'], 'completed')
+
+    def test_missing_manifest(self):
+        """Test that a batch that never ran yields no entries"""
+        self.assertEqual(load_batch_manifest(self.output_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
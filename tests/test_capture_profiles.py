@@ -0,0 +1,119 @@
+import unittest
+import sys
+import ast
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.capture_profiles import (
+    apply_capture_profile,
+    detect_capture_profile,
+    get_capture_profile
+)
+
+
+SCRIPT = """
+import ns.core
+import ns.network
+
+def main():
+    phy = ns.wifi.YansWifiPhyHelper()
+    # 10. HABILITAR CAPTURA PCAP
+    phy.EnablePcapAll("simulacion", True)
+    ns.core.Simulator.Run()
+"""
+
+
+class TestCaptureProfiles(unittest.TestCase):
+
+    def test_full_profile_keeps_script(self):
+        """Test that the default profile leaves the script untouched"""
+        self.assertEqual(apply_capture_profile(SCRIPT, 'full'), SCRIPT)
+        self.assertEqual(apply_capture_profile(SCRIPT, None), SCRIPT)
+        self.assertEqual(detect_capture_profile(SCRIPT), 'full')
+
+    def test_headers_profile_sets_snaplen(self):
+        """Test header-only capture on every node"""
+        code = apply_capture_profile(SCRIPT, 'headers')
+
+        self.assertIn('ns3::PcapFileWrapper::CaptureSize', code)
+        self.assertIn('UintegerValue(128)', code)
+        self.assertIn('phy.EnablePcapAll("simulacion", True)', code)
+        self.assertEqual(detect_capture_profile(code), 'headers')
+        ast.parse(code)
+
+    def test_routing_profile_captures_node_subset(self):
+        """Test per-node capture with the original indentation"""
+        code = apply_capture_profile(SCRIPT, 'routing')
+
+        self.assertNotIn('EnablePcapAll', code)
+        self.assertIn('    for capture_node_id in range(', code)
+        self.assertIn('        phy.EnablePcap("simulacion", ns.network.NodeContainer(', code)
+        ast.parse(code)
+
+    def test_none_profile_disables_capture(self):
+        """Test that capture can be disabled entirely"""
+        code = apply_capture_profile(SCRIPT, 'none')
+
+        self.assertNotIn('EnablePcap', code)
+        self.assertEqual(detect_capture_profile(code), 'none')
+        ast.parse(code)
+
+    def test_none_profile_keeps_blocks_valid(self):
+        """Test that removing a capture call that is the only statement of a block keeps valid syntax"""
+        script = SCRIPT.replace(
+            '    phy.EnablePcapAll("simulacion", True)\n',
+            '    if capture:\n        phy.EnablePcapAll("simulacion", True)\n'
+        )
+        code = apply_capture_profile(script, 'none')
+
+        self.assertNotIn('EnablePcap', code)
+        self.assertIn('        pass', code)
+        ast.parse(code)
+
+    def test_trailing_comment_and_multiline_calls(self):
+        """Test that calls with a trailing comment or arguments over several lines are rewritten"""
+        commented = SCRIPT.replace('phy.EnablePcapAll("simulacion", True)',
+                                   'phy.EnablePcapAll("simulacion", True)  # captura (todos)')
+        multiline = SCRIPT.replace('phy.EnablePcapAll("simulacion", True)',
+                                   'phy.EnablePcapAll(\n        "simulacion",\n        True,\n    )')
+
+        for script in (commented, multiline):
+            self.assertEqual(detect_capture_profile(script), 'full')
+            for profile in ('headers', 'routing', 'none'):
+                code = apply_capture_profile(script, profile)
+                self.assertEqual(detect_capture_profile(code), profile)
+                self.assertNotIn('# captura (todos)', code)
+                self.assertEqual(code.count('EnablePcapAll'), 1 if profile == 'headers' else 0)
+                ast.parse(code)
+
+    def test_invalid_script_uses_line_pattern(self):
+        """Test that scripts that do not parse are still rewritten line by line"""
+        broken = SCRIPT.replace('ns.core.Simulator.Run()', 'ns.core.Simulator.Run(') \
+            .replace('phy.EnablePcapAll("simulacion", True)', 'phy.EnablePcapAll("simulacion", True)  # captura')
+
+        code = apply_capture_profile(broken, 'none')
+        self.assertNotIn('EnablePcap', code)
+        self.assertEqual(detect_capture_profile(code), 'none')
+
+    def test_profile_applied_once(self):
+        """Test that re-applying a profile does not duplicate the block"""
+        once = apply_capture_profile(SCRIPT, 'headers')
+        self.assertEqual(apply_capture_profile(once, 'headers'), once)
+
+    def test_unknown_profile(self):
+        """Test error on unknown profile names"""
+        with self.assertRaises(ValueError):
+            get_capture_profile('everything')
+
+    def test_reduced_profiles_restrict_analyses(self):
+        """Test that node-subset captures skip flow-level analyses"""
+        routing = get_capture_profile('routing')
+        self.assertIn('routing', routing['analyses'])
+        self.assertNotIn('conversations', routing['analyses'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.code_rules import (
+    VERDICT_AMBIGUOUS,
+    VERDICT_APPROVED,
+    VERDICT_REJECTED,
+    check_code_rules,
+    parse_task_requirements
+)
+
+
+SCRIPT = '''
+import ns.core
+import ns.network
+import ns.aodv
+import ns.mobility
+import ns.flow_monitor
+
+def main():
+    num_nodes = 20
+    nodes = ns.network.NodeContainer()
+    nodes.Create(num_nodes)
+    mobility = ns.mobility.MobilityHelper()
+    mobility.SetMobilityModel("ns3::RandomWaypointMobilityModel")
+    aodv = ns.aodv.AodvHelper()
+    phy.EnablePcapAll("simulacion", True)
+    flowmon_helper = ns.flow_monitor.FlowMonitorHelper()
+    monitor = flowmon_helper.InstallAll()
+    return 0
+
+if __name__ == "__main__":
+    main()
+'''
+
+TASK = "Simular AODV con 20 nodos y movilidad Random Waypoint"
+
+
+class TestCodeRules(unittest.TestCase):
+
+    def test_task_requirements_parsed(self):
+        """Test that protocol, node count and mobility are read from the task"""
+        requirements = parse_task_requirements(TASK)
+
+        self.assertEqual(requirements.protocols, ['AODV'])
+        self.assertEqual(requirements.num_nodes, 20)
+        self.assertEqual(requirements.mobility, 'RandomWaypoint')
+
+    def test_matching_script_approved(self):
+        """Test that a script meeting every requirement is approved without the LLM"""
+        report = check_code_rules(TASK, SCRIPT)
+        self.assertEqual(report.verdict, VERDICT_APPROVED)
+
+    def test_wrong_protocol_and_nodes_rejected(self):
+        """Test that protocol and node count mismatches are reported"""
+        report = check_code_rules("Simular OLSR con 50 nodos", SCRIPT)
+
+        self.assertEqual(report.verdict, VERDICT_REJECTED)
+        self.assertEqual({check.name for check in report.failures}, {'protocolo', 'nodos'})
+        self.assertIn("OlsrHelper", report.critique)
+
+    def test_missing_metrics_and_pcap_rejected(self):
+        """Test that FlowMonitor and PCAP are required when capture is enabled"""
+        code = SCRIPT.replace('phy.EnablePcapAll("simulacion", True)', 'pass')
+        code = code.replace('flowmon_helper = ns.flow_monitor.FlowMonitorHelper()', 'pass')
+        code = code.replace('monitor = flowmon_helper.InstallAll()', 'pass')
+
+        report = check_code_rules(TASK, code)
+        self.assertEqual({check.name for check in report.failures}, {'flowmonitor', 'pcap'})
+
+        no_capture = check_code_rules(TASK, SCRIPT.replace('phy.EnablePcapAll("simulacion", True)', 'pass'),
+                                      capture_enabled=False)
+        self.assertEqual(no_capture.verdict, VERDICT_APPROVED)
+
+    def test_undecidable_cases_go_to_llm(self):
+        """Test that unknown protocol, unresolved node count or non-NS-3 code are ambiguous"""
+        self.assertEqual(check_code_rules("Comparar AODV y OLSR", SCRIPT).verdict, VERDICT_AMBIGUOUS)
+        self.assertEqual(
+            check_code_rules(TASK, SCRIPT.replace("nodes.Create(num_nodes)", "nodes.Create(args.nodes)")).verdict,
+            VERDICT_AMBIGUOUS
+        )
+        self.assertEqual(check_code_rules(TASK, "print('valid code')").verdict, VERDICT_AMBIGUOUS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Mock dependencies
+sys.modules.setdefault("chromadb", MagicMock())
+sys.modules.setdefault("chromadb.config", MagicMock())
+sys.modules.setdefault("agents.ns3_ai_integration", MagicMock())
+
+# Import coder module
+import importlib.util
+spec = importlib.util.spec_from_file_location("coder_routing_under_test", PROJECT_ROOT / "agents/coder.py")
+coder_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(coder_module)
+
+from utils.state import create_initial_state
+
+
+class TestCoderRouting(unittest.TestCase):
+
+    def setUp(self):
+        self.llms = {}
+
+        def routed_llm(call_type, model, temperature, agent=None, escalate=False):
+            llm = MagicMock()
+            llm.model_name = model
+            llm.invoke.return_value.content = "```python\nimport ns.core\nprint('ok')\n```"
+            self.llms[call_type] = (llm, escalate)
+            return llm
+
+        patchers = [
+            patch.object(coder_module, 'get_routed_llm', side_effect=routed_llm),
+            patch.object(coder_module, 'get_memory'),
+            patch.object(coder_module, 'validate_code', return_value=(True, "ok")),
+            patch.object(coder_module, 'save_code', return_value="simulations/scripts/sim.py"),
+            patch.object(coder_module, 'update_agent_status'),
+            patch.object(coder_module, 'log_message'),
+            patch.object(coder_module, 'CODER_STREAMING', False),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        coder_module.get_memory.return_value.retrieve_experience.return_value = []
+
+    def _run(self, iteration_count):
+        state = create_initial_state("Simular AODV con 20 nodos", seed=1)
+        state['errors'] = ["SimulationError: PDR nulo"]
+        state['error_type'] = "SimulationError"
+        state['iteration_count'] = iteration_count
+        return coder_module.coder_node(state)
+
+    def test_plan_escalates_after_repeated_failures(self):
+        """Test that coder_node escalates the plan once iteration_count reaches the threshold"""
+        result = self._run(coder_module.MODEL_ESCALATION_FAILURES)
+
+        self.assertTrue(self.llms['coder.plan'][1])
+        self.assertFalse(self.llms['coder.code'][1])
+        self.assertEqual(result['iteration_count'], coder_module.MODEL_ESCALATION_FAILURES + 1)
+        self.assertEqual(result['audit_trail'][-1]['details']['iteration'], coder_module.MODEL_ESCALATION_FAILURES)
+
+        code_prompt = self.llms['coder.code'][0].invoke.call_args[0][0]
+        self.assertIn(f"intento #{coder_module.MODEL_ESCALATION_FAILURES + 1}", code_prompt)
+
+    def test_plan_stays_fast_before_threshold(self):
+        """Test that earlier failed iterations keep the plan on the fast tier"""
+        self._run(coder_module.MODEL_ESCALATION_FAILURES - 1)
+        self.assertFalse(self.llms['coder.plan'][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,7 +26,7 @@ spec.loader.exec_module(critic_module)
 
 class TestCriticAgent(unittest.TestCase):
     
-    @patch('agents.critic.ChatOllama')
+    @patch('agents.critic.get_routed_llm')
     def test_critic_approval(self, mock_llm):
         """Test critic approving valid code"""
         # Mock LLM response
@@ -46,7 +46,7 @@ class TestCriticAgent(unittest.TestCase):
         self.assertEqual(result['critique'], "Code looks good")
         self.assertIn('approved', result['audit_trail'][-1]['action'])
 
-    @patch('agents.critic.ChatOllama')
+    @patch('agents.critic.get_routed_llm')
     def test_critic_rejection(self, mock_llm):
         """Test critic rejecting invalid logic"""
         # Mock LLM response
@@ -66,7 +66,7 @@ class TestCriticAgent(unittest.TestCase):
         self.assertEqual(result['critique'], "Logic error: wrong protocol")
         self.assertIn('rejected', result['audit_trail'][-1]['action'])
 
-    @patch('agents.critic.ChatOllama')
+    @patch('agents.critic.get_routed_llm')
     def test_critic_fallback_parsing(self, mock_llm):
         """Test critic parsing non-JSON response"""
         # Mock LLM response (plain text)
@@ -85,5 +85,48 @@ class TestCriticAgent(unittest.TestCase):
         self.assertTrue(result['critic_approved'])
         self.assertIn("Aprobado", result['critique'])
 
+    @patch('agents.critic.get_routed_llm')
+    def test_ambiguous_review_escalates(self, mock_llm):
+        """Test that a non-JSON review is repeated with the large model"""
+        fast = MagicMock(tier="fast")
+        fast.invoke.return_value.content = "The code is Approved. It looks correct."
+        large = MagicMock(tier="large")
+        large.invoke.return_value.content = '{"approved": false, "critique": "Missing mobility model"}'
+        mock_llm.side_effect = [fast, large]
+        
+        state = {
+            "task": "Test Task",
+            "code_snippet": "print('valid code')",
+            "iteration": 0,
+            "audit_trail": []
+        }
+        
+        result = critic_module.critic_node(state)
+        
+        self.assertTrue(mock_llm.call_args_list[1].kwargs['escalate'])
+        self.assertFalse(result['critic_approved'])
+        self.assertEqual(result['critique'], "Missing mobility model")
+
+    @patch('utils.model_router.get_llm')
+    @patch('utils.model_router._routing_settings', return_value=(False, "llama3.2:3b"))
+    def test_ambiguous_review_without_routing(self, mock_settings, mock_get_llm):
+        """Test that an ambiguous review is not repeated when routing is disabled"""
+        # Sin enrutado el primer cliente ya es el modelo grande
+        mock_get_llm.return_value.invoke.return_value.content = "The code is Approved. It looks correct."
+        
+        state = {
+            "task": "Test Task",
+            "code_snippet": "print('valid code')",
+            "iteration": 0,
+            "audit_trail": []
+        }
+        
+        result = critic_module.critic_node(state)
+        
+        self.assertEqual(mock_get_llm.call_count, 1)
+        self.assertEqual(mock_get_llm.return_value.invoke.call_count, 1)
+        self.assertTrue(result['critic_approved'])
+        self.assertFalse(result['audit_trail'][-1]['details']['escalated'])
+
 if __name__ == '__main__':
     unittest.main()
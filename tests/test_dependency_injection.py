@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.dependency_injection import DIContainer, Environment, parse_keep_alive, pooled_client_kwargs
+
+
+def fake_client(config, model, temperature=None, **options):
+    """Sustituye a ChatOllama: cada llamada crea un objeto distinto"""
+    return object()
+
+
+class TestLLMRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.container = DIContainer(Environment.TESTING)
+        patcher = patch('utils.dependency_injection.create_llm_client', side_effect=fake_client)
+        self.factory = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_clients_built_lazily(self):
+        """Test that no LLM client is constructed until requested"""
+        self.assertEqual(len(self.container._llm_clients), 0)
+
+    def test_same_configuration_reuses_client(self):
+        """Test that repeated requests share one client and its connection pool"""
+        first = self.container.get_llm("llama3.1:8b", 0.1)
+        second = self.container.get_llm("llama3.1:8b", 0.1)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.factory.call_count, 1)
+
+    def test_distinct_configurations(self):
+        """Test that model, temperature and options are part of the key"""
+        base = self.container.get_llm("llama3.1:8b", 0.1)
+
+        self.assertIsNot(base, self.container.get_llm("llama3.1:8b", 0.3))
+        self.assertIsNot(base, self.container.get_llm("qwen2.5-coder:7b", 0.1))
+        self.assertIsNot(base, self.container.get_llm("llama3.1:8b", 0.1, num_predict=256))
+        self.assertEqual(self.factory.call_count, 4)
+
+    def test_pool_limits(self):
+        """Test that clients are configured with the pooled HTTP limits and the request timeout"""
+        config = self.container.config_provider.get_ollama_config()
+        client_kwargs = pooled_client_kwargs(config)
+        limits = client_kwargs['limits']
+
+        self.assertEqual(limits.max_connections, config.max_connections)
+        self.assertEqual(limits.keepalive_expiry, config.keepalive_expiry)
+        self.assertEqual(client_kwargs['timeout'], config.timeout)
+
+    def test_keep_alive_parsing(self):
+        """Test that keep_alive accepts durations and seconds"""
+        self.assertEqual(parse_keep_alive("30m"), "30m")
+        self.assertEqual(parse_keep_alive("-1"), -1)
+        self.assertIsNone(parse_keep_alive(""))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.cache import PersistentCache
+from utils.embeddings import (
+    CachedEmbeddingFunction, EmbeddingBackend, HashingBackend, create_backend
+)
+from utils.memory import EpisodicMemory
+from utils.vector_store import VectorStore
+
+
+class CountingBackend(EmbeddingBackend):
+    """Backend determinista que registra el tamaño de cada lote"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(len(texts))
+        return np.array([[len(text), text.count("a"), 1.0] for text in texts], dtype=np.float32)
+
+
+class FailingBackend(EmbeddingBackend):
+    name = "failing"
+
+    def embed(self, texts):
+        raise RuntimeError("modelo no disponible")
+
+
+class FakeClient:
+    def __init__(self):
+        self.names = []
+
+    def get_or_create_collection(self, name, embedding_function=None):
+        self.names.append(name)
+        return object()
+
+
+class TestEmbeddings(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.tmp.name) / "cache.db"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batched_inference_with_disk_cache(self):
+        """Test that texts are embedded in batches once and reused from disk by later processes"""
+        texts = ["aodv", "olsr", "aodv", "dsdv", "hwmp mesh"]
+        backend = CountingBackend()
+        function = CachedEmbeddingFunction(backend, PersistentCache(self.cache_path, "embeddings"), batch_size=2)
+
+        vectors = function.embed(texts)
+        self.assertEqual(vectors.shape, (5, 3))
+        self.assertEqual(backend.batches, [2, 2])
+        np.testing.assert_array_equal(vectors[0], vectors[2])
+
+        stats = function.get_stats()
+        self.assertEqual(stats['documents_embedded'], 4)
+        self.assertGreater(stats['docs_per_second'], 0)
+
+        # Otro proceso con el mismo caché no vuelve a ejecutar el modelo
+        other_backend = CountingBackend()
+        other = CachedEmbeddingFunction(other_backend, PersistentCache(self.cache_path, "embeddings"))
+        self.assertEqual(other(texts), vectors.tolist())
+        self.assertEqual(other_backend.batches, [])
+        self.assertEqual(other.get_stats()['cache_hits'], 4)
+
+    def test_non_default_model_uses_own_collections(self):
+        """Test that backends are pluggable and a different model gets suffixed collections"""
+        function = CachedEmbeddingFunction(create_backend("hashing"))
+        self.assertEqual(function.collection_suffix, "_hashing_512")
+        self.assertEqual(CachedEmbeddingFunction(create_backend("chroma")).collection_suffix, "")
+        with self.assertRaises(ValueError):
+            create_backend("desconocido")
+
+        client = FakeClient()
+        VectorStore(client=client, embedding_function=function).collection("thesis_papers")
+        self.assertEqual(client.names, ["thesis_papers_hashing_512"])
+
+    def test_episodic_memory_semantic_search(self):
+        """Test that episodic memory retrieves by embeddings and falls back to TF-IDF on failure"""
+        db_path = str(Path(self.tmp.name) / "memory.db")
+        memory = EpisodicMemory(db_path, embedder=CachedEmbeddingFunction(HashingBackend()))
+        memory.add_experience("AODV 20 nodos", "c", "AttributeError: module ns has no attribute core", "s1")
+        memory.add_experience("OLSR 30 nodos", "c", "ModuleNotFoundError: No module named ns.olsr", "s2")
+        memory.add_experience("DSDV 50 nodos", "c", "Simulator Run no termina en DSDV", "s3")
+
+        results = memory.retrieve_experience("OLSR 40 nodos", "No module named ns.olsr")
+        self.assertEqual(results[0]['solution'], "s2")
+        self.assertNotIn('signature', results[0])
+        self.assertEqual(memory.get_stats()['embedding_model'], "hashing:512")
+        self.assertEqual(len(memory._vector_ids), 3)
+
+        failing = EpisodicMemory(db_path, embedder=CachedEmbeddingFunction(FailingBackend()))
+        results = failing.retrieve_experience("OLSR 40 nodos", "No module named ns.olsr")
+        self.assertEqual(results[0]['solution'], "s2")
+        self.assertIsNone(failing.embedder)
+
+
+if __name__ == '__main__':
+    unittest.main()
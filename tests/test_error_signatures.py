@@ -0,0 +1,124 @@
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.error_signatures import error_signature
+from utils.memory import EpisodicMemory
+
+
+TRACEBACK = '''Traceback (most recent call last):
+  File "/tmp/simulations/tesis_sim_20250101_101010.py", line 42, in <module>
+    routing = ns.aodv.AodvHelperX()
+AttributeError: module 'ns.aodv' has no attribute 'AodvHelperX'
+'''
+
+
+# Error tal como lo reporta el simulador: prefijo + stderr con varios frames
+SIMULATOR_ERROR = "Error de ejecución (código 1): " + """Traceback (most recent call last):
+  File "/home/tesis/simulations/scripts/tesis_sim_20250101_101010.py", line 212, in <module>
+    sys.exit(main())
+             ^^^^^^
+  File "/home/tesis/simulations/scripts/tesis_sim_20250101_101010.py", line 187, in main
+    routing = configure_routing(nodes, wifi_devices, "AODV", hello_interval=1.0)
+              ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+  File "/home/tesis/simulations/scripts/tesis_sim_20250101_101010.py", line 96, in configure_routing
+    helper = build_routing_helper(protocol, hello_interval)
+             ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+  File "/home/tesis/simulations/scripts/tesis_sim_20250101_101010.py", line 71, in build_routing_helper
+    helper = ns.aodv.AodvHelperX()
+             ^^^^^^^^^^^^^^^^^^^
+AttributeError: module 'ns.aodv' has no attribute 'AodvHelperX'
+"""
+
+
+class TestErrorSignature(unittest.TestCase):
+
+    def test_tracebacks_differing_in_paths_and_lines_match(self):
+        """Test that line numbers and paths do not change the signature"""
+        other = TRACEBACK.replace("line 42", "line 97").replace("20250101_101010", "20250202_090000")
+
+        signature = error_signature(TRACEBACK)
+        self.assertEqual(signature.exception, "AttributeError")
+        self.assertEqual(signature.symbol, "ns.aodv.AodvHelperX")
+        self.assertEqual(signature.key, error_signature(other).key)
+
+    def test_prefixed_messages_and_frame_fallback(self):
+        """Test exception extraction after a prefix and the last frame as symbol"""
+        signature = error_signature("Error en simulación: NameError: name 'phy' is not defined")
+        self.assertEqual((signature.exception, signature.symbol), ("NameError", "phy"))
+
+        signature = error_signature(
+            'Traceback (most recent call last):\n'
+            '  File "sim.py", line 3, in run_simulation\n'
+            'ZeroDivisionError: division by zero'
+        )
+        self.assertEqual((signature.exception, signature.symbol), ("ZeroDivisionError", "run_simulation"))
+        self.assertIsNone(error_signature(""))
+
+    def test_only_named_symbols_are_specific(self):
+        """Test that concrete-symbol failures are specific and generic ones are not"""
+        self.assertTrue(error_signature(TRACEBACK).is_specific)
+        self.assertTrue(error_signature("NameError: name 'phy' is not defined").is_specific)
+        self.assertFalse(error_signature("TimeoutError: simulación excedió 300s").is_specific)
+        self.assertFalse(error_signature("Segmentation fault (core dumped)").is_specific)
+
+
+class TestSignatureLookup(unittest.TestCase):
+
+    def test_known_failure_resolves_by_signature(self):
+        """Test that a known signature returns the most confirmed solution before fuzzy search"""
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = EpisodicMemory(str(Path(tmp) / "memory.db"))
+            memory.add_experience("AODV 20 nodos", "c", TRACEBACK, "fix-a")
+            memory.add_experience("AODV 20 nodos", "c", "  " + TRACEBACK.replace("<module>", "main"), "fix-b")
+            memory.add_experience("AODV 20 nodos", "c", TRACEBACK.replace("line 42", "line 50"), "fix-c")
+
+            results = memory.retrieve_experience("OLSR 10 nodos", TRACEBACK.replace("line 42", "line 7"))
+
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0]['solution'], "fix-c")
+            self.assertEqual(results[0]['relevance'], 1.0)
+            self.assertIn("AodvHelperX", results[0]['signature'])
+            self.assertEqual(memory.get_stats()['error_signatures'], 1)
+
+            unknown = memory.retrieve_experience("AODV 20 nodos", "TypeError: bad operand")
+            self.assertTrue(all('signature' not in exp for exp in unknown))
+
+    def test_long_simulator_traceback_resolves_by_signature(self):
+        """Test that a multi-frame traceback longer than the stored excerpt still matches its signature"""
+        self.assertGreater(len(SIMULATOR_ERROR), 500)
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = EpisodicMemory(str(Path(tmp) / "memory.db"))
+            memory.add_experience("Simular AODV con 20 nodos", "c", SIMULATOR_ERROR, "fix-aodv")
+
+            query = SIMULATOR_ERROR.replace("20250101_101010", "20250303_080000").replace("line 71", "line 74")
+            exact = memory.lookup_signature(query)
+
+            self.assertIsNotNone(exact)
+            self.assertEqual(exact['solution'], "fix-aodv")
+            self.assertIn("ns.aodv.AodvHelperX", exact['signature'])
+
+    def test_generic_signature_needs_same_task_template(self):
+        """Test that generic failures only short-circuit for the same task template"""
+        timeout = "TimeoutError: La simulación excedió 300 segundos"
+        solution = "import ns.core\n" + "# ajuste\n" * 200
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = EpisodicMemory(str(Path(tmp) / "memory.db"))
+            memory.add_experience("Simular AODV con 20 nodos", "c", timeout, solution)
+            memory.add_experience("Simular OLSR con 50 nodos", "c", "ZeroDivisionError: division by zero", "s")
+
+            same_template = memory.retrieve_experience("Simular AODV con 40 nodos", timeout)
+            self.assertIn('signature', same_template[0])
+            self.assertEqual(same_template[0]['solution'], solution)
+
+            other_task = memory.retrieve_experience("Simular OLSR con 50 nodos", timeout)
+            self.assertTrue(all('signature' not in exp for exp in other_task))
+
+
+if __name__ == '__main__':
+    unittest.main()
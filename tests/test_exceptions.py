@@ -42,15 +42,15 @@ class TestExceptions(unittest.TestCase):
         with self.assertRaises(CompilationError):
             run_ns3_simulation(Path('scratch/test.py'), 10)
 
-    @patch('agents.coder.ChatOllama')
-    def test_coder_generation_error(self, mock_ollama_cls):
+    @patch('agents.coder.get_routed_llm')
+    def test_coder_generation_error(self, mock_get_routed_llm):
         """Verify generate_code raises CodeGenerationError on LLM failure"""
         mock_llm = MagicMock()
         mock_llm.invoke.side_effect = Exception("LLM connection failed")
-        mock_ollama_cls.return_value = mock_llm
+        mock_get_routed_llm.return_value = mock_llm
         
         # We need to mock memory to avoid other errors
-        with patch('agents.coder.memory') as mock_memory:
+        with patch('agents.coder.get_memory'):
             with self.assertRaises(CodeGenerationError):
                 generate_code("Task", "Notes")
 
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Mock dependencies
+sys.modules.setdefault("chromadb", MagicMock())
+sys.modules.setdefault("chromadb.config", MagicMock())
+sys.modules.setdefault("agents.ns3_ai_integration", MagicMock())
+sys.modules.setdefault("supervisor", MagicMock())
+
+# Import runner module
+import importlib.util
+spec = importlib.util.spec_from_file_location("experiment_runner_under_test",
+                                              PROJECT_ROOT / "experiments/experiment_runner.py")
+runner_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(runner_module)
+
+
+SCENARIO = {'name': "AODV_10", 'protocol': "AODV", 'nodes': 10, 'base_seed': 100}
+
+
+class TestBatchedScenario(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = runner_module.ExperimentRunner.__new__(runner_module.ExperimentRunner)
+        self.runner.config = {'experiment': {'name': "exp", 'max_iterations': 3}}
+        self.runner.results = []
+        self.runner.supervisor = MagicMock()
+
+    def _seed_result(self, seed):
+        return {'seed': seed, 'status': 'completed', 'simulation_logs': f"sim_{seed}.xml",
+                'execution_time': 1.0}
+
+    @patch.object(runner_module, 'calculate_kpis', return_value={'avg_pdr': 90.0})
+    @patch.object(runner_module, 'parse_flowmonitor_xml')
+    @patch.object(runner_module, 'run_simulation_batch')
+    def test_each_seed_runs_once_with_validated_code(self, mock_batch, mock_parse, mock_kpis):
+        """Test that the pipeline stops before the simulator and every seed is batched once"""
+        self.runner.supervisor.run_experiment.return_value = {
+            'code_snippet': "codigo validado", 'code_validated': True, 'code_source': 'template'
+        }
+        mock_batch.side_effect = lambda code, seeds: [self._seed_result(seed) for seed in seeds]
+
+        self.assertTrue(self.runner._run_batched_scenario("exp", SCENARIO, "AODV_10", 3))
+
+        kwargs = self.runner.supervisor.run_experiment.call_args.kwargs
+        self.assertEqual(kwargs['stop_before'], ["simulator"])
+        self.assertEqual(kwargs['seed'], 101)
+        mock_batch.assert_called_once_with("codigo validado", [101, 102, 103])
+        self.assertEqual([r['seed'] for r in self.runner.results], [101, 102, 103])
+        self.assertEqual([r['repetition'] for r in self.runner.results], [1, 2, 3])
+
+    @patch.object(runner_module, 'run_simulation_batch')
+    def test_unreviewed_llm_code_is_not_batched(self, mock_batch):
+        """Test that LLM code the critic did not approve falls back to individual runs"""
+        self.runner.supervisor.run_experiment.return_value = {
+            'code_snippet': "codigo", 'code_validated': True, 'code_source': 'llm', 'critic_approved': False
+        }
+
+        self.assertFalse(self.runner._run_batched_scenario("exp", SCENARIO, "AODV_10", 3))
+        mock_batch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
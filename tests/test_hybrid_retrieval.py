@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Mock dependencies
+sys.modules.setdefault("chromadb", MagicMock())
+sys.modules.setdefault("chromadb.config", MagicMock())
+
+# Import researcher module
+import importlib.util
+spec = importlib.util.spec_from_file_location("researcher_hybrid_under_test", PROJECT_ROOT / "agents/researcher.py")
+researcher_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(researcher_module)
+
+from utils.hybrid_retrieval import BM25Index, RetrievedChunk, assemble_context, hybrid_search
+from utils.prompt_budget import estimate_tokens
+from utils.vector_store import VectorStore, paper_id
+
+
+DOCUMENTS = {
+    'aodv': "Title: AODV route discovery\n\nAbstract: AODV floods RREQ packets; PDR drops at high mobility.",
+    'aodv_copy': "Title: AODV route discovery\n\nAbstract: AODV floods RREQ packets; PDR drops at high mobility!",
+    'olsr': "Title: OLSR link state\n\nAbstract: OLSR uses MPR selection to reduce overhead in dense MANETs.",
+    'mesh': "Title: HWMP for mesh\n\nAbstract: HWMP combines proactive tree and on-demand paths in 802.11s.",
+}
+
+
+class FakeCollection:
+    """Colección en memoria con búsqueda vectorial simulada (orden fijo)"""
+
+    def __init__(self, documents, vector_order):
+        self.documents = dict(documents)
+        self.vector_order = vector_order
+
+    def get(self, ids=None, include=None):
+        ids = list(self.documents) if ids is None else [i for i in ids if i in self.documents]
+        return {'ids': ids, 'documents': [self.documents[i] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas):
+        self.documents.update(zip(ids, documents))
+
+    def query(self, query_embeddings, n_results, include=None):
+        ids = [i for i in self.vector_order if i in self.documents][:n_results]
+        return {'ids': [ids], 'documents': [[self.documents[i] for i in ids]]}
+
+
+class FakeClient:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_or_create_collection(self, name, embedding_function=None):
+        return self.collection
+
+
+class TestHybridRetrieval(unittest.TestCase):
+
+    def test_hybrid_search_fuses_and_dedupes(self):
+        """Test that lexical and vector rankings are fused and near-duplicates dropped"""
+        index = BM25Index()
+        index.add(DOCUMENTS)
+        self.assertEqual(index.search("OLSR MPR overhead")[0][0], 'olsr')
+
+        # La búsqueda vectorial sola prefiere 'mesh'; BM25 aporta el término exacto
+        vector_hits = [(doc_id, DOCUMENTS[doc_id]) for doc_id in ('mesh', 'aodv', 'aodv_copy', 'olsr')]
+        chunks = hybrid_search("AODV PDR mobility", index, vector_hits, top_k=3)
+
+        ids = [chunk.doc_id for chunk in chunks]
+        self.assertIn(ids[0], ('aodv', 'aodv_copy'))
+        self.assertFalse({'aodv', 'aodv_copy'} <= set(ids))
+        self.assertEqual(chunks[0].sources, ['bm25', 'vector'])
+
+    def test_context_assembler_respects_budget(self):
+        """Test that the assembler keeps whole top chunks and trims only the last one"""
+        chunks = [RetrievedChunk(str(i), f"fragmento {i} " + "x" * 400) for i in range(5)]
+        per_chunk = estimate_tokens(chunks[0].text)
+
+        context = assemble_context(chunks, max_tokens=per_chunk * 2 + 60)
+        self.assertEqual(context[:2], [chunks[0].text, chunks[1].text])
+        self.assertEqual(len(context), 3)
+        self.assertLessEqual(sum(estimate_tokens(t) for t in context) + 2, per_chunk * 2 + 60)
+
+        self.assertEqual(len(assemble_context(chunks, max_tokens=per_chunk * 2 + 10)), 2)
+        self.assertEqual(assemble_context([], max_tokens=500), [])
+
+    def test_vector_store_hybrid_query_feeds_synthesis(self):
+        """Test that hybrid results follow ingestion and reach the synthesis prompt"""
+        collection = FakeCollection({k: v for k, v in DOCUMENTS.items() if k != 'aodv_copy'},
+                                    vector_order=['mesh', 'olsr', 'aodv'])
+        store = VectorStore(client=FakeClient(collection), embedding_function=lambda texts: [[0.0]] * len(texts))
+
+        self.assertEqual(store.hybrid_query("OLSR MPR", "papers", n_results=2)[0].doc_id, 'olsr')
+
+        paper = {'title': "DSDV sequence numbers", 'abstract': "DSDV avoids loops with sequence numbers",
+                 'year': 2022, 'citations': 3, 'url': ''}
+        store.add_papers([paper], "papers")
+        collection.vector_order.append(paper_id(paper))
+        chunks = store.hybrid_query("DSDV sequence numbers", "papers", n_results=2)
+        self.assertEqual(chunks[0].doc_id, paper_id(paper))
+
+        llm = MagicMock()
+        llm.invoke.return_value.content = "síntesis"
+        context = assemble_context(chunks, researcher_module.LOCAL_CONTEXT_TOKENS)
+        with patch.object(researcher_module, 'get_llm', return_value=llm):
+            researcher_module.synthesize_research("DSDV", [{**paper, 'relevance_score': 1.0}], context)
+        prompt = llm.invoke.call_args[0][0]
+        self.assertIn("DSDV avoids loops", prompt)
+        self.assertIn("CONTEXTO DE INVESTIGACIONES PREVIAS", prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.literature_cache import LiteratureCache
+
+
+PAPERS = [{'title': "AODV in vehicular networks", 'abstract': "Routing study", 'year': 2022}]
+
+
+class TestLiteratureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = LiteratureCache(Path(self.tmp.name) / "cache.db", corpus_dir=Path(self.tmp.name))
+        self.settings = patch('utils.literature_cache._settings', return_value=(True, False, 24.0, None))
+        self.settings_mock = self.settings.start()
+        self.addCleanup(self.settings.stop)
+
+    def test_repeated_queries_skip_the_network(self):
+        """Test that a normalized repeat of a query is served from the cache"""
+        fetch = MagicMock(return_value=PAPERS)
+
+        self.cache.search('arxiv', "AODV  Vehicular", {'max_results': 5}, fetch)
+        result = self.cache.search('arxiv', "aodv vehicular", {'max_results': 5}, fetch)
+
+        self.assertEqual(result, PAPERS)
+        fetch.assert_called_once()
+        self.cache.search('arxiv', "aodv vehicular", {'max_results': 10}, fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_expired_entries_refresh_and_back_up_failures(self):
+        """Test that stale entries are refetched, and served when the refetch fails"""
+        self.cache.search('semantic_scholar', "olsr", {}, MagicMock(return_value=PAPERS))
+
+        with patch('utils.literature_cache.time.time', return_value=1e12):
+            fetch = MagicMock(return_value=[])
+            self.assertEqual(self.cache.search('semantic_scholar', "olsr", {}, fetch), PAPERS)
+            fetch.assert_called_once()
+
+    def test_offline_mode_uses_cache_and_corpus(self):
+        """Test that offline searches never fetch and the local corpus is searchable"""
+        self.cache.search('arxiv', "aodv", {}, MagicMock(return_value=PAPERS))
+        (Path(self.tmp.name) / "corpus.jsonl").write_text(
+            json.dumps({'title': "OLSR mesh performance", 'abstract': "HWMP comparison"}) + "\n"
+            + json.dumps({'title': "Unrelated", 'abstract': "Optics"}) + "\n"
+        )
+        self.settings_mock.return_value = (True, True, 24.0, None)
+        fetch = MagicMock(return_value=PAPERS)
+
+        self.assertEqual(self.cache.search('arxiv', "aodv", {}, fetch), PAPERS)
+        self.assertEqual(self.cache.search('arxiv', "dsdv", {}, fetch), [])
+        fetch.assert_not_called()
+
+        local = self.cache.search_corpus("OLSR vs HWMP mesh", max_results=5)
+        self.assertEqual([p['title'] for p in local], ["OLSR mesh performance"])
+        self.assertEqual(local[0]['citations'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
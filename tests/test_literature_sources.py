@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Mock dependencies
+sys.modules.setdefault("chromadb", MagicMock())
+sys.modules.setdefault("chromadb.config", MagicMock())
+
+# Import researcher module
+import importlib.util
+spec = importlib.util.spec_from_file_location("researcher_sources_under_test", PROJECT_ROOT / "agents/researcher.py")
+researcher_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(researcher_module)
+
+import config.settings as settings
+from utils.literature_sources import STATUS_OK, STATUS_TIMEOUT, fan_out, merge_papers
+
+
+SHARED_TITLE = "Performance of AODV in Vehicular Networks"
+
+SEMANTIC_SCHOLAR_RESPONSE = {'data': [
+    {'title': SHARED_TITLE, 'abstract': "AODV en VANETs", 'year': 2021,
+     'authors': [{'name': "A. Author"}], 'citationCount': 120,
+     'influentialCitationCount': 4, 'venue': "IEEE TVT", 'url': "https://s2/aodv"},
+    {'title': "OLSR Tuning", 'abstract': "Ajuste de OLSR", 'year': 2019,
+     'authors': [], 'citationCount': 10, 'influentialCitationCount': 0,
+     'venue': "", 'url': "https://s2/olsr"}
+]}
+
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"
+      xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <opensearch:totalResults>2</opensearch:totalResults>
+  <opensearch:startIndex>0</opensearch:startIndex>
+  <entry>
+    <id>http://arxiv.org/abs/2101.00001v1</id>
+    <updated>2021-01-01T00:00:00Z</updated>
+    <published>2021-01-01T00:00:00Z</published>
+    <title>Performance of AODV in  Vehicular Networks</title>
+    <summary>Preprint del mismo estudio</summary>
+    <author><name>A. Author</name></author>
+    <link href="http://arxiv.org/pdf/2101.00001v1" rel="related" title="pdf"/>
+    <arxiv:primary_category term="cs.NI"/>
+    <category term="cs.NI"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2401.00002v1</id>
+    <updated>2024-01-01T00:00:00Z</updated>
+    <published>2024-01-01T00:00:00Z</published>
+    <title>Mesh Routing with HWMP</title>
+    <summary>HWMP en 802.11s</summary>
+    <author><name>B. Author</name></author>
+    <link href="http://arxiv.org/pdf/2401.00002v1" rel="related" title="pdf"/>
+    <arxiv:primary_category term="cs.NI"/>
+    <category term="cs.NI"/>
+  </entry>
+</feed>"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Servidor local que imita Semantic Scholar y arXiv"""
+
+    def do_GET(self):
+        if self.path.startswith("/graph/v1/paper/search"):
+            body, content_type = json.dumps(SEMANTIC_SCHOLAR_RESPONSE), "application/json"
+        elif self.path.startswith("/api/query"):
+            body, content_type = ARXIV_FEED, "application/atom+xml"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLiteratureSources(unittest.TestCase):
+
+    def test_slow_source_times_out_without_delaying_others(self):
+        """Test that sources run concurrently and a slow one only loses its own results"""
+        def slow():
+            time.sleep(2)
+            return [{'title': "tarde"}]
+
+        start = time.time()
+        results = asyncio.run(fan_out(
+            {'fast': lambda: [{'title': "rápido"}], 'slow': slow, 'broken': lambda: 1 / 0},
+            {'fast': 1.0, 'slow': 0.2, 'broken': 1.0}
+        ))
+
+        self.assertLess(time.time() - start, 1.5)
+        self.assertEqual(results['fast'].status, STATUS_OK)
+        self.assertEqual(results['fast'].items, [{'title': "rápido"}])
+        self.assertEqual(results['slow'].status, STATUS_TIMEOUT)
+        self.assertEqual(results['slow'].items, [])
+        self.assertEqual(results['broken'].status, "error")
+
+    def test_merge_dedupes_and_ranks(self):
+        """Test that duplicates across sources are combined and results are ranked"""
+        merged = merge_papers({
+            'arxiv': [{'title': "Paper  A", 'abstract': "preprint", 'citations': 0, 'url': "arxiv/a"},
+                      {'title': "Paper B", 'abstract': "b", 'citations': 0, 'year': ''}],
+            'semantic_scholar': [{'title': "paper a", 'abstract': "", 'citations': 300,
+                                  'influential_citations': 5, 'year': 2022, 'venue': "ACM"}]
+        }, researcher_module.paper_relevance)
+
+        self.assertEqual([p['title'] for p in merged], ["paper a", "Paper B"])
+        self.assertEqual(merged[0]['sources'], ['arxiv', 'semantic_scholar'])
+        self.assertEqual(merged[0]['citations'], 300)
+        self.assertEqual(merged[0]['abstract'], "preprint")
+        self.assertEqual(merged[0]['relevance_score'], 30 + 15 + 15 + 10)
+        self.assertEqual(merged[1]['relevance_score'], 0)
+
+    def test_research_against_stand_in_servers(self):
+        """Test that both sources can be served by a local stand-in and are merged"""
+        server = HTTPServer(("127.0.0.1", 0), StandInHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_port}"
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        # Otros tests sustituyen el paquete arxiv por un mock a nivel de módulo
+        with patch.dict(sys.modules):
+            sys.modules.pop('arxiv', None)
+            try:
+                importlib.import_module('arxiv')
+            except ImportError:
+                self.skipTest("arxiv no está instalado")
+            query, local_docs, sources = self._gather_from(base)
+
+        self.assertEqual(query, "aodv vanet")
+        self.assertEqual(local_docs, ["doc local"])
+        self.assertTrue(all(result.status == STATUS_OK for result in sources.values()))
+        self.assertEqual(len(sources['semantic_scholar'].items), 2)
+        self.assertEqual(len(sources['arxiv'].items), 2)
+
+        merged = merge_papers({name: sources[name].items for name in ('semantic_scholar', 'arxiv')},
+                              researcher_module.paper_relevance)
+        self.assertEqual(len(merged), 3)
+        self.assertEqual(merged[0]['title'], SHARED_TITLE)
+        self.assertEqual(merged[0]['sources'], ['semantic_scholar', 'arxiv'])
+
+    def _gather_from(self, base):
+        with patch.object(settings, 'SEMANTIC_SCHOLAR_API_URL', f"{base}/graph/v1/paper/search", create=True), \
+             patch.object(settings, 'ARXIV_API_URL', f"{base}/api/query", create=True), \
+             patch.object(settings, 'LITERATURE_CACHE_ENABLED', False, create=True), \
+             patch.object(settings, 'LITERATURE_OFFLINE', False, create=True), \
+             patch.object(researcher_module, 'agenerate_search_query', AsyncMock(return_value="aodv vanet")), \
+             patch.object(researcher_module, 'retrieve_local_context', return_value=["doc local"]):
+            return asyncio.run(researcher_module._gather_literature("AODV en VANETs"))
+
+
+if __name__ == '__main__':
+    unittest.main()
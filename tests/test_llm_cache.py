@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from utils.llm_cache import CachedLLM, LLMResponseCache, normalize_prompt
+
+
+class FakeLLM:
+    """Modelo de chat mínimo que cuenta invocaciones"""
+
+    def __init__(self, model="llama3.1:8b", temperature=0.1):
+        self.model = model
+        self.temperature = temperature
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        return AIMessage(content=f"respuesta {self.calls}")
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMResponseCache(Path(self.tmp.name) / "cache.db")
+
+        # Las llamadas registradas no deben escribir en logs/ del repositorio
+        for name in ('LLM_CALLS_FILE', 'STATE_FILE'):
+            patcher = patch(f'utils.logging_utils.{name}', Path(self.tmp.name) / name.lower())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_identical_prompt_hits_cache(self):
+        """Test that a repeated prompt is not sent to the model again"""
+        fake = FakeLLM()
+        llm = CachedLLM(fake, "coder", cache=self.cache, bypass=False)
+
+        first = llm.invoke("Genera un script AODV")
+        second = llm.invoke("Genera un script AODV   \n\n\n")
+
+        self.assertEqual(fake.calls, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertTrue(second.response_metadata.get('cached'))
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['agents']['coder']['hit_rate'], 0.5)
+
+    def test_key_depends_on_model_and_temperature(self):
+        """Test that model and temperature are part of the key"""
+        CachedLLM(FakeLLM(), "coder", cache=self.cache, bypass=False).invoke("prompt")
+
+        other_model = FakeLLM(model="qwen2.5-coder:7b")
+        CachedLLM(other_model, "coder", cache=self.cache, bypass=False).invoke("prompt")
+        other_temperature = FakeLLM(temperature=0.3)
+        CachedLLM(other_temperature, "coder", cache=self.cache, bypass=False).invoke("prompt")
+
+        self.assertEqual(other_model.calls, 1)
+        self.assertEqual(other_temperature.calls, 1)
+
+    def test_bypass(self):
+        """Test that a bypassed agent always invokes the model"""
+        fake = FakeLLM()
+        llm = CachedLLM(fake, "critic", cache=self.cache, bypass=True)
+
+        llm.invoke("prompt")
+        llm.invoke("prompt")
+
+        self.assertEqual(fake.calls, 2)
+        self.assertEqual(self.cache.get_stats()['agents']['critic']['bypassed'], 2)
+        self.assertEqual(len(self.cache.cache), 0)
+
+    def test_message_lists(self):
+        """Test normalization of message-list prompts"""
+        messages = [SystemMessage(content="Eres un escritor"), HumanMessage(content="Resume  \n")]
+        self.assertEqual(
+            normalize_prompt(messages),
+            [['system', 'Eres un escritor'], ['human', 'Resume']]
+        )
+
+        fake = FakeLLM()
+        llm = CachedLLM(fake, "scientific_writer", cache=self.cache, bypass=False)
+        llm.invoke(messages)
+        llm.invoke(messages)
+        self.assertEqual(fake.calls, 1)
+
+    def test_unidentifiable_model_is_not_cached(self):
+        """Test that models without a string name skip the cache"""
+        fake = FakeLLM(model=None)
+        llm = CachedLLM(fake, "coder", cache=self.cache, bypass=False)
+
+        llm.invoke("prompt")
+        llm.invoke("prompt")
+
+        self.assertEqual(fake.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import patch
+import sys
+import asyncio
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import httpx
+from langchain_core.messages import AIMessage
+
+from utils.llm_cache import CachedLLM, LLMResponseCache
+from utils.llm_concurrency import gather_bounded, invoke_concurrently, run_coroutine
+
+
+class SlowAsyncLLM:
+    """Modelo de chat asíncrono que tarda un tiempo fijo y mide la concurrencia"""
+
+    def __init__(self, delay=0.2):
+        self.model = "llama3.1:8b"
+        self.temperature = 0.3
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return AIMessage(content=f"respuesta a {prompt}")
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Servidor HTTP/1.1 que mantiene abiertas las conexiones (como Ollama)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLLMConcurrency(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMResponseCache(Path(self.tmp.name) / "cache.db")
+
+        # Las llamadas registradas no deben escribir en logs/ del repositorio
+        for name in ('LLM_CALLS_FILE', 'STATE_FILE'):
+            patcher = patch(f'utils.logging_utils.{name}', Path(self.tmp.name) / name.lower())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_wall_time_close_to_longest_call(self):
+        """Test that independent generations overlap instead of adding up"""
+        fake = SlowAsyncLLM(delay=0.2)
+        llm = CachedLLM(fake, "scientific_writer", cache=self.cache, bypass=False)
+
+        start = time.time()
+        responses = invoke_concurrently(llm, ["a", "b", "c"], max_concurrency=3)
+        elapsed = time.time() - start
+
+        self.assertEqual([r.content for r in responses],
+                         ["respuesta a a", "respuesta a b", "respuesta a c"])
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(fake.max_in_flight, 3)
+
+    def test_concurrency_limit(self):
+        """Test that no more than max_concurrency generations run at once"""
+        fake = SlowAsyncLLM(delay=0.05)
+        llm = CachedLLM(fake, "scientific_writer", cache=self.cache, bypass=False)
+
+        invoke_concurrently(llm, [str(i) for i in range(6)], max_concurrency=2)
+
+        self.assertEqual(fake.calls, 6)
+        self.assertEqual(fake.max_in_flight, 2)
+
+    def test_batch_uses_cache(self):
+        """Test that cached prompts are not sent to the model again"""
+        fake = SlowAsyncLLM(delay=0.01)
+        llm = CachedLLM(fake, "scientific_writer", cache=self.cache, bypass=False)
+
+        invoke_concurrently(llm, ["a", "b"], max_concurrency=2)
+        responses = invoke_concurrently(llm, ["a", "b"], max_concurrency=2)
+
+        self.assertEqual(fake.calls, 2)
+        self.assertTrue(all(r.response_metadata.get('cached') for r in responses))
+
+    def test_return_exceptions(self):
+        """Test that a failing generation does not discard the others"""
+        async def ok():
+            return "ok"
+
+        async def fail():
+            raise ValueError("fallo")
+
+        results = run_coroutine(gather_bounded([ok(), fail()], max_concurrency=2,
+                                               return_exceptions=True))
+
+        self.assertEqual(results[0], "ok")
+        self.assertIsInstance(results[1], ValueError)
+
+    def test_run_coroutine_inside_running_loop(self):
+        """Test that sync callers work even when an event loop is running"""
+        async def inner():
+            return 42
+
+        async def outer():
+            return run_coroutine(inner())
+
+        self.assertEqual(asyncio.run(outer()), 42)
+
+    def test_run_coroutine_reuses_pooled_client(self):
+        """Test that repeated calls can share one async client with keep-alive connections"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        # Igual que los clientes agrupados: un único AsyncClient para todo el proceso
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        self.addCleanup(run_coroutine, client.aclose())
+
+        for _ in range(3):
+            self.assertEqual(run_coroutine(client.get("/")).text, "ok")
+
+
+if __name__ == '__main__':
+    unittest.main()
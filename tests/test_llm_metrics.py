@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from utils import llm_metrics
+from utils.llm_cache import CachedLLM, LLMResponseCache
+from utils.llm_metrics import estimate_api_cost, extract_first_token_latency, summarize_llm_calls
+
+
+class FakeLLM:
+    """Modelo de chat con metadatos de Ollama"""
+
+    model = "llama3.1:8b"
+    temperature = 0.1
+
+    def invoke(self, prompt, **kwargs):
+        return AIMessage(content="respuesta", response_metadata={
+            'prompt_eval_count': 200, 'eval_count': 50,
+            'load_duration': 100_000_000, 'prompt_eval_duration': 400_000_000
+        })
+
+    def stream(self, prompt, **kwargs):
+        yield AIMessageChunk(content="resp")
+        yield AIMessageChunk(content="uesta", response_metadata={'prompt_eval_count': 80, 'eval_count': 20})
+
+
+class TestLLMMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = LLMResponseCache(Path(self.tmp.name) / "cache.db")
+
+        llm_metrics._tracker.reset()
+        self.addCleanup(llm_metrics._tracker.reset)
+        for target, value in [('utils.llm_metrics._metrics_enabled', True),
+                              ('utils.logging_utils.log_llm_call', None)]:
+            patcher = patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_invoke_records_tokens_and_cache_hits(self):
+        """Test that generated and cached calls are recorded with their context"""
+        llm_metrics.set_llm_context(campaign="comparacion", iteration=2)
+        llm = CachedLLM(FakeLLM(), "critic", cache=self.cache, bypass=False)
+        llm.invoke("prompt")
+        llm.invoke("prompt")
+
+        first, second = llm_metrics.get_llm_calls(campaign="comparacion")
+        self.assertEqual((first['prompt_tokens'], first['completion_tokens']), (200, 50))
+        self.assertAlmostEqual(first['ttft'], 0.5)
+        self.assertEqual(first['iteration'], 2)
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['prompt_tokens'], 0)
+
+    def test_stream_measures_first_token(self):
+        """Test that streamed calls record time-to-first-token and final usage"""
+        llm = CachedLLM(FakeLLM(), "coder", cache=self.cache, bypass=True)
+        self.assertEqual("".join(chunk.content for chunk in llm.stream("prompt")), "respuesta")
+
+        record, = llm_metrics.get_llm_calls(agent="coder")
+        self.assertIsNotNone(record['ttft'])
+        self.assertEqual(record['completion_tokens'], 20)
+
+    def test_summary_by_agent_and_projected_cost(self):
+        """Test aggregation and API cost projection"""
+        records = [
+            {'agent': 'coder', 'model': 'm', 'prompt_tokens': 1_000_000, 'completion_tokens': 0,
+             'latency': 10.0, 'ttft': 1.0, 'cached': False, 'status': 'ok'},
+            {'agent': 'critic', 'model': 'm', 'prompt_tokens': 0, 'completion_tokens': 0,
+             'latency': 0.0, 'ttft': None, 'cached': True, 'status': 'ok'},
+        ]
+        summary = summarize_llm_calls(records)
+
+        self.assertEqual(summary['total']['calls'], 2)
+        self.assertEqual(summary['total']['hit_rate'], 0.5)
+        self.assertEqual(summary['by_agent']['coder']['avg_latency'], 10.0)
+        self.assertAlmostEqual(summary['projected_cost']['claude-3.5-sonnet'], 3.0)
+        self.assertEqual(estimate_api_cost(0, 1_000_000)['ollama'], 0.0)
+        self.assertIsNone(extract_first_token_latency(AIMessage(content="x")))
+
+
+if __name__ == '__main__':
+    unittest.main()
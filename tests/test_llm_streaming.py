@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from utils.llm_cache import CachedLLM, LLMResponseCache
+from utils.llm_streaming import CodeBlockDetector, stream_code_block
+
+
+RESPONSE = (
+    "Aquí está el script:\n"
+    "```python\n"
+    "import ns.core\n"
+    "\n"
+    "def main():\n"
+    "    return 0\n"
+    "```\n"
+    "Explicación: el script configura los nodos, la movilidad y luego "
+    "ejecuta la simulación durante el tiempo indicado. " * 20
+)
+
+
+class FakeStreamingLLM:
+    """Modelo de chat que emite la respuesta en fragmentos y registra el cierre"""
+
+    def __init__(self, text=RESPONSE, chunk_size=8):
+        self.model = "llama3.1:8b"
+        self.temperature = 0.05
+        self.text = text
+        self.chunk_size = chunk_size
+        self.chunks_sent = 0
+        self.closed = False
+
+    def stream(self, prompt, **kwargs):
+        try:
+            for i in range(0, len(self.text), self.chunk_size):
+                self.chunks_sent += 1
+                yield AIMessageChunk(content=self.text[i:i + self.chunk_size])
+        finally:
+            self.closed = True
+
+
+class TestLLMStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        # Las llamadas registradas no deben escribir en logs/ del repositorio
+        for name in ('LLM_CALLS_FILE', 'STATE_FILE'):
+            patcher = patch(f'utils.logging_utils.{name}', Path(self.tmp.name) / name.lower())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_stops_after_valid_block(self):
+        """Test that generation is cut once a complete, valid code block arrives"""
+        fake = FakeStreamingLLM()
+        text, code, stats = stream_code_block(fake, "prompt")
+
+        self.assertEqual(code, "import ns.core\n\ndef main():\n    return 0")
+        self.assertTrue(stats['stopped_early'])
+        self.assertTrue(fake.closed)
+        self.assertLess(len(text), len(RESPONSE) // 4)
+        self.assertLess(fake.chunks_sent, len(RESPONSE) // fake.chunk_size)
+
+    def test_invalid_block_keeps_streaming(self):
+        """Test that a syntactically invalid block does not stop generation"""
+        text = (
+            "```python\ndef main(:\n```\n"
+            "Corrección:\n```python\ndef main():\n    return 0\n```\nFin."
+        )
+        _, code, stats = stream_code_block(FakeStreamingLLM(text), "prompt")
+
+        self.assertEqual(code, "def main():\n    return 0")
+        self.assertEqual(stats['rejected_blocks'], 1)
+
+    def test_non_python_blocks_are_ignored(self):
+        """Test that shell snippets are skipped and unfenced output is kept whole"""
+        detector = CodeBlockDetector()
+        detector.feed("```bash\n./ns3 run sim\n```\n")
+        self.assertIsNone(detector.code)
+
+        text, code, stats = stream_code_block(FakeStreamingLLM("print('sin bloque')"), "prompt")
+        self.assertIsNone(code)
+        self.assertFalse(stats['stopped_early'])
+        self.assertEqual(text, "print('sin bloque')")
+
+    def test_cached_stream_stores_received_prefix(self):
+        """Test that an early-terminated stream is cached and replayed"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMResponseCache(Path(tmp) / "cache.db")
+            fake = FakeStreamingLLM()
+            llm = CachedLLM(fake, "coder", cache=cache, bypass=False)
+
+            first_text, first_code, _ = stream_code_block(llm, "prompt")
+            self.assertTrue(fake.closed)
+
+            sent = fake.chunks_sent
+            second_text, second_code, _ = stream_code_block(llm, "prompt")
+
+            self.assertEqual(fake.chunks_sent, sent)
+            self.assertEqual(second_code, first_code)
+            self.assertEqual(second_text, first_text)
+
+    def test_partial_stream_is_not_served_to_invoke(self):
+        """Test that a truncated stream never answers invoke() for the same prompt"""
+        cache = LLMResponseCache(Path(self.tmp.name) / "cache.db")
+        fake = FakeStreamingLLM()
+        fake.invoke = MagicMock(return_value=AIMessage(content="respuesta completa"))
+        llm = CachedLLM(fake, "coder", cache=cache, bypass=False)
+
+        stream_code_block(llm, "prompt")
+        self.assertTrue(fake.closed)
+
+        self.assertEqual(llm.invoke("prompt").content, "respuesta completa")
+        fake.invoke.assert_called_once()
+
+        # La respuesta completa tiene prioridad sobre la parcial
+        chunks = list(llm.stream("prompt"))
+        self.assertEqual(chunks[0].content, "respuesta completa")
+        self.assertNotIn('partial', chunks[0].response_metadata)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.memory import EpisodicMemory, TfidfIndex
+
+
+DOCS = [
+    "Simular AODV con 20 nodos AttributeError module ns has no attribute core",
+    "Simular OLSR con 30 nodos ModuleNotFoundError No module named ns.olsr",
+    "DSDV 50 nodos TimeoutError Simulator Run no termina",
+    "AODV 10 nodos NameError name phy is not defined",
+]
+QUERY = "Simular AODV con 15 nodos AttributeError core"
+
+
+class TestTfidfIndex(unittest.TestCase):
+
+    def test_matches_refitted_vectorizer(self):
+        """Test that incremental scores equal the previous per-query TfidfVectorizer refit"""
+        index = TfidfIndex()
+        index.add(DOCS[:2])
+        index.add(DOCS[2:])
+
+        vectors = TfidfVectorizer().fit_transform([QUERY] + DOCS)
+        reference = cosine_similarity(vectors[0:1], vectors[1:]).ravel()
+
+        self.assertEqual(len(index), len(DOCS))
+        np.testing.assert_allclose(index.query(QUERY), reference, atol=1e-9)
+
+    def test_drop_oldest_updates_document_frequency(self):
+        """Test that removing the oldest documents matches an index built without them"""
+        index = TfidfIndex()
+        for doc in DOCS:
+            index.add([doc])
+        index.drop_first(2)
+
+        rebuilt = TfidfIndex()
+        rebuilt.add(DOCS[2:])
+
+        np.testing.assert_allclose(index.query(QUERY), rebuilt.query(QUERY))
+        np.testing.assert_allclose(index.doc_freq, rebuilt.doc_freq)
+
+
+class TestEpisodicMemoryIndex(unittest.TestCase):
+
+    def test_retrieval_uses_incremental_index(self):
+        """Test that added and reloaded experiences are retrievable without refitting"""
+        with tempfile.TemporaryDirectory() as tmp:
+            memory_file = Path(tmp) / "memory.json"
+            memory = EpisodicMemory(str(memory_file))
+            for doc in DOCS:
+                memory.add_experience(" ".join(doc.split()[:4]), "code", doc, "solution")
+
+            results = memory.retrieve_experience("Simular AODV con 15 nodos", "AttributeError core", top_k=2)
+            self.assertEqual(results[0]['error'], DOCS[0])
+            self.assertEqual(len(memory.index), len(DOCS))
+
+            reloaded = EpisodicMemory(str(memory_file))
+            self.assertEqual(len(reloaded.index), len(DOCS))
+            self.assertEqual(
+                reloaded.retrieve_experience("Simular AODV con 15 nodos", "AttributeError core")[0]['error'],
+                DOCS[0]
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
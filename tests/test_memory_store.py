@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import patch
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.memory import EpisodicMemory, normalize_error
+
+
+class TestEpisodicMemoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "memory.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_near_identical_errors_are_merged(self):
+        """Test that errors differing only in paths and numbers update one experience"""
+        self.assertEqual(
+            normalize_error('File "/tmp/sim_1.py", line 12: NameError phy'),
+            normalize_error('File "/home/u/sim_2.py", line 40: NameError phy')
+        )
+
+        memory = EpisodicMemory(self.db_path)
+        memory.add_experience("AODV 20 nodos", "c1", 'File "/tmp/sim_1.py", line 12: NameError phy', "s1")
+        memory.add_experience("AODV 30 nodos", "c2", 'File "/home/u/sim_2.py", line 40: NameError phy', "s2")
+        memory.add_experience("OLSR 20 nodos", "c3", "AttributeError: no attribute 'core'", "s3")
+
+        experiences = memory.experiences
+        self.assertEqual(len(experiences), 2)
+        self.assertEqual(experiences[0]['solution'], "s2")
+        self.assertEqual(experiences[0]['occurrences'], 2)
+        self.assertEqual(memory.get_stats()['deduplicated_errors'], 1)
+
+    def test_least_used_experiences_are_evicted(self):
+        """Test that eviction keeps experiences that were retrieved"""
+        memory = EpisodicMemory(self.db_path)
+        with patch('utils.memory._max_experiences', return_value=3):
+            memory.add_experience("AODV", "c", "NameError aodv_helper", "s")
+            memory.add_experience("OLSR", "c", "TypeError olsr_install", "s")
+            memory.add_experience("DSDV", "c", "KeyError dsdv_table", "s")
+            memory.retrieve_experience("AODV", "NameError aodv_helper")
+            memory.add_experience("HWMP", "c", "ValueError mesh_stack", "s")
+
+        tasks = [exp['task'] for exp in memory.experiences]
+        self.assertEqual(tasks, ["AODV", "DSDV", "HWMP"])
+        self.assertEqual(len(memory.index), 3)
+        self.assertEqual(memory.retrieve_experience("OLSR", "TypeError olsr_install"), [])
+
+    def test_instances_share_one_store(self):
+        """Test that experiences written by another worker are retrievable"""
+        worker_a = EpisodicMemory(self.db_path)
+        worker_b = EpisodicMemory(self.db_path)
+
+        worker_a.add_experience("AODV 20 nodos", "c", "AttributeError: no attribute 'core'", "s")
+        worker_b.add_experience("DSDV 50 nodos", "c", "TimeoutError Simulator Run", "s")
+
+        results = worker_a.retrieve_experience("DSDV 40 nodos", "TimeoutError Simulator Run no termina")
+        self.assertEqual(results[0]['task'], "DSDV 50 nodos")
+        self.assertEqual(len(worker_a.index), 2)
+
+    def test_failures_sharing_a_long_stack_stay_separate(self):
+        """Test that tracebacks with the same long call-stack prefix but different exceptions are not merged"""
+        frames = "Error de ejecución (código 1): Traceback (most recent call last):\n" + "".join(
+            f'  File "/home/tesis/simulations/scripts/tesis_sim.py", line {10 * i}, in step{i}\n'
+            f'    resultado = step{i + 1}(nodos, dispositivos, parametros)\n'
+            for i in range(8)
+        )
+        self.assertGreater(len(frames), 500)
+
+        memory = EpisodicMemory(self.db_path)
+        memory.add_experience("AODV 20 nodos", "c1", frames + "AttributeError: module 'ns.aodv' has no attribute 'X'", "fix-aodv")
+        memory.add_experience("AODV 20 nodos", "c2", frames + "NameError: name 'phy' is not defined", "fix-phy")
+
+        self.assertEqual(memory.get_stats()['total_experiences'], 2)
+        self.assertEqual(memory.lookup_signature(frames + "NameError: name 'phy' is not defined")['solution'], "fix-phy")
+        self.assertEqual(memory.lookup_signature(frames + "AttributeError: module 'ns.aodv' has no attribute 'X'")['solution'], "fix-aodv")
+
+    def test_keyword_search_without_index(self):
+        """Test that the full-text fallback finds experiences when TF-IDF is unavailable"""
+        memory = EpisodicMemory(self.db_path)
+        memory.index = None
+        memory.add_experience("AODV 20 nodos", "c", "AttributeError core", "s")
+        memory.add_experience("OLSR 30 nodos", "c", "ModuleNotFoundError ns.olsr", "s")
+
+        results = memory.retrieve_experience("OLSR", "ModuleNotFoundError ns.olsr")
+        self.assertEqual(results[0]['task'], "OLSR 30 nodos")
+
+    def test_global_memory_is_created_on_first_use(self):
+        """Test that importing the module does not open the database until get_memory is called"""
+        import utils.memory as memory_module
+
+        with patch.object(memory_module, 'EpisodicMemory') as episodic_memory, \
+             patch.object(memory_module, '_memory', None):
+            episodic_memory.assert_not_called()
+            first = memory_module.get_memory()
+            self.assertIs(memory_module.get_memory(), first)
+            self.assertIs(memory_module.memory, first)
+            episodic_memory.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
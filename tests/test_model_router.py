@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.messages import AIMessage
+
+from utils.model_router import RoutedLLM, TierStats, extract_token_usage, get_routed_llm, route_model
+
+
+LARGE = "llama3.1:8b"
+FAST = "llama3.2:3b"
+
+
+class TestModelRouter(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('utils.model_router._routing_settings', return_value=(True, FAST))
+        self.settings = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_routes_by_call_type(self):
+        """Test that simple calls use the fast model and code uses the large one"""
+        self.assertEqual(route_model('researcher.query', LARGE), (FAST, 'fast'))
+        self.assertEqual(route_model('coder.code', LARGE), (LARGE, 'large'))
+        self.assertEqual(route_model('unknown.call', LARGE), (LARGE, 'large'))
+
+    def test_escalation_and_disabled_routing(self):
+        """Test that escalation or disabled routing selects the large model"""
+        self.assertEqual(route_model('critic.review', LARGE, escalate=True), (LARGE, 'large'))
+
+        self.settings.return_value = (False, FAST)
+        self.assertEqual(route_model('critic.review', LARGE), (LARGE, 'large'))
+
+    @patch('utils.model_router.get_llm')
+    def test_fast_model_failure_falls_back(self, mock_get_llm):
+        """Test that an unavailable fast model falls back to the large model"""
+        fast = MagicMock()
+        fast.invoke.side_effect = RuntimeError("model 'llama3.2:3b' not found")
+        large = MagicMock()
+        large.invoke.return_value = AIMessage(content="respuesta")
+        mock_get_llm.side_effect = lambda model, *args, **kwargs: fast if model == FAST else large
+
+        llm = get_routed_llm('critic.review', LARGE, agent="critic")
+        self.assertEqual(llm.model_name, FAST)
+        self.assertEqual(llm.invoke("prompt").content, "respuesta")
+        self.assertEqual(mock_get_llm.call_args.args[0], LARGE)
+
+    def test_token_usage_and_stats(self):
+        """Test that token counts are read from responses and aggregated per tier"""
+        response = AIMessage(content="ok", response_metadata={'prompt_eval_count': 120, 'eval_count': 30})
+        self.assertEqual(extract_token_usage(response), (120, 30))
+        self.assertEqual(extract_token_usage(MagicMock(spec=[])), (0, 0))
+
+        stats = TierStats()
+        inner = MagicMock()
+        inner.invoke.return_value = response
+        RoutedLLM(inner, 'critic.review', FAST, 'fast', stats=stats).invoke("prompt")
+        RoutedLLM(inner, 'critic.review', LARGE, 'large', escalated=True, stats=stats).invoke("prompt")
+
+        result = stats.get_stats()
+        self.assertEqual(result['fast']['calls'], 1)
+        self.assertEqual(result['fast']['input_tokens'], 120)
+        self.assertEqual(result['large']['escalations'], 1)
+        self.assertIn('tokens_per_second', result['large'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.ns3_bindings import (
+    NS3BindingIndex,
+    find_unresolved_references,
+    get_cache_file,
+    load_binding_index
+)
+
+
+class TestNS3Bindings(unittest.TestCase):
+
+    def setUp(self):
+        self.index = NS3BindingIndex({
+            'core': ['Simulator', 'Seconds', 'StringValue'],
+            'network': ['NodeContainer', 'Ipv4Address'],
+            'aodv': ['AodvHelper']
+        }, version='3.45')
+
+    def test_valid_references(self):
+        """Test code whose references all exist"""
+        code = """
+import ns.core
+import ns.network
+import ns.aodv
+
+def main():
+    nodes = ns.network.NodeContainer()
+    helper = ns.aodv.AodvHelper()
+    ns.core.Simulator.Stop(ns.core.Seconds(10))
+"""
+        self.assertEqual(find_unresolved_references(code, self.index), [])
+
+    def test_unknown_symbol(self):
+        """Test detection of a non-existent class"""
+        code = """
+import ns.core
+import ns.aodv
+
+helper = ns.aodv.AodvRoutingHelper()
+ns.core.Simulator.Run()
+"""
+        unresolved = find_unresolved_references(code, self.index)
+        self.assertEqual(unresolved, ['ns.aodv.AodvRoutingHelper'])
+
+    def test_unknown_module(self):
+        """Test detection of a missing ns-3 module"""
+        code = """
+import ns.core
+import ns.olsr
+
+helper = ns.olsr.OlsrHelper()
+"""
+        unresolved = find_unresolved_references(code, self.index)
+        self.assertIn('ns.olsr', unresolved)
+
+    def test_module_alias(self):
+        """Test resolution through import aliases"""
+        code = """
+import ns.core as core
+from ns.network import NodeContainer, Ipv4Mask
+
+core.Simulator.Run()
+core.Simulatr.Destroy()
+"""
+        unresolved = find_unresolved_references(code, self.index)
+        self.assertIn('ns.core.Simulatr', unresolved)
+        self.assertIn('ns.network.Ipv4Mask', unresolved)
+        self.assertEqual(len(unresolved), 2)
+
+    def test_cache_roundtrip(self):
+        """Test that a cached index is loaded without rebuilding"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_file = get_cache_file('3.45', Path(tmp))
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.index.to_dict(), f)
+
+            loaded = load_binding_index('3.45', cache_dir=Path(tmp), ns3_root=Path(tmp) / 'missing')
+
+            self.assertIsNotNone(loaded)
+            self.assertTrue(loaded.has_symbol('aodv', 'AodvHelper'))
+            self.assertFalse(loaded.has_module('olsr'))
+
+    def test_missing_ns3_returns_none(self):
+        """Test that without NS-3 and without cache no index is produced"""
+        with tempfile.TemporaryDirectory() as tmp:
+            loaded = load_binding_index('0.0', cache_dir=Path(tmp), ns3_root=Path(tmp) / 'missing')
+            self.assertIsNone(loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils import prompt_budget
+from utils.prompt_budget import (
+    PromptSection,
+    compress_traceback,
+    dedupe_traceback,
+    estimate_tokens,
+    fit_sections,
+    get_budgeted_prompt,
+    shrink_items,
+    summarize_notes
+)
+
+
+RECURSIVE_TRACEBACK = (
+    "Traceback (most recent call last):\n"
+    + '  File "sim.py", line 10, in configure\n    return configure(node)\n' * 50
+    + "RecursionError: maximum recursion depth exceeded\n"
+)
+
+NOTES = (
+    "# Hallazgos principales\n"
+    + "\n".join(f"- AODV mejora el PDR un {i}% con {i * 5} nodos" for i in range(40))
+    + "\n" + "Texto descriptivo sin datos concretos. " * 80
+    + "\nhttps://www.semanticscholar.org/paper/123\n"
+)
+
+
+class TestPromptBudget(unittest.TestCase):
+
+    def test_traceback_repetitions_collapsed(self):
+        """Test that repeated frames are collapsed and the error line kept"""
+        deduped = dedupe_traceback(RECURSIVE_TRACEBACK)
+
+        self.assertEqual(deduped.count('in configure'), 1)
+        self.assertIn('repetido 49 veces', deduped)
+        self.assertTrue(deduped.endswith('RecursionError: maximum recursion depth exceeded'))
+
+    def test_compressed_traceback_keeps_final_error(self):
+        """Test that compression favours the end of the traceback"""
+        text = "linea de log sin interés\n" * 200 + "ValueError: nodo 42 sin interfaz IP"
+        compressed = compress_traceback(text, 60)
+
+        self.assertLessEqual(estimate_tokens(compressed), 60)
+        self.assertTrue(compressed.endswith("ValueError: nodo 42 sin interfaz IP"))
+
+    def test_notes_summary_prefers_findings_and_is_reused(self):
+        """Test extractive summarization order and memoization"""
+        summary = summarize_notes(NOTES, 150)
+
+        self.assertLessEqual(estimate_tokens(summary), 150)
+        self.assertTrue(summary.startswith("# Hallazgos principales"))
+        self.assertIn("- AODV mejora el PDR un 0%", summary)
+        self.assertNotIn("semanticscholar", summary)
+
+        key = next(k for k in prompt_budget._summary_cache if k[1] == 150)
+        prompt_budget._summary_cache[key] = "resumen memorizado"
+        self.assertEqual(summarize_notes(NOTES, 150), "resumen memorizado")
+        del prompt_budget._summary_cache[key]
+
+    def test_items_shrunk_longest_first(self):
+        """Test that every item survives and short items are untouched"""
+        items = ["a" * 2000, "b" * 100, "c" * 3000]
+        joined = shrink_items(items, 300)
+
+        self.assertLessEqual(estimate_tokens(joined), 300 + 5)
+        self.assertIn("b" * 100, joined)
+        self.assertIn("a", joined)
+        self.assertIn("c", joined)
+
+    def test_low_priority_sections_compressed_first(self):
+        """Test that the most important section is kept intact when possible"""
+        sections = {
+            'plan': PromptSection("p" * 700, priority=1),
+            'memory': PromptSection("m" * 3500, priority=3),
+        }
+        texts = fit_sections(sections, available_tokens=400)
+
+        self.assertEqual(texts['plan'], "p" * 700)
+        self.assertLessEqual(estimate_tokens(texts['plan']) + estimate_tokens(texts['memory']), 400)
+
+    def test_budgeted_prompt_fits(self):
+        """Test that a real prompt template is fitted to the budget"""
+        code = "print('linea de código')\n" * 1000
+        prompt = get_budgeted_prompt(
+            'critic', 'review',
+            sections={'code': PromptSection(code)},
+            budget=800,
+            task="Simular AODV con 20 nodos"
+        )
+
+        self.assertLessEqual(estimate_tokens(prompt), 800)
+        self.assertIn("Simular AODV con 20 nodos", prompt)
+        self.assertIn('"approved": true/false', prompt)
+
+    def test_small_prompt_unchanged(self):
+        """Test that prompts within budget are not modified"""
+        sections = {'research_notes': PromptSection("Notas breves", compressor='notes')}
+        self.assertEqual(fit_sections(sections, 1000), {'research_notes': "Notas breves"})
+
+
+if __name__ == '__main__':
+    unittest.main()
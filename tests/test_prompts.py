@@ -0,0 +1,63 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.prompts import get_prompt, is_segmented, load_prompts, render_segments
+
+
+def common_prefix(a: str, b: str) -> int:
+    """Longitud del prefijo común de dos prompts"""
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+class TestPromptLayout(unittest.TestCase):
+
+    def test_retries_share_prefix(self):
+        """Test that coder retries only differ after the task context"""
+        first = get_prompt('coder', 'generation', task="AODV 20 nodos", plan="Plan", error_context="")
+        retry = get_prompt('coder', 'generation', task="AODV 20 nodos", plan="Plan",
+                           error_context="**⚠️ ERROR ANTERIOR (Iteración 1):** NameError")
+
+        prefix = common_prefix(first, retry)
+        self.assertGreaterEqual(prefix, len(first.rstrip()))
+        self.assertIn("TU PLANIFICACIÓN DETALLADA", first[:prefix])
+
+    def test_static_instructions_first(self):
+        """Test that the static segment precedes every placeholder value"""
+        prompt = get_prompt('critic', 'review', task="TAREA-X", code="CODIGO-X")
+        static = load_prompts()['critic']['review']['static'].rstrip()
+
+        self.assertTrue(prompt.startswith(static))
+        self.assertLess(prompt.index("TAREA-X"), prompt.index("CODIGO-X"))
+
+    def test_static_segment_is_literal(self):
+        """Test that braces in the static segment need no escaping"""
+        template = {'static': 'metadata = {"status": "ok"}', 'context': 'Tarea: {task}'}
+
+        self.assertTrue(is_segmented(template))
+        self.assertEqual(render_segments(template, task="T"),
+                         'metadata = {"status": "ok"}\n\nTarea: T\n')
+
+    def test_generation_prompt_formats(self):
+        """Test that the generation prompt keeps its script skeleton"""
+        prompt = get_prompt('coder', 'generation', task="T", plan="P", error_context="")
+        self.assertIn('"status": "completed"', prompt)
+
+    def test_plain_and_nested_prompts_unchanged(self):
+        """Test that non-segmented entries still format as before"""
+        self.assertIn("Tarea: T", get_prompt('researcher', 'generate_query', task="T"))
+        self.assertIn("ESTRATEGIA GENERAL", get_prompt('coder', 'error_strategy.general'))
+        self.assertFalse(is_segmented(load_prompts()['coder']['error_strategy']))
+
+
+if __name__ == '__main__':
+    unittest.main()
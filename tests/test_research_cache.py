@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.research_cache import ResearchArtifactCache, task_template
+
+
+class TestResearchArtifactCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = ResearchArtifactCache(Path(self.tmp.name) / "cache.db")
+
+    def test_template_ignores_numeric_parameters(self):
+        """Test that tasks differing only in node count or speed share a template"""
+        self.assertEqual(
+            task_template("Simular AODV con 20 nodos a 5 m/s"),
+            task_template("simular AODV con 50  nodos a 12.5 m/s")
+        )
+        self.assertNotEqual(task_template("Simular AODV con 20 nodos"), task_template("Simular OLSR con 20 nodos"))
+
+    def test_family_reuses_research_until_stale(self):
+        """Test that a sibling task reuses stored notes and a staleness threshold forces refresh"""
+        self.cache.store("Simular AODV con 20 nodos", ["notas"], [{'title': "AODV"}])
+
+        entry = self.cache.lookup("Simular AODV con 40 nodos", max_age_hours=1)
+        self.assertEqual(entry['research_notes'], ["notas"])
+        self.assertEqual(entry['task'], "Simular AODV con 20 nodos")
+        self.assertIsNone(self.cache.lookup("Simular OLSR con 40 nodos", max_age_hours=1))
+
+        later = entry['created_at'] + 2 * 3600
+        with patch('utils.research_cache.time.time', return_value=later):
+            self.assertIsNone(self.cache.lookup("Simular AODV con 40 nodos", max_age_hours=1))
+            self.assertIsNotNone(self.cache.lookup("Simular AODV con 40 nodos", max_age_hours=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import MagicMock
+import ast
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Mock dependencies
+sys.modules.setdefault("chromadb", MagicMock())
+sys.modules.setdefault("chromadb.config", MagicMock())
+sys.modules.setdefault("sentence_transformers", MagicMock())
+
+# Import coder module
+import importlib.util
+spec = importlib.util.spec_from_file_location("coder_templates_under_test", PROJECT_ROOT / "agents/coder.py")
+coder_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(coder_module)
+
+from utils.code_rules import VERDICT_APPROVED, check_code_rules
+
+
+# Formato de ExperimentRunner._generate_task
+TASK = (
+    "Simular red MANET con protocolo AODV, 30 nodos móviles con modelo RandomWaypoint "
+    "(velocidad 5-15 m/s), área de 800x800 metros, durante 150 segundos"
+)
+
+
+class TestScenarioTemplates(unittest.TestCase):
+
+    def test_standard_task_parsed(self):
+        """Test that experiment-runner tasks yield structured parameters"""
+        scenario = coder_module.normalize_scenario(coder_module.parse_scenario_from_task(TASK))
+
+        self.assertEqual(scenario['protocol'], 'AODV')
+        self.assertEqual(scenario['nodes'], 30)
+        self.assertEqual(scenario['area'], 800)
+        self.assertEqual((scenario['speed_min'], scenario['speed_max']), (5, 15))
+
+    def test_non_standard_tasks_use_llm(self):
+        """Test that free-form tasks and unsupported protocols are not templated"""
+        self.assertIsNone(coder_module.parse_scenario_from_task("Optimizar AODV con GNN"))
+        self.assertIsNone(coder_module.normalize_scenario({'protocol': 'DSR', 'nodes': 20}))
+        self.assertIsNone(coder_module.normalize_scenario({'protocol': 'AODV', 'speed': 'rápida'}))
+
+    def test_rendered_scripts_pass_rules(self):
+        """Test that every supported protocol renders a script the pre-critic approves"""
+        for protocol, mobility in [('AODV', 'RandomWaypoint'), ('OLSR', 'RandomWaypoint'),
+                                   ('DSDV', 'ConstantPosition'), ('HWMP', 'ConstantPosition')]:
+            scenario = coder_module.normalize_scenario({
+                'protocol': protocol, 'nodes': 20, 'area': 1000, 'duration': 200,
+                'mobility': mobility, 'speed': '0-0' if mobility == 'ConstantPosition' else '5-15'
+            })
+            code = coder_module.render_scenario_script(scenario, seed=10001)
+            ast.parse(code)
+
+            task = f"Simular {protocol} con 20 nodos y movilidad {mobility}"
+            report = check_code_rules(task, code)
+            self.assertEqual(report.verdict, VERDICT_APPROVED, f"{protocol}: {report.critique}")
+            self.assertIn("SIMULATION_SEED = 10001", code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.cache import PersistentCache
+from utils.simulation_cache import (
+    SimulationResultCache,
+    normalize_script,
+    simulation_fingerprint
+)
+
+
+SCRIPT = """
+import ns.core
+
+def main():
+    ns.core.Simulator.Run()
+"""
+
+SCRIPT_REFORMATTED = """
+# Comentario añadido por el optimizador
+import ns.core
+
+
+def main():
+    ns.core.Simulator.Run()   # ejecutar
+"""
+
+
+class TestPersistentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "cache.db"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_set_get_and_stats(self):
+        """Test basic storage and hit/miss accounting"""
+        cache = PersistentCache(self.db_path, namespace="test")
+        self.assertIsNone(cache.get("missing"))
+        cache.set("key", {"value": 1})
+        self.assertEqual(cache.get("key"), {"value": 1})
+
+        stats = cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+
+    def test_ttl_expiration(self):
+        """Test that expired entries are not returned"""
+        cache = PersistentCache(self.db_path, namespace="ttl", ttl_seconds=0.05)
+        cache.set("key", "value")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("key"))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = PersistentCache(self.db_path, namespace="lru", max_entries=2)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        cache.set("b", 2)
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_namespaces_are_isolated(self):
+        """Test that namespaces sharing a file do not collide"""
+        PersistentCache(self.db_path, namespace="one").set("key", 1)
+        self.assertIsNone(PersistentCache(self.db_path, namespace="two").get("key"))
+
+
+class TestSimulationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SimulationResultCache(Path(self.tmp.name) / "cache.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalization_ignores_comments_and_format(self):
+        """Test that formatting-only changes keep the same fingerprint"""
+        self.assertEqual(normalize_script(SCRIPT), normalize_script(SCRIPT_REFORMATTED))
+        self.assertEqual(
+            simulation_fingerprint(SCRIPT, 42, "3.45"),
+            simulation_fingerprint(SCRIPT_REFORMATTED, 42, "3.45")
+        )
+
+    def test_fingerprint_depends_on_seed_version_and_params(self):
+        """Test that seed, NS-3 version and parameters change the fingerprint"""
+        base = simulation_fingerprint(SCRIPT, 42, "3.45", {"profile": "full"})
+        self.assertNotEqual(base, simulation_fingerprint(SCRIPT, 43, "3.45", {"profile": "full"}))
+        self.assertNotEqual(base, simulation_fingerprint(SCRIPT, 42, "3.44", {"profile": "full"}))
+        self.assertNotEqual(base, simulation_fingerprint(SCRIPT, 42, "3.45", {"profile": "headers"}))
+
+    def test_lookup_reuses_existing_artifacts(self):
+        """Test cache hit when artifacts are still on disk"""
+        xml_file = Path(self.tmp.name) / "sim.xml"
+        xml_file.write_text("<FlowMonitor/>")
+
+        fingerprint = simulation_fingerprint(SCRIPT, 42, "3.45")
+        self.cache.store(fingerprint, {
+            'timestamp': '20260101_000000',
+            'results_dir': self.tmp.name,
+            'simulation_logs': str(xml_file),
+            'pcap_files': []
+        })
+
+        entry = self.cache.lookup(fingerprint)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry['simulation_logs'], str(xml_file))
+
+    def test_lookup_discards_missing_artifacts(self):
+        """Test that entries whose artifacts were deleted are dropped"""
+        fingerprint = simulation_fingerprint(SCRIPT, 42, "3.45")
+        self.cache.store(fingerprint, {
+            'timestamp': '20260101_000000',
+            'results_dir': self.tmp.name,
+            'simulation_logs': str(Path(self.tmp.name) / "deleted.xml"),
+            'pcap_files': []
+        })
+
+        self.assertIsNone(self.cache.lookup(fingerprint))
+        self.assertIsNone(self.cache.cache.get(fingerprint))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import hashlib
+import unittest
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.vector_store import VectorStore, paper_id, upsert_papers
+
+
+class FakeCollection:
+    """Colección en memoria con la interfaz get/upsert de ChromaDB"""
+
+    def __init__(self):
+        self.documents = {}
+        self.upsert_calls = 0
+        self.query_calls = 0
+
+    def get(self, ids, include=None):
+        return {'ids': [doc_id for doc_id in ids if doc_id in self.documents]}
+
+    def upsert(self, ids, documents, metadatas):
+        assert len(set(ids)) == len(ids)
+        self.upsert_calls += 1
+        self.documents.update(zip(ids, documents))
+
+    def query(self, query_embeddings, n_results):
+        self.query_calls += 1
+        return {'documents': [sorted(self.documents.values())[:n_results]]}
+
+
+class FakeClient:
+    def __init__(self):
+        self.collections = {}
+        self.open_calls = 0
+
+    def get_or_create_collection(self, name, embedding_function=None):
+        self.open_calls += 1
+        return self.collections.setdefault(name, FakeCollection())
+
+
+class CountingEmbedding:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+
+def make_paper(n, **fields):
+    paper = {'title': f"Routing study {n}", 'abstract': "AODV", 'year': 2023,
+             'citations': None, 'url': None}
+    paper.update(fields)
+    return paper
+
+
+class TestVectorStore(unittest.TestCase):
+
+    def test_ids_depend_on_content_only(self):
+        """Test that IDs are stable and ignore case and spacing of the title"""
+        self.assertEqual(paper_id({'title': "AODV  in MANETs"}), paper_id({'title': "aodv in manets"}))
+        self.assertNotEqual(paper_id({'title': "AODV"}), paper_id({'title': "OLSR"}))
+        self.assertEqual(paper_id({'title': "AODV"}), "paper_" + hashlib.sha256(b"aodv").hexdigest()[:32])
+
+    def test_batches_new_papers_only(self):
+        """Test that ingestion batches new papers and skips stored ones and duplicates"""
+        collection = FakeCollection()
+        papers = [make_paper(n) for n in range(5)]
+
+        self.assertEqual(upsert_papers(collection, papers + [make_paper(0, url="arxiv")], batch_size=2), 5)
+        self.assertEqual(collection.upsert_calls, 3)
+
+        self.assertEqual(upsert_papers(collection, papers + [make_paper(5)], batch_size=2), 1)
+        self.assertEqual(collection.upsert_calls, 4)
+        self.assertEqual(len(collection.documents), 6)
+
+
+
+class TestVectorStoreHandle(unittest.TestCase):
+
+    def test_repeated_queries_served_from_memory(self):
+        """Test that the collection is opened once and repeated queries skip ChromaDB"""
+        client, embedding = FakeClient(), CountingEmbedding()
+        store = VectorStore(client=client, embedding_function=embedding)
+        store.add_papers([make_paper(1)], "papers")
+
+        first = store.query("AODV  vehicular", "papers", n_results=3)
+        second = store.query("aodv vehicular", "papers", n_results=3)
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.open_calls, 1)
+        self.assertEqual(client.collections["papers"].query_calls, 1)
+        self.assertEqual((store.hits, store.misses), (1, 1))
+
+    def test_new_papers_invalidate_results_but_keep_embeddings(self):
+        """Test that inserting papers refreshes cached results without re-embedding the query"""
+        client, embedding = FakeClient(), CountingEmbedding()
+        store = VectorStore(client=client, embedding_function=embedding)
+        store.add_papers([make_paper(1)], "papers")
+        store.query("AODV", "papers")
+
+        store.add_papers([make_paper(2)], "papers")
+        results = store.query("AODV", "papers")
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(client.collections["papers"].query_calls, 2)
+        self.assertEqual(embedding.texts, ["AODV"])
+
+
+if __name__ == '__main__':
+    unittest.main()
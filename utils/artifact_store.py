@@ -0,0 +1,226 @@
+"""
+Almacenamiento Comprimido de Artefactos de Simulación
+
+Los PCAPs y el XML de FlowMonitor dominan el uso de disco de las campañas.
+Este módulo los comprime (zstd, o gzip si zstandard no está instalado) una vez
+analizados, permite leerlos de forma transparente mediante descompresión en
+streaming y aplica una política de retención que elimina los artefactos crudos
+antiguos conservando las tablas derivadas (CSV, JSON, reportes).
+"""
+
+import gzip
+import io
+import shutil
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Union
+
+from config.settings import (
+    ARTIFACT_COMPRESSION,
+    ARTIFACT_COMPRESSION_LEVEL,
+    SIMULATIONS_DIR
+)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# Extensiones de los artefactos comprimidos, por método
+COMPRESSED_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+
+# Artefactos crudos que se comprimen y que la retención puede eliminar
+RAW_ARTIFACT_PATTERNS = ('*.pcap', '*.xml')
+
+# Tamaño de bloque para copias en streaming
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_compressed(path: Union[str, Path]) -> bool:
+    """Indica si la ruta corresponde a un artefacto comprimido"""
+    return Path(path).suffix in COMPRESSED_SUFFIXES.values()
+
+
+def resolve_artifact(path: Union[str, Path]) -> Optional[Path]:
+    """
+    Localiza un artefacto, esté o no comprimido
+
+    Args:
+        path: Ruta original del artefacto (p.ej. resultados.xml)
+
+    Returns:
+        Ruta existente (original o comprimida), o None si no existe
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+
+    for suffix in COMPRESSED_SUFFIXES.values():
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+
+    return None
+
+
+def open_artifact(path: Union[str, Path], text: bool = False) -> Union[BinaryIO, io.TextIOWrapper]:
+    """
+    Abre un artefacto para lectura descomprimiendo en streaming
+
+    Args:
+        path: Ruta del artefacto (original o comprimida)
+        text: Si True, retorna un flujo de texto UTF-8
+
+    Returns:
+        Objeto archivo de lectura
+
+    Raises:
+        FileNotFoundError: Si el artefacto no existe en ninguna forma
+    """
+    resolved = resolve_artifact(path)
+    if resolved is None:
+        raise FileNotFoundError(f"Artefacto no encontrado: {path}")
+
+    if resolved.suffix == COMPRESSED_SUFFIXES['zstd']:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"zstandard no instalado, no se puede leer {resolved.name}")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(resolved, 'rb'), closefd=True)
+        stream = io.BufferedReader(stream, buffer_size=CHUNK_SIZE)
+    elif resolved.suffix == COMPRESSED_SUFFIXES['gzip']:
+        stream = gzip.open(resolved, 'rb')
+    else:
+        stream = open(resolved, 'rb')
+
+    if text:
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return stream
+
+
+def _effective_method(method: str) -> Optional[str]:
+    """Determina el método de compresión disponible (None = sin compresión)"""
+    method = (method or 'none').lower()
+    if method == 'zstd' and not ZSTD_AVAILABLE:
+        return 'gzip'
+    if method in COMPRESSED_SUFFIXES:
+        return method
+    return None
+
+
+def compress_artifact(path: Union[str, Path], method: str = ARTIFACT_COMPRESSION,
+                      level: int = ARTIFACT_COMPRESSION_LEVEL) -> Path:
+    """
+    Comprime un artefacto en streaming y elimina el original
+
+    Args:
+        path: Ruta del artefacto sin comprimir
+        method: Método de compresión ("zstd", "gzip" o "none")
+        level: Nivel de compresión
+
+    Returns:
+        Ruta del artefacto resultante (la original si no se comprimió)
+    """
+    path = Path(path)
+    method = _effective_method(method)
+    if method is None or is_compressed(path) or not path.exists():
+        return path
+
+    target = path.with_name(path.name + COMPRESSED_SUFFIXES[method])
+    tmp_target = target.with_name(target.name + '.tmp')
+
+    try:
+        with open(path, 'rb') as src, open(tmp_target, 'wb') as dst:
+            if method == 'zstd':
+                compressor = zstandard.ZstdCompressor(level=level)
+                with compressor.stream_writer(dst, closefd=False) as writer:
+                    shutil.copyfileobj(src, writer, CHUNK_SIZE)
+            else:
+                with gzip.GzipFile(fileobj=dst, mode='wb', compresslevel=min(level, 9)) as writer:
+                    shutil.copyfileobj(src, writer, CHUNK_SIZE)
+
+        # Conservar la fecha original para la política de retención
+        shutil.copystat(path, tmp_target)
+        tmp_target.replace(target)
+        path.unlink()
+    except Exception:
+        tmp_target.unlink(missing_ok=True)
+        raise
+
+    return target
+
+
+def compress_run_artifacts(results_dir: Union[str, Path],
+                           patterns: Iterable[str] = RAW_ARTIFACT_PATTERNS,
+                           method: str = ARTIFACT_COMPRESSION,
+                           level: int = ARTIFACT_COMPRESSION_LEVEL) -> Dict:
+    """
+    Comprime los artefactos crudos de un directorio de resultados
+
+    Args:
+        results_dir: Directorio de la ejecución
+        patterns: Patrones de archivos a comprimir
+        method: Método de compresión
+        level: Nivel de compresión
+
+    Returns:
+        Diccionario con archivos comprimidos y bytes antes/después
+    """
+    results_dir = Path(results_dir)
+    stats = {'compressed_files': [], 'bytes_before': 0, 'bytes_after': 0}
+
+    if _effective_method(method) is None or not results_dir.is_dir():
+        return stats
+
+    for pattern in patterns:
+        for path in sorted(results_dir.glob(pattern)):
+            size_before = path.stat().st_size
+            target = compress_artifact(path, method, level)
+            if target != path:
+                stats['compressed_files'].append(str(target))
+                stats['bytes_before'] += size_before
+                stats['bytes_after'] += target.stat().st_size
+
+    return stats
+
+
+def apply_retention_policy(max_age_days: int,
+                           results_root: Union[str, Path] = SIMULATIONS_DIR / "results",
+                           patterns: Iterable[str] = RAW_ARTIFACT_PATTERNS) -> Dict:
+    """
+    Elimina artefactos crudos más antiguos que el periodo de retención
+
+    Solo se borran PCAPs y XML (comprimidos o no); las tablas derivadas
+    (CSV, JSON, reportes, stdout) se conservan.
+
+    Args:
+        max_age_days: Antigüedad máxima en días (0 o menos = no eliminar)
+        results_root: Directorio con un subdirectorio por ejecución
+        patterns: Patrones de artefactos crudos
+
+    Returns:
+        Diccionario con archivos eliminados y bytes liberados
+    """
+    stats = {'removed_files': 0, 'bytes_freed': 0}
+    results_root = Path(results_root)
+
+    if max_age_days <= 0 or not results_root.is_dir():
+        return stats
+
+    cutoff = time.time() - max_age_days * 86400
+    expanded: List[str] = []
+    for pattern in patterns:
+        expanded.append(pattern)
+        expanded.extend(pattern + suffix for suffix in COMPRESSED_SUFFIXES.values())
+
+    for pattern in expanded:
+        for path in results_root.rglob(pattern):
+            if not path.is_file():
+                continue
+            file_stat = path.stat()
+            if file_stat.st_mtime < cutoff:
+                path.unlink()
+                stats['removed_files'] += 1
+                stats['bytes_freed'] += file_stat.st_size
+
+    return stats
@@ -0,0 +1,135 @@
+"""
+Ejecución por Lotes de Semillas
+
+En escenarios pequeños el arranque del proceso (intérprete + bindings de NS-3)
+domina el tiempo de ejecución. Este módulo genera un script lanzador que
+importa una sola vez el script de simulación y ejecuta su main() para varias
+semillas de forma secuencial, reiniciando el Simulator entre ejecuciones y
+separando las salidas (FlowMonitor, PCAP, metadatos) por semilla.
+
+Cada semilla se aplica igual que en una ejecución individual: el script la
+recibe en SIMULATION_SEED (que su main() pasa a RngSeedManager.SetSeed) y el
+lanzador llama además a SetSeed para los scripts que no la definen, de modo
+que ambos modos producen las mismas secuencias aleatorias.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+# Nombre del manifiesto que escribe el lanzador
+BATCH_MANIFEST = "batch_manifest.json"
+
+# Artefactos que el script deja en el directorio de trabajo
+SEED_OUTPUT_PATTERNS = ("resultados.xml", "simulacion-*.pcap", "simulation_metadata.json")
+
+BATCH_RUNNER_TEMPLATE = '''#!/usr/bin/env python3
+"""
+Lanzador por lotes generado automáticamente
+Ejecuta {script_name} para {n_seeds} semilla(s) en un único proceso
+"""
+import glob
+import json
+import runpy
+import shutil
+import sys
+import time
+import traceback
+from pathlib import Path
+
+SCRIPT = {script!r}
+SEEDS = {seeds!r}
+OUTPUT_DIR = Path({output_dir!r})
+OUTPUT_PATTERNS = {patterns!r}
+
+# Cargar el script sin ejecutar su bloque __main__
+module = runpy.run_path(SCRIPT, run_name="a2a_batch")
+main = module["main"]
+
+import ns.core
+
+manifest = []
+for index, seed in enumerate(SEEDS, 1):
+    seed_dir = OUTPUT_DIR / f"seed_{{seed}}"
+    seed_dir.mkdir(parents=True, exist_ok=True)
+    entry = {{"seed": seed, "status": "completed", "output_dir": str(seed_dir)}}
+    start = time.time()
+    print(f"[batch] Semilla {{seed}} ({{index}}/{{len(SEEDS)}})", flush=True)
+
+    try:
+        # Mismo esquema que una ejecución individual: SetSeed(semilla), RngRun por defecto
+        if "SIMULATION_SEED" in main.__globals__:
+            main.__globals__["SIMULATION_SEED"] = seed
+        ns.core.RngSeedManager.SetSeed(seed)
+        returncode = main()
+        if returncode not in (None, 0):
+            entry["status"] = "failed"
+            entry["error"] = f"main() retornó {{returncode}}"
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            entry["status"] = "failed"
+            entry["error"] = f"sys.exit({{e.code}})"
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{{type(e).__name__}}: {{e}}"
+        traceback.print_exc()
+    finally:
+        # Reiniciar el simulador para la siguiente semilla
+        try:
+            ns.core.Simulator.Destroy()
+        except Exception:
+            pass
+
+    for pattern in OUTPUT_PATTERNS:
+        for path in glob.glob(pattern):
+            shutil.move(path, str(seed_dir / Path(path).name))
+
+    entry["execution_time"] = time.time() - start
+    manifest.append(entry)
+
+with open(OUTPUT_DIR / {manifest!r}, "w") as f:
+    json.dump(manifest, f, indent=2)
+
+sys.exit(0 if any(e["status"] == "completed" for e in manifest) else 1)
+'''
+
+
+def build_batch_runner(script_path: Path, seeds: List[int], output_dir: Path) -> str:
+    """
+    Genera el código del lanzador por lotes
+
+    Args:
+        script_path: Script de simulación (debe definir main())
+        seeds: Semillas a ejecutar (se aplican con RngSeedManager.SetSeed)
+        output_dir: Directorio donde se separan las salidas por semilla
+
+    Returns:
+        Código Python del lanzador
+    """
+    return BATCH_RUNNER_TEMPLATE.format(
+        script_name=Path(script_path).name,
+        n_seeds=len(seeds),
+        script=str(script_path),
+        seeds=[int(seed) for seed in seeds],
+        output_dir=str(output_dir),
+        patterns=SEED_OUTPUT_PATTERNS,
+        manifest=BATCH_MANIFEST
+    )
+
+
+def load_batch_manifest(output_dir: Path) -> List[Dict]:
+    """
+    Lee el manifiesto escrito por el lanzador
+
+    Args:
+        output_dir: Directorio de salida del lote
+
+    Returns:
+        Lista de entradas por semilla (vacía si el lanzador no llegó a escribirlo)
+    """
+    manifest_file = Path(output_dir) / BATCH_MANIFEST
+    if not manifest_file.exists():
+        return []
+
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,255 @@
+"""
+Caché Persistente del Sistema A2A
+
+Almacén clave-valor respaldado por SQLite, compartido por los distintos
+cachés del sistema (resultados de simulación, respuestas LLM, literatura,
+embeddings).
+Soporta expiración por TTL, desalojo LRU y métricas de aciertos/fallos.
+Es seguro para varios procesos escribiendo sobre el mismo archivo.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Claves por sentencia en las operaciones por lotes (límite de variables de SQLite)
+BULK_CHUNK = 500
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Genera una clave de caché estable a partir de sus componentes
+
+    Args:
+        *parts: Componentes serializables de la clave
+
+    Returns:
+        Hash SHA-256 hexadecimal
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PersistentCache:
+    """
+    Caché clave-valor persistente en SQLite.
+
+    Cada instancia opera sobre un espacio de nombres dentro del archivo,
+    de modo que varios cachés pueden compartir la misma base de datos.
+    """
+
+    def __init__(self, db_path: Path, namespace: str = "default",
+                 ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Inicializa el caché
+
+        Args:
+            db_path: Ruta al archivo SQLite
+            namespace: Espacio de nombres de las entradas
+            ttl_seconds: Tiempo de vida de cada entrada (None = sin expiración)
+            max_entries: Máximo de entradas antes de desalojar por LRU (None = sin límite)
+        """
+        self.db_path = Path(db_path)
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        """Abre una conexión (una por operación, segura entre hilos y procesos)"""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cache_entries (
+                        namespace TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL,
+                        PRIMARY KEY (namespace, key)
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_cache_lru "
+                    "ON cache_entries (namespace, last_access)"
+                )
+                self._initialized = True
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _is_expired(self, created_at: float) -> bool:
+        """Indica si una entrada superó su TTL"""
+        return self.ttl_seconds is not None and (time.time() - created_at) > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Obtiene un valor del caché
+
+        Args:
+            key: Clave de la entrada
+
+        Returns:
+            Valor almacenado, o None si no existe o expiró
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+
+            if row is None or self._is_expired(row[1]):
+                if row is not None:
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                        (self.namespace, key)
+                    )
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (time.time(), self.namespace, key)
+            )
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        """
+        Guarda un valor en el caché (debe ser serializable a JSON)
+
+        Args:
+            key: Clave de la entrada
+            value: Valor a almacenar
+        """
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, now, now)
+            )
+            self._evict(conn)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Obtiene varios valores con una sola conexión
+
+        Args:
+            keys: Claves de las entradas
+
+        Returns:
+            Diccionario clave -> valor con las entradas presentes y vigentes
+        """
+        found: Dict[str, Any] = {}
+        unique = list(dict.fromkeys(keys))
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            for start in range(0, len(unique), BULK_CHUNK):
+                chunk = unique[start:start + BULK_CHUNK]
+                rows = conn.execute(
+                    f"SELECT key, value, created_at FROM cache_entries "
+                    f"WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [self.namespace, *chunk]
+                ).fetchall()
+                live = [(key, value) for key, value, created_at in rows if not self._is_expired(created_at)]
+                conn.executemany(
+                    "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                    [(now, self.namespace, key) for key, _ in live]
+                )
+                found.update((key, json.loads(value)) for key, value in live)
+
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, Any]):
+        """
+        Guarda varios valores en una sola transacción
+
+        Args:
+            items: Diccionario clave -> valor (serializable a JSON)
+        """
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (self.namespace, key, json.dumps(value, ensure_ascii=False, default=str), now, now)
+            for key, value in items.items()
+        ]
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict(conn)
+
+    def delete(self, key: str):
+        """Elimina una entrada del caché"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            )
+
+    def clear(self):
+        """Elimina todas las entradas del espacio de nombres"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Elimina entradas expiradas y las menos usadas si se supera el límite"""
+        if self.ttl_seconds is not None:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?",
+                (self.namespace, time.time() - self.ttl_seconds)
+            )
+
+        if self.max_entries is not None:
+            conn.execute(
+                """
+                DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.namespace, self.namespace, self.max_entries)
+            )
+
+    def __len__(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()[0]
+
+    def get_stats(self) -> Dict:
+        """Retorna estadísticas del caché"""
+        total = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total > 0 else 0.0,
+            'db_path': str(self.db_path)
+        }
@@ -0,0 +1,205 @@
+"""
+Perfiles de Captura PCAP
+
+Los scripts generados habilitan PCAP en todos los dispositivos, de modo que la
+escritura de trazas domina la E/S de la simulación con muchos nodos. Un perfil
+de captura reescribe la llamada EnablePcapAll del script para limitar la
+captura a un subconjunto de nodos y/o truncar cada paquete a sus cabeceras,
+y declara qué análisis de trazas siguen siendo válidos con la captura reducida.
+"""
+
+import ast
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Prefijo de los archivos PCAP (el simulador busca simulacion-*.pcap)
+PCAP_PREFIX = "simulacion"
+
+# Análisis del trace analyzer
+ALL_ANALYSES = ['basic_stats', 'protocols', 'routing', 'conversations', 'retransmissions']
+
+CAPTURE_PROFILES: Dict[str, Dict] = {
+    'full': {
+        'description': 'Todos los nodos, paquetes completos',
+        'enabled': True,
+        'snaplen': None,
+        'max_nodes': None,
+        'analyses': ALL_ANALYSES
+    },
+    'headers': {
+        'description': 'Todos los nodos, solo cabeceras (802.11 + IP + UDP/TCP + enrutamiento)',
+        'enabled': True,
+        'snaplen': 128,
+        'max_nodes': None,
+        'analyses': ALL_ANALYSES
+    },
+    'routing': {
+        'description': 'Subconjunto de nodos, paquetes de control completos y datos truncados',
+        'enabled': True,
+        'snaplen': 256,
+        'max_nodes': 5,
+        'analyses': ['basic_stats', 'protocols', 'routing']
+    },
+    'none': {
+        'description': 'Sin captura PCAP',
+        'enabled': False,
+        'snaplen': None,
+        'max_nodes': None,
+        'analyses': []
+    }
+}
+
+# Llamada a reescribir en scripts que no compilan: <indent><helper>.EnablePcapAll(<args>)
+# (los scripts válidos se analizan con ast, que admite argumentos en varias líneas)
+ENABLE_PCAP_ALL_PATTERN = re.compile(
+    r'^(?P<indent>[ \t]*)(?P<helper>[A-Za-z_][\w\.]*)\.EnablePcapAll\((?P<args>.*)\)[ \t]*(?:#.*)?$',
+    re.MULTILINE
+)
+
+# Comentario que marca un bloque de captura ya generado
+PROFILE_MARKER_PATTERN = re.compile(r"# Captura PCAP \(perfil '(\w+)'\)")
+
+
+def get_capture_profile(name: Optional[str]) -> Dict:
+    """
+    Obtiene la definición de un perfil de captura
+
+    Args:
+        name: Nombre del perfil (None = 'full')
+
+    Returns:
+        Diccionario con la definición del perfil (incluye 'name')
+
+    Raises:
+        ValueError: Si el perfil no existe
+    """
+    name = (name or 'full').lower()
+    if name not in CAPTURE_PROFILES:
+        raise ValueError(
+            f"Perfil de captura desconocido: {name}. "
+            f"Disponibles: {', '.join(CAPTURE_PROFILES)}"
+        )
+    return {'name': name, **CAPTURE_PROFILES[name]}
+
+
+def find_enable_pcap_all(code: str) -> Optional[List[Tuple[int, int, str, str]]]:
+    """
+    Localiza las sentencias EnablePcapAll del script con ast
+
+    Args:
+        code: Código del script
+
+    Returns:
+        Lista de (primera línea, última línea, indentación, helper), con las
+        líneas numeradas desde 1, o None si el script no es Python válido
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    lines = code.split("\n")
+    calls = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+                and isinstance(node.value.func, ast.Attribute)
+                and node.value.func.attr == 'EnablePcapAll'):
+            continue
+
+        # Solo sentencias que ocupan sus líneas completas (salvo un comentario final)
+        indent = lines[node.lineno - 1][:node.col_offset]
+        rest = lines[node.end_lineno - 1].encode('utf-8')[node.end_col_offset:].decode('utf-8').strip()
+        if indent.strip() or (rest and not rest.startswith('#')):
+            continue
+
+        helper = ast.get_source_segment(code, node.value.func.value)
+        calls.append((node.lineno, node.end_lineno, indent, helper))
+    return sorted(calls)
+
+
+def render_capture_block(profile: Dict, helper: str, indent: str = "") -> List[str]:
+    """
+    Genera las líneas de código que habilitan la captura según el perfil
+
+    Args:
+        profile: Definición del perfil
+        helper: Variable del helper PHY del script (p.ej. 'phy')
+        indent: Indentación de la llamada original
+
+    Returns:
+        Líneas de código Python
+    """
+    lines = [f"{indent}# Captura PCAP (perfil '{profile['name']}'): {profile['description']}"]
+
+    if not profile['enabled']:
+        # La llamada pudo ser la única sentencia de su bloque (if/for/with)
+        lines.append(f"{indent}pass")
+        return lines
+
+    if profile['snaplen']:
+        lines.append(
+            f'{indent}ns.core.Config.SetDefault("ns3::PcapFileWrapper::CaptureSize", '
+            f'ns.core.UintegerValue({profile["snaplen"]}))'
+        )
+
+    max_nodes = profile['max_nodes']
+    if max_nodes:
+        lines.extend([
+            f"{indent}capture_stride = max(1, ns.network.NodeList.GetNNodes() // {max_nodes})",
+            f"{indent}for capture_node_id in range(0, ns.network.NodeList.GetNNodes(), capture_stride)[:{max_nodes}]:",
+            f'{indent}    {helper}.EnablePcap("{PCAP_PREFIX}", '
+            f'ns.network.NodeContainer(ns.network.NodeList.GetNode(capture_node_id)), True)'
+        ])
+    else:
+        lines.append(f'{indent}{helper}.EnablePcapAll("{PCAP_PREFIX}", True)')
+
+    return lines
+
+
+def apply_capture_profile(code: str, profile_name: Optional[str]) -> str:
+    """
+    Reescribe las llamadas EnablePcapAll del script según el perfil
+
+    El perfil 'full' deja el script intacto. Un script que ya tiene un
+    perfil aplicado no se reescribe de nuevo.
+
+    Args:
+        code: Código del script de simulación
+        profile_name: Nombre del perfil de captura
+
+    Returns:
+        Código con la captura configurada
+    """
+    profile = get_capture_profile(profile_name)
+    if profile['name'] == 'full' or PROFILE_MARKER_PATTERN.search(code):
+        return code
+
+    calls = find_enable_pcap_all(code)
+    if calls is None:
+        def replace(match: re.Match) -> str:
+            return "\n".join(render_capture_block(profile, match.group('helper'), match.group('indent')))
+
+        return ENABLE_PCAP_ALL_PATTERN.sub(replace, code)
+
+    lines = code.split("\n")
+    for first, last, indent, helper in reversed(calls):
+        lines[first - 1:last] = render_capture_block(profile, helper, indent)
+    return "\n".join(lines)
+
+
+def detect_capture_profile(code: str) -> Optional[str]:
+    """
+    Detecta el perfil de captura aplicado a un script
+
+    Args:
+        code: Código del script
+
+    Returns:
+        Nombre del perfil, 'full' si usa EnablePcapAll sin perfil, o None
+    """
+    match = PROFILE_MARKER_PATTERN.search(code)
+    if match:
+        return match.group(1)
+    calls = find_enable_pcap_all(code)
+    found = calls if calls is not None else ENABLE_PCAP_ALL_PATTERN.search(code)
+    return 'full' if found else None
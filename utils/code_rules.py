@@ -0,0 +1,290 @@
+"""
+Reglas Deterministas de Revisión de Código
+
+El crítico gastaba una llamada al LLM para comprobaciones mecánicas ("si se
+pide AODV, ¿usa AODV?", "¿se recolectan métricas?"). Este módulo extrae los
+requisitos de la tarea (protocolo, número de nodos, modelo de movilidad) y
+analiza el AST del script generado para verificar helper de enrutamiento,
+movilidad, nodos creados, FlowMonitor y captura PCAP. El crítico LLM solo se
+consulta cuando las reglas pasan pero no bastan para decidir.
+"""
+
+import ast
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+# Veredictos del pre-crítico
+VERDICT_APPROVED = "approved"
+VERDICT_REJECTED = "rejected"
+VERDICT_AMBIGUOUS = "ambiguous"
+
+# Protocolo -> helpers NS-3 que lo instalan
+PROTOCOL_HELPERS: Dict[str, Tuple[str, ...]] = {
+    'AODV': ('AodvHelper',),
+    'OLSR': ('OlsrHelper',),
+    'DSDV': ('DsdvHelper',),
+    'DSR': ('DsrHelper', 'DsrMainHelper'),
+    'HWMP': ('MeshHelper',),
+}
+
+# Modelo de movilidad -> (patrón en la tarea, nombre del modelo NS-3)
+MOBILITY_MODELS: Dict[str, Tuple[str, str]] = {
+    'RandomWaypoint': (r'random\s*-?\s*waypoint|\brwp\b', 'RandomWaypointMobilityModel'),
+    'RandomWalk2d': (r'random\s*-?\s*walk', 'RandomWalk2dMobilityModel'),
+    'RandomDirection2d': (r'random\s*-?\s*direction', 'RandomDirection2dMobilityModel'),
+    'GaussMarkov': (r'gauss\s*-?\s*markov', 'GaussMarkovMobilityModel'),
+    'ConstantPosition': (r'est[aá]tic|\bstatic\b|sin movilidad|constant\s*position',
+                         'ConstantPositionMobilityModel'),
+}
+
+NODES_PATTERN = re.compile(r'(\d+)\s*(?:nodos|nodes|nodo|node)\b', re.IGNORECASE)
+
+PCAP_CALLS = ('EnablePcapAll', 'EnablePcap', 'EnablePcapInternal')
+FLOW_MONITOR_INSTALL = ('InstallAll', 'Install')
+
+
+@dataclass
+class TaskRequirements:
+    """Requisitos verificables extraídos de la descripción de la tarea"""
+    protocols: List[str] = field(default_factory=list)
+    num_nodes: Optional[int] = None
+    mobility: Optional[str] = None
+
+
+def parse_task_requirements(task: str) -> TaskRequirements:
+    """
+    Extrae protocolo, número de nodos y movilidad de la descripción de la tarea
+
+    Args:
+        task: Descripción de la tarea en lenguaje natural
+
+    Returns:
+        Requisitos encontrados (los campos no mencionados quedan vacíos)
+    """
+    protocols = [name for name in PROTOCOL_HELPERS
+                 if re.search(rf'\b{name}\b', task, re.IGNORECASE)]
+
+    nodes_match = NODES_PATTERN.search(task)
+    mobility = next((name for name, (pattern, _) in MOBILITY_MODELS.items()
+                     if re.search(pattern, task, re.IGNORECASE)), None)
+
+    return TaskRequirements(
+        protocols=protocols,
+        num_nodes=int(nodes_match.group(1)) if nodes_match else None,
+        mobility=mobility
+    )
+
+
+def _dotted_name(node: ast.AST) -> str:
+    """Nombre con puntos de una expresión (p.ej. 'ns.aodv.AodvHelper')"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+class CodeFacts(ast.NodeVisitor):
+    """
+    Hechos del script relevantes para las reglas: nombres referenciados,
+    cadenas literales, métodos llamados, nodos creados y FlowMonitor.
+    """
+
+    def __init__(self):
+        self.names: Set[str] = set()
+        self.strings: List[str] = []
+        self.calls: Set[str] = set()
+        self.imports: Set[str] = set()
+        self.int_assignments: Dict[str, int] = {}
+        self.create_args: List[ast.AST] = []
+        self.flowmon_vars: Set[str] = set()
+        self.flowmon_installed = False
+
+    def visit_Import(self, node: ast.Import):
+        self.imports.update(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self.imports.add(node.module)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        self.names.add(node.attr)
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name):
+        self.names.add(node.id)
+
+    def visit_Constant(self, node: ast.Constant):
+        if isinstance(node.value, str):
+            self.strings.append(node.value)
+
+    def visit_Assign(self, node: ast.Assign):
+        targets = [t.id for t in node.targets if isinstance(t, ast.Name)]
+        value = node.value
+        if isinstance(value, ast.Constant) and isinstance(value.value, int) \
+                and not isinstance(value.value, bool):
+            for target in targets:
+                self.int_assignments[target] = value.value
+        if isinstance(value, ast.Call) and _dotted_name(value.func).endswith('FlowMonitorHelper'):
+            self.flowmon_vars.update(targets)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Attribute):
+            method = node.func.attr
+            self.calls.add(method)
+            receiver = node.func.value
+            if method == 'Create' and node.args:
+                self.create_args.append(node.args[0])
+            if method in FLOW_MONITOR_INSTALL:
+                # flowmon_helper.InstallAll() o FlowMonitorHelper().InstallAll()
+                if (isinstance(receiver, ast.Name) and receiver.id in self.flowmon_vars) or \
+                        (isinstance(receiver, ast.Call)
+                         and _dotted_name(receiver.func).endswith('FlowMonitorHelper')):
+                    self.flowmon_installed = True
+        self.generic_visit(node)
+
+    def created_node_counts(self) -> Tuple[List[int], bool]:
+        """
+        Valores pasados a NodeContainer.Create()
+
+        Returns:
+            Tupla (valores resueltos, hay argumentos no resueltos)
+        """
+        values, unresolved = [], False
+        for arg in self.create_args:
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, int):
+                values.append(arg.value)
+            elif isinstance(arg, ast.Name) and arg.id in self.int_assignments:
+                values.append(self.int_assignments[arg.id])
+            else:
+                unresolved = True
+        return values, unresolved
+
+
+@dataclass
+class RuleCheck:
+    """Resultado de una regla: passed=None si no se puede decidir"""
+    name: str
+    passed: Optional[bool]
+    message: str
+
+
+@dataclass
+class RuleReport:
+    """Resultado del pre-crítico"""
+    checks: List[RuleCheck]
+    requirements: TaskRequirements
+
+    @property
+    def failures(self) -> List[RuleCheck]:
+        return [check for check in self.checks if check.passed is False]
+
+    @property
+    def verdict(self) -> str:
+        """
+        Rechazado si falla alguna regla; aprobado solo si la tarea declara un
+        protocolo y todas las reglas se pudieron decidir; ambiguo en otro caso
+        """
+        if self.failures:
+            return VERDICT_REJECTED
+        if not self.checks or any(check.passed is None for check in self.checks):
+            return VERDICT_AMBIGUOUS
+        return VERDICT_APPROVED
+
+    @property
+    def critique(self) -> str:
+        """Crítica legible con los fallos (o el resumen de reglas superadas)"""
+        if self.failures:
+            return " ".join(check.message for check in self.failures)
+        return "Aprobado (reglas deterministas): " + ", ".join(
+            check.name for check in self.checks if check.passed)
+
+
+def check_code_rules(task: str, code: str, capture_enabled: bool = True) -> RuleReport:
+    """
+    Verifica el script generado contra los requisitos de la tarea
+
+    Args:
+        task: Descripción de la tarea
+        code: Código Python generado
+        capture_enabled: Si el perfil de captura activo requiere PCAP
+
+    Returns:
+        Informe con una comprobación por regla y su veredicto
+    """
+    requirements = parse_task_requirements(task)
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        # La sintaxis la valida el coder; sin AST no hay reglas que aplicar
+        return RuleReport([], requirements)
+
+    facts = CodeFacts()
+    facts.visit(tree)
+
+    # Sin imports de NS-3 las reglas no aplican: decide el crítico LLM
+    if not any(module == 'ns' or module.startswith('ns.') for module in facts.imports):
+        return RuleReport([], requirements)
+
+    checks: List[RuleCheck] = []
+
+    # 1. Protocolo de enrutamiento
+    if len(requirements.protocols) == 1:
+        protocol = requirements.protocols[0]
+        helpers = PROTOCOL_HELPERS[protocol]
+        used = any(helper in facts.names for helper in helpers)
+        checks.append(RuleCheck(
+            'protocolo', used,
+            f"La tarea pide {protocol} pero el código no usa {' ni '.join(helpers)}."
+        ))
+    else:
+        # Sin protocolo o comparación de varios: requiere revisión del LLM
+        checks.append(RuleCheck('protocolo', None, "Protocolo no determinado por la tarea."))
+
+    # 2. Modelo de movilidad
+    if requirements.mobility:
+        model = MOBILITY_MODELS[requirements.mobility][1]
+        used = model in facts.names or any(model in text for text in facts.strings)
+        checks.append(RuleCheck(
+            'movilidad', used,
+            f"La tarea pide movilidad {requirements.mobility} pero el código no usa {model}."
+        ))
+
+    # 3. Número de nodos
+    if requirements.num_nodes is not None:
+        counts, unresolved = facts.created_node_counts()
+        if requirements.num_nodes in counts:
+            passed = True
+        elif unresolved or not counts:
+            passed = None
+        else:
+            passed = False
+        checks.append(RuleCheck(
+            'nodos', passed,
+            f"La tarea pide {requirements.num_nodes} nodos pero el código crea "
+            f"{', '.join(map(str, counts)) or 'un número no determinado de'} nodos."
+        ))
+
+    # 4. FlowMonitor (métricas PDR, retardo, throughput)
+    if 'FlowMonitorHelper' not in facts.names:
+        flowmon = False
+    else:
+        flowmon = True if facts.flowmon_installed else None
+    checks.append(RuleCheck(
+        'flowmonitor', flowmon,
+        "El código no instala FlowMonitor, no se recolectarán métricas."
+    ))
+
+    # 5. Captura PCAP
+    if capture_enabled:
+        checks.append(RuleCheck(
+            'pcap', any(call in facts.calls for call in PCAP_CALLS),
+            "El código no habilita la captura PCAP (EnablePcapAll)."
+        ))
+
+    return RuleReport(checks, requirements)
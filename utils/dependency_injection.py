@@ -5,15 +5,19 @@ Elimina hardcoded dependencies y permite configuración flexible
 """
 
 import os
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Optional, Protocol
+from typing import Dict, Any, List, Optional, Protocol, Union
 from enum import Enum
 
+import httpx
 import requests
 from langchain_ollama import ChatOllama
 
+from utils.llm_cache import cached_llm
+
 
 class Environment(Enum):
     """Ambientes de ejecución"""
@@ -54,6 +58,9 @@ class OllamaConfig:
     coding_model: str
     embedding_model: str
     timeout: int = 120
+    max_connections: int = 10
+    keepalive_expiry: float = 300.0
+    keep_alive: Optional[Union[int, str]] = "30m"
     
     def __post_init__(self):
         """Valida configuración"""
@@ -150,7 +157,10 @@ class EnvironmentConfigProvider(ConfigProvider):
             reasoning_model=os.getenv('MODEL_REASONING', 'llama3.1:8b'),
             coding_model=os.getenv('MODEL_CODING', 'llama3.1:8b'),
             embedding_model=os.getenv('MODEL_EMBEDDING', 'nomic-embed-text'),
-            timeout=int(os.getenv('LLM_TIMEOUT', '120'))
+            timeout=int(os.getenv('LLM_TIMEOUT', '120')),
+            max_connections=int(os.getenv('OLLAMA_MAX_CONNECTIONS', '10')),
+            keepalive_expiry=float(os.getenv('OLLAMA_KEEPALIVE_EXPIRY', '300')),
+            keep_alive=parse_keep_alive(os.getenv('OLLAMA_KEEP_ALIVE', '30m'))
         )
     
     def get_database_config(self) -> DatabaseConfig:
@@ -212,36 +222,65 @@ class ServiceContainer:
 
 
 # Factories para servicios
-def create_ollama_client(container: ServiceContainer) -> ChatOllama:
-    """Factory para cliente Ollama"""
-    config = container.get_config().get_ollama_config()
+def parse_keep_alive(value: Optional[str]) -> Optional[Union[int, str]]:
+    """
+    Interpreta OLLAMA_KEEP_ALIVE: duración ("30m", "2h") o segundos ("-1" = siempre)
+    """
+    if value is None or value.strip() == "":
+        return None
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def pooled_client_kwargs(config: OllamaConfig) -> Dict[str, Any]:
+    """
+    Argumentos del cliente httpx con conexiones keep-alive reutilizables
+    
+    Las llamadas LLM están espaciadas por decenas de segundos, por lo que
+    las conexiones se mantienen abiertas más que el valor por defecto de httpx.
+    """
+    return {
+        'timeout': config.timeout,
+        'limits': httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_connections,
+            keepalive_expiry=config.keepalive_expiry
+        )
+    }
+
+
+def create_llm_client(config: OllamaConfig, model: str, temperature: Optional[float] = None,
+                      **options) -> ChatOllama:
+    """Factory para un cliente LLM con conexiones agrupadas"""
+    options.setdefault('keep_alive', config.keep_alive)
     return ChatOllama(
         base_url=config.base_url,
-        model=config.reasoning_model,
-        timeout=config.timeout
+        model=model,
+        temperature=temperature,
+        client_kwargs=pooled_client_kwargs(config),
+        **options
     )
 
 
+def create_ollama_client(container: ServiceContainer) -> ChatOllama:
+    """Factory para cliente Ollama"""
+    config = container.get_config().get_ollama_config()
+    return create_llm_client(config, config.reasoning_model)
+
+
 def create_coding_llm(container: ServiceContainer) -> ChatOllama:
     """Factory para LLM de coding"""
     config = container.get_config().get_ollama_config()
-    return ChatOllama(
-        base_url=config.base_url,
-        model=config.coding_model,
-        temperature=0.05,
-        timeout=config.timeout
-    )
+    return create_llm_client(config, config.coding_model, temperature=0.05)
 
 
 def create_reasoning_llm(container: ServiceContainer) -> ChatOllama:
     """Factory para LLM de razonamiento"""
     config = container.get_config().get_ollama_config()
-    return ChatOllama(
-        base_url=config.base_url,
-        model=config.reasoning_model,
-        temperature=0.1,
-        timeout=config.timeout
-    )
+    return create_llm_client(config, config.reasoning_model, temperature=0.1)
 
 
 def create_requests_session(container: ServiceContainer) -> requests.Session:
@@ -274,6 +313,8 @@ class DIContainer:
         self.environment = environment
         self.config_provider = EnvironmentConfigProvider(environment)
         self.container = ServiceContainer(self.config_provider)
+        self._llm_clients: Dict[tuple, ChatOllama] = {}
+        self._llm_lock = threading.Lock()
         self._register_services()
     
     def _register_services(self):
@@ -298,6 +339,29 @@ class DIContainer:
         """Obtiene LLM para razonamiento"""
         return self.container.get('reasoning_llm')
     
+    def get_llm(self, model: str, temperature: Optional[float] = None, **options) -> ChatOllama:
+        """
+        Obtiene un cliente LLM compartido del registro
+        
+        Cada combinación (modelo, temperatura, opciones) se construye una sola
+        vez, en el primer uso, y reutiliza sus conexiones HTTP entre llamadas.
+        
+        Args:
+            model: Nombre del modelo en Ollama
+            temperature: Temperatura de muestreo
+            **options: Parámetros adicionales de ChatOllama
+            
+        Returns:
+            Cliente ChatOllama compartido
+        """
+        key = (model, temperature, tuple(sorted(options.items())))
+        
+        with self._llm_lock:
+            if key not in self._llm_clients:
+                config = self.config_provider.get_ollama_config()
+                self._llm_clients[key] = create_llm_client(config, model, temperature, **options)
+            return self._llm_clients[key]
+    
     def get_requests_session(self) -> requests.Session:
         """Obtiene sesión HTTP"""
         return self.container.get('requests_session')
@@ -385,6 +449,24 @@ def get_reasoning_llm() -> ChatOllama:
     return get_di_container().get_reasoning_llm()
 
 
+def get_llm(model: str, temperature: Optional[float] = None, agent: Optional[str] = None,
+            **options):
+    """
+    Obtiene un cliente LLM compartido desde DI container
+    
+    Args:
+        model: Nombre del modelo en Ollama
+        temperature: Temperatura de muestreo
+        agent: Agente que lo usa; si se indica, el cliente se envuelve con el caché LLM
+        **options: Parámetros adicionales de ChatOllama
+        
+    Returns:
+        Cliente LLM (envuelto con caché si se indicó agente)
+    """
+    llm = get_di_container().get_llm(model, temperature, **options)
+    return cached_llm(llm, agent) if agent else llm
+
+
 def get_ns3_config() -> NS3Config:
     """Obtiene configuración NS-3 desde DI container"""
     return get_di_container().get_ns3_config()
@@ -0,0 +1,390 @@
+"""
+Embeddings Locales con Caché en Disco
+
+RAG dependía de la función de embedding por defecto de ChromaDB y
+MODEL_EMBEDDING no se usaba. Este módulo ofrece backends de embedding
+intercambiables (EMBEDDING_BACKEND) que se ejecutan en el propio proceso y en
+CPU, con inferencia por lotes y un caché en disco indexado por el hash del
+texto, de modo que un documento solo se embebe una vez por modelo. La misma
+función la comparten el almacén vectorial del investigador y la memoria
+episódica, y mide su rendimiento en documentos por segundo.
+
+Backends disponibles:
+    - chroma: modelo ONNX por defecto de ChromaDB (all-MiniLM-L6-v2)
+    - sentence_transformers: EMBEDDING_LOCAL_MODEL con sentence-transformers en CPU
+    - hashing: vectores de términos por hashing (sin descargas; CI y sin conexión)
+    - ollama: MODEL_EMBEDDING servido por Ollama
+"""
+
+import base64
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.cache import PersistentCache, make_cache_key
+
+# Valores por defecto si la configuración no está disponible
+DEFAULT_BACKEND = "chroma"
+DEFAULT_LOCAL_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CACHE_MAX_ENTRIES = 50000
+
+
+class EmbeddingBackend:
+    """
+    Modelo de embedding: recibe un lote de textos y retorna una matriz.
+
+    Las subclases implementan embed(); model_id identifica el modelo en las
+    claves del caché (embeddings de modelos distintos no se mezclan).
+    """
+
+    name = "base"
+
+    @property
+    def model_id(self) -> str:
+        return self.name
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeddings de un lote de textos (una fila por texto)"""
+        raise NotImplementedError
+
+
+class ChromaDefaultBackend(EmbeddingBackend):
+    """Modelo ONNX por defecto de ChromaDB (el comportamiento previo)"""
+
+    name = "chroma"
+
+    def __init__(self):
+        self._function = None
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{DEFAULT_LOCAL_MODEL}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self._function is None:
+            from chromadb.utils import embedding_functions
+            self._function = embedding_functions.DefaultEmbeddingFunction()
+        return np.asarray(self._function(texts), dtype=np.float32)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Modelo de sentence-transformers cargado en el proceso, en CPU"""
+
+    name = "sentence_transformers"
+
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL):
+        self.model_name = model_name
+        self._model = None
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device="cpu")
+        return np.asarray(self._model.encode(
+            texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True
+        ), dtype=np.float32)
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Vectores de unigramas y bigramas proyectados por hashing y normalizados.
+
+    No es un modelo semántico, pero es determinista, rápido y no descarga
+    nada: útil para runners sin conexión y para los tests.
+    """
+
+    name = "hashing"
+
+    def __init__(self, n_features: int = 512):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.n_features = n_features
+        self.vectorizer = HashingVectorizer(n_features=n_features, ngram_range=(1, 2), norm='l2')
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.n_features}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.vectorizer.transform(texts).toarray().astype(np.float32)
+
+
+class OllamaBackend(EmbeddingBackend):
+    """MODEL_EMBEDDING servido por Ollama"""
+
+    name = "ollama"
+
+    def __init__(self, model: str, base_url: str):
+        self.model = model
+        self.base_url = base_url
+        self._client = None
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self._client is None:
+            from langchain_ollama import OllamaEmbeddings
+            self._client = OllamaEmbeddings(model=self.model, base_url=self.base_url)
+        return np.asarray(self._client.embed_documents(texts), dtype=np.float32)
+
+
+def _setting(name: str, default, expected_type):
+    """Lee un valor de configuración con su tipo (o el valor por defecto)"""
+    try:
+        import config.settings as settings
+    except ImportError:
+        return default
+    value = getattr(settings, name, default)
+    if expected_type is bool:
+        return value if isinstance(value, bool) else default
+    return value if isinstance(value, expected_type) and not isinstance(value, bool) else default
+
+
+# Backends registrados: nombre -> fábrica
+EMBEDDING_BACKENDS: Dict[str, Callable[[], EmbeddingBackend]] = {
+    'chroma': ChromaDefaultBackend,
+    'sentence_transformers': lambda: SentenceTransformerBackend(
+        _setting('EMBEDDING_LOCAL_MODEL', DEFAULT_LOCAL_MODEL, str)
+    ),
+    'hashing': HashingBackend,
+    'ollama': lambda: OllamaBackend(
+        _setting('MODEL_EMBEDDING', "nomic-embed-text", str),
+        _setting('OLLAMA_BASE_URL', "http://localhost:11434", str)
+    ),
+}
+
+
+def register_embedding_backend(name: str, factory: Callable[[], EmbeddingBackend]):
+    """
+    Registra un backend de embedding seleccionable con EMBEDDING_BACKEND
+
+    Args:
+        name: Nombre del backend
+        factory: Función sin argumentos que construye el backend
+    """
+    EMBEDDING_BACKENDS[name.lower()] = factory
+
+
+def create_backend(name: str) -> EmbeddingBackend:
+    """
+    Construye un backend registrado
+
+    Args:
+        name: Nombre del backend
+
+    Returns:
+        Backend de embedding
+
+    Raises:
+        ValueError: Si el backend no está registrado
+    """
+    factory = EMBEDDING_BACKENDS.get(name.lower())
+    if factory is None:
+        raise ValueError(
+            f"Backend de embedding desconocido: {name} "
+            f"(disponibles: {', '.join(sorted(EMBEDDING_BACKENDS))})"
+        )
+    return factory()
+
+
+def _encode(vector: np.ndarray) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode('ascii')
+
+
+def _decode(payload: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload), dtype=np.float32)
+
+
+class CachedEmbeddingFunction:
+    """
+    Función de embedding compatible con ChromaDB sobre un backend.
+
+    Los textos ya embebidos (mismo modelo y mismo texto) se leen del caché en
+    disco; el resto se embebe en lotes de batch_size. Acumula el tiempo de
+    inferencia para reportar documentos por segundo.
+    """
+
+    def __init__(self, backend: EmbeddingBackend, cache: Optional[PersistentCache] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Args:
+            backend: Modelo de embedding
+            cache: Caché persistente de vectores (None = sin caché en disco)
+            batch_size: Textos por llamada al modelo
+        """
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self.documents_embedded = 0
+        self.batches = 0
+        self.inference_seconds = 0.0
+        self.cache_hits = 0
+
+    @property
+    def model_id(self) -> str:
+        return self.backend.model_id
+
+    @property
+    def collection_suffix(self) -> str:
+        """
+        Sufijo de las colecciones de ChromaDB embebidas con este modelo
+
+        Las colecciones existentes usan el modelo por defecto; otro modelo
+        produce vectores incompatibles, así que usa colecciones propias.
+        """
+        if self.backend.name == ChromaDefaultBackend.name:
+            return ""
+        return "_" + re.sub(r'[^a-zA-Z0-9]+', '_', self.model_id).strip('_').lower()
+
+    def text_key(self, text: str) -> str:
+        """Clave del caché de un texto para el modelo actual"""
+        return make_cache_key('embedding', self.model_id, text)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeddings de una lista de textos
+
+        Args:
+            texts: Textos a embeber (puede haber repetidos)
+
+        Returns:
+            Matriz float32 con una fila por texto, en el mismo orden
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [self.text_key(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        if self.cache is not None:
+            vectors = {key: _decode(payload) for key, payload in self.cache.get_many(keys).items()}
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        with self._lock:
+            self.cache_hits += len(set(keys)) - len(missing)
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            began = time.perf_counter()
+            matrix = self.backend.embed([text for _, text in batch])
+            elapsed = time.perf_counter() - began
+
+            with self._lock:
+                self.documents_embedded += len(batch)
+                self.batches += 1
+                self.inference_seconds += elapsed
+
+            computed = {key: row for (key, _), row in zip(batch, matrix)}
+            vectors.update(computed)
+            if self.cache is not None:
+                self.cache.set_many({key: _encode(row) for key, row in computed.items()})
+
+        return np.vstack([vectors[key] for key in keys]).astype(np.float32)
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Interfaz EmbeddingFunction de ChromaDB"""
+        return [row.tolist() for row in self.embed(list(input))]
+
+    def get_stats(self) -> Dict:
+        """Retorna estadísticas de inferencia y del caché"""
+        with self._lock:
+            return {
+                'model': self.model_id,
+                'batch_size': self.batch_size,
+                'documents_embedded': self.documents_embedded,
+                'batches': self.batches,
+                'inference_seconds': round(self.inference_seconds, 4),
+                'docs_per_second': (self.documents_embedded / self.inference_seconds
+                                    if self.inference_seconds > 0 else 0.0),
+                'cache_hits': self.cache_hits,
+                'cache_enabled': self.cache is not None
+            }
+
+
+def _settings() -> Tuple[str, int, bool, int]:
+    """
+    Lee la configuración en el momento de la llamada
+
+    Returns:
+        Tupla (backend, tamaño de lote, caché habilitado, máximo de vectores cacheados)
+    """
+    backend = _setting('EMBEDDING_BACKEND', DEFAULT_BACKEND, str)
+    batch_size = _setting('EMBEDDING_BATCH_SIZE', DEFAULT_BATCH_SIZE, int)
+    cache_enabled = _setting('EMBEDDING_CACHE_ENABLED', True, bool)
+    max_entries = _setting('EMBEDDING_CACHE_MAX_ENTRIES', DEFAULT_CACHE_MAX_ENTRIES, int)
+    return backend, batch_size, cache_enabled, max_entries
+
+
+def build_embedding_function(backend: Optional[str] = None,
+                             db_path: Optional[Path] = None) -> CachedEmbeddingFunction:
+    """
+    Construye una función de embedding según la configuración
+
+    Args:
+        backend: Nombre del backend (None = EMBEDDING_BACKEND)
+        db_path: Base de datos del caché (None = CACHE_DB_PATH)
+
+    Returns:
+        Función de embedding con caché
+    """
+    name, batch_size, cache_enabled, max_entries = _settings()
+    cache = None
+    if cache_enabled:
+        if db_path is None:
+            from config.settings import CACHE_DB_PATH
+            db_path = CACHE_DB_PATH
+        cache = PersistentCache(db_path, namespace="embeddings", max_entries=max_entries)
+
+    return CachedEmbeddingFunction(create_backend(backend or name), cache, batch_size)
+
+
+# Instancia global (se crea en el primer uso)
+_embedding_function: Optional[CachedEmbeddingFunction] = None
+_embedding_function_lock = threading.Lock()
+
+
+def get_embedding_function() -> CachedEmbeddingFunction:
+    """Obtiene la función de embedding compartida por el proceso"""
+    global _embedding_function
+
+    with _embedding_function_lock:
+        if _embedding_function is None:
+            _embedding_function = build_embedding_function()
+    return _embedding_function
+
+
+if __name__ == "__main__":
+    # Medición de rendimiento del backend (sin caché): python -m utils.embeddings [backend]
+    import sys
+
+    backend_name = sys.argv[1] if len(sys.argv) > 1 else _settings()[0]
+    documents = [
+        f"Simulación {i}: protocolo {p} con {n} nodos y movilidad RandomWaypoint a {s} m/s"
+        for i, (p, n, s) in enumerate(
+            (p, n, s) for p in ("AODV", "OLSR", "DSDV", "HWMP") for n in (10, 20, 50, 100) for s in (1, 5, 15, 30)
+        )
+    ]
+
+    function = CachedEmbeddingFunction(create_backend(backend_name), cache=None,
+                                       batch_size=_settings()[1])
+    function.embed(documents)
+    stats = function.get_stats()
+    print(f"Backend: {stats['model']}")
+    print(f"Documentos: {stats['documents_embedded']} en {stats['batches']} lotes")
+    print(f"Rendimiento: {stats['docs_per_second']:.1f} docs/s")
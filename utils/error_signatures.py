@@ -0,0 +1,138 @@
+"""
+Firmas de Error
+
+La mayoría de los fallos de los scripts NS-3 son las mismas pocas firmas
+(atributo inexistente, helper mal nombrado, ImportError) que solo difieren en
+números de línea y rutas. Este módulo reduce un traceback a su firma canónica
+(tipo de excepción, símbolo que falla, mensaje normalizado) para que la
+memoria episódica resuelva un fallo conocido con una búsqueda exacta, antes
+de cualquier búsqueda aproximada o ronda extra del LLM.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Patrones que distinguen errores casi idénticos (rutas, direcciones, números)
+_ERROR_NOISE = [
+    (re.compile(r'(?:[A-Za-z]:)?(?:[\\/][\w.\-]+)+'), '<ruta>'),
+    (re.compile(r'0x[0-9a-fA-F]+'), '<hex>'),
+    (re.compile(r'\d+(?:\.\d+)?'), '<n>'),
+]
+
+# Excepción dentro de una línea: "[modulo.]TipoError: mensaje" (al final de
+# un traceback o tras un prefijo como "Error en simulación: ")
+EXCEPTION_LINE = re.compile(
+    r'(?:^|\s)(?:[\w.]+\.)?(?P<type>[A-Z]\w*(?:Error|Exception|Exit|Interrupt|Warning))\b:?\s*(?P<message>.*)$'
+)
+
+# Frame de un traceback de Python
+FRAME_LINE = re.compile(r'^\s*File "[^"]*", line \d+, in (?P<function>[\w<>]+)')
+
+# Excepciones cuyo mensaje nombra el símbolo concreto que falla: su firma
+# identifica el fallo aunque cambie la tarea. Timeouts, segfaults o errores
+# de simulación genéricos colapsan en pocas firmas y no bastan por sí solos.
+SPECIFIC_EXCEPTIONS = frozenset({
+    'AttributeError', 'ImportError', 'ModuleNotFoundError', 'NameError', 'UnboundLocalError'
+})
+
+# Símbolo que falla según la forma del mensaje (de más a menos específica)
+SYMBOL_PATTERNS = [
+    re.compile(r"module '(?P<owner>[\w.]+)' has no attribute '(?P<name>\w+)'"),
+    re.compile(r"'(?P<owner>\w+)' object has no attribute '(?P<name>\w+)'"),
+    re.compile(r"type object '(?P<owner>\w+)' has no attribute '(?P<name>\w+)'"),
+    re.compile(r"cannot import name '(?P<name>[\w.]+)'(?: from '(?P<owner>[\w.]+)')?"),
+    re.compile(r"No module named '(?P<name>[\w.]+)'"),
+    re.compile(r"name '(?P<name>\w+)' is not defined"),
+    re.compile(r"'(?P<name>[\w.]+)'"),
+]
+
+
+def normalize_error(error: str) -> str:
+    """
+    Normaliza un mensaje de error para detectar duplicados
+
+    Sustituye rutas, direcciones de memoria y números (líneas, tiempos,
+    identificadores de nodo) y colapsa espacios, conservando el tipo de
+    excepción y los símbolos citados.
+
+    Args:
+        error: Mensaje de error
+
+    Returns:
+        Mensaje normalizado
+    """
+    text = error or ""
+    for pattern, replacement in _ERROR_NOISE:
+        text = pattern.sub(replacement, text)
+    return " ".join(text.split()).lower()
+
+
+@dataclass(frozen=True)
+class ErrorSignature:
+    """Firma canónica de un error"""
+    exception: str
+    symbol: str
+    message: str
+    # El símbolo se citó en el mensaje (no es la función del último frame)
+    cited: bool = field(default=False, compare=False)
+
+    @property
+    def key(self) -> str:
+        """Hash estable de la firma (clave del índice de soluciones)"""
+        payload = f"{self.exception}|{self.symbol}|{self.message}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def is_specific(self) -> bool:
+        """La firma nombra un símbolo concreto y basta para identificar el fallo"""
+        return self.cited and self.exception in SPECIFIC_EXCEPTIONS
+
+    def __str__(self) -> str:
+        symbol = f" [{self.symbol}]" if self.symbol else ""
+        return f"{self.exception or 'Error'}{symbol}: {self.message}"
+
+
+def _failing_symbol(message: str) -> Optional[str]:
+    """Símbolo citado en el mensaje de la excepción"""
+    for pattern in SYMBOL_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            owner = match.groupdict().get('owner')
+            name = match.group('name')
+            return f"{owner}.{name}" if owner else name
+    return None
+
+
+def error_signature(error: str) -> Optional[ErrorSignature]:
+    """
+    Reduce un error (o traceback completo) a su firma canónica
+
+    Usa la última línea de excepción del texto; el símbolo es el nombre citado
+    en el mensaje o, si no lo hay, la función del último frame.
+
+    Args:
+        error: Mensaje de error o traceback
+
+    Returns:
+        Firma del error, o None si el texto está vacío
+    """
+    lines = [line for line in (error or "").splitlines() if line.strip()]
+    if not lines:
+        return None
+
+    exception, message = "", lines[-1].strip()
+    for line in reversed(lines):
+        match = EXCEPTION_LINE.search(line)
+        if match:
+            exception, message = match.group('type'), match.group('message').strip()
+            break
+
+    symbol = _failing_symbol(message)
+    cited = symbol is not None
+    if not cited:
+        frames = [m.group('function') for m in map(FRAME_LINE.match, lines) if m]
+        symbol = frames[-1] if frames else ""
+
+    return ErrorSignature(exception, symbol, normalize_error(message), cited)
@@ -0,0 +1,246 @@
+"""
+Recuperación Híbrida para el Contexto de Investigación
+
+query_vectordb devolvía los n documentos más cercanos por embedding y
+research_node pegaba los 200 primeros caracteres de los dos primeros: los
+términos exactos (nombres de protocolos, métricas) no pesaban y el recorte
+podía dejar fuera lo relevante. Este módulo combina un índice invertido BM25
+con la búsqueda vectorial de ChromaDB mediante fusión por rango recíproco,
+reordena los candidatos con una puntuación barata (cobertura de los términos
+de la consulta ponderada por IDF, sin documentos casi duplicados) y ensambla
+el contexto dentro de un presupuesto de tokens: menos fragmentos, pero
+mejores, llegan al prompt de síntesis.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from utils.prompt_budget import estimate_tokens, truncate_to_tokens
+
+# Candidatos por búsqueda (léxica y vectorial) antes de fusionar y reordenar
+HYBRID_CANDIDATES = 20
+
+# Constante de la fusión por rango recíproco
+RRF_K = 60
+
+# Solapamiento de términos a partir del cual un candidato se considera duplicado
+MAX_OVERLAP = 0.8
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Términos de un texto (minúsculas, al menos dos caracteres)"""
+    return [term for term in TOKEN_PATTERN.findall(str(text).lower()) if len(term) > 1]
+
+
+@dataclass
+class RetrievedChunk:
+    """Fragmento recuperado con su puntuación final"""
+    doc_id: str
+    text: str
+    score: float = 0.0
+    sources: List[str] = field(default_factory=list)
+
+
+class BM25Index:
+    """
+    Índice invertido BM25 incremental.
+
+    Los documentos solo se añaden (las colecciones de papers no borran), de
+    modo que el índice se construye una vez desde la colección y se amplía
+    con cada ingesta.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.texts: Dict[str, str] = {}
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.texts
+
+    def add(self, documents: Dict[str, str]):
+        """Indexa documentos nuevos (los ya indexados se ignoran)"""
+        for doc_id, text in documents.items():
+            if doc_id in self.texts or not text:
+                continue
+            position = len(self.ids)
+            terms = Counter(tokenize(text))
+            for term, count in terms.items():
+                self.postings.setdefault(term, {})[position] = count
+            self.ids.append(doc_id)
+            self.texts[doc_id] = text
+            length = sum(terms.values())
+            self.lengths.append(length)
+            self._total_length += length
+
+    def idf(self, term: str) -> float:
+        """IDF de BM25 (siempre positivo)"""
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.ids) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = HYBRID_CANDIDATES) -> List[Tuple[str, float]]:
+        """
+        Documentos con mayor puntuación BM25 para la consulta
+
+        Args:
+            query: Consulta
+            top_k: Número máximo de resultados
+
+        Returns:
+            Lista de (id, puntuación) con puntuación positiva, descendente
+        """
+        if not self.ids:
+            return []
+
+        average = self._total_length / len(self.ids)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for position, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / average)
+                scores[position] = scores.get(position, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self.ids[position], score) for position, score in ranked]
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, Sequence[str]], k: int = RRF_K) -> Dict[str, float]:
+    """
+    Fusiona rankings por rango recíproco (sin calibrar puntuaciones entre métodos)
+
+    Args:
+        rankings: Método -> ids ordenados de mejor a peor
+        k: Constante de suavizado
+
+    Returns:
+        Id -> puntuación fusionada
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings.values():
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return fused
+
+
+def rerank(query: str, candidates: List[RetrievedChunk], index: BM25Index,
+           top_k: int, max_overlap: float = MAX_OVERLAP) -> List[RetrievedChunk]:
+    """
+    Reordena los candidatos fusionados y descarta los casi duplicados
+
+    La puntuación final promedia la fusión normalizada y la fracción del IDF
+    de la consulta que cubre cada documento.
+
+    Args:
+        query: Consulta
+        candidates: Candidatos con la puntuación de la fusión en 'score'
+        index: Índice BM25 (para el IDF de los términos)
+        top_k: Número de fragmentos a conservar
+        max_overlap: Solapamiento (Jaccard) máximo con un fragmento ya elegido
+
+    Returns:
+        Fragmentos ordenados por la puntuación final
+    """
+    query_terms = set(tokenize(query))
+    weights = {term: index.idf(term) for term in query_terms}
+    total_weight = sum(weights.values()) or 1.0
+    best_fused = max((chunk.score for chunk in candidates), default=0.0) or 1.0
+
+    for chunk in candidates:
+        terms = set(tokenize(chunk.text))
+        coverage = sum(weight for term, weight in weights.items() if term in terms) / total_weight
+        chunk.score = 0.5 * chunk.score / best_fused + 0.5 * coverage
+
+    selected: List[RetrievedChunk] = []
+    selected_terms: List[set] = []
+    for chunk in sorted(candidates, key=lambda c: c.score, reverse=True):
+        terms = set(tokenize(chunk.text))
+        if any(len(terms & other) / max(len(terms | other), 1) > max_overlap for other in selected_terms):
+            continue
+        selected.append(chunk)
+        selected_terms.append(terms)
+        if len(selected) >= top_k:
+            break
+    return selected
+
+
+def hybrid_search(query: str, index: BM25Index, vector_hits: List[Tuple[str, str]],
+                  top_k: int, candidates: int = HYBRID_CANDIDATES) -> List[RetrievedChunk]:
+    """
+    Combina BM25 y búsqueda vectorial y reordena el resultado
+
+    Args:
+        query: Consulta
+        index: Índice BM25 de la colección
+        vector_hits: (id, documento) de la búsqueda vectorial, de mejor a peor
+        top_k: Número de fragmentos a retornar
+        candidates: Candidatos léxicos considerados
+
+    Returns:
+        Fragmentos recuperados, de mejor a peor
+    """
+    lexical = [doc_id for doc_id, _ in index.search(query, candidates)]
+    vector = [doc_id for doc_id, _ in vector_hits]
+    texts = {**dict(vector_hits), **{doc_id: index.texts[doc_id] for doc_id in lexical}}
+
+    fused = reciprocal_rank_fusion({'bm25': lexical, 'vector': vector})
+    chunks = [
+        RetrievedChunk(doc_id, texts[doc_id], score,
+                       [name for name, ranking in (('bm25', lexical), ('vector', vector)) if doc_id in ranking])
+        for doc_id, score in fused.items() if texts.get(doc_id)
+    ]
+    return rerank(query, chunks, index, top_k)
+
+
+def assemble_context(chunks: List[RetrievedChunk], max_tokens: int,
+                     min_chunk_tokens: int = 48, separator: str = "\n\n") -> List[str]:
+    """
+    Selecciona fragmentos completos, de mejor a peor, hasta agotar el presupuesto
+
+    El último fragmento se recorta si aún quedan al menos min_chunk_tokens;
+    los siguientes se omiten en lugar de recortar todos un poco.
+
+    Args:
+        chunks: Fragmentos ordenados por relevancia
+        max_tokens: Tokens disponibles para el contexto
+        min_chunk_tokens: Tamaño mínimo útil de un fragmento recortado
+        separator: Separador entre fragmentos
+
+    Returns:
+        Textos de los fragmentos que caben
+    """
+    selected: List[str] = []
+    remaining = max_tokens
+    separator_tokens = estimate_tokens(separator)
+
+    for chunk in chunks:
+        cost = estimate_tokens(chunk.text) + (separator_tokens if selected else 0)
+        if cost <= remaining:
+            selected.append(chunk.text)
+            remaining -= cost
+            continue
+        available = remaining - (separator_tokens if selected else 0)
+        if available >= min_chunk_tokens:
+            selected.append(truncate_to_tokens(chunk.text, available, head_ratio=1.0))
+        break
+
+    return selected
+
+
+def chunks_from_documents(documents: List[str], source: str = "vector") -> List[RetrievedChunk]:
+    """Fragmentos a partir de documentos sin id (resultado de una búsqueda solo vectorial)"""
+    return [RetrievedChunk(f"{source}_{i}", text, 0.0, [source]) for i, text in enumerate(documents) if text]
@@ -0,0 +1,197 @@
+"""
+Caché de Búsquedas Bibliográficas
+
+Cada ejecución de research_node consultaba Semantic Scholar y arXiv por red,
+con un rate_limit que duerme el proceso, aunque las repeticiones de una
+campaña repiten exactamente las mismas consultas. Este módulo guarda las
+respuestas en el caché persistente indexadas por (fuente, consulta
+normalizada, parámetros) con TTL, y ofrece un modo sin conexión que responde
+solo desde el caché o desde un corpus local de papers (archivos JSON/JSONL en
+LITERATURE_CORPUS_DIR), para runners sin acceso a internet.
+"""
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.cache import PersistentCache, make_cache_key
+
+# Valores por defecto si la configuración no está disponible
+DEFAULT_TTL_HOURS = 720.0
+
+
+def normalize_query(query: str) -> str:
+    """Consulta en minúsculas y con espacios colapsados"""
+    return " ".join(str(query).lower().split())
+
+
+def _settings() -> Tuple[bool, bool, float, Optional[Path]]:
+    """
+    Lee la configuración en el momento de la llamada
+
+    Returns:
+        Tupla (caché habilitado, modo sin conexión, TTL en horas, directorio del corpus)
+    """
+    try:
+        import config.settings as settings
+    except ImportError:
+        return True, False, DEFAULT_TTL_HOURS, None
+
+    enabled = getattr(settings, 'LITERATURE_CACHE_ENABLED', True) is True
+    offline = getattr(settings, 'LITERATURE_OFFLINE', False) is True
+    ttl = getattr(settings, 'LITERATURE_CACHE_TTL_HOURS', DEFAULT_TTL_HOURS)
+    if not isinstance(ttl, (int, float)) or ttl <= 0:
+        ttl = DEFAULT_TTL_HOURS
+    corpus_dir = getattr(settings, 'LITERATURE_CORPUS_DIR', None)
+    return enabled, offline, ttl, corpus_dir if isinstance(corpus_dir, Path) else None
+
+
+def literature_offline() -> bool:
+    """Indica si la investigación debe funcionar sin acceso a red"""
+    return _settings()[1]
+
+
+class LiteratureCache:
+    """
+    Caché persistente de búsquedas bibliográficas con corpus local de respaldo.
+
+    Las entradas no se borran al expirar: en línea una entrada vencida se
+    vuelve a pedir (y se sirve si la red falla); sin conexión se sirve igual.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, corpus_dir: Optional[Path] = None):
+        """
+        Inicializa el caché
+
+        Args:
+            db_path: Ruta a la base de datos (None = CACHE_DB_PATH)
+            corpus_dir: Directorio del corpus local (None = LITERATURE_CORPUS_DIR)
+        """
+        if db_path is None:
+            from config.settings import CACHE_DB_PATH
+            db_path = CACHE_DB_PATH
+
+        self.cache = PersistentCache(db_path, namespace="literature")
+        self.corpus_dir = corpus_dir
+        self._corpus: Optional[List[Dict]] = None
+        self._corpus_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(source: str, query: str, params: Dict) -> str:
+        """Calcula la clave de una búsqueda"""
+        return make_cache_key('literature', source, normalize_query(query), params)
+
+    def search(self, source: str, query: str, params: Dict,
+               fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """
+        Resuelve una búsqueda desde el caché o, si hace falta, desde la red
+
+        Args:
+            source: Fuente consultada ('semantic_scholar', 'arxiv', ...)
+            query: Consulta de búsqueda
+            params: Parámetros que afectan a la respuesta (p.ej. max_results)
+            fetch: Función que consulta la fuente por red
+
+        Returns:
+            Papers encontrados
+        """
+        enabled, offline, ttl_hours, _ = _settings()
+        if not enabled and not offline:
+            return fetch()
+
+        key = self.make_key(source, query, params)
+        entry = self.cache.get(key)
+        fresh = entry is not None and time.time() - entry['fetched_at'] <= ttl_hours * 3600
+
+        if entry is not None and (fresh or offline):
+            return entry['papers']
+        if offline:
+            return []
+
+        papers = fetch()
+        if papers:
+            self.cache.set(key, {'papers': papers, 'fetched_at': time.time()})
+            return papers
+
+        # Sin respuesta de la red: mejor resultados vencidos que ninguno
+        return entry['papers'] if entry is not None else papers
+
+    def _load_corpus(self) -> List[Dict]:
+        """Carga (y recarga si cambió) los papers del corpus local"""
+        corpus_dir = self.corpus_dir or _settings()[3]
+        if corpus_dir is None or not Path(corpus_dir).is_dir():
+            return []
+
+        files = sorted(list(Path(corpus_dir).glob('*.json')) + list(Path(corpus_dir).glob('*.jsonl')))
+        mtime = max((f.stat().st_mtime for f in files), default=0.0)
+
+        with self._lock:
+            if self._corpus is not None and self._corpus_mtime == mtime:
+                return self._corpus
+
+            papers = []
+            for path in files:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        if path.suffix == '.jsonl':
+                            papers.extend(json.loads(line) for line in f if line.strip())
+                        else:
+                            data = json.load(f)
+                            papers.extend(data if isinstance(data, list) else [data])
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Error leyendo corpus local {path.name}: {e}")
+
+            self._corpus = [p for p in papers if isinstance(p, dict) and p.get('title')]
+            self._corpus_mtime = mtime
+            return self._corpus
+
+    def search_corpus(self, query: str, max_results: int = 10) -> List[Dict]:
+        """
+        Busca en el corpus local por coincidencia de términos
+
+        Args:
+            query: Consulta de búsqueda
+            max_results: Número máximo de resultados
+
+        Returns:
+            Papers del corpus ordenados por términos en común con la consulta
+        """
+        terms = set(re.findall(r'\w+', normalize_query(query)))
+        if not terms:
+            return []
+
+        scored = []
+        for paper in self._load_corpus():
+            text = f"{paper.get('title', '')} {paper.get('abstract', '')}".lower()
+            score = len(terms & set(re.findall(r'\w+', text))) / len(terms)
+            if score > 0:
+                scored.append((score, paper))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {'abstract': '', 'year': '', 'authors': [], 'citations': 0, 'url': '', **paper}
+            for _, paper in scored[:max_results]
+        ]
+
+    def get_stats(self) -> Dict:
+        """Retorna estadísticas del caché"""
+        return self.cache.get_stats()
+
+
+# Instancia global (se crea en el primer uso)
+_literature_cache: Optional[LiteratureCache] = None
+_literature_cache_lock = threading.Lock()
+
+
+def get_literature_cache() -> LiteratureCache:
+    """Obtiene la instancia global del caché bibliográfico"""
+    global _literature_cache
+
+    with _literature_cache_lock:
+        if _literature_cache is None:
+            _literature_cache = LiteratureCache()
+    return _literature_cache
@@ -0,0 +1,168 @@
+"""
+Consulta Concurrente de Fuentes Bibliográficas
+
+research_node consultaba Semantic Scholar, arXiv y la base vectorial local
+una tras otra, de modo que la investigación duraba la suma de las tres. Este
+módulo lanza las fuentes a la vez, cada una con su propio timeout (una fuente
+lenta o caída no retrasa a las demás), y fusiona los resultados eliminando
+duplicados entre fuentes y ordenándolos por relevancia.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from utils.vector_store import paper_id
+
+# Hilos propios (no el executor por defecto de asyncio): al cerrar el loop no
+# se espera a las consultas que excedieron su timeout
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="literature")
+
+# Valores por defecto si la configuración no está disponible
+DEFAULT_TIMEOUTS = {'semantic_scholar': 30.0, 'arxiv': 30.0, 'local_db': 10.0}
+DEFAULT_URLS = {
+    'semantic_scholar': "https://api.semanticscholar.org/graph/v1/paper/search",
+    'arxiv': "https://export.arxiv.org/api/query"
+}
+
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+
+def source_timeouts() -> Dict[str, float]:
+    """
+    Lee los timeouts por fuente en el momento de la llamada
+
+    Returns:
+        Fuente -> segundos máximos de espera
+    """
+    try:
+        import config.settings as settings
+    except ImportError:
+        return dict(DEFAULT_TIMEOUTS)
+
+    timeouts = {}
+    for name, setting in [('semantic_scholar', 'SEMANTIC_SCHOLAR_TIMEOUT'),
+                          ('arxiv', 'ARXIV_TIMEOUT'), ('local_db', 'VECTORDB_TIMEOUT')]:
+        value = getattr(settings, setting, DEFAULT_TIMEOUTS[name])
+        timeouts[name] = value if isinstance(value, (int, float)) and value > 0 else DEFAULT_TIMEOUTS[name]
+    return timeouts
+
+
+def source_url(name: str) -> str:
+    """
+    Endpoint configurado de una fuente ('semantic_scholar' o 'arxiv')
+
+    Args:
+        name: Nombre de la fuente
+
+    Returns:
+        URL de la API (la oficial salvo que se configure un servidor local)
+    """
+    try:
+        import config.settings as settings
+    except ImportError:
+        return DEFAULT_URLS[name]
+
+    value = getattr(settings, f"{name.upper()}_API_URL", None)
+    return value if isinstance(value, str) and value else DEFAULT_URLS[name]
+
+
+@dataclass
+class SourceResult:
+    """Resultado de consultar una fuente"""
+    name: str
+    items: List[Any] = field(default_factory=list)
+    status: str = STATUS_OK
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+async def fetch_source(name: str, fetch: Callable[[], List[Any]], timeout: Optional[float]) -> SourceResult:
+    """
+    Consulta una fuente en un hilo, con timeout
+
+    Args:
+        name: Nombre de la fuente
+        fetch: Función bloqueante que retorna los resultados
+        timeout: Segundos máximos de espera (None = sin límite)
+
+    Returns:
+        Resultado con los elementos obtenidos (vacío si falló o expiró)
+    """
+    loop = asyncio.get_running_loop()
+    start = time.time()
+    try:
+        items = await asyncio.wait_for(loop.run_in_executor(_executor, fetch), timeout)
+        return SourceResult(name, list(items or []), STATUS_OK, time.time() - start)
+    except asyncio.TimeoutError:
+        return SourceResult(name, [], STATUS_TIMEOUT, time.time() - start,
+                            f"sin respuesta en {timeout:.0f}s")
+    except Exception as e:
+        return SourceResult(name, [], STATUS_ERROR, time.time() - start, str(e))
+
+
+async def fan_out(fetchers: Dict[str, Callable[[], List[Any]]],
+                  timeouts: Union[float, Dict[str, float], None] = None) -> Dict[str, SourceResult]:
+    """
+    Consulta varias fuentes a la vez
+
+    Args:
+        fetchers: Fuente -> función bloqueante que la consulta
+        timeouts: Timeout común o por fuente (las no listadas no tienen límite)
+
+    Returns:
+        Fuente -> resultado, en el orden de fetchers
+    """
+    def timeout_for(name: str) -> Optional[float]:
+        if isinstance(timeouts, dict):
+            return timeouts.get(name)
+        return timeouts
+
+    results = await asyncio.gather(*(
+        fetch_source(name, fetch, timeout_for(name)) for name, fetch in fetchers.items()
+    ))
+    return {result.name: result for result in results}
+
+
+def merge_papers(results: Dict[str, List[Dict]], score: Callable[[Dict], float]) -> List[Dict]:
+    """
+    Fusiona los papers de varias fuentes
+
+    Los duplicados (mismo ID de contenido) se combinan: se conserva la versión
+    con más citas, se completan sus campos vacíos con los de la otra y se
+    anotan todas las fuentes en 'sources'.
+
+    Args:
+        results: Fuente -> papers encontrados
+        score: Función de relevancia de un paper
+
+    Returns:
+        Papers únicos ordenados por 'relevance_score' descendente
+    """
+    merged: Dict[str, Dict] = {}
+    for source, papers in results.items():
+        for paper in papers:
+            key = paper_id(paper)
+            current = merged.get(key)
+            if current is None:
+                merged[key] = {**paper, 'sources': [source]}
+                continue
+
+            sources = current['sources'] + [source]
+            if (paper.get('citations') or 0) > (current.get('citations') or 0):
+                current, paper = {**paper}, current
+            for name, value in paper.items():
+                if name != 'sources' and value and not current.get(name):
+                    current[name] = value
+            current['sources'] = sources
+            merged[key] = current
+
+    papers = list(merged.values())
+    for paper in papers:
+        paper['relevance_score'] = score(paper)
+    papers.sort(key=lambda p: p['relevance_score'], reverse=True)
+    return papers
@@ -0,0 +1,412 @@
+"""
+Caché Persistente de Respuestas LLM
+
+Los agentes recalculan prompts idénticos (misma tarea, mismas notas de
+investigación, temperatura baja) en cada repetición y re-ejecución, y cada
+inferencia local cuesta decenas de segundos. Este módulo envuelve los modelos
+de chat con un caché en disco indexado por (modelo, temperatura, hash del
+prompt normalizado), con TTL/LRU, métricas de aciertos por agente y la
+posibilidad de omitir el caché para agentes concretos.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from utils.cache import PersistentCache, make_cache_key
+from utils.llm_concurrency import gather_bounded
+from utils.llm_metrics import record_llm_call
+
+
+def _normalize_text(text: str) -> str:
+    """Elimina espacios finales y líneas en blanco repetidas"""
+    lines = [line.rstrip() for line in str(text).strip().splitlines()]
+    normalized = []
+    for line in lines:
+        if line or (normalized and normalized[-1]):
+            normalized.append(line)
+    return "\n".join(normalized)
+
+
+def normalize_prompt(prompt: Any) -> Any:
+    """
+    Normaliza un prompt (texto o lista de mensajes) para calcular su clave
+
+    Args:
+        prompt: Prompt en texto o lista de mensajes de LangChain
+
+    Returns:
+        Representación serializable e insensible a diferencias de formato
+    """
+    if isinstance(prompt, (list, tuple)):
+        return [
+            [getattr(message, 'type', type(message).__name__),
+             _normalize_text(getattr(message, 'content', message))]
+            for message in prompt
+        ]
+    return _normalize_text(prompt)
+
+
+class LLMResponseCache:
+    """
+    Caché de respuestas LLM con métricas por agente.
+    """
+
+    def __init__(self, db_path=None, ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        """
+        Inicializa el caché
+
+        Args:
+            db_path: Ruta a la base de datos (None = CACHE_DB_PATH)
+            ttl_seconds: Tiempo de vida de las respuestas
+            max_entries: Máximo de respuestas almacenadas (LRU)
+        """
+        if db_path is None:
+            from config.settings import CACHE_DB_PATH
+            db_path = CACHE_DB_PATH
+
+        self.cache = PersistentCache(db_path, namespace="llm",
+                                     ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._agent_stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, temperature: Optional[float], prompt: Any) -> str:
+        """Calcula la clave de una invocación"""
+        return make_cache_key('llm', model, temperature, normalize_prompt(prompt))
+
+    def _record(self, agent: str, event: str, saved_seconds: float = 0.0):
+        """Actualiza los contadores del agente"""
+        with self._lock:
+            stats = self._agent_stats.setdefault(
+                agent, {'hits': 0, 'misses': 0, 'bypassed': 0, 'saved_seconds': 0.0}
+            )
+            stats[event] += 1
+            stats['saved_seconds'] += saved_seconds
+
+    @staticmethod
+    def partial_key(key: str) -> str:
+        """Clave bajo la que se guarda una respuesta interrumpida"""
+        return f"{key}:partial"
+
+    def get(self, key: str, agent: str, allow_partial: bool = False) -> Optional[Dict]:
+        """
+        Busca una respuesta en el caché
+
+        Args:
+            key: Clave de la invocación
+            agent: Agente que consulta (para las métricas)
+            allow_partial: Aceptar una respuesta interrumpida si no hay una completa
+
+        Returns:
+            Entrada con 'content' y 'latency' ('partial' si está incompleta), o None
+        """
+        entry = self.cache.get(key)
+        if entry is None and allow_partial:
+            entry = self.cache.get(self.partial_key(key))
+        if entry is None:
+            self._record(agent, 'misses')
+        else:
+            self._record(agent, 'hits', entry.get('latency', 0.0))
+        return entry
+
+    def set(self, key: str, content: str, latency: float, partial: bool = False):
+        """
+        Guarda una respuesta junto con la latencia que costó generarla
+
+        Las respuestas interrumpidas se guardan aparte: invoke() nunca las sirve.
+        """
+        if partial:
+            self.cache.set(self.partial_key(key), {'content': content, 'latency': latency, 'partial': True})
+        else:
+            self.cache.set(key, {'content': content, 'latency': latency})
+
+    def record_bypass(self, agent: str):
+        """Registra una invocación que omitió el caché"""
+        self._record(agent, 'bypassed')
+
+    def get_stats(self) -> Dict:
+        """
+        Retorna métricas globales y por agente
+
+        Returns:
+            Diccionario con 'hits', 'misses', 'bypassed', 'hit_rate',
+            'saved_seconds', 'entries' y 'agents'
+        """
+        with self._lock:
+            agents = {name: dict(stats) for name, stats in self._agent_stats.items()}
+
+        hits = sum(s['hits'] for s in agents.values())
+        misses = sum(s['misses'] for s in agents.values())
+        for stats in agents.values():
+            total = stats['hits'] + stats['misses']
+            stats['hit_rate'] = (stats['hits'] / total) if total > 0 else 0.0
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'bypassed': sum(s['bypassed'] for s in agents.values()),
+            'hit_rate': (hits / (hits + misses)) if (hits + misses) > 0 else 0.0,
+            'saved_seconds': sum(s['saved_seconds'] for s in agents.values()),
+            'entries': len(self.cache),
+            'agents': agents
+        }
+
+
+class CachedLLM:
+    """
+    Envoltorio de un modelo de chat que consulta el caché antes de invocar.
+
+    Expone la misma interfaz invoke()/ainvoke()/abatch()/stream() que el
+    modelo envuelto; el resto de atributos se delegan al modelo original.
+    """
+
+    def __init__(self, llm: Any, agent: str, cache: Optional[LLMResponseCache] = None,
+                 bypass: Optional[bool] = None):
+        """
+        Args:
+            llm: Modelo de chat (p.ej. ChatOllama)
+            agent: Nombre del agente que lo usa
+            cache: Caché a utilizar (None = caché global)
+            bypass: Forzar la omisión del caché (None = según configuración)
+        """
+        self.llm = llm
+        self.agent = agent
+        self._cache = cache
+        self.bypass = _is_bypassed(agent) if bypass is None else bypass
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        return self._cache if self._cache is not None else get_llm_cache()
+
+    @property
+    def model_label(self) -> str:
+        model = getattr(self.llm, 'model', None)
+        return model if isinstance(model, str) else 'desconocido'
+
+    def _cache_key(self, prompt: Any) -> Optional[str]:
+        """Clave de la invocación, o None si el modelo no es identificable"""
+        model = getattr(self.llm, 'model', None)
+        if not isinstance(model, str):
+            return None
+        temperature = getattr(self.llm, 'temperature', None)
+        if not isinstance(temperature, (int, float, type(None))):
+            return None
+        return self.cache.make_key(model, temperature, prompt)
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        """
+        Invoca el modelo, reutilizando la respuesta si ya está en caché
+
+        Args:
+            prompt: Prompt en texto o lista de mensajes
+            **kwargs: Argumentos adicionales para el modelo
+
+        Returns:
+            Mensaje de respuesta (AIMessage en caso de acierto)
+        """
+        start = time.time()
+        key = None if self.bypass else self._cache_key(prompt)
+        if key is None:
+            self.cache.record_bypass(self.agent)
+            return self._invoke_model(prompt, start, **kwargs)
+
+        cached = self.cache.get(key, self.agent)
+        if cached is not None:
+            record_llm_call(self.agent, self.model_label, start, cached=True)
+            return AIMessage(content=cached['content'], response_metadata={'cached': True})
+
+        response = self._invoke_model(prompt, start, **kwargs)
+        content = getattr(response, 'content', None)
+        if isinstance(content, str) and content:
+            self.cache.set(key, content, time.time() - start)
+        return response
+
+    def _invoke_model(self, prompt: Any, start: float, **kwargs) -> Any:
+        """Invoca el modelo envuelto registrando tokens y latencia"""
+        try:
+            response = self.llm.invoke(prompt, **kwargs)
+        except Exception:
+            record_llm_call(self.agent, self.model_label, start, status='error')
+            raise
+        record_llm_call(self.agent, self.model_label, start, response)
+        return response
+
+    async def _ainvoke_model(self, prompt: Any, start: float, **kwargs) -> Any:
+        """Versión asíncrona de _invoke_model()"""
+        try:
+            response = await self.llm.ainvoke(prompt, **kwargs)
+        except Exception:
+            record_llm_call(self.agent, self.model_label, start, status='error')
+            raise
+        record_llm_call(self.agent, self.model_label, start, response)
+        return response
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[Any]:
+        """
+        Genera la respuesta en streaming, sirviéndola del caché si existe
+
+        Si el consumidor cierra el stream antes de terminar (terminación
+        temprana), lo recibido hasta ese momento se guarda como respuesta
+        parcial: otro stream del mismo prompt puede reutilizarla (es lo que el
+        consumidor utilizó), pero invoke() y ainvoke() solo sirven respuestas
+        completas.
+
+        Args:
+            prompt: Prompt en texto o lista de mensajes
+            **kwargs: Argumentos adicionales para el modelo
+
+        Yields:
+            Fragmentos de la respuesta (AIMessageChunk)
+        """
+        start = time.time()
+        key = None if self.bypass else self._cache_key(prompt)
+        if key is None:
+            self.cache.record_bypass(self.agent)
+            yield from self._stream_model(prompt, start, **kwargs)
+            return
+
+        cached = self.cache.get(key, self.agent, allow_partial=True)
+        if cached is not None:
+            record_llm_call(self.agent, self.model_label, start, cached=True)
+            metadata = {'cached': True, 'partial': True} if cached.get('partial') else {'cached': True}
+            yield AIMessageChunk(content=cached['content'], response_metadata=metadata)
+            return
+
+        parts = []
+
+        def store(partial: bool = False):
+            content = "".join(parts)
+            if content:
+                self.cache.set(key, content, time.time() - start, partial=partial)
+
+        inner = self._stream_model(prompt, start, **kwargs)
+        try:
+            for chunk in inner:
+                content = getattr(chunk, 'content', None)
+                if isinstance(content, str):
+                    parts.append(content)
+                yield chunk
+        except GeneratorExit:
+            store(partial=True)
+            raise
+        finally:
+            inner.close()
+        store()
+
+    def _stream_model(self, prompt: Any, start: float, **kwargs) -> Iterator[Any]:
+        """Stream del modelo envuelto midiendo el tiempo hasta el primer token"""
+        ttft = None
+        last_chunk = None
+        status = 'ok'
+        inner = self.llm.stream(prompt, **kwargs)
+        try:
+            for chunk in inner:
+                if ttft is None and getattr(chunk, 'content', None):
+                    ttft = time.time() - start
+                last_chunk = chunk
+                yield chunk
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            # Propagar el cierre para abortar la petición al modelo
+            close = getattr(inner, 'close', None)
+            if close is not None:
+                close()
+            # El último fragmento trae el recuento de tokens si la generación terminó
+            record_llm_call(self.agent, self.model_label, start, last_chunk, ttft=ttft, status=status)
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> Any:
+        """Versión asíncrona de invoke()"""
+        start = time.time()
+        key = None if self.bypass else self._cache_key(prompt)
+        if key is None:
+            self.cache.record_bypass(self.agent)
+            return await self._ainvoke_model(prompt, start, **kwargs)
+
+        cached = self.cache.get(key, self.agent)
+        if cached is not None:
+            record_llm_call(self.agent, self.model_label, start, cached=True)
+            return AIMessage(content=cached['content'], response_metadata={'cached': True})
+
+        response = await self._ainvoke_model(prompt, start, **kwargs)
+        content = getattr(response, 'content', None)
+        if isinstance(content, str) and content:
+            self.cache.set(key, content, time.time() - start)
+        return response
+
+    async def abatch(self, prompts: List[Any], config: Optional[Dict] = None,
+                     return_exceptions: bool = False, **kwargs) -> List[Any]:
+        """
+        Invoca varios prompts en paralelo consultando el caché en cada uno
+
+        Args:
+            prompts: Prompts en texto o listas de mensajes
+            config: Configuración de LangChain ('max_concurrency' limita las
+                generaciones simultáneas)
+            return_exceptions: Retornar las excepciones en lugar de propagarlas
+            **kwargs: Argumentos adicionales para el modelo
+
+        Returns:
+            Respuestas en el mismo orden que los prompts
+        """
+        max_concurrency = (config or {}).get('max_concurrency')
+        return await gather_bounded(
+            (self.ainvoke(prompt, **kwargs) for prompt in prompts),
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+
+def _is_bypassed(agent: str) -> bool:
+    """Indica si el agente debe omitir el caché según la configuración"""
+    from config.settings import LLM_CACHE_ENABLED, LLM_CACHE_BYPASS_AGENTS
+    if LLM_CACHE_ENABLED is not True:
+        return True
+    return agent.lower() in LLM_CACHE_BYPASS_AGENTS
+
+
+# Instancia global (se crea en el primer uso)
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Obtiene la instancia global del caché LLM"""
+    global _llm_cache
+
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            from config.settings import LLM_CACHE_TTL_HOURS, LLM_CACHE_MAX_ENTRIES
+            _llm_cache = LLMResponseCache(
+                ttl_seconds=LLM_CACHE_TTL_HOURS * 3600 if LLM_CACHE_TTL_HOURS > 0 else None,
+                max_entries=LLM_CACHE_MAX_ENTRIES if LLM_CACHE_MAX_ENTRIES > 0 else None
+            )
+    return _llm_cache
+
+
+def cached_llm(llm: Any, agent: str, bypass: Optional[bool] = None) -> CachedLLM:
+    """
+    Envuelve un modelo de chat con el caché global
+
+    Args:
+        llm: Modelo de chat
+        agent: Nombre del agente
+        bypass: Forzar la omisión del caché (None = según configuración)
+
+    Returns:
+        Modelo envuelto
+    """
+    return CachedLLM(llm, agent, bypass=bypass)
+
+
+def get_llm_cache_stats() -> Dict:
+    """Retorna las métricas del caché LLM global"""
+    return get_llm_cache().get_stats()
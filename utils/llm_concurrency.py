@@ -0,0 +1,108 @@
+"""
+Invocación Concurrente de LLMs
+
+Algunos nodos lanzan varias generaciones independientes una tras otra, de modo
+que el tiempo del nodo es la suma de todas ellas. Este módulo ofrece una capa
+asíncrona (ainvoke/abatch con límite de concurrencia) para ejecutarlas en
+paralelo contra el servidor de modelos local y una forma segura de lanzarla
+desde los nodos síncronos de LangGraph.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Iterable, List, Optional
+
+
+def get_max_concurrency(max_concurrency: Optional[int] = None) -> int:
+    """Límite de concurrencia efectivo (None = LLM_MAX_CONCURRENCY)"""
+    if max_concurrency is None:
+        from config.settings import LLM_MAX_CONCURRENCY
+        max_concurrency = LLM_MAX_CONCURRENCY
+    return max(1, int(max_concurrency))
+
+
+# Event loop de larga duración para el trabajo asíncrono de los LLM. Los clientes
+# agrupados mantienen un httpx.AsyncClient cuyas conexiones keep-alive quedan
+# ligadas al loop que las abrió: un loop nuevo por llamada (asyncio.run) deja
+# conexiones de un loop cerrado y la siguiente llamada falla.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Obtiene el event loop compartido (se arranca en un hilo auxiliar al primer uso)"""
+    global _loop, _loop_thread
+
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="llm-event-loop", daemon=True)
+            _loop_thread.start()
+    return _loop
+
+
+def run_coroutine(coro: Awaitable) -> Any:
+    """
+    Ejecuta una corrutina desde código síncrono
+
+    Todas las llamadas comparten un único event loop que corre en un hilo
+    auxiliar, de modo que los clientes LLM reutilizan sus conexiones entre
+    llamadas. Funciona también si el hilo actual ya tiene un loop en marcha
+    (p.ej. el dashboard).
+
+    Args:
+        coro: Corrutina a ejecutar
+
+    Returns:
+        Resultado de la corrutina
+    """
+    loop = get_event_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_coroutine no puede llamarse desde el propio event loop compartido")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def gather_bounded(awaitables: Iterable[Awaitable], max_concurrency: Optional[int] = None,
+                         return_exceptions: bool = False) -> List[Any]:
+    """
+    Equivalente a asyncio.gather con un máximo de tareas simultáneas
+
+    Args:
+        awaitables: Corrutinas a ejecutar
+        max_concurrency: Máximo de corrutinas en curso (None = configuración)
+        return_exceptions: Retornar las excepciones en lugar de propagarlas
+
+    Returns:
+        Resultados en el mismo orden que las corrutinas
+    """
+    semaphore = asyncio.Semaphore(get_max_concurrency(max_concurrency))
+
+    async def bounded(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(bounded(a) for a in awaitables),
+                                return_exceptions=return_exceptions)
+
+
+def invoke_concurrently(llm: Any, prompts: List[Any], max_concurrency: Optional[int] = None,
+                        return_exceptions: bool = False) -> List[Any]:
+    """
+    Invoca un modelo con varios prompts independientes en paralelo
+
+    Args:
+        llm: Modelo de chat (ChatOllama o CachedLLM)
+        prompts: Prompts en texto o listas de mensajes
+        max_concurrency: Máximo de generaciones simultáneas (None = configuración)
+        return_exceptions: Retornar las excepciones en lugar de propagarlas
+
+    Returns:
+        Respuestas en el mismo orden que los prompts
+    """
+    if not prompts:
+        return []
+
+    config = {'max_concurrency': get_max_concurrency(max_concurrency)}
+    return run_coroutine(llm.abatch(prompts, config=config, return_exceptions=return_exceptions))
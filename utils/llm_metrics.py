@@ -0,0 +1,288 @@
+"""
+Contabilidad de Tokens y Latencia de las Llamadas LLM
+
+No había forma de saber en qué se iba el tiempo de inferencia. Cada llamada
+que pasa por el caché LLM (todas las de los agentes) registra aquí tokens de
+entrada y salida, tiempo hasta el primer token, latencia total, acierto de
+caché, modelo, agente e iteración. Los registros alimentan las métricas de
+logging_utils (y el panel del dashboard) y se agregan en informes de coste y
+latencia por campaña, con las tarifas de COST_ESTIMATION.md como proyección.
+"""
+
+import csv
+import statistics
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Tarifas por millón de tokens (entrada, salida) de COST_ESTIMATION.md
+API_PRICING: Dict[str, Tuple[float, float]] = {
+    'claude-3.5-sonnet': (3.0, 15.0),
+    'gpt-4-turbo': (10.0, 30.0),
+    'gpt-4o': (2.5, 10.0),
+    'gemini-pro': (0.5, 1.5),
+    'ollama': (0.0, 0.0),
+}
+
+# Columnas de cada registro (y del CSV de llamadas)
+CALL_FIELDS = [
+    'timestamp', 'campaign', 'scenario', 'run_id', 'iteration', 'agent', 'model',
+    'prompt_tokens', 'completion_tokens', 'ttft', 'latency', 'cached', 'status'
+]
+
+
+def extract_token_usage(response: Any) -> Tuple[int, int]:
+    """
+    Obtiene los tokens de entrada y salida de una respuesta
+
+    Args:
+        response: Mensaje de respuesta de LangChain
+
+    Returns:
+        Tupla (tokens de entrada, tokens de salida); (0, 0) si no hay datos
+        (p.ej. respuestas servidas desde el caché)
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if isinstance(usage, dict) and usage:
+        return int(usage.get('input_tokens', 0) or 0), int(usage.get('output_tokens', 0) or 0)
+
+    metadata = getattr(response, 'response_metadata', None)
+    if isinstance(metadata, dict):
+        return int(metadata.get('prompt_eval_count', 0) or 0), int(metadata.get('eval_count', 0) or 0)
+    return 0, 0
+
+
+def extract_first_token_latency(response: Any) -> Optional[float]:
+    """
+    Estima el tiempo hasta el primer token de una respuesta no streaming
+
+    Ollama informa la carga del modelo y el prefill (en nanosegundos); su
+    suma es el tiempo transcurrido antes de generar el primer token.
+
+    Args:
+        response: Mensaje de respuesta de LangChain
+
+    Returns:
+        Segundos hasta el primer token, o None si no hay datos
+    """
+    metadata = getattr(response, 'response_metadata', None)
+    if not isinstance(metadata, dict) or 'prompt_eval_duration' not in metadata:
+        return None
+    nanoseconds = (metadata.get('load_duration', 0) or 0) + (metadata.get('prompt_eval_duration', 0) or 0)
+    return nanoseconds / 1e9
+
+
+class LLMCallTracker:
+    """
+    Registro en memoria de las llamadas LLM del proceso, con el contexto
+    (campaña, escenario, ejecución, iteración) en el que se hicieron.
+    """
+
+    def __init__(self, max_records: int = 10000):
+        self._records: List[Dict[str, Any]] = []
+        self._context: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.max_records = max_records
+
+    def set_context(self, **fields):
+        """Actualiza el contexto de las próximas llamadas (None elimina el campo)"""
+        with self._lock:
+            for name, value in fields.items():
+                if value is None:
+                    self._context.pop(name, None)
+                else:
+                    self._context[name] = value
+
+    def record(self, agent: str, model: str, latency: float, prompt_tokens: int = 0,
+               completion_tokens: int = 0, ttft: Optional[float] = None,
+               cached: bool = False, status: str = 'ok') -> Dict[str, Any]:
+        """Registra una llamada y la retorna como diccionario"""
+        with self._lock:
+            record = {
+                'timestamp': datetime.now().isoformat(),
+                'campaign': self._context.get('campaign'),
+                'scenario': self._context.get('scenario'),
+                'run_id': self._context.get('run_id'),
+                'iteration': self._context.get('iteration'),
+                'agent': agent,
+                'model': model,
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'ttft': ttft,
+                'latency': latency,
+                'cached': cached,
+                'status': status,
+            }
+            self._records.append(record)
+            if len(self._records) > self.max_records:
+                del self._records[:len(self._records) - self.max_records]
+        return record
+
+    def get_records(self, **filters) -> List[Dict[str, Any]]:
+        """Registros que coinciden con los filtros (p.ej. campaign='x')"""
+        with self._lock:
+            records = list(self._records)
+        return [r for r in records if all(r.get(k) == v for k, v in filters.items())]
+
+    def reset(self):
+        """Elimina registros y contexto"""
+        with self._lock:
+            self._records.clear()
+            self._context.clear()
+
+
+# Registro global del proceso
+_tracker = LLMCallTracker()
+
+
+def _metrics_enabled() -> bool:
+    try:
+        from config.settings import LLM_METRICS_ENABLED
+    except ImportError:
+        return False
+    return LLM_METRICS_ENABLED is True
+
+
+def set_llm_context(**fields):
+    """
+    Fija el contexto de las llamadas siguientes
+
+    Args:
+        **fields: campaign, scenario, run_id y/o iteration (None los elimina)
+    """
+    _tracker.set_context(**fields)
+
+
+def record_llm_call(agent: str, model: str, start: float, response: Any = None,
+                    ttft: Optional[float] = None, cached: bool = False,
+                    status: str = 'ok') -> Optional[Dict[str, Any]]:
+    """
+    Registra una llamada LLM y la envía a las métricas de logging_utils
+
+    Args:
+        agent: Agente que hizo la llamada
+        model: Modelo invocado
+        start: Instante de inicio (time.time())
+        response: Respuesta (o último fragmento del stream) con el uso de tokens
+        ttft: Tiempo hasta el primer token medido (None = estimarlo de la respuesta)
+        cached: Si la respuesta salió del caché LLM
+        status: 'ok' o 'error'
+
+    Returns:
+        Registro creado, o None si la contabilidad está deshabilitada
+    """
+    if not _metrics_enabled():
+        return None
+
+    prompt_tokens, completion_tokens = extract_token_usage(response) if response is not None else (0, 0)
+    if ttft is None and response is not None:
+        ttft = extract_first_token_latency(response)
+
+    record = _tracker.record(agent, model, time.time() - start, prompt_tokens,
+                             completion_tokens, ttft, cached, status)
+
+    try:
+        from utils.logging_utils import log_llm_call
+        log_llm_call(record)
+    except Exception:
+        pass
+    return record
+
+
+def get_llm_calls(**filters) -> List[Dict[str, Any]]:
+    """Llamadas registradas en este proceso (filtrables por campaign, run_id, agent...)"""
+    return _tracker.get_records(**filters)
+
+
+def load_llm_calls(path: Path) -> List[Dict[str, Any]]:
+    """
+    Carga las llamadas registradas en un CSV de logging_utils
+
+    Args:
+        path: Ruta al CSV de llamadas
+
+    Returns:
+        Registros con los campos numéricos convertidos
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+
+    records = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            for name in ('prompt_tokens', 'completion_tokens'):
+                row[name] = int(float(row.get(name) or 0))
+            for name in ('latency', 'ttft'):
+                row[name] = float(row[name]) if row.get(name) else None
+            row['cached'] = str(row.get('cached')).lower() == 'true'
+            records.append(row)
+    return records
+
+
+def _summarize_group(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = [r['latency'] for r in records if r.get('latency') is not None and not r.get('cached')]
+    ttfts = [r['ttft'] for r in records if r.get('ttft') is not None and not r.get('cached')]
+    hits = sum(1 for r in records if r.get('cached'))
+
+    summary = {
+        'calls': len(records),
+        'cache_hits': hits,
+        'hit_rate': hits / len(records) if records else 0.0,
+        'errors': sum(1 for r in records if r.get('status') == 'error'),
+        'prompt_tokens': sum(r.get('prompt_tokens') or 0 for r in records),
+        'completion_tokens': sum(r.get('completion_tokens') or 0 for r in records),
+        'latency_seconds': sum(latencies),
+        'avg_latency': statistics.mean(latencies) if latencies else 0.0,
+        'p95_latency': (statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1
+                        else (latencies[0] if latencies else 0.0)),
+        'avg_ttft': statistics.mean(ttfts) if ttfts else None,
+    }
+    summary['tokens_per_second'] = (
+        summary['completion_tokens'] / summary['latency_seconds'] if summary['latency_seconds'] > 0 else 0.0
+    )
+    return summary
+
+
+def estimate_api_cost(prompt_tokens: int, completion_tokens: int) -> Dict[str, float]:
+    """
+    Proyecta el coste de los tokens consumidos con las tarifas de API
+
+    Args:
+        prompt_tokens: Tokens de entrada
+        completion_tokens: Tokens de salida
+
+    Returns:
+        Diccionario proveedor -> coste en USD
+    """
+    return {
+        name: (prompt_tokens * price_in + completion_tokens * price_out) / 1e6
+        for name, (price_in, price_out) in API_PRICING.items()
+    }
+
+
+def summarize_llm_calls(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Agrega llamadas LLM en totales y desgloses por agente y modelo
+
+    Args:
+        records: Registros de llamadas
+
+    Returns:
+        Diccionario con 'total', 'by_agent', 'by_model' y 'projected_cost'
+    """
+    by_agent: Dict[str, List[Dict]] = {}
+    by_model: Dict[str, List[Dict]] = {}
+    for record in records:
+        by_agent.setdefault(record.get('agent') or 'desconocido', []).append(record)
+        by_model.setdefault(record.get('model') or 'desconocido', []).append(record)
+
+    total = _summarize_group(records)
+    return {
+        'total': total,
+        'by_agent': {name: _summarize_group(group) for name, group in sorted(by_agent.items())},
+        'by_model': {name: _summarize_group(group) for name, group in sorted(by_model.items())},
+        'projected_cost': estimate_api_cost(total['prompt_tokens'], total['completion_tokens']),
+    }
@@ -0,0 +1,116 @@
+"""
+Generación en Streaming con Terminación Temprana
+
+Al generar código, el modelo suele seguir escribiendo explicaciones largas
+después del bloque de código, y esos tokens se pagan en latencia aunque
+luego se descarten. Este módulo consume la respuesta en streaming, detecta
+el primer bloque de código Python completo y sintácticamente válido, y cierra
+la petición en ese momento (al cerrar el stream se corta la conexión HTTP y
+Ollama deja de generar).
+"""
+
+import ast
+import re
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Bloque de código cerrado: ```lenguaje\n ... \n```
+FENCE_PATTERN = re.compile(r'```([\w+-]*)[ \t]*\n(.*?)\n```', re.DOTALL)
+
+# Etiquetas de bloque que se consideran código Python
+PYTHON_FENCE_LANGUAGES = ('python', 'python3', 'py', '')
+
+
+def is_valid_python(code: str) -> bool:
+    """Indica si el código es Python sintácticamente válido"""
+    try:
+        ast.parse(code)
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+
+class CodeBlockDetector:
+    """
+    Acumula fragmentos de texto y detecta el primer bloque Python completo.
+    """
+
+    def __init__(self, validator: Callable[[str], bool] = is_valid_python):
+        """
+        Args:
+            validator: Función que decide si un bloque cerrado es aceptable
+        """
+        self.validator = validator
+        self.text = ""
+        self.code: Optional[str] = None
+        self.rejected_blocks = 0
+        self._scan_from = 0
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Añade un fragmento y busca bloques que se hayan cerrado
+
+        Args:
+            chunk: Texto recibido
+
+        Returns:
+            Código del primer bloque válido, o None si aún no hay ninguno
+        """
+        self.text += chunk
+        if self.code is not None:
+            return self.code
+
+        for match in FENCE_PATTERN.finditer(self.text, self._scan_from):
+            self._scan_from = match.end()
+            if match.group(1).lower() not in PYTHON_FENCE_LANGUAGES:
+                continue
+            code = match.group(2).strip()
+            if code and self.validator(code):
+                self.code = code
+                return code
+            self.rejected_blocks += 1
+        return None
+
+
+def stream_code_block(llm: Any, prompt: Any,
+                      validator: Callable[[str], bool] = is_valid_python,
+                      **kwargs) -> Tuple[str, Optional[str], Dict]:
+    """
+    Genera en streaming y se detiene al recibir un bloque de código válido
+
+    Args:
+        llm: Modelo de chat con interfaz stream() (ChatOllama o CachedLLM)
+        prompt: Prompt en texto o lista de mensajes
+        validator: Función que decide si un bloque cerrado es aceptable
+        **kwargs: Argumentos adicionales para el modelo
+
+    Returns:
+        Tupla (texto recibido, código detectado o None, estadísticas con
+        'stopped_early', 'chars_received', 'rejected_blocks' y 'elapsed')
+    """
+    detector = CodeBlockDetector(validator)
+    stopped_early = False
+    start = time.time()
+
+    stream = llm.stream(prompt, **kwargs)
+    try:
+        for chunk in stream:
+            content = getattr(chunk, 'content', chunk)
+            if not isinstance(content, str):
+                continue
+            if detector.feed(content) is not None:
+                stopped_early = True
+                break
+    finally:
+        # Cerrar el stream aborta la petición en curso
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+
+    stats = {
+        'stopped_early': stopped_early,
+        'chars_received': len(detector.text),
+        'rejected_blocks': detector.rejected_blocks,
+        'elapsed': time.time() - start
+    }
+    return detector.text, detector.code, stats
@@ -22,6 +22,7 @@ LOG_FILE = LOGS_DIR / "sistema_a2a.log"
 STATE_FILE = LOGS_DIR / "system_state.json"
 METRICS_FILE = LOGS_DIR / "metrics_history.csv"
 AGENT_LOGS_FILE = LOGS_DIR / "agent_logs.json"
+LLM_CALLS_FILE = LOGS_DIR / "llm_calls.csv"
 
 # Configurar logger
 logging.basicConfig(
@@ -215,6 +216,42 @@ def log_metric(pdr: float = 0, delay: float = 0, throughput: float = 0, overhead
         logger.error(f"Error guardando métricas en CSV: {e}")
 
 
+def log_llm_call(record: Dict[str, Any]):
+    """
+    Registra una llamada LLM (tokens, latencia, caché) para el dashboard
+    
+    Args:
+        record: Registro de utils.llm_metrics (agent, model, prompt_tokens,
+            completion_tokens, ttft, latency, cached, iteration...)
+    """
+    from utils.llm_metrics import CALL_FIELDS
+    
+    # Acumulados por agente en el estado del sistema
+    usage = _system_state.setdefault('llm_usage', {})
+    agent_usage = usage.setdefault(record['agent'], {
+        'calls': 0, 'cache_hits': 0, 'prompt_tokens': 0,
+        'completion_tokens': 0, 'latency_seconds': 0.0
+    })
+    agent_usage['calls'] += 1
+    agent_usage['cache_hits'] += int(bool(record.get('cached')))
+    agent_usage['prompt_tokens'] += record.get('prompt_tokens') or 0
+    agent_usage['completion_tokens'] += record.get('completion_tokens') or 0
+    agent_usage['latency_seconds'] += record.get('latency') or 0.0
+    _save_state()
+    
+    # Historial de llamadas (CSV)
+    try:
+        file_exists = LLM_CALLS_FILE.exists()
+        
+        with open(LLM_CALLS_FILE, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CALL_FIELDS, extrasaction='ignore')
+            if not file_exists:
+                writer.writeheader()
+            writer.writerow(record)
+    except Exception as e:
+        logger.error(f"Error guardando llamada LLM en CSV: {e}")
+
+
 def set_system_status(status: str, task: str = None, iteration: int = None, max_iterations: int = None):
     """
     Actualiza el estado general del sistema
@@ -2,25 +2,157 @@
 Memoria Episódica para el Sistema A2A
 
 Permite al sistema recordar experiencias pasadas (código, errores, soluciones)
-y recuperarlas cuando enfrenta problemas similares.
+y recuperarlas cuando enfrenta problemas similares. Las experiencias viven en
+una base SQLite compartida por los procesos de una campaña.
 """
 
-import json
 import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Optional
 import numpy as np
 
+from utils.error_signatures import error_signature, normalize_error
+
 # Intentar importar sklearn, si no está disponible usar fallback simple
 try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from scipy import sparse
     HAS_SKLEARN = True
 except ImportError:
     HAS_SKLEARN = False
     print("⚠️  scikit-learn no disponible. Memoria episódica usará búsqueda simple.")
 
 
+class TfidfIndex:
+    """
+    Índice TF-IDF incremental con vocabulario fijo.
+    
+    Los términos se proyectan por hashing a un espacio de dimensión fija, de
+    modo que añadir un documento no requiere reajustar el vocabulario: solo
+    se apila su vector de frecuencias y se actualiza la frecuencia documental.
+    El IDF se aplica en la consulta, que equivale a ajustar TfidfVectorizer
+    (idf suavizado, norma L2) sobre [consulta] + documentos y se resuelve con
+    dos productos matriz dispersa-vector.
+    """
+    
+    # Bloques apilados antes de compactarlos en una única matriz
+    MAX_BLOCKS = 16
+    
+    def __init__(self, n_features: int = 2 ** 14):
+        """
+        Args:
+            n_features: Dimensión del espacio de términos
+        """
+        self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        self.doc_freq = np.zeros(n_features)
+        self._blocks = []       # Matrices de frecuencias (CSR), una por lote añadido
+        self._squared = []      # Cuadrados elemento a elemento (para las normas)
+    
+    def __len__(self) -> int:
+        return sum(block.shape[0] for block in self._blocks)
+    
+    def add(self, texts: List[str]):
+        """Indexa documentos nuevos al final del índice"""
+        if not texts:
+            return
+        counts = self.vectorizer.transform(texts).tocsr()
+        self.doc_freq += np.asarray((counts > 0).sum(axis=0)).ravel()
+        self._blocks.append(counts)
+        self._squared.append(counts.multiply(counts).tocsr())
+        if len(self._blocks) > self.MAX_BLOCKS:
+            self._compact()
+    
+    def _compact(self):
+        if len(self._blocks) > 1:
+            self._blocks = [sparse.vstack(self._blocks).tocsr()]
+            self._squared = [sparse.vstack(self._squared).tocsr()]
+    
+    def drop_first(self, count: int):
+        """Elimina los primeros documentos del índice (los más antiguos)"""
+        self.remove(range(max(0, count)))
+    
+    def remove(self, positions):
+        """Elimina los documentos en las posiciones indicadas"""
+        positions = np.fromiter(positions, dtype=int)
+        if positions.size == 0:
+            return
+        self._compact()
+        matrix, squared = self._blocks[0], self._squared[0]
+        keep = np.ones(matrix.shape[0], dtype=bool)
+        keep[positions] = False
+        self.doc_freq -= np.asarray((matrix[~keep] > 0).sum(axis=0)).ravel()
+        self._blocks = [matrix[keep]]
+        self._squared = [squared[keep]]
+    
+    def clear(self):
+        """Vacía el índice"""
+        self.doc_freq[:] = 0
+        self._blocks = []
+        self._squared = []
+    
+    def query(self, text: str) -> np.ndarray:
+        """
+        Similitud coseno TF-IDF entre el texto y cada documento indexado
+        
+        Args:
+            text: Texto de la consulta
+            
+        Returns:
+            Array con la similitud de cada documento, en orden de inserción
+        """
+        n_docs = len(self)
+        if n_docs == 0:
+            return np.zeros(0)
+        
+        # IDF suavizado (como TfidfVectorizer) sobre los documentos indexados
+        # más la consulta, igual que el ajuste sobre [consulta] + documentos
+        query = np.asarray(self.vectorizer.transform([text]).todense()).ravel()
+        doc_freq = self.doc_freq + (query > 0)
+        idf = np.log((2 + n_docs) / (1 + doc_freq)) + 1
+        idf_squared = idf ** 2
+        
+        query_norm = np.linalg.norm(query * idf)
+        if query_norm == 0:
+            return np.zeros(n_docs)
+        
+        weights = query * idf_squared
+        dots = np.concatenate([block @ weights for block in self._blocks])
+        norms = np.sqrt(np.concatenate([block @ idf_squared for block in self._squared]))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarities = np.where(norms > 0, dots / (norms * query_norm), 0.0)
+        return similarities
+
+
+def _max_experiences() -> int:
+    """Lee MEMORY_MAX_EXPERIENCES (o el valor por defecto)"""
+    try:
+        from config.settings import MEMORY_MAX_EXPERIENCES
+    except ImportError:
+        return EpisodicMemory.DEFAULT_MAX_EXPERIENCES
+    if isinstance(MEMORY_MAX_EXPERIENCES, int) and MEMORY_MAX_EXPERIENCES > 0:
+        return MEMORY_MAX_EXPERIENCES
+    return EpisodicMemory.DEFAULT_MAX_EXPERIENCES
+
+
+def _semantic_embedder():
+    """Función de embedding compartida si MEMORY_SEMANTIC_SEARCH está activo"""
+    try:
+        from config.settings import MEMORY_SEMANTIC_SEARCH
+    except ImportError:
+        return None
+    if MEMORY_SEMANTIC_SEARCH is not True:
+        return None
+    from utils.embeddings import get_embedding_function
+    return get_embedding_function()
+
+
 class EpisodicMemory:
     """
     Almacena y recupera experiencias pasadas del sistema.
@@ -31,42 +163,287 @@ class EpisodicMemory:
     - error: Error que ocurrió
     - solution: Solución que funcionó
     - timestamp: Cuándo ocurrió
+    
+    Las experiencias se guardan en SQLite (modo WAL), de modo que varios
+    procesos de una campaña pueden compartir la misma memoria: cada escritura
+    es una inserción atómica, los errores casi idénticos actualizan la
+    experiencia existente y, al superar MEMORY_MAX_EXPERIENCES, se desalojan
+    las menos usadas en recuperaciones. Cada experiencia se indexa además por
+    la firma canónica de su error, que resuelve los fallos conocidos con una
+    búsqueda exacta antes del TF-IDF. Con MEMORY_SEMANTIC_SEARCH, la búsqueda
+    aproximada usa los embeddings compartidos con el investigador.
     """
     
-    def __init__(self, memory_file: str = "data/episodic_memory.json"):
+    DEFAULT_MAX_EXPERIENCES = 5000
+    # Similitud coseno mínima de una experiencia recuperada por embeddings
+    MIN_EMBEDDING_SIMILARITY = 0.3
+    SCHEMA_VERSION = 2
+    
+    def __init__(self, memory_file: str = "data/episodic_memory.db", embedder=None):
         """
         Inicializa la memoria episódica
         
         Args:
-            memory_file: Ruta al archivo de memoria
+            memory_file: Ruta a la base de datos de memoria. Si se indica un
+                archivo .json (formato anterior), la base de datos se crea a su
+                lado con extensión .db y se importan sus experiencias
+            embedder: Función de embedding para la búsqueda semántica
+                (None = la compartida si MEMORY_SEMANTIC_SEARCH está activo)
         """
-        self.memory_file = Path(memory_file)
+        memory_file = Path(memory_file)
+        if memory_file.suffix == '.json':
+            self.legacy_file = memory_file
+            self.memory_file = memory_file.with_suffix('.db')
+        else:
+            self.legacy_file = memory_file.with_suffix('.json')
+            self.memory_file = memory_file
         self.memory_file.parent.mkdir(parents=True, exist_ok=True)
-        self.experiences = self._load()
         
-        if HAS_SKLEARN:
-            self.vectorizer = TfidfVectorizer(max_features=100)
-        else:
-            self.vectorizer = None
+        self._lock = threading.Lock()
+        self.has_fts = False
+        self._init_db()
+        
+        # Índice de (tarea + error) de cada experiencia, alineado con sus ids;
+        # se construye una vez y se sincroniza con las escrituras de otros procesos
+        self._index_ids: List[int] = []
+        self.index = TfidfIndex() if HAS_SKLEARN else None
+        self._sync_index()
+        
+        # Embeddings de las mismas experiencias; se calculan en la primera
+        # recuperación (no al importar) y se leen del caché en disco
+        self.embedder = embedder if embedder is not None else _semantic_embedder()
+        self._vector_ids: List[int] = []
+        self._vectors: Optional[np.ndarray] = None
+    
+    @staticmethod
+    def _document(experience: Dict) -> str:
+        """Texto indexado de una experiencia"""
+        return f"{experience['task']} {experience['error']}"
     
-    def _load(self) -> List[Dict]:
-        """Carga experiencias desde archivo"""
-        if self.memory_file.exists():
+    @contextmanager
+    def _connect(self, write: bool = False):
+        """
+        Abre una conexión (una por operación, segura entre hilos y procesos)
+        
+        Args:
+            write: Tomar el bloqueo de escritura al empezar la transacción
+        """
+        conn = sqlite3.connect(str(self.memory_file), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    
+    def _init_db(self):
+        """Crea el esquema e importa la memoria JSON anterior una sola vez"""
+        conn = sqlite3.connect(str(self.memory_file), timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS experiences (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    error_key TEXT NOT NULL UNIQUE,
+                    signature TEXT,
+                    task TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    error TEXT NOT NULL,
+                    solution TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    occurrences INTEGER NOT NULL DEFAULT 1,
+                    uses INTEGER NOT NULL DEFAULT 0,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_experiences_usage "
+                "ON experiences (uses, last_used)"
+            )
+            
+            # Bases creadas antes de las firmas de error
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(experiences)")}
+            if 'signature' not in columns:
+                conn.execute("ALTER TABLE experiences ADD COLUMN signature TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_experiences_signature "
+                "ON experiences (signature)"
+            )
+            
+            # Índice de texto completo para la búsqueda sin scikit-learn
             try:
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS experiences_fts
+                    USING fts5(task, error, content='experiences', content_rowid='id')
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS experiences_fts_insert AFTER INSERT ON experiences
+                    BEGIN
+                        INSERT INTO experiences_fts (rowid, task, error)
+                        VALUES (new.id, new.task, new.error);
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS experiences_fts_delete AFTER DELETE ON experiences
+                    BEGIN
+                        INSERT INTO experiences_fts (experiences_fts, rowid, task, error)
+                        VALUES ('delete', old.id, old.task, old.error);
+                    END
+                """)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self.has_fts = False
+            conn.commit()
+            
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+        
+        if version < self.SCHEMA_VERSION:
+            with self._connect(write=True) as conn:
+                # Otro proceso pudo migrar mientras se esperaba el bloqueo
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < 1:
+                    for experience in self._load_legacy():
+                        self._upsert(conn, experience)
+                if version < 2:
+                    rows = conn.execute(
+                        "SELECT id, error FROM experiences WHERE signature IS NULL"
+                    ).fetchall()
+                    conn.executemany(
+                        "UPDATE experiences SET signature = ? WHERE id = ?",
+                        [(self._signature_key(row['error']), row['id']) for row in rows]
+                    )
+                conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+    
+    def _load_legacy(self) -> List[Dict]:
+        """Carga experiencias del archivo JSON del formato anterior"""
+        if self.legacy_file.exists():
+            try:
+                with open(self.legacy_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except Exception as e:
                 print(f"⚠️  Error cargando memoria: {e}")
                 return []
         return []
     
-    def _save(self):
-        """Guarda experiencias a archivo"""
-        try:
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(self.experiences, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"⚠️  Error guardando memoria: {e}")
+    @staticmethod
+    def _signature_key(error: str) -> Optional[str]:
+        """Clave de la firma canónica del error (None si no hay error)"""
+        signature = error_signature(error)
+        return signature.key if signature else None
+    
+    @classmethod
+    def _upsert(cls, conn: sqlite3.Connection, experience: Dict):
+        """
+        Inserta una experiencia, o actualiza la existente si su error es casi idéntico
+        
+        La tarea y el error indexados se conservan de la primera aparición;
+        se actualizan la solución, el código y la fecha. La firma se toma de
+        'signature' si viene calculada sobre el error completo.
+        
+        El error se identifica por su firma (excepción, símbolo y mensaje
+        normalizado) y no por el inicio del texto: en un traceback largo el
+        inicio son frames que comparten fallos distintos.
+        """
+        signature = experience.get('signature') or cls._signature_key(experience['error'])
+        error_key = signature or hashlib.sha256(
+            normalize_error(experience['error']).encode('utf-8')).hexdigest()
+        conn.execute("""
+            INSERT INTO experiences
+                (error_key, signature, task, code, error, solution, timestamp, last_used)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (error_key) DO UPDATE SET
+                code = excluded.code,
+                solution = excluded.solution,
+                timestamp = excluded.timestamp,
+                occurrences = occurrences + 1
+        """, (error_key, signature, experience['task'],
+              experience['code'], experience['error'], experience['solution'],
+              experience['timestamp'], time.time()))
+    
+    @staticmethod
+    def _row_to_experience(row: sqlite3.Row) -> Dict:
+        return {
+            'task': row['task'],
+            'code': row['code'],
+            'error': row['error'],
+            'solution': row['solution'],
+            'timestamp': row['timestamp'],
+            'occurrences': row['occurrences'],
+            'uses': row['uses'],
+        }
+    
+    @property
+    def experiences(self) -> List[Dict]:
+        """Todas las experiencias almacenadas, en orden de inserción"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM experiences ORDER BY id").fetchall()
+        return [self._row_to_experience(row) for row in rows]
+    
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM experiences").fetchone()[0]
+    
+    def _sync_index(self):
+        """
+        Alinea el índice TF-IDF con la base de datos
+        
+        Indexa las experiencias nuevas (de este u otros procesos) y retira las
+        desalojadas, sin reconstruir el índice completo.
+        """
+        if self.index is None:
+            return
+        
+        with self._lock:
+            last_id = self._index_ids[-1] if self._index_ids else 0
+            with self._connect() as conn:
+                new_rows = conn.execute(
+                    "SELECT id, task, error FROM experiences WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+                count = conn.execute(
+                    "SELECT COUNT(*) FROM experiences WHERE id <= ?", (last_id,)
+                ).fetchone()[0]
+                live_ids = None
+                if count < len(self._index_ids):
+                    live_ids = {row[0] for row in conn.execute(
+                        "SELECT id FROM experiences WHERE id <= ?", (last_id,))}
+            
+            if live_ids is not None:
+                removed = [pos for pos, exp_id in enumerate(self._index_ids) if exp_id not in live_ids]
+                self.index.remove(removed)
+                self._index_ids = [exp_id for exp_id in self._index_ids if exp_id in live_ids]
+            
+            if new_rows:
+                self.index.add([self._document(row) for row in new_rows])
+                self._index_ids.extend(row['id'] for row in new_rows)
+    
+    def _sync_vectors(self):
+        """Alinea los embeddings de las experiencias con la base de datos"""
+        with self._lock:
+            last_id = self._vector_ids[-1] if self._vector_ids else 0
+            with self._connect() as conn:
+                new_rows = conn.execute(
+                    "SELECT id, task, error FROM experiences WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+                live_ids = {row[0] for row in conn.execute(
+                    "SELECT id FROM experiences WHERE id <= ?", (last_id,))}
+            
+            if len(live_ids) < len(self._vector_ids):
+                keep = [exp_id in live_ids for exp_id in self._vector_ids]
+                self._vectors = self._vectors[np.array(keep, dtype=bool)]
+                self._vector_ids = [exp_id for exp_id in self._vector_ids if exp_id in live_ids]
+            
+            if new_rows:
+                vectors = self.embedder.embed([self._document(row) for row in new_rows])
+                self._vectors = vectors if self._vectors is None or not len(self._vectors) \
+                    else np.vstack([self._vectors, vectors])
+                self._vector_ids.extend(row['id'] for row in new_rows)
     
     def add_experience(self, task: str, code: str, error: str, solution: str):
         """
@@ -82,18 +459,32 @@ class EpisodicMemory:
             'task': task[:500],  # Truncar para no ocupar mucho espacio
             'code': code[:1000],
             'error': error[:500],
-            'solution': solution[:1000],
+            # La excepción está al final del traceback: la firma usa el error completo
+            'signature': self._signature_key(error),
+            'solution': solution,  # Completa: puede servir de plan para un fallo conocido
             'timestamp': datetime.datetime.now().isoformat()
         }
         
-        self.experiences.append(experience)
-        
-        # Limitar a últimas 100 experiencias
-        if len(self.experiences) > 100:
-            self.experiences = self.experiences[-100:]
+        try:
+            with self._connect(write=True) as conn:
+                self._upsert(conn, experience)
+                
+                # Desalojar las experiencias menos usadas (y menos recientes)
+                total = conn.execute("SELECT COUNT(*) FROM experiences").fetchone()[0]
+                excess = total - _max_experiences()
+                if excess > 0:
+                    conn.execute("""
+                        DELETE FROM experiences WHERE id IN (
+                            SELECT id FROM experiences ORDER BY uses, last_used LIMIT ?
+                        )
+                    """, (excess,))
+                    total -= excess
+        except sqlite3.Error as e:
+            print(f"⚠️  Error guardando memoria: {e}")
+            return
         
-        self._save()
-        print(f"🧠 Experiencia guardada en memoria ({len(self.experiences)} total)")
+        self._sync_index()
+        print(f"🧠 Experiencia guardada en memoria ({total} total)")
     
     def retrieve_experience(self, task: str, error: str, top_k: int = 3) -> List[Dict]:
         """
@@ -107,38 +498,107 @@ class EpisodicMemory:
         Returns:
             Lista de experiencias similares con score de relevancia
         """
-        if not self.experiences:
-            return []
+        # Fallo conocido: la solución se resuelve por firma, sin búsqueda aproximada
+        exact = self.lookup_signature(error, task)
+        if exact is not None:
+            self._record_usage([exact.pop('id')])
+            return [exact]
         
         query = f"{task} {error}"
         
-        if HAS_SKLEARN and len(self.experiences) >= 2:
-            return self._retrieve_with_tfidf(query, top_k)
-        else:
-            return self._retrieve_simple(query, top_k)
+        results = self._retrieve_with_embeddings(query, top_k) if self.embedder is not None else None
+        if results is None:
+            self._sync_index()
+            if self.index is not None and len(self.index) >= 2:
+                results = self._retrieve_with_tfidf(query, top_k)
+            else:
+                results = self._retrieve_simple(query, top_k)
+        
+        self._record_usage([exp.pop('id') for exp in results])
+        return results
+    
+    def lookup_signature(self, error: str, task: Optional[str] = None) -> Optional[Dict]:
+        """
+        Busca la mejor solución conocida para la firma exacta del error
+        
+        Entre las experiencias con la misma firma se elige la solución
+        confirmada más veces y, a igualdad, la más reciente. Si la firma no
+        nombra un símbolo concreto (timeouts, segfaults...) solo cuentan las
+        experiencias cuya tarea sigue la misma plantilla (igual salvo números).
+        
+        Args:
+            error: Mensaje de error o traceback
+            task: Tarea actual (necesaria para firmas genéricas)
+            
+        Returns:
+            Experiencia con 'relevance' 1.0 y la firma en 'signature', o None
+        """
+        signature = error_signature(error)
+        if signature is None:
+            return None
+        
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT * FROM experiences WHERE signature = ?
+                ORDER BY occurrences DESC, timestamp DESC
+            """, (signature.key,)).fetchall()
+        if not signature.is_specific:
+            template = normalize_error(task) if task else None
+            rows = [row for row in rows if template and normalize_error(row['task']) == template]
+        if not rows:
+            return None
+        row = rows[0]
+        
+        experience = self._row_to_experience(row)
+        experience['id'] = row['id']
+        experience['relevance'] = 1.0
+        experience['signature'] = str(signature)
+        return experience
+    
+    def _fetch(self, ids: List[int]) -> Dict[int, Dict]:
+        """Experiencias por id (las desalojadas entretanto no aparecen)"""
+        if not ids:
+            return {}
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM experiences WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        return {row['id']: self._row_to_experience(row) for row in rows}
+    
+    def _record_usage(self, ids: List[int]):
+        """Cuenta una recuperación de cada experiencia (protege del desalojo)"""
+        if not ids:
+            return
+        try:
+            with self._connect(write=True) as conn:
+                conn.executemany(
+                    "UPDATE experiences SET uses = uses + 1, last_used = ? WHERE id = ?",
+                    [(time.time(), exp_id) for exp_id in ids]
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  Error actualizando uso de memoria: {e}")
     
     def _retrieve_with_tfidf(self, query: str, top_k: int) -> List[Dict]:
-        """Recuperación usando TF-IDF y similitud coseno"""
+        """Recuperación usando el índice TF-IDF y similitud coseno"""
         try:
-            # Crear documentos de experiencias
-            docs = [f"{exp['task']} {exp['error']}" for exp in self.experiences]
-            
-            # Vectorizar
-            all_docs = [query] + docs
-            vectors = self.vectorizer.fit_transform(all_docs)
-            
-            # Calcular similitud
-            query_vector = vectors[0:1]
-            doc_vectors = vectors[1:]
-            similarities = cosine_similarity(query_vector, doc_vectors).flatten()
+            with self._lock:
+                similarities = self.index.query(query)
+                ids = list(self._index_ids)
             
             # Obtener top_k más similares
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            top_k = min(top_k, len(similarities))
+            top_indices = np.argpartition(similarities, -top_k)[-top_k:]
+            top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
+            
+            # Umbral mínimo de similitud
+            top_indices = [idx for idx in top_indices if similarities[idx] > 0.1]
+            stored = self._fetch([ids[idx] for idx in top_indices])
             
             results = []
             for idx in top_indices:
-                if similarities[idx] > 0.1:  # Umbral mínimo de similitud
-                    exp = self.experiences[idx].copy()
+                if ids[idx] in stored:
+                    exp = stored[ids[idx]]
+                    exp['id'] = ids[idx]
                     exp['relevance'] = float(similarities[idx])
                     results.append(exp)
             
@@ -147,6 +607,59 @@ class EpisodicMemory:
             print(f"⚠️  Error en recuperación TF-IDF: {e}")
             return self._retrieve_simple(query, top_k)
     
+    def _retrieve_with_embeddings(self, query: str, top_k: int) -> Optional[List[Dict]]:
+        """
+        Recuperación por similitud coseno de embeddings
+        
+        Returns:
+            Experiencias similares, o None si hay que usar TF-IDF (memoria
+            casi vacía o backend de embedding no disponible)
+        """
+        try:
+            self._sync_vectors()
+            with self._lock:
+                if self._vectors is None or len(self._vectors) < 2:
+                    return None
+                vectors = self._vectors
+                ids = list(self._vector_ids)
+            
+            query_vector = self.embedder.embed([query])[0]
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query_vector)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                similarities = np.where(norms > 0, (vectors @ query_vector) / norms, 0.0)
+        except Exception as e:
+            print(f"⚠️  Búsqueda semántica no disponible, usando TF-IDF: {e}")
+            self.embedder = None
+            return None
+        
+        order = np.argsort(similarities)[::-1][:top_k]
+        order = [idx for idx in order if similarities[idx] >= self.MIN_EMBEDDING_SIMILARITY]
+        stored = self._fetch([ids[idx] for idx in order])
+        
+        results = []
+        for idx in order:
+            if ids[idx] in stored:
+                exp = stored[ids[idx]]
+                exp['id'] = ids[idx]
+                exp['relevance'] = float(similarities[idx])
+                results.append(exp)
+        return results
+    
+    def _candidates(self, query_words: set, limit: int) -> List[sqlite3.Row]:
+        """Experiencias que comparten algún término con la consulta"""
+        with self._connect() as conn:
+            if self.has_fts and query_words:
+                terms = " OR ".join('"' + word.replace('"', '""') + '"' for word in query_words)
+                try:
+                    return conn.execute("""
+                        SELECT experiences.* FROM experiences_fts
+                        JOIN experiences ON experiences.id = experiences_fts.rowid
+                        WHERE experiences_fts MATCH ? ORDER BY rank LIMIT ?
+                    """, (terms, limit)).fetchall()
+                except sqlite3.OperationalError:
+                    pass
+            return conn.execute("SELECT * FROM experiences").fetchall()
+    
     def _retrieve_simple(self, query: str, top_k: int) -> List[Dict]:
         """Recuperación simple basada en palabras clave"""
         query_lower = query.lower()
@@ -154,16 +667,17 @@ class EpisodicMemory:
         
         scored_experiences = []
         
-        for exp in self.experiences:
+        for row in self._candidates(query_words, max(top_k * 20, 100)):
             # Calcular score simple: palabras en común
-            exp_text = f"{exp['task']} {exp['error']}".lower()
+            exp_text = f"{row['task']} {row['error']}".lower()
             exp_words = set(exp_text.split())
             
             common_words = query_words.intersection(exp_words)
             score = len(common_words) / max(len(query_words), 1)
             
             if score > 0.1:  # Umbral mínimo
-                exp_copy = exp.copy()
+                exp_copy = self._row_to_experience(row)
+                exp_copy['id'] = row['id']
                 exp_copy['relevance'] = score
                 scored_experiences.append(exp_copy)
         
@@ -173,24 +687,60 @@ class EpisodicMemory:
     
     def clear(self):
         """Limpia toda la memoria"""
-        self.experiences = []
-        self._save()
+        with self._connect(write=True) as conn:
+            conn.execute("DELETE FROM experiences")
+        with self._lock:
+            self._index_ids = []
+            self._vector_ids = []
+            self._vectors = None
+            if self.index is not None:
+                self.index.clear()
         print("🧠 Memoria episódica limpiada")
     
     def get_stats(self) -> Dict:
         """Retorna estadísticas de la memoria"""
+        with self._connect() as conn:
+            total, occurrences, signatures = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(occurrences), 0), COUNT(DISTINCT signature) "
+                "FROM experiences"
+            ).fetchone()
         return {
-            'total_experiences': len(self.experiences),
+            'total_experiences': total,
+            'error_signatures': signatures,
+            'deduplicated_errors': occurrences - total,
+            'max_experiences': _max_experiences(),
             'memory_file': str(self.memory_file),
-            'has_sklearn': HAS_SKLEARN
+            'has_sklearn': HAS_SKLEARN,
+            'has_fts': self.has_fts,
+            'embedding_model': self.embedder.model_id if self.embedder is not None else None
         }
 
 
-# Instancia global de memoria
-memory = EpisodicMemory()
+# Instancia global de memoria (se crea al primer uso, no al importar)
+_memory: Optional[EpisodicMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_memory() -> EpisodicMemory:
+    """Obtiene la instancia global de la memoria episódica"""
+    global _memory
+
+    with _memory_lock:
+        if _memory is None:
+            _memory = EpisodicMemory()
+    return _memory
+
+
+def __getattr__(name):
+    # Compatibilidad con 'from utils.memory import memory'
+    if name == 'memory':
+        return get_memory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
+    memory = get_memory()
+
     # Prueba de la memoria episódica
     print("🧠 Prueba de Memoria Episódica\n")
     
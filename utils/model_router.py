@@ -0,0 +1,227 @@
+"""
+Enrutamiento de Modelos por Niveles
+
+Todos los agentes usaban el modelo grande (MODEL_REASONING / MODEL_CODING)
+incluso para decisiones triviales como generar la consulta de búsqueda o
+emitir el JSON de aprobación del crítico. Este módulo envía las llamadas de
+bajo riesgo a un modelo pequeño y rápido (MODEL_FAST) y escala al modelo
+grande solo cuando hace falta (respuesta del crítico ambigua, código que ya
+falló varias veces), registrando latencia y tokens por nivel.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from utils.dependency_injection import get_llm
+from utils.llm_metrics import extract_token_usage
+
+logger = logging.getLogger('A2A.router')
+
+TIER_FAST = "fast"
+TIER_LARGE = "large"
+
+# Nivel por defecto de cada tipo de llamada (las no listadas usan el modelo grande)
+ROUTES = {
+    'researcher.query': TIER_FAST,    # Consulta de 5-7 palabras
+    'critic.review': TIER_FAST,       # Aprobación JSON; escala si la respuesta es ambigua
+    'coder.plan': TIER_FAST,          # Plan CoT; escala tras fallos repetidos
+    'coder.code': TIER_LARGE,         # El código siempre con el modelo grande
+}
+
+
+def _routing_settings() -> Tuple[bool, str]:
+    """Lee la configuración de enrutamiento en el momento de la llamada"""
+    from config.settings import MODEL_ROUTING_ENABLED, MODEL_FAST
+    enabled = MODEL_ROUTING_ENABLED is True and isinstance(MODEL_FAST, str) and bool(MODEL_FAST)
+    return enabled, MODEL_FAST
+
+
+def route_model(route: str, default_model: str, escalate: bool = False) -> Tuple[str, str]:
+    """
+    Decide qué modelo atiende una llamada
+
+    Args:
+        route: Tipo de llamada (clave de ROUTES)
+        default_model: Modelo grande que el agente usaría sin enrutamiento
+        escalate: Forzar el modelo grande
+
+    Returns:
+        Tupla (modelo, nivel)
+    """
+    enabled, fast_model = _routing_settings()
+    tier = ROUTES.get(route, TIER_LARGE)
+
+    if escalate or not enabled or tier == TIER_LARGE or fast_model == default_model:
+        return default_model, TIER_LARGE
+    return fast_model, TIER_FAST
+
+
+class TierStats:
+    """
+    Métricas acumuladas por nivel de modelo.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tier: str, route: str, model: str, latency: float,
+               input_tokens: int = 0, output_tokens: int = 0, escalated: bool = False):
+        """Registra una llamada"""
+        with self._lock:
+            stats = self._stats.setdefault(tier, {
+                'calls': 0, 'escalations': 0, 'latency_seconds': 0.0,
+                'input_tokens': 0, 'output_tokens': 0
+            })
+            stats['calls'] += 1
+            stats['escalations'] += int(escalated)
+            stats['latency_seconds'] += latency
+            stats['input_tokens'] += input_tokens
+            stats['output_tokens'] += output_tokens
+
+        logger.info(
+            f"[{tier}] {route} -> {model}: {latency:.2f}s, "
+            f"{input_tokens} tokens entrada / {output_tokens} salida"
+            + (" (escalado)" if escalated else "")
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Retorna las métricas por nivel
+
+        Returns:
+            Diccionario nivel -> {'calls', 'escalations', 'latency_seconds',
+            'avg_latency', 'input_tokens', 'output_tokens', 'tokens_per_second'}
+        """
+        with self._lock:
+            result = {tier: dict(stats) for tier, stats in self._stats.items()}
+
+        for stats in result.values():
+            stats['avg_latency'] = stats['latency_seconds'] / stats['calls'] if stats['calls'] else 0.0
+            stats['tokens_per_second'] = (
+                stats['output_tokens'] / stats['latency_seconds'] if stats['latency_seconds'] > 0 else 0.0
+            )
+        return result
+
+    def reset(self):
+        """Reinicia las métricas"""
+        with self._lock:
+            self._stats.clear()
+
+
+# Métricas globales del proceso
+_tier_stats = TierStats()
+
+
+def get_tier_stats() -> Dict[str, Dict[str, float]]:
+    """Retorna las métricas por nivel del proceso"""
+    return _tier_stats.get_stats()
+
+
+class RoutedLLM:
+    """
+    Envoltorio que registra latencia y tokens de cada llamada en su nivel.
+    """
+
+    def __init__(self, llm: Any, route: str, model: str, tier: str,
+                 escalated: bool = False, stats: Optional[TierStats] = None,
+                 fallback: Optional[Callable[[], 'RoutedLLM']] = None):
+        """
+        Args:
+            llm: Cliente del modelo elegido
+            route: Tipo de llamada
+            model: Nombre del modelo elegido
+            tier: Nivel del modelo
+            escalated: Si la llamada se escaló al modelo grande
+            stats: Métricas donde registrar (None = globales)
+            fallback: Fábrica del cliente grande si el modelo rápido falla
+                (p.ej. porque no está descargado en Ollama)
+        """
+        self.llm = llm
+        self.route = route
+        self.model_name = model
+        self.tier = tier
+        self.escalated = escalated
+        self._stats = stats if stats is not None else _tier_stats
+        self._fallback = fallback
+
+    def _record(self, start: float, response: Any):
+        input_tokens, output_tokens = extract_token_usage(response)
+        self._stats.record(self.tier, self.route, self.model_name, time.time() - start,
+                           input_tokens, output_tokens, self.escalated)
+
+    def _fall_back(self, error: Exception) -> 'RoutedLLM':
+        logger.warning(f"[{self.tier}] {self.route}: {self.model_name} falló ({error}); "
+                       f"usando el modelo grande")
+        return self._fallback()
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        start = time.time()
+        try:
+            response = self.llm.invoke(prompt, **kwargs)
+        except Exception as e:
+            if self._fallback is None:
+                raise
+            return self._fall_back(e).invoke(prompt, **kwargs)
+        self._record(start, response)
+        return response
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> Any:
+        start = time.time()
+        try:
+            response = await self.llm.ainvoke(prompt, **kwargs)
+        except Exception as e:
+            if self._fallback is None:
+                raise
+            return await self._fall_back(e).ainvoke(prompt, **kwargs)
+        self._record(start, response)
+        return response
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[Any]:
+        start = time.time()
+        last_chunk = None
+        inner = self.llm.stream(prompt, **kwargs)
+        try:
+            for chunk in inner:
+                last_chunk = chunk
+                yield chunk
+        finally:
+            close = getattr(inner, 'close', None)
+            if close is not None:
+                close()
+            # El último fragmento trae el recuento de tokens si la generación terminó
+            self._record(start, last_chunk)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+
+def get_routed_llm(route: str, default_model: str, temperature: Optional[float] = None,
+                   agent: Optional[str] = None, escalate: bool = False, **options) -> RoutedLLM:
+    """
+    Obtiene el cliente LLM del nivel que corresponde a la llamada
+
+    Args:
+        route: Tipo de llamada (clave de ROUTES)
+        default_model: Modelo grande que el agente usaría sin enrutamiento
+        temperature: Temperatura de muestreo
+        agent: Agente que lo usa (activa el caché LLM)
+        escalate: Forzar el modelo grande
+        **options: Parámetros adicionales de ChatOllama
+
+    Returns:
+        Cliente envuelto que registra métricas por nivel
+    """
+    model, tier = route_model(route, default_model, escalate)
+    routed_model, _ = route_model(route, default_model)
+    llm = get_llm(model, temperature, agent=agent, **options)
+
+    fallback = None
+    if tier == TIER_FAST:
+        fallback = lambda: get_routed_llm(route, default_model, temperature, agent,
+                                          escalate=True, **options)
+
+    return RoutedLLM(llm, route, model, tier,
+                     escalated=escalate and routed_model != model, fallback=fallback)
@@ -0,0 +1,308 @@
+"""
+Índice de Bindings Python de NS-3
+
+Construye (una sola vez por versión de NS-3) un índice de los módulos y
+símbolos disponibles en los bindings Python, lo cachea en disco y permite
+resolver estáticamente las referencias ``ns.<modulo>.<Clase>`` del código
+generado sin lanzar una simulación.
+"""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from config.settings import (
+    NS3_ROOT,
+    NS3_VERSION,
+    NS3_BINDINGS_CACHE_DIR
+)
+
+
+# Script de introspección ejecutado en un proceso aparte (con cwd=NS3_ROOT),
+# para no cargar cppyy/bindings en el proceso de los agentes.
+INTROSPECTION_SCRIPT = r'''
+import importlib
+import json
+import pkgutil
+import sys
+
+sys.path.insert(0, 'build/lib/python3')
+sys.path.insert(0, 'build/bindings/python')
+
+import ns
+
+names = set()
+if hasattr(ns, '__path__'):
+    names.update(m.name for m in pkgutil.iter_modules(ns.__path__))
+names.update(n for n in dir(ns) if not n.startswith('_'))
+
+index = {}
+for name in sorted(names):
+    try:
+        module = importlib.import_module('ns.' + name)
+    except Exception:
+        module = getattr(ns, name, None)
+        if module is None or not hasattr(module, '__dict__'):
+            continue
+    index[name] = sorted(s for s in dir(module) if not s.startswith('_'))
+
+print(json.dumps(index))
+'''
+
+
+class NS3BindingIndex:
+    """
+    Índice de símbolos disponibles en los bindings Python de NS-3.
+
+    Mapea cada módulo (``core``, ``network``, ``wifi``, ...) al conjunto de
+    símbolos públicos que expone.
+    """
+
+    def __init__(self, modules: Dict[str, List[str]], version: str = NS3_VERSION):
+        """
+        Inicializa el índice
+
+        Args:
+            modules: Diccionario módulo -> lista de símbolos
+            version: Versión de NS-3 a la que corresponde el índice
+        """
+        self.version = version
+        self.modules: Dict[str, Set[str]] = {
+            name: set(symbols) for name, symbols in modules.items()
+        }
+
+    def has_module(self, module: str) -> bool:
+        """Indica si el módulo ns.<module> existe"""
+        return module in self.modules
+
+    def has_symbol(self, module: str, symbol: str) -> bool:
+        """
+        Indica si ns.<module>.<symbol> existe.
+
+        Si el módulo no expone símbolos (bindings con carga perezosa),
+        no se puede afirmar que falte, por lo que se considera válido.
+        """
+        symbols = self.modules.get(module)
+        if symbols is None:
+            return False
+        return not symbols or symbol in symbols
+
+    def to_dict(self) -> Dict:
+        """Serializa el índice para guardarlo en disco"""
+        return {
+            'version': self.version,
+            'modules': {name: sorted(symbols) for name, symbols in self.modules.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NS3BindingIndex':
+        """Reconstruye el índice desde su forma serializada"""
+        return cls(data.get('modules', {}), version=data.get('version', NS3_VERSION))
+
+
+def get_cache_file(version: str = NS3_VERSION, cache_dir: Path = None) -> Path:
+    """
+    Obtiene la ruta del índice cacheado para una versión de NS-3
+
+    Args:
+        version: Versión de NS-3
+        cache_dir: Directorio de caché (por defecto NS3_BINDINGS_CACHE_DIR)
+
+    Returns:
+        Ruta al archivo JSON del índice
+    """
+    cache_dir = Path(cache_dir) if cache_dir else Path(NS3_BINDINGS_CACHE_DIR)
+    return cache_dir / f"bindings_ns-{version}.json"
+
+
+def build_binding_index(ns3_root: Path = NS3_ROOT, timeout: int = 300) -> Optional[NS3BindingIndex]:
+    """
+    Construye el índice introspeccionando los bindings en un subproceso
+
+    Args:
+        ns3_root: Directorio raíz de NS-3
+        timeout: Tiempo máximo de introspección en segundos
+
+    Returns:
+        Índice construido, o None si los bindings no están disponibles
+    """
+    ns3_root = Path(ns3_root)
+    if not ns3_root.exists():
+        return None
+
+    env = os.environ.copy()
+    bindings_paths = [
+        str(ns3_root / "build" / "bindings" / "python"),
+        str(ns3_root / "build" / "lib" / "python3")
+    ]
+    if env.get("PYTHONPATH"):
+        bindings_paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(bindings_paths)
+
+    try:
+        result = subprocess.run(
+            [sys.executable, '-c', INTROSPECTION_SCRIPT],
+            cwd=str(ns3_root),
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"⚠️  No se pudo introspeccionar bindings NS-3: {e}")
+        return None
+
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+
+    try:
+        modules = json.loads(result.stdout.strip().splitlines()[-1])
+    except json.JSONDecodeError:
+        return None
+
+    if not modules:
+        return None
+
+    return NS3BindingIndex(modules)
+
+
+def load_binding_index(version: str = NS3_VERSION, cache_dir: Path = None,
+                       ns3_root: Path = NS3_ROOT, rebuild: bool = False) -> Optional[NS3BindingIndex]:
+    """
+    Carga el índice desde disco o lo construye y cachea si no existe
+
+    Args:
+        version: Versión de NS-3
+        cache_dir: Directorio de caché
+        ns3_root: Directorio raíz de NS-3 (para construir el índice)
+        rebuild: Forzar reconstrucción ignorando la caché
+
+    Returns:
+        Índice de bindings, o None si no hay NS-3 disponible
+    """
+    cache_file = get_cache_file(version, cache_dir)
+
+    if cache_file.exists() and not rebuild:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return NS3BindingIndex.from_dict(json.load(f))
+        except Exception as e:
+            print(f"⚠️  Índice de bindings corrupto, reconstruyendo: {e}")
+
+    index = build_binding_index(ns3_root)
+    if index is None:
+        return None
+
+    index.version = version
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(index.to_dict(), f)
+    except Exception as e:
+        print(f"⚠️  No se pudo guardar el índice de bindings: {e}")
+
+    return index
+
+
+_index_cache: Dict[str, Optional[NS3BindingIndex]] = {}
+
+
+def get_binding_index(version: str = NS3_VERSION) -> Optional[NS3BindingIndex]:
+    """
+    Obtiene el índice de bindings, construyéndolo como máximo una vez por proceso
+
+    Args:
+        version: Versión de NS-3
+
+    Returns:
+        Índice de bindings, o None si NS-3 no está disponible
+    """
+    if version not in _index_cache:
+        _index_cache[version] = load_binding_index(version)
+    return _index_cache[version]
+
+
+def _dotted_name(node: ast.AST) -> Optional[List[str]]:
+    """Convierte una cadena de atributos (a.b.c) en lista de nombres"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return list(reversed(parts))
+    return None
+
+
+def find_unresolved_references(code: str, index: NS3BindingIndex) -> List[str]:
+    """
+    Resuelve cada referencia ns.<modulo>.<Símbolo> del código contra el índice
+
+    Args:
+        code: Código Python a verificar
+        index: Índice de bindings NS-3
+
+    Returns:
+        Lista de referencias no resueltas (vacía si todo es válido)
+    """
+    tree = ast.parse(code)
+
+    # Alias locales que apuntan a un módulo NS-3 (import ns.core as core)
+    module_aliases: Dict[str, str] = {}
+    unresolved: List[str] = []
+
+    def report(reference: str):
+        if reference not in unresolved:
+            unresolved.append(reference)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                parts = alias.name.split('.')
+                if parts[0] != 'ns' or len(parts) < 2:
+                    continue
+                if not index.has_module(parts[1]):
+                    report(alias.name)
+                elif alias.asname:
+                    module_aliases[alias.asname] = parts[1]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            parts = node.module.split('.')
+            if parts[0] != 'ns':
+                continue
+            if len(parts) == 1:
+                for alias in node.names:
+                    if alias.name != 'ns' and not index.has_module(alias.name):
+                        report(f"ns.{alias.name}")
+                    elif alias.name != 'ns':
+                        module_aliases[alias.asname or alias.name] = alias.name
+            elif not index.has_module(parts[1]):
+                report(node.module)
+            else:
+                for alias in node.names:
+                    if alias.name != '*' and not index.has_symbol(parts[1], alias.name):
+                        report(f"{node.module}.{alias.name}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Attribute):
+            continue
+        parts = _dotted_name(node)
+        if not parts:
+            continue
+
+        if parts[0] == 'ns' and len(parts) >= 3:
+            module, symbol = parts[1], parts[2]
+        elif parts[0] in module_aliases and len(parts) >= 2:
+            module, symbol = module_aliases[parts[0]], parts[1]
+        else:
+            continue
+
+        if not index.has_module(module):
+            report(f"ns.{module}")
+        elif not index.has_symbol(module, symbol):
+            report(f"ns.{module}.{symbol}")
+
+    return unresolved
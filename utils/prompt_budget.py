@@ -0,0 +1,344 @@
+"""
+Presupuesto de Tokens para Prompts
+
+Los agentes recortaban el contexto de forma ad hoc (research_notes[:2000],
+code[:4000], previous_error[:500], abstract[:400]): a veces se pierde lo
+importante (el final de un traceback) y a veces pasa contexto innecesario que
+alarga el prefill en los modelos locales. Este módulo construye prompts sobre
+get_prompt() ajustándolos a un presupuesto de tokens: cuenta tokens, ordena
+las secciones por prioridad y comprime primero las menos importantes con un
+compresor adecuado a su contenido (tracebacks deduplicados, notas de
+investigación resumidas una sola vez, listas recortadas de forma uniforme).
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
+from utils.prompts import get_prompt
+
+# Marca que sustituye al texto eliminado
+TRUNCATION_MARKER = "\n[... recortado ...]\n"
+
+# Valores por defecto si la configuración no está disponible
+DEFAULT_CHARS_PER_TOKEN = 3.5
+DEFAULT_TOKEN_BUDGET = 3000
+
+
+def _setting(name: str, default: float) -> float:
+    """Lee un valor numérico de config.settings (o el valor por defecto)"""
+    try:
+        import config.settings as settings
+    except ImportError:
+        return default
+    value = getattr(settings, name, default)
+    return value if isinstance(value, (int, float)) and value > 0 else default
+
+
+def _chars_per_token() -> float:
+    return _setting('PROMPT_CHARS_PER_TOKEN', DEFAULT_CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estima el número de tokens de un texto
+
+    Los modelos locales no exponen su tokenizador a través de Ollama, así que
+    se usa una estimación por caracteres (PROMPT_CHARS_PER_TOKEN).
+
+    Args:
+        text: Texto a medir
+
+    Returns:
+        Número estimado de tokens
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / _chars_per_token())
+
+
+def _max_chars(max_tokens: int) -> int:
+    return max(0, int(max_tokens * _chars_per_token()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, head_ratio: float = 0.7) -> str:
+    """
+    Recorta un texto conservando su inicio y su final
+
+    Args:
+        text: Texto a recortar
+        max_tokens: Máximo de tokens del resultado
+        head_ratio: Fracción del espacio reservada al inicio del texto
+
+    Returns:
+        Texto recortado (sin cambios si ya cabe)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    available = _max_chars(max_tokens) - len(TRUNCATION_MARKER)
+    if available <= 0:
+        return ""
+
+    head = int(available * head_ratio)
+    tail = available - head
+    if tail <= 0:
+        return text[:head].rstrip() + TRUNCATION_MARKER.rstrip()
+    return text[:head].rstrip() + TRUNCATION_MARKER + text[-tail:].lstrip()
+
+
+def dedupe_traceback(text: str, max_block: int = 3) -> str:
+    """
+    Colapsa líneas y bloques de líneas repetidos consecutivamente
+
+    Reduce tracebacks recursivos y salidas de error que repiten el mismo
+    frame o mensaje muchas veces.
+
+    Args:
+        text: Traceback o salida de error
+        max_block: Tamaño máximo (en líneas) de los bloques que se detectan
+
+    Returns:
+        Texto con las repeticiones colapsadas
+    """
+    lines = text.splitlines()
+    result: List[str] = []
+    i = 0
+
+    while i < len(lines):
+        collapsed = False
+        for size in range(1, max_block + 1):
+            block = lines[i:i + size]
+            if len(block) < size:
+                break
+            repeats = 1
+            while lines[i + repeats * size:i + (repeats + 1) * size] == block:
+                repeats += 1
+            if repeats > 1:
+                result.extend(block)
+                result.append(f"[... bloque anterior repetido {repeats - 1} veces más ...]")
+                i += repeats * size
+                collapsed = True
+                break
+        if not collapsed:
+            result.append(lines[i])
+            i += 1
+
+    # Eliminar tracebacks completos duplicados (p.ej. stderr y log con el mismo error)
+    blocks = re.split(r'(?=^Traceback \(most recent call last\):)', "\n".join(result), flags=re.M)
+    unique_blocks = list(dict.fromkeys(block for block in blocks if block.strip()))
+    return "\n".join(block.rstrip("\n") for block in unique_blocks)
+
+
+def compress_traceback(text: str, max_tokens: int) -> str:
+    """
+    Comprime un traceback priorizando su final (tipo y mensaje del error)
+
+    Args:
+        text: Traceback o salida de error
+        max_tokens: Máximo de tokens del resultado
+
+    Returns:
+        Traceback deduplicado y, si hace falta, recortado por el medio
+    """
+    return truncate_to_tokens(dedupe_traceback(text), max_tokens, head_ratio=0.3)
+
+
+def _line_rank(line: str) -> int:
+    """Importancia de una línea de notas (menor = más importante)"""
+    stripped = line.strip()
+    if stripped.startswith('#') or re.match(r'^\*\*[^*]+\*\*:?$', stripped) or stripped.endswith(':'):
+        return 0
+    if re.match(r'^(\d+[.)]|[-*•])\s', stripped):
+        return 1
+    if re.search(r'https?://', stripped):
+        return 3
+    return 2
+
+
+# Resúmenes ya calculados: (hash de las notas, presupuesto) -> resumen
+_summary_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_summary_lock = threading.Lock()
+SUMMARY_CACHE_SIZE = 64
+
+
+def summarize_notes(text: str, max_tokens: int) -> str:
+    """
+    Resume notas de investigación de forma extractiva para que quepan en el presupuesto
+
+    Conserva primero encabezados y viñetas (hallazgos, parámetros), después
+    el texto corrido y por último enlaces y referencias, respetando el orden
+    original. El resumen se memoriza: las notas de una tarea se resumen una
+    sola vez y se reutilizan en las siguientes iteraciones.
+
+    Args:
+        text: Notas de investigación
+        max_tokens: Máximo de tokens del resumen
+
+    Returns:
+        Notas resumidas (sin cambios si ya caben)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    key = (hashlib.sha256(text.encode('utf-8')).hexdigest(), max_tokens)
+    with _summary_lock:
+        if key in _summary_cache:
+            _summary_cache.move_to_end(key)
+            return _summary_cache[key]
+
+    # Líneas únicas no vacías, con su posición original
+    seen = set()
+    candidates = []
+    for index, line in enumerate(text.splitlines()):
+        normalized = " ".join(line.split()).lower()
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        candidates.append((index, line.rstrip()))
+
+    # Las líneas muy largas se acortan para dar cabida a más hallazgos
+    line_cap = max(1, max_tokens // 6)
+    budget = _max_chars(max_tokens)
+    selected = []
+    used = 0
+    for index, line in sorted(candidates, key=lambda c: (_line_rank(c[1]), c[0])):
+        line = truncate_to_tokens(line, line_cap, head_ratio=1.0).rstrip()
+        cost = len(line) + 1
+        if used + cost > budget:
+            continue
+        selected.append((index, line))
+        used += cost
+
+    summary = "\n".join(line for _, line in sorted(selected))
+
+    with _summary_lock:
+        _summary_cache[key] = summary
+        _summary_cache.move_to_end(key)
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    return summary
+
+
+def shrink_items(items: List[str], max_tokens: int, separator: str = "\n\n") -> str:
+    """
+    Une una lista de elementos recortando primero los más largos
+
+    Todos los elementos se conservan; se busca el mayor límite común por
+    elemento con el que la lista completa cabe en el presupuesto.
+
+    Args:
+        items: Elementos (p.ej. un resumen por paper)
+        max_tokens: Máximo de tokens del resultado
+        separator: Separador entre elementos
+
+    Returns:
+        Elementos unidos y recortados
+    """
+    joined = separator.join(items)
+    if estimate_tokens(joined) <= max_tokens or not items:
+        return joined
+
+    available = max_tokens - estimate_tokens(separator) * (len(items) - 1)
+    low, high = 0, max(estimate_tokens(item) for item in items)
+    while low < high:
+        cap = (low + high + 1) // 2
+        if sum(min(estimate_tokens(item), cap) for item in items) <= available:
+            low = cap
+        else:
+            high = cap - 1
+
+    return separator.join(truncate_to_tokens(item, low, head_ratio=1.0) for item in items)
+
+
+# Compresores disponibles por tipo de contenido
+COMPRESSORS: Dict[str, Callable[[str, int], str]] = {
+    'text': truncate_to_tokens,
+    'traceback': compress_traceback,
+    'notes': summarize_notes,
+}
+
+
+@dataclass
+class PromptSection:
+    """Sección variable de un prompt que puede comprimirse"""
+    content: Union[str, List[str]]
+    priority: int = 1                  # 1 = más importante; se comprime último
+    max_tokens: Optional[int] = None   # Límite propio de la sección
+    compressor: str = 'text'           # Clave de COMPRESSORS (ignorado en listas)
+    min_tokens: int = 64               # No se comprime por debajo de este tamaño
+    separator: str = "\n\n"            # Separador si content es una lista
+
+    def render(self, max_tokens: Optional[int] = None) -> str:
+        """Texto de la sección, comprimido a max_tokens si se indica"""
+        if isinstance(self.content, (list, tuple)):
+            items = [str(item) for item in self.content]
+            if max_tokens is None:
+                return self.separator.join(items)
+            return shrink_items(items, max_tokens, self.separator)
+
+        text = str(self.content or "")
+        if max_tokens is None or estimate_tokens(text) <= max_tokens:
+            return text
+        if self.compressor not in COMPRESSORS:
+            raise ValueError(f"Compresor desconocido: {self.compressor}")
+        return COMPRESSORS[self.compressor](text, max_tokens)
+
+
+def fit_sections(sections: Dict[str, PromptSection], available_tokens: int) -> Dict[str, str]:
+    """
+    Ajusta las secciones a los tokens disponibles
+
+    Primero aplica el límite propio de cada sección; si aún se excede el
+    presupuesto, comprime las secciones de menor prioridad hasta su mínimo
+    antes de tocar las más importantes.
+
+    Args:
+        sections: Secciones por nombre de placeholder
+        available_tokens: Tokens disponibles para todas las secciones
+
+    Returns:
+        Texto final de cada sección
+    """
+    texts = {name: section.render(section.max_tokens) for name, section in sections.items()}
+
+    excess = sum(estimate_tokens(t) for t in texts.values()) - available_tokens
+    for name, section in sorted(sections.items(), key=lambda item: -item[1].priority):
+        if excess <= 0:
+            break
+        current = estimate_tokens(texts[name])
+        target = max(section.min_tokens, current - excess)
+        if target < current:
+            texts[name] = section.render(target)
+            excess -= current - estimate_tokens(texts[name])
+
+    return texts
+
+
+def get_budgeted_prompt(agent: str, key: str, sections: Dict[str, PromptSection],
+                        budget: Optional[int] = None, **kwargs) -> str:
+    """
+    Obtiene un prompt de get_prompt() ajustado a un presupuesto de tokens
+
+    Args:
+        agent: Nombre del agente (coder, researcher, etc.)
+        key: Clave del prompt
+        sections: Placeholders comprimibles con su prioridad y compresor
+        budget: Máximo de tokens del prompt (None = PROMPT_TOKEN_BUDGET)
+        **kwargs: Placeholders fijos (no se comprimen)
+
+    Returns:
+        Prompt formateado
+    """
+    if budget is None:
+        budget = int(_setting('PROMPT_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET))
+
+    # Tokens del prompt sin las secciones comprimibles
+    skeleton = get_prompt(agent, key, **kwargs, **{name: "" for name in sections})
+    available = max(0, budget - estimate_tokens(skeleton))
+
+    return get_prompt(agent, key, **kwargs, **fit_sections(sections, available))
@@ -5,6 +5,12 @@ from typing import Dict, Any
 # Ruta al archivo de prompts
 PROMPTS_FILE = Path(__file__).parent.parent / "config" / "prompts.yaml"
 
+# Segmentos de un prompt con prefijo estable, en el orden en que se emiten:
+# instrucciones fijas (texto literal, sin placeholders), contexto de la tarea
+# y detalles de la iteración (errores, memoria). Mantener lo fijo al principio
+# permite al servidor reutilizar su caché de prefijo entre llamadas repetidas.
+PROMPT_SEGMENTS = ('static', 'context', 'iteration')
+
 _prompts_cache = None
 
 def load_prompts() -> Dict[str, Any]:
@@ -22,6 +28,37 @@ def load_prompts() -> Dict[str, Any]:
             
     return _prompts_cache
 
+def is_segmented(template: Any) -> bool:
+    """Indica si una entrada de prompts.yaml usa la disposición de prefijo estable"""
+    return isinstance(template, dict) and 'static' in template and set(template) <= set(PROMPT_SEGMENTS)
+
+def render_segments(template: Dict[str, str], **kwargs) -> str:
+    """
+    Compone un prompt segmentado: static + context + iteration
+    
+    El segmento 'static' se emite literalmente (idéntico en todas las
+    llamadas); 'context' e 'iteration' se formatean con kwargs.
+    
+    Args:
+        template: Entrada segmentada de prompts.yaml
+        **kwargs: Variables para formatear el prompt
+        
+    Returns:
+        Prompt formateado
+    """
+    parts = [template['static'].rstrip()]
+    for segment in PROMPT_SEGMENTS[1:]:
+        text = template.get(segment) or ''
+        rendered = text.format(**kwargs).strip()
+        if rendered:
+            parts.append(rendered)
+    return "\n\n".join(parts) + "\n"
+
+def _format_template(template: Any, **kwargs) -> str:
+    if is_segmented(template):
+        return render_segments(template, **kwargs)
+    return template.format(**kwargs)
+
 def get_prompt(agent: str, key: str, **kwargs) -> str:
     """
     Obtiene un prompt específico y formatea sus placeholders.
@@ -49,12 +86,12 @@ def get_prompt(agent: str, key: str, **kwargs) -> str:
                     value = value[part]
                 else:
                     raise KeyError(f"Clave '{key}' no encontrada para agente '{agent}'")
-            return value.format(**kwargs)
+            return _format_template(value, **kwargs)
         else:
             raise KeyError(f"Clave '{key}' no encontrada para agente '{agent}'")
             
     prompt_template = prompts[agent][key]
     try:
-        return prompt_template.format(**kwargs)
+        return _format_template(prompt_template, **kwargs)
     except KeyError as e:
         raise ValueError(f"Falta variable para formatear prompt '{agent}.{key}': {e}")
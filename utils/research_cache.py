@@ -0,0 +1,136 @@
+"""
+Reutilización de Investigaciones por Familia de Tareas
+
+En una campaña cuyos escenarios solo difieren en el número de nodos o la
+velocidad, research_node repetía la generación de la consulta, la búsqueda
+bibliográfica, la ingesta en ChromaDB y la síntesis LLM. Este módulo guarda
+research_notes y papers_found indexados por la plantilla normalizada de la
+tarea (los valores numéricos se sustituyen), de modo que las tareas de la
+misma familia reutilizan la investigación previa mientras no sea más antigua
+que RESEARCH_REUSE_MAX_AGE_HOURS.
+"""
+
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.cache import PersistentCache, make_cache_key
+
+# Números (enteros o decimales) de la descripción de la tarea
+NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)?')
+
+
+def task_template(task: str) -> str:
+    """
+    Plantilla de una tarea: minúsculas, números sustituidos y espacios colapsados
+
+    Args:
+        task: Descripción de la tarea
+
+    Returns:
+        Plantilla común a las tareas de la misma familia
+    """
+    return " ".join(NUMBER_PATTERN.sub('<n>', task.lower()).split())
+
+
+def _settings() -> Tuple[bool, float]:
+    """
+    Lee la configuración en el momento de la llamada
+
+    Returns:
+        Tupla (reutilización habilitada, antigüedad máxima en horas; 0 = sin límite)
+    """
+    try:
+        import config.settings as settings
+    except ImportError:
+        return False, 0.0
+
+    enabled = getattr(settings, 'RESEARCH_REUSE_ENABLED', False) is True
+    max_age = getattr(settings, 'RESEARCH_REUSE_MAX_AGE_HOURS', 0.0)
+    if not isinstance(max_age, (int, float)) or max_age < 0:
+        max_age = 0.0
+    return enabled, max_age
+
+
+def research_reuse_enabled() -> bool:
+    """Indica si research_node debe reutilizar investigaciones previas"""
+    return _settings()[0]
+
+
+class ResearchArtifactCache:
+    """
+    Caché persistente de los artefactos de investigación por plantilla de tarea.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Inicializa el caché
+
+        Args:
+            db_path: Ruta a la base de datos (None = CACHE_DB_PATH)
+        """
+        if db_path is None:
+            from config.settings import CACHE_DB_PATH
+            db_path = CACHE_DB_PATH
+
+        self.cache = PersistentCache(db_path, namespace="research")
+
+    @staticmethod
+    def make_key(task: str) -> str:
+        """Calcula la clave de la familia de la tarea"""
+        return make_cache_key('research', task_template(task))
+
+    def lookup(self, task: str, max_age_hours: Optional[float] = None) -> Optional[Dict]:
+        """
+        Busca la investigación de una tarea de la misma familia
+
+        Args:
+            task: Descripción de la tarea
+            max_age_hours: Antigüedad máxima aceptada (None = configuración; 0 = sin límite)
+
+        Returns:
+            Entrada con 'research_notes', 'papers_found', 'task' y 'created_at',
+            o None si no existe o está obsoleta
+        """
+        if max_age_hours is None:
+            max_age_hours = _settings()[1]
+
+        entry = self.cache.get(self.make_key(task))
+        if entry is None:
+            return None
+        if max_age_hours > 0 and time.time() - entry['created_at'] > max_age_hours * 3600:
+            return None
+        return entry
+
+    def store(self, task: str, research_notes: List[str], papers_found: List[Dict]):
+        """
+        Guarda la investigación de una tarea para su familia
+
+        Args:
+            task: Descripción de la tarea investigada
+            research_notes: Notas de investigación producidas
+            papers_found: Papers encontrados
+        """
+        self.cache.set(self.make_key(task), {
+            'task': task,
+            'research_notes': research_notes,
+            'papers_found': papers_found,
+            'created_at': time.time()
+        })
+
+
+# Instancia global (se crea en el primer uso)
+_research_cache: Optional[ResearchArtifactCache] = None
+_research_cache_lock = threading.Lock()
+
+
+def get_research_cache() -> ResearchArtifactCache:
+    """Obtiene la instancia global del caché de investigaciones"""
+    global _research_cache
+
+    with _research_cache_lock:
+        if _research_cache is None:
+            _research_cache = ResearchArtifactCache()
+    return _research_cache
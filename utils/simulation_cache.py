@@ -0,0 +1,117 @@
+"""
+Caché de Resultados de Simulación
+
+Evita relanzar NS-3 cuando el optimizador o una re-ejecución producen el mismo
+script con la misma semilla: la huella (script normalizado, semilla, versión de
+NS-3, parámetros) identifica una simulación y permite reutilizar su XML de
+FlowMonitor, sus PCAPs y su stdout ya almacenados.
+"""
+
+import ast
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.settings import CACHE_DB_PATH
+from utils.cache import PersistentCache, make_cache_key
+from utils.artifact_store import resolve_artifact
+
+
+def normalize_script(code: str) -> str:
+    """
+    Normaliza un script eliminando comentarios y diferencias de formato
+
+    Args:
+        code: Código Python del script
+
+    Returns:
+        Código normalizado (idéntico para scripts semánticamente iguales)
+    """
+    try:
+        return ast.unparse(ast.parse(code))
+    except SyntaxError:
+        lines = [line.rstrip() for line in code.strip().splitlines()]
+        return "\n".join(line for line in lines if line and not line.lstrip().startswith('#'))
+
+
+def simulation_fingerprint(code: str, seed: Optional[int], ns3_version: str,
+                           params: Dict[str, Any] = None) -> str:
+    """
+    Calcula la huella de una simulación
+
+    Args:
+        code: Código del script de simulación
+        seed: Semilla aleatoria de la simulación
+        ns3_version: Versión de NS-3
+        params: Parámetros adicionales que afectan al resultado
+
+    Returns:
+        Huella hexadecimal
+    """
+    return make_cache_key(
+        'simulation',
+        normalize_script(code),
+        seed,
+        ns3_version,
+        params or {}
+    )
+
+
+class SimulationResultCache:
+    """
+    Caché de resultados de simulación indexado por huella.
+
+    Cada entrada guarda las rutas de los artefactos producidos; una entrada
+    cuyos artefactos ya no existen (ni comprimidos) se descarta al consultarla.
+    """
+
+    def __init__(self, db_path: Path = CACHE_DB_PATH):
+        """
+        Inicializa el caché
+
+        Args:
+            db_path: Ruta a la base de datos de caché
+        """
+        self.cache = PersistentCache(db_path, namespace="simulations")
+
+    def lookup(self, fingerprint: str) -> Optional[Dict]:
+        """
+        Busca un resultado previo para la huella dada
+
+        Args:
+            fingerprint: Huella de la simulación
+
+        Returns:
+            Entrada almacenada, o None si no existe o sus artefactos faltan
+        """
+        entry = self.cache.get(fingerprint)
+        if entry is None:
+            return None
+
+        # Los artefactos pueden haberse comprimido tras el análisis
+        logs = resolve_artifact(entry['simulation_logs']) if entry.get('simulation_logs') else None
+        pcaps = [resolve_artifact(path) for path in entry.get('pcap_files', [])]
+        if logs is None or not all(pcaps):
+            self.cache.delete(fingerprint)
+            return None
+
+        entry['simulation_logs'] = str(logs)
+        entry['pcap_files'] = [str(path) for path in pcaps]
+        return entry
+
+    def store(self, fingerprint: str, entry: Dict):
+        """
+        Guarda el resultado de una simulación exitosa
+
+        Args:
+            fingerprint: Huella de la simulación
+            entry: Rutas de artefactos e información de la ejecución
+        """
+        self.cache.set(fingerprint, entry)
+
+    def get_stats(self) -> Dict:
+        """Retorna estadísticas del caché"""
+        return self.cache.get_stats()
+
+
+# Instancia global del caché de simulaciones
+simulation_cache = SimulationResultCache()
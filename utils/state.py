@@ -30,6 +30,9 @@ class AgentState(TypedDict):
     papers_found: Annotated[List[Dict[str, Any]], operator.add]
     """Lista de papers encontrados con metadatos"""
     
+    scenario: Optional[Dict[str, Any]]
+    """Parámetros estructurados del escenario (protocol, nodes, area, duration, mobility, speed)"""
+    
     # ========================================================================
     # CÓDIGO Y SIMULACIÓN
     # ========================================================================
@@ -40,6 +43,9 @@ class AgentState(TypedDict):
     code_validated: bool
     """Indica si el código ha sido validado"""
     
+    code_source: Optional[str]
+    """Origen del código: 'template' (escenario estándar) o 'llm'"""
+    
     simulation_logs: str
     """Ruta al archivo de logs de la simulación (XML/CSV)"""
     
@@ -49,6 +55,9 @@ class AgentState(TypedDict):
     pcap_files: Annotated[List[str], operator.add]
     """Lista de archivos PCAP generados por la simulación"""
     
+    capture_profile: Optional[str]
+    """Perfil de captura PCAP de la simulación (full, headers, routing, none)"""
+    
     trace_analysis: Optional[List[Dict[str, Any]]]
     """Análisis detallado de trazas PCAP"""
     
@@ -127,7 +136,8 @@ class AgentState(TypedDict):
     """Overhead de enrutamiento (paquetes control/datos)"""
 
 
-def create_initial_state(task: str, max_iterations: int = 5, seed: int = None) -> AgentState:
+def create_initial_state(task: str, max_iterations: int = 5, seed: int = None,
+                         capture_profile: str = None, scenario: Dict[str, Any] = None) -> AgentState:
     """
     Crea un estado inicial para una nueva tarea.
     
@@ -135,6 +145,8 @@ def create_initial_state(task: str, max_iterations: int = 5, seed: int = None) -
         task: Descripción de la tarea de investigación
         max_iterations: Número máximo de iteraciones permitidas
         seed: Semilla aleatoria para reproducibilidad (None = aleatoria)
+        capture_profile: Perfil de captura PCAP (None = configuración global)
+        scenario: Parámetros estructurados del escenario (None = solo la tarea)
         
     Returns:
         Estado inicial configurado
@@ -150,13 +162,16 @@ def create_initial_state(task: str, max_iterations: int = 5, seed: int = None) -
         task=task,
         research_notes=[],
         papers_found=[],
+        scenario=scenario,
         
         # Código
         code_snippet="",
         code_validated=False,
+        code_source=None,
         simulation_logs="",
         simulation_status="pending",
         pcap_files=[],
+        capture_profile=capture_profile,
         trace_analysis=None,
         trace_analysis_report=None,
         
@@ -67,4 +67,47 @@ def validate_code(code: str) -> Tuple[bool, str]:
     if 'def main()' not in code and 'if __name__' not in code:
          return False, "Falta función main() o bloque if __name__"
 
+    # 4. Resolución estática de referencias ns.* contra el índice de bindings
+    is_valid, message = validate_ns3_references(code)
+    if not is_valid:
+        return False, message
+
     return True, "Código válido"
+
+
+def validate_ns3_references(code: str) -> Tuple[bool, str]:
+    """
+    Verifica que cada referencia ns.<modulo>.<Clase> exista en los bindings NS-3.
+
+    Usa el índice cacheado por versión de NS-3; si NS-3 no está disponible
+    en este entorno la verificación se omite.
+
+    Args:
+        code: The Python code string to validate.
+
+    Returns:
+        A tuple (is_valid, message).
+    """
+    try:
+        from config.settings import NS3_BINDINGS_CHECK
+        from utils.ns3_bindings import get_binding_index, find_unresolved_references
+
+        if not NS3_BINDINGS_CHECK:
+            return True, "Verificación de bindings deshabilitada"
+
+        index = get_binding_index()
+        if index is None:
+            return True, "Índice de bindings NS-3 no disponible"
+
+        unresolved = find_unresolved_references(code, index)
+    except Exception as e:
+        logger.warning(f"Verificación de bindings NS-3 omitida: {e}")
+        return True, "Verificación de bindings omitida"
+
+    if unresolved:
+        return False, (
+            f"Referencias NS-3 inexistentes en bindings {index.version}: "
+            f"{', '.join(unresolved[:10])}"
+        )
+
+    return True, "Referencias NS-3 válidas"
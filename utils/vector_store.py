@@ -0,0 +1,316 @@
+"""
+Almacén Vectorial de Papers
+
+El investigador añadía los papers a ChromaDB de uno en uno, con IDs
+construidos con hash(título): la aleatorización de hash() por proceso hacía
+que cada ejecución volviera a insertar (y a embeber) los mismos papers. Aquí
+los IDs se derivan del contenido, los papers ya presentes se omiten y los
+nuevos se insertan por lotes, con una sola llamada de embedding por lote.
+
+Además, cada consulta abría un PersistentClient nuevo, recargando el índice
+HNSW desde disco. VectorStore mantiene un cliente y sus colecciones por
+proceso, creados al primer uso, y un LRU de embeddings de consulta y de
+resultados para servir desde memoria las consultas RAG repetidas. Para la
+recuperación híbrida mantiene también un índice BM25 por colección.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.hybrid_retrieval import HYBRID_CANDIDATES, BM25Index, RetrievedChunk, hybrid_search
+
+# Papers por llamada a upsert (y por tanto por llamada de embedding)
+PAPER_BATCH_SIZE = 64
+
+# Consultas recientes (embeddings y resultados) conservadas en memoria
+QUERY_CACHE_SIZE = 128
+
+
+def paper_id(paper: Dict) -> str:
+    """
+    ID estable de un paper, igual en todos los procesos y ejecuciones
+
+    Se deriva del título normalizado (o de la URL si no hay título), de modo
+    que el mismo paper encontrado en Semantic Scholar y arXiv comparte ID.
+
+    Args:
+        paper: Paper con 'title' y/o 'url'
+
+    Returns:
+        ID del documento en la colección
+    """
+    key = " ".join(str(paper.get('title') or '').lower().split()) or str(paper.get('url') or '')
+    return "paper_" + hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+
+def paper_document(paper: Dict) -> str:
+    """Texto embebido de un paper (título y abstract)"""
+    return f"Title: {paper['title']}\n\nAbstract: {paper['abstract']}"
+
+
+def paper_metadata(paper: Dict) -> Dict[str, Any]:
+    """Metadatos de un paper (ChromaDB no admite valores None)"""
+    return {
+        'title': paper['title'],
+        'year': str(paper.get('year', '')),
+        'citations': paper.get('citations') or 0,
+        'url': paper.get('url') or ''
+    }
+
+
+def upsert_papers(collection: Any, papers: List[Dict], batch_size: int = PAPER_BATCH_SIZE) -> int:
+    """
+    Inserta en la colección los papers que aún no contiene
+
+    Args:
+        collection: Colección de ChromaDB
+        papers: Papers a almacenar (puede haber duplicados entre fuentes)
+        batch_size: Papers por llamada a upsert
+
+    Returns:
+        Número de papers nuevos insertados
+    """
+    unique: Dict[str, Dict] = {}
+    for paper in papers:
+        unique.setdefault(paper_id(paper), paper)
+    if not unique:
+        return 0
+
+    existing = set(collection.get(ids=list(unique), include=[])['ids'])
+    new = [(doc_id, paper) for doc_id, paper in unique.items() if doc_id not in existing]
+
+    for start in range(0, len(new), batch_size):
+        batch = new[start:start + batch_size]
+        collection.upsert(
+            ids=[doc_id for doc_id, _ in batch],
+            documents=[paper_document(paper) for _, paper in batch],
+            metadatas=[paper_metadata(paper) for _, paper in batch]
+        )
+
+    return len(new)
+
+
+def _normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _lru_put(cache: OrderedDict, key: Any, value: Any, max_size: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+class VectorStore:
+    """
+    Acceso de proceso a ChromaDB: un cliente persistente y una colección por
+    nombre, creados al primer uso, con caché LRU de consultas.
+    """
+
+    def __init__(self, path: Optional[Path] = None, client: Any = None,
+                 embedding_function: Any = None, cache_size: int = QUERY_CACHE_SIZE):
+        """
+        Args:
+            path: Directorio de la base vectorial (None = CHROMA_PATH)
+            client: Cliente ya construido (None = PersistentClient al primer uso)
+            embedding_function: Función de embedding de las colecciones
+                (None = la función compartida de utils.embeddings)
+            cache_size: Consultas recientes conservadas en memoria
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self._client = client
+        self._embedding_function = embedding_function
+        self._collections: Dict[str, Any] = {}
+        self._embeddings: "OrderedDict[str, Any]" = OrderedDict()
+        self._results: "OrderedDict[tuple, List[Any]]" = OrderedDict()
+        self._lexical: Dict[str, BM25Index] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            from chromadb import PersistentClient
+            from chromadb.config import Settings
+
+            if self.path is None:
+                from config.settings import CHROMA_PATH
+                self.path = CHROMA_PATH
+            self._client = PersistentClient(
+                path=str(self.path),
+                settings=Settings(anonymized_telemetry=False)
+            )
+        return self._client
+
+    def _get_embedding_function(self) -> Any:
+        if self._embedding_function is None:
+            from utils.embeddings import get_embedding_function
+            self._embedding_function = get_embedding_function()
+        return self._embedding_function
+
+    def collection(self, name: str) -> Any:
+        """
+        Colección de ChromaDB (se crea o abre una sola vez por proceso)
+
+        Args:
+            name: Nombre de la colección
+
+        Returns:
+            Colección con la función de embedding del almacén (con un modelo
+            distinto del por defecto, la colección lleva el sufijo del modelo)
+        """
+        with self._lock:
+            if name not in self._collections:
+                embedding_function = self._get_embedding_function()
+                suffix = getattr(embedding_function, 'collection_suffix', '')
+                if not isinstance(suffix, str):
+                    suffix = ''
+                self._collections[name] = self._get_client().get_or_create_collection(
+                    name + suffix, embedding_function=embedding_function
+                )
+            return self._collections[name]
+
+    def embed_query(self, text: str) -> Any:
+        """Embedding de una consulta (reutiliza los de consultas recientes)"""
+        key = _normalize_query(text)
+        with self._lock:
+            if key in self._embeddings:
+                self._embeddings.move_to_end(key)
+                return self._embeddings[key]
+
+        embedding = self._get_embedding_function()([text])[0]
+        with self._lock:
+            _lru_put(self._embeddings, key, embedding, self.cache_size)
+        return embedding
+
+    def query(self, text: str, collection_name: str, n_results: int = 5) -> List[str]:
+        """
+        Documentos más similares a una consulta
+
+        Args:
+            text: Consulta
+            collection_name: Nombre de la colección
+            n_results: Número de resultados
+
+        Returns:
+            Lista de documentos (servida desde memoria si la consulta es reciente)
+        """
+        key = (collection_name, _normalize_query(text), n_results)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return list(self._results[key])
+            self.misses += 1
+
+        results = self.collection(collection_name).query(
+            query_embeddings=[self.embed_query(text)],
+            n_results=n_results
+        )
+        documents = (results.get('documents') or [[]])[0]
+
+        with self._lock:
+            _lru_put(self._results, key, documents, self.cache_size)
+        return list(documents)
+
+    def lexical_index(self, collection_name: str) -> BM25Index:
+        """
+        Índice BM25 de una colección (se construye una vez desde sus documentos)
+
+        Args:
+            collection_name: Nombre de la colección
+
+        Returns:
+            Índice invertido de los documentos de la colección
+        """
+        with self._lock:
+            if collection_name not in self._lexical:
+                stored = self.collection(collection_name).get(include=['documents'])
+                index = BM25Index()
+                index.add(dict(zip(stored.get('ids') or [], stored.get('documents') or [])))
+                self._lexical[collection_name] = index
+            return self._lexical[collection_name]
+
+    def hybrid_query(self, text: str, collection_name: str, n_results: int = 5,
+                     candidates: int = HYBRID_CANDIDATES) -> List[RetrievedChunk]:
+        """
+        Fragmentos más relevantes combinando BM25 y búsqueda vectorial
+
+        Args:
+            text: Consulta
+            collection_name: Nombre de la colección
+            n_results: Número de fragmentos tras reordenar
+            candidates: Candidatos de cada método antes de fusionar
+
+        Returns:
+            Fragmentos reordenados (servidos desde memoria si la consulta es reciente)
+        """
+        key = (collection_name, 'hybrid', _normalize_query(text), n_results)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return list(self._results[key])
+            self.misses += 1
+
+        index = self.lexical_index(collection_name)
+        if len(index) == 0:
+            return []
+
+        results = self.collection(collection_name).query(
+            query_embeddings=[self.embed_query(text)],
+            n_results=min(candidates, len(index)),
+            include=['documents']
+        )
+        vector_hits = list(zip((results.get('ids') or [[]])[0], (results.get('documents') or [[]])[0]))
+        chunks = hybrid_search(text, index, vector_hits, n_results, candidates)
+
+        with self._lock:
+            _lru_put(self._results, key, chunks, self.cache_size)
+        return list(chunks)
+
+    def add_papers(self, papers: List[Dict], collection_name: str) -> int:
+        """
+        Inserta los papers nuevos e invalida los resultados cacheados de la colección
+
+        Args:
+            papers: Papers a almacenar
+            collection_name: Nombre de la colección
+
+        Returns:
+            Número de papers nuevos insertados
+        """
+        stored = upsert_papers(self.collection(collection_name), papers)
+        if stored:
+            with self._lock:
+                for key in [key for key in self._results if key[0] == collection_name]:
+                    del self._results[key]
+                if collection_name in self._lexical:
+                    self._lexical[collection_name].add(
+                        {paper_id(paper): paper_document(paper) for paper in papers}
+                    )
+        return stored
+
+    def reset(self):
+        """Cierra las colecciones abiertas y vacía los cachés"""
+        with self._lock:
+            self._client = None
+            self._collections.clear()
+            self._lexical.clear()
+            self._embeddings.clear()
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Almacén global del proceso
+_store = VectorStore()
+
+
+def get_vector_store() -> VectorStore:
+    """Retorna el almacén vectorial del proceso"""
+    return _store
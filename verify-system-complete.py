@@ -181,8 +181,8 @@ def check_system_functionality():
     
     # Test 1: Importar memoria episódica
     try:
-        from utils.memory import memory
-        stats = memory.get_stats()
+        from utils.memory import get_memory
+        stats = get_memory().get_stats()
         print_success(f"Memoria episódica: {stats['total_experiences']} experiencias")
         tests.append(True)
     except Exception as e: